@@ -17,6 +17,12 @@ def _build_parser() -> argparse.ArgumentParser:
         description="Assign missing UUIDs to every question.md in a CHGKA pack.",
     )
     parser.add_argument("pack_path", type=Path, help="path to the pack directory")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="processes that parse sectors in parallel (default: 1)",
+    )
     return parser
 
 
@@ -49,11 +55,12 @@ def assign_question_ids(
     pack_path: Path,
     *,
     id_factory: Callable[[], uuid.UUID] = uuid.uuid4,
+    workers: int = 1,
 ) -> int:
     pack_path = Path(pack_path).expanduser().resolve()
     # Validate the complete pack before modifying any file. Existing IDs are
     # still checked for canonical UUID format and duplicates.
-    parse_question_pack(pack_path, require_ids=False)
+    parse_question_pack(pack_path, require_ids=False, workers=workers)
 
     changes: dict[Path, str] = {}
     known_ids: set[str] = set()
@@ -109,15 +116,18 @@ def assign_question_ids(
         path.write_text(content, encoding="utf-8", newline="")
 
     if changes:
-        parse_question_pack(pack_path)
+        parse_question_pack(pack_path, workers=workers)
     return len(changes)
 
 
 def main(argv: list[str] | None = None) -> int:
-    args = _build_parser().parse_args(argv)
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
     pack_path = args.pack_path
     try:
-        assigned = assign_question_ids(pack_path)
+        assigned = assign_question_ids(pack_path, workers=args.workers)
     except (QuestionParseError, OSError, ValueError) as error:
         print(f"INVALID: {pack_path.expanduser().resolve()}", file=sys.stderr)
         print(error, file=sys.stderr)
@@ -0,0 +1,99 @@
+"""Socket writes and time per transition, event by event against batched.
+
+One room with an admin and `--spectators` delta subscribers registered with
+the real python-socketio client manager; only the final engine.io write is
+replaced by a counter, so packet encoding and fan-out are measured. Every
+transition stops the sounds, plays two new ones and changes the score, which
+is what a round opening sends: two `settings_update`, `stop_sound`, two
+`play_sound`, the state and the admin-only question.
+
+    python benchmarks/effect_frames.py --spectators 40 --transitions 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+from pathlib import Path
+import sys
+import time
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+def _configure_environment() -> None:
+    os.environ.update(
+        {
+            "CHGKA_ENV": "development",
+            "ADMIN_PASSWORD": "benchmark-password",
+            "ALLOWED_ORIGINS": "http://localhost:5173",
+            "CHGKA_DB_PATH": ":memory:",
+        }
+    )
+    if str(BACKEND_DIR) not in sys.path:
+        sys.path.insert(0, str(BACKEND_DIR))
+
+
+async def _run(*, spectators: int, transitions: int, batch: bool) -> tuple[float, int]:
+    import main
+    from roster import AdminRecord
+    from transitions import TransitionEffects
+
+    writes = 0
+
+    async def count_packet(_eio_sid, _packet):
+        nonlocal writes
+        writes += 1
+
+    main.sio._send_eio_packet = count_packet
+    room = main.rooms.open(f"frames-{'batch' if batch else 'legacy'}")
+    with main._entered_room(room):
+        for index in range(spectators + 1):
+            sid = await main.sio.manager.connect(f"{room.id}-{index}", "/")
+            await main.sio.manager.enter_room(sid, "/", room.channel)
+            main.rooms.attach(sid, room)
+            await main.state_subscribe(sid, {"protocol": "delta", "batch": batch})
+            if index == 0:
+                token = main.generate_admin_token()
+                room.players.add(AdminRecord(sid=sid, name="admin", token=token))
+                await main._join_admin_audience(sid, token)
+        main._emit_current_question_to_admins = lambda: main._emit_to_admins(
+            "admin_question", {"title": "benchmark"}
+        )
+        effects = TransitionEffects(
+            sounds=("gong", "whistle"),
+            stop_sounds=True,
+            refresh_admin_question=True,
+        )
+        writes = 0
+        started = time.perf_counter()
+        for number in range(transitions):
+            room.state["game"]["score"]["znatoki"] = number % 7
+            await main._apply_transition_effects(effects)
+        return time.perf_counter() - started, writes
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--spectators", type=int, default=40)
+    parser.add_argument("--transitions", type=int, default=2000)
+    args = parser.parse_args(argv)
+    _configure_environment()
+
+    print(f"1 admin + {args.spectators} delta subscribers, {args.transitions} transitions")
+    print(f"{'mode':<16} {'writes/transition':>18} {'us/transition':>14}")
+    for name, batch in (("event by event", False), ("batched", True)):
+        elapsed, writes = asyncio.run(
+            _run(spectators=args.spectators, transitions=args.transitions, batch=batch)
+        )
+        print(
+            f"{name:<16} {writes / args.transitions:>18.1f} "
+            f"{elapsed / args.transitions * 1e6:>14.0f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
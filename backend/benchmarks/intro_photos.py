@@ -0,0 +1,149 @@
+"""Slide advance to visible author photo, with and without the intro bundle.
+
+Photo sizes, the Python side of serving each `display` variant and a Pillow
+decode of it (standing in for the browser's decode) are measured on a pack;
+the network is a model. Without the bundle every client asks for a slide's
+photos when the host advances to it and sees them after one round trip, the
+transfer at its share of the server uplink and the decode. With the bundle all
+clients download every photo in slide order from intro start and decode it
+ahead, so a photo is late only if its download is still running when its
+slide comes up.
+
+    python benchmarks/intro_photos.py --clients 40 --uplink-mbit 50 --slide-seconds 6
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from pathlib import Path
+import statistics
+import sys
+import tempfile
+import time
+
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from PIL import Image  # noqa: E402
+
+from image_variants import build_image_variants, image_variant_path  # noqa: E402
+from media_files import MediaFileResponse, MediaFiles  # noqa: E402
+from questions import parse_question_pack  # noqa: E402
+
+
+SAMPLE_PACK = Path(__file__).resolve().parents[2] / "fixtures" / "sample_questions"
+
+
+async def _serve_seconds(response) -> float:
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    async def send(_message):
+        pass
+
+    scope = {"type": "http", "method": "GET", "headers": [], "asgi": {"spec_version": "2.4"}}
+    started = time.perf_counter()
+    await response(scope, receive, send)
+    return time.perf_counter() - started
+
+
+def _slide_photos(pack_path: Path) -> list[list[tuple[int, float, float]]]:
+    """Per intro slide: `(bytes, serve seconds, decode seconds)` of each photo."""
+    pack = parse_question_pack(pack_path)
+    with tempfile.TemporaryDirectory() as directory:
+        pack.image_variants, _report = build_image_variants(pack, Path(directory))
+        media_files = MediaFiles()
+        media_files.configure(pack.path, {})
+        slides = []
+        for question in pack.questions[:12]:
+            photos = []
+            for item in question.parts or [question]:
+                if item.author_photo is None:
+                    continue
+                path = Path(image_variant_path(pack, item.author_photo, "display"))
+                serve = asyncio.run(_serve_seconds(MediaFileResponse(media_files.get(path))))
+                started = time.perf_counter()
+                with Image.open(path) as image:
+                    image.load()
+                decode = time.perf_counter() - started
+                photos.append((path.stat().st_size, serve, decode))
+            slides.append(photos)
+    return slides
+
+
+def _latencies(
+    slides: list[list[tuple[int, float, float]]],
+    *,
+    rate: float,
+    rtt: float,
+    first_slide: float,
+    slide_seconds: float,
+    bundle: bool,
+) -> list[float]:
+    """Seconds from each slide's advance until its last photo is visible."""
+    latencies = []
+    downloaded_at = rtt
+    for index, photos in enumerate(slides):
+        if not photos:
+            continue
+        advance_at = first_slide + index * slide_seconds
+        if not bundle:
+            latencies.append(max(rtt + serve + size / rate + decode for size, serve, decode in photos))
+            continue
+        ready = 0.0
+        for size, serve, decode in photos:
+            downloaded_at += serve + size / rate
+            ready = max(ready, downloaded_at + decode)
+        latencies.append(max(0.0, ready - advance_at))
+    return latencies
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pack", type=Path, default=SAMPLE_PACK)
+    parser.add_argument("--clients", type=int, default=40)
+    parser.add_argument("--uplink-mbit", type=float, default=50.0)
+    parser.add_argument("--downlink-mbit", type=float, default=20.0)
+    parser.add_argument("--rtt-ms", type=float, default=60.0)
+    parser.add_argument("--first-slide-seconds", type=float, default=5.0)
+    parser.add_argument("--slide-seconds", type=float, default=6.0)
+    args = parser.parse_args(argv)
+
+    slides = _slide_photos(args.pack)
+    photos = [photo for slide in slides for photo in slide]
+    rate = min(args.downlink_mbit, args.uplink_mbit / args.clients) * 1_000_000 / 8
+    print(
+        f"{len(photos)} author photos, {sum(size for size, _s, _d in photos) / 2**20:.1f} MiB "
+        f"as display; {args.clients} clients at {rate * 8 / 1_000_000:.2f} Mbit/s each, "
+        f"{args.rtt_ms:g} ms RTT"
+    )
+    print(
+        f"serve {statistics.median(serve for _size, serve, _d in photos) * 1000:.2f} ms, "
+        f"decode {statistics.median(decode for _size, _s, decode in photos) * 1000:.1f} ms "
+        "median per photo"
+    )
+    print(f"{'mode':<28} {'median ms':>10} {'max ms':>10}")
+    rows = [("per slide, no-store", False, args.slide_seconds)]
+    rows += [
+        (f"bundle, {seconds:g} s per slide", True, seconds)
+        for seconds in (1.0, 2.0, args.slide_seconds)
+    ]
+    for name, bundle, slide_seconds in rows:
+        latencies = _latencies(
+            slides,
+            rate=rate,
+            rtt=args.rtt_ms / 1000,
+            first_slide=args.first_slide_seconds,
+            slide_seconds=slide_seconds,
+            bundle=bundle,
+        )
+        print(
+            f"{name:<28} {statistics.median(latencies) * 1000:>10.0f} "
+            f"{max(latencies) * 1000:>10.0f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,139 @@
+"""Latency of the history snapshot behind `admin_get_game_history`.
+
+A journal is filled with regular sessions of a few opened questions each and
+`GameJournal.snapshot()` is timed. For comparison the former queries, which
+decoded every `question_opened` payload of the listed sessions and of the
+whole question history, are timed on the same database.
+
+    python benchmarks/journal_history.py --sessions 1000 10000
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import json
+import statistics
+import sys
+import tempfile
+import time
+
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from game_journal import MODE_REGULAR, WRITES_STRICT, GameJournal  # noqa: E402
+
+
+def _fill(journal: GameJournal, sessions: int, questions: int) -> None:
+    connection = journal._db()
+    with connection:
+        connection.executemany(
+            """
+            INSERT INTO game_sessions (
+                id, mode, status, created_at, pack_fingerprint, pack_name, pack_path
+            ) VALUES (?, 'regular', 'completed', ?, 'benchmark', 'benchmark', '.')
+            """,
+            (
+                (f"session-{index:06d}", f"2026-01-01T00:00:00.{index:06d}")
+                for index in range(sessions)
+            ),
+        )
+        connection.executemany(
+            """
+            INSERT INTO game_events (
+                session_id, sequence_number, occurred_at,
+                event_type, payload_json, display_message
+            ) VALUES (?, ?, ?, 'question_opened', ?, 'Вопрос')
+            """,
+            (
+                (
+                    f"session-{index:06d}",
+                    number + 1,
+                    f"2026-01-01T00:00:00.{index:06d}",
+                    json.dumps(
+                        {
+                            "question_id": f"q-{(index * questions + number) % 500}",
+                            "title": "Вопрос",
+                            "sector": number + 1,
+                            "kind": "normal",
+                        }
+                    ),
+                )
+                for index in range(sessions)
+                for number in range(questions)
+            ),
+        )
+        journal._backfill_question_openings(connection)
+
+
+def _legacy_snapshot(journal: GameJournal, limit: int) -> None:
+    connection = journal._db()
+    rows = connection.execute(
+        "SELECT * FROM game_sessions ORDER BY created_at DESC, id DESC LIMIT ?",
+        (limit,),
+    ).fetchall()
+    for row in rows:
+        payloads = connection.execute(
+            """
+            SELECT payload_json FROM game_events
+            WHERE session_id = ? AND event_type = 'question_opened'
+            """,
+            (row["id"],),
+        ).fetchall()
+        len({json.loads(payload[0]).get("question_id") for payload in payloads})
+    used: dict[str, dict] = {}
+    for row in connection.execute(
+        """
+        SELECT e.occurred_at, e.payload_json
+        FROM game_events e
+        JOIN game_sessions s ON s.id = e.session_id
+        WHERE e.event_type = 'question_opened' AND s.mode = ?
+        ORDER BY e.occurred_at ASC, e.id ASC
+        """,
+        (MODE_REGULAR,),
+    ):
+        payload = json.loads(row["payload_json"])
+        used.setdefault(payload["question_id"], payload)
+
+
+def _median_ms(call, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def run(sessions: int, questions: int, repeats: int, directory: Path) -> tuple[float, float]:
+    """Return (snapshot ms, former queries ms)."""
+    journal = GameJournal(
+        directory / f"history-{sessions}.sqlite3",
+        default_mode=MODE_REGULAR,
+        writes=WRITES_STRICT,
+    )
+    journal.initialize()
+    _fill(journal, sessions, questions)
+    snapshot = _median_ms(lambda: journal.snapshot(limit=50), repeats)
+    legacy = _median_ms(lambda: _legacy_snapshot(journal, 50), repeats)
+    journal.close()
+    return snapshot, legacy
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--questions", type=int, default=12)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    print(f"{'sessions':>9} {'snapshot ms':>12} {'former ms':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        for sessions in args.sessions:
+            snapshot, legacy = run(sessions, args.questions, args.repeats, Path(directory))
+            print(f"{sessions:>9} {snapshot:>12.2f} {legacy:>10.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
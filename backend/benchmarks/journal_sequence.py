@@ -0,0 +1,81 @@
+"""`record_event` latency on sessions that already hold many events.
+
+For every size a session is filled with that many stored events, then strict
+`record_event` calls are timed. The first call after the fill finds its
+counter behind the stored maximum and goes through the UNIQUE-conflict
+repair; later calls use only the in-memory counter. The cost of the former
+per-event `SELECT MAX(sequence_number)` is shown for comparison.
+
+    python benchmarks/journal_sequence.py --sizes 10000 100000 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import statistics
+import sys
+import tempfile
+import time
+
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from game_journal import MODE_REGULAR, WRITES_STRICT, GameJournal  # noqa: E402
+
+
+def run(size: int, calls: int, directory: Path) -> tuple[float, float, float]:
+    """Return (median µs, first-call µs, MAX query µs)."""
+    journal = GameJournal(
+        directory / f"sequence-{size}.sqlite3",
+        default_mode=MODE_REGULAR,
+        writes=WRITES_STRICT,
+    )
+    journal.initialize()
+    journal.configure_pack(fingerprint="benchmark", name="benchmark", path=directory)
+    session_id = journal.record_event("admin_note", "Начало", {})["session_id"]
+    connection = journal._db()
+    with connection:
+        connection.executemany(
+            """
+            INSERT INTO game_events (
+                session_id, sequence_number, occurred_at,
+                event_type, payload_json, display_message
+            ) VALUES (?, ?, '2026-01-01T00:00:00.000+00:00', 'admin_note', '{}', 'x')
+            """,
+            ((session_id, sequence) for sequence in range(2, size + 2)),
+        )
+
+    timings = []
+    for index in range(calls):
+        started = time.perf_counter()
+        journal.record_event("admin_note", f"Событие {index}", {})
+        timings.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    for _ in range(calls):
+        connection.execute(
+            "SELECT COALESCE(MAX(sequence_number), 0) + 1 FROM game_events WHERE session_id = ?",
+            (session_id,),
+        ).fetchone()
+    max_query = (time.perf_counter() - started) / calls
+    journal.close()
+    return statistics.median(timings[1:]) * 1e6, timings[0] * 1e6, max_query * 1e6
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--calls", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    print(f"{'events':>9} {'median µs':>10} {'repair µs':>10} {'MAX() µs':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            median, first, max_query = run(size, args.calls, Path(directory))
+            print(f"{size:>9} {median:>10.1f} {first:>10.1f} {max_query:>9.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,62 @@
+"""Events per second of strict and batched `GameJournal` writes.
+
+Both modes record the same events into a fresh SQLite file in WAL mode. The
+strict figure includes one commit per event; the batched figure measures how
+fast the event loop can hand events over, and the time of the final `flush()`
+is added so both numbers cover durable writes. The slowest single
+`record_event` call is what a socket would wait for at worst.
+
+    python benchmarks/journal_writes.py --events 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import sys
+import tempfile
+import time
+
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from game_journal import MODE_REGULAR, WRITE_MODES, GameJournal  # noqa: E402
+
+
+def run(writes: str, events: int, directory: Path) -> tuple[float, float]:
+    """Return (events per second including flush, slowest call in ms)."""
+    journal = GameJournal(
+        directory / f"{writes}.sqlite3",
+        default_mode=MODE_REGULAR,
+        writes=writes,
+    )
+    journal.initialize()
+    journal.configure_pack(fingerprint="benchmark", name="benchmark", path=directory)
+    payload = {"question_id": "q", "sector": 3, "kind": "normal"}
+    slowest = 0.0
+    started = time.perf_counter()
+    for index in range(events):
+        call_started = time.perf_counter()
+        journal.record_event("admin_note", f"Событие {index}", payload)
+        slowest = max(slowest, time.perf_counter() - call_started)
+    journal.flush()
+    elapsed = time.perf_counter() - started
+    journal.close()
+    return events / elapsed, slowest * 1000
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=5_000)
+    args = parser.parse_args(argv)
+
+    print(f"{'mode':>8} {'events/s':>10} {'slowest ms':>11}")
+    with tempfile.TemporaryDirectory() as directory:
+        for writes in WRITE_MODES:
+            rate, slowest = run(writes, args.events, Path(directory))
+            print(f"{writes:>8} {rate:>10.0f} {slowest:>11.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
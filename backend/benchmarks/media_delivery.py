@@ -0,0 +1,118 @@
+"""Throughput of 200 concurrent range readers of one shared video.
+
+Every reader seeks like a spectator in a shared video: it asks for random
+`Range: bytes=...` chunks of one file. Responses are driven through the ASGI
+interface in this process, so the numbers are the Python side of `GET
+/media`: the former `exists()`/`is_file()` checks plus a `FileResponse` that
+stats the file again, against `MediaFileResponse` with a cached stat, its
+`If-None-Match` revalidation (304) and the `X-Accel-Redirect` mode, where
+Nginx would send the bytes.
+
+    python benchmarks/media_delivery.py --readers 200 --requests 20 --size-mb 64
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from pathlib import Path
+import random
+import sys
+import tempfile
+import time
+
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from starlette.responses import FileResponse  # noqa: E402
+
+from media_files import MediaFileResponse, MediaFiles  # noqa: E402
+
+
+CHUNK = 256 * 1024
+
+
+def _former_response(path: Path, _media_files: MediaFiles):
+    if not path.exists() or not path.is_file():
+        raise FileNotFoundError(path)
+    return FileResponse(str(path))
+
+
+def _cached_response(path: Path, media_files: MediaFiles):
+    return MediaFileResponse(media_files.get(path))
+
+
+def _accel_response(path: Path, media_files: MediaFiles):
+    return MediaFileResponse(media_files.get(path), accel_prefix="/chgka-pack/")
+
+
+async def _serve(response, headers: dict[str, str]) -> int:
+    sent = 0
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal sent
+        sent += len(message.get("body", b""))
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in headers.items()],
+        "asgi": {"spec_version": "2.4"},
+    }
+    await response(scope, receive, send)
+    return sent
+
+
+async def _readers(path: Path, build, readers: int, requests: int, size: int, *, revalidate: bool):
+    media_files = MediaFiles()
+    media_files.configure(path.parent, {})
+    etag = media_files.get(path).etag
+
+    async def reader(seed: int) -> int:
+        rng = random.Random(seed)
+        total = 0
+        for _ in range(requests):
+            start = rng.randrange(0, size - CHUNK)
+            headers = {"Range": f"bytes={start}-{start + CHUNK - 1}"}
+            if revalidate:
+                headers = {"If-None-Match": etag}
+            total += await _serve(build(path, media_files), headers)
+        return total
+
+    started = time.perf_counter()
+    sent = sum(await asyncio.gather(*(reader(seed) for seed in range(readers))))
+    return time.perf_counter() - started, sent
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--readers", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--size-mb", type=int, default=64)
+    args = parser.parse_args(argv)
+
+    size = args.size_mb * 1024 * 1024
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "video.mp4"
+        path.write_bytes(random.Random(0).randbytes(size))
+        total = args.readers * args.requests
+        print(f"{args.readers} readers x {args.requests} ranges of {CHUNK // 1024} KiB")
+        print(f"{'mode':<22} {'req/s':>8} {'MiB/s':>8}")
+        for name, build, revalidate in (
+            ("former FileResponse", _former_response, False),
+            ("cached stat", _cached_response, False),
+            ("304 revalidation", _cached_response, True),
+            ("X-Accel-Redirect", _accel_response, False),
+        ):
+            elapsed, sent = asyncio.run(
+                _readers(path, build, args.readers, args.requests, size, revalidate=revalidate)
+            )
+            print(f"{name:<22} {total / elapsed:>8.0f} {sent / elapsed / 2**20:>8.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
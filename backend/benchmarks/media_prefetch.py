@@ -0,0 +1,105 @@
+"""Time to first frame after a share, with and without question prefetch.
+
+A model, not a network measurement: the server uplink is shared fairly
+(processor sharing) by every running download. Without prefetch all clients
+start the shared file at the share. With prefetch each client downloads the
+file once at question open (one download per client, as
+`MEDIA_PREFETCH_CONCURRENCY` allows). A client whose download finished plays
+from its blob at once; otherwise it abandons the prefetch and streams the
+file like before. A frame needs `--startup-kib` bytes.
+
+    python benchmarks/media_prefetch.py --clients 40 --size-mb 8 --uplink-mbit 100
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+
+
+def _first_frames(
+    *,
+    clients: int,
+    size: float,
+    uplink: float,
+    reading_seconds: float,
+    startup: float,
+    prefetch: bool,
+) -> list[float]:
+    """Seconds from the share to the first frame of every client."""
+    # flow -> [remaining bytes, client, kind]; kind is "prefetch" or "stream".
+    flows = [[size, client, "prefetch"] for client in range(clients)] if prefetch else []
+    received = {client: 0.0 for client in range(clients)}
+    first_frame: dict[int, float] = {}
+    now = 0.0
+    share_at = reading_seconds if prefetch else 0.0
+    shared = False
+
+    while len(first_frame) < clients:
+        if not shared and now >= share_at:
+            shared = True
+            pending = {client for _remaining, client, kind in flows if kind == "prefetch"}
+            flows = []
+            for client in range(clients):
+                if prefetch and client not in pending:
+                    first_frame[client] = 0.0
+                else:
+                    flows.append([size, client, "stream"])
+            continue
+        if not flows:
+            now = share_at
+            continue
+        rate = uplink / len(flows)
+        # Next event: a flow completes, a stream reaches the startup buffer or
+        # the share happens.
+        step = min(remaining for remaining, _client, _kind in flows) / rate
+        for _remaining, client, kind in flows:
+            if kind == "stream" and client not in first_frame:
+                step = min(step, (startup - received[client]) / rate)
+        if not shared:
+            step = min(step, share_at - now)
+        now += step
+        for flow in flows:
+            flow[0] -= rate * step
+            if flow[2] == "stream":
+                received[flow[1]] += rate * step
+                if flow[1] not in first_frame and received[flow[1]] >= startup - 1e-6:
+                    first_frame[flow[1]] = now - share_at
+        flows = [flow for flow in flows if flow[0] > 1e-6]
+    return list(first_frame.values())
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=40)
+    parser.add_argument("--size-mb", type=float, default=8.0)
+    parser.add_argument("--uplink-mbit", type=float, default=100.0)
+    parser.add_argument("--startup-kib", type=float, default=512.0)
+    args = parser.parse_args(argv)
+
+    size = args.size_mb * 2**20
+    uplink = args.uplink_mbit * 1_000_000 / 8
+    startup = min(args.startup_kib * 1024, size)
+    print(
+        f"{args.clients} clients, {args.size_mb:g} MiB file, "
+        f"{args.uplink_mbit:g} Mbit/s uplink, {args.startup_kib:g} KiB to first frame"
+    )
+    print(f"all prefetches finish {args.clients * size / uplink:.1f} s after question open")
+    print(f"{'mode':<24} {'median s':>9} {'max s':>9}")
+    rows = [("no prefetch", False, 0.0)]
+    rows += [(f"prefetch, read {seconds:g} s", True, seconds) for seconds in (5.0, 15.0, 30.0)]
+    for name, prefetch, reading_seconds in rows:
+        frames = _first_frames(
+            clients=args.clients,
+            size=size,
+            uplink=uplink,
+            reading_seconds=reading_seconds,
+            startup=startup,
+            prefetch=prefetch,
+        )
+        print(f"{name:<24} {statistics.median(frames):>9.2f} {max(frames):>9.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
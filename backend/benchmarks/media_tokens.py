@@ -0,0 +1,80 @@
+"""Per-request media token bookkeeping with many outstanding tokens.
+
+Every media request first drops expired tokens and a private author preview
+looks for a reusable author token. The former code scanned the whole token
+dict for both; `MediaTokenStore` pops expired tokens from a heap and finds the
+author token through its round index. Each request here also adds one fresh
+token and lets one old token expire, as a steady stream of previews would.
+
+    python benchmarks/media_tokens.py --tokens 1000 10000 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import sys
+import time
+
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from media import MediaTokenStore  # noqa: E402
+
+
+ROUND_KEY = (3, "normal", 0)
+SPIN_ID = 1
+
+
+def _info(expires_at: float, *, author: bool = False) -> dict:
+    info = {"round_key": ROUND_KEY, "spin_id": SPIN_ID, "expires_at": expires_at}
+    if author:
+        info["presentation_kind"] = "author"
+    return info
+
+
+def _legacy_request(tokens: dict, now: float) -> None:
+    expired = [mid for mid, info in tokens.items() if info.get("expires_at", 0) <= now]
+    for mid in expired:
+        tokens.pop(mid, None)
+    for info in tokens.values():
+        if info.get("presentation_kind") == "author" and info["round_key"] == ROUND_KEY:
+            break
+
+
+def _store_request(tokens: MediaTokenStore, now: float) -> None:
+    tokens.expire(now)
+    tokens.find("author", ROUND_KEY, SPIN_ID)
+
+
+def run(size: int, requests: int) -> tuple[float, float]:
+    """Return (former µs/request, store µs/request)."""
+    results = []
+    for tokens, request in ((dict(), _legacy_request), (MediaTokenStore(), _store_request)):
+        # Token i expires at time i, so request i expires exactly one token.
+        for index in range(size):
+            tokens[f"media-{index}"] = _info(float(index + 1))
+        tokens["author"] = _info(float(size * 10), author=True)
+        started = time.perf_counter()
+        for step in range(requests):
+            tokens[f"new-{step}"] = _info(float(size + step + 1))
+            request(tokens, float(step + 1))
+        results.append((time.perf_counter() - started) / requests * 1e6)
+    return results[0], results[1]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tokens", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    print(f"{'tokens':>7} {'former µs':>10} {'store µs':>9}")
+    for size in args.tokens:
+        legacy, store = run(size, args.requests)
+        print(f"{size:>7} {legacy:>10.1f} {store:>9.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,221 @@
+"""Bytes and encode time per packet type, JSON text against MessagePack.
+
+The payloads are recorded, not made up: the benchmark drives `main` with the
+sample pack through real Socket.IO messages. An admin logs in, `--groups`
+teams join and are approved, the intro is skipped and a round is opened,
+answered and scored. Every packet the server sends is captured just before the transport.
+The run keeps the largest recorded packet of each type, plus the
+acknowledgements, labelled by the message they answer.
+
+Sizes are shown raw and after permessage-deflate. The deflate figure comes
+from a per-connection zlib stream fed with the recorded packets in order, as
+uvicorn's WebSocket transports do when the browser negotiates the extension.
+Encode time is measured from the Python payload to the wire text or bytes.
+"json->msgpack" is what a room emit costs a MessagePack client: the emit is
+encoded as JSON once, then converted once for all MessagePack recipients.
+
+    python benchmarks/msgpack_wire.py --groups 12 --repeat 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+from pathlib import Path
+import sys
+import tempfile
+import time
+import zlib
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+SAMPLE_PACK = BACKEND_DIR.parent / "fixtures" / "sample_questions"
+ADMIN_PASSWORD = "benchmark-password"
+
+
+def _configure_environment(cache_dir: str) -> None:
+    os.environ.update(
+        {
+            "CHGKA_ENV": "development",
+            "ADMIN_PASSWORD": ADMIN_PASSWORD,
+            "ALLOWED_ORIGINS": "http://localhost:5173",
+            "CHGKA_DB_PATH": ":memory:",
+            "QUESTIONS_PACK_PATH": str(SAMPLE_PACK),
+            "CHGKA_PACK_CACHE_DIR": cache_dir,
+        }
+    )
+    if str(BACKEND_DIR) not in sys.path:
+        sys.path.insert(0, str(BACKEND_DIR))
+
+
+async def _record(groups: int) -> list[tuple[str, str, str]]:
+    """(Engine.IO sid, packet type, Socket.IO JSON text) for every send."""
+    from engineio.async_socket import AsyncSocket
+    import main
+
+    main._load_question_pack_on_startup()
+    sent: list[tuple[str, str]] = []
+
+    async def record(eio_sid, pkt, _event=None):
+        sent.append((eio_sid, pkt.data))
+
+    main.sio.outbound.send = record
+    pending_acks: dict[int, str] = {}
+    ack_ids = iter(range(1, 1_000_000))
+
+    async def message(eio_sid: str, event: str, data: object = None) -> None:
+        ack_id = next(ack_ids)
+        pending_acks[ack_id] = event
+        payload = [event] if data is None else [event, data]
+        await main.sio._handle_eio_message(eio_sid, f"2{ack_id}{json.dumps(payload)}")
+        # Handlers run as tasks; a few loop turns let them finish.
+        for _ in range(20):
+            await asyncio.sleep(0)
+
+    async def connect(eio_sid: str) -> None:
+        main.sio.eio.sockets[eio_sid] = AsyncSocket(main.sio.eio, eio_sid)
+        await main.sio._handle_eio_connect(eio_sid, {"QUERY_STRING": "room=main&EIO=4"})
+        await main.sio._handle_eio_message(eio_sid, '0{"room":"main"}')
+
+    await connect("admin")
+    await message("admin", "authenticate_admin", {"password": ADMIN_PASSWORD})
+    await message("admin", "state_subscribe", {"protocol": "delta"})
+    for index in range(groups):
+        await connect(f"team-{index}")
+        await message(f"team-{index}", "state_subscribe", {"protocol": "delta"})
+        await message(
+            f"team-{index}",
+            "join_game",
+            {"participants": [f"Игрок {index}-{seat}" for seat in range(3)]},
+        )
+    room = main.rooms.default
+    for group in room.players.groups():
+        await message("admin", "admin_approve", {"group_id": group.group_id})
+    await message("admin", "start_game")
+    slide = room.state["presentation"]["intro"]["slide_index"]
+    await message("admin", "admin_skip_intro", {"expected_slide": slide})
+    await message("admin", "admin_open_round", {"sector": 3})
+    await message("admin", "admin_start_discussion")
+    await message("admin", "admin_early_answer")
+    respondent = next(room.players.groups()).participants[0]
+    await message("admin", "admin_select_respondent", {"participant_id": respondent.id})
+    await message("admin", "admin_score", {"winner": "znatoki"})
+    await message("admin", "admin_end_round")
+
+    deliveries = []
+    for eio_sid, text in sent:
+        pkt = main.sio.packet_class(encoded_packet=text)
+        if pkt.packet_type == 3:
+            label = f"ack {pending_acks.get(pkt.id, '?')}"
+        elif pkt.packet_type == 2:
+            label = pkt.data[0]
+        else:
+            label = "connect"
+        deliveries.append((eio_sid, label, text))
+    return deliveries
+
+
+class _DeflateStream:
+    """One direction of a permessage-deflate connection with context takeover."""
+
+    def __init__(self) -> None:
+        self._stream = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+
+    def frame_size(self, data: bytes) -> int:
+        compressed = self._stream.compress(data) + self._stream.flush(zlib.Z_SYNC_FLUSH)
+        # RFC 7692 strips the trailing empty block of every message.
+        return len(compressed) - 4
+
+
+def _time_us(encode, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        encode()
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--groups", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        _configure_environment(cache_dir)
+        deliveries = asyncio.run(_record(args.groups))
+
+    from socketio.msgpack_packet import MsgPackPacket
+    import main as app
+    from wire_format import msgpack_message
+
+    packet_class = app.sio.packet_class
+    # text -> (decoded packet, JSON frame, MessagePack frame)
+    frames: dict[str, tuple] = {}
+    for _eio_sid, _label, text in deliveries:
+        if text not in frames:
+            pkt = packet_class(encoded_packet=text)
+            frames[text] = (pkt, text.encode("utf-8"), msgpack_message(pkt).data)
+
+    streams: dict[str, tuple[_DeflateStream, _DeflateStream]] = {}
+    # label -> [sends, json, msgpack, json deflated, msgpack deflated]
+    totals: dict[str, list[int]] = {}
+    largest: dict[str, str] = {}
+    for eio_sid, label, text in deliveries:
+        _pkt, json_frame, msgpack_frame = frames[text]
+        json_stream, msgpack_stream = streams.setdefault(
+            eio_sid, (_DeflateStream(), _DeflateStream())
+        )
+        row = totals.setdefault(label, [0, 0, 0, 0, 0])
+        row[0] += 1
+        row[1] += len(json_frame)
+        row[2] += len(msgpack_frame)
+        row[3] += json_stream.frame_size(json_frame)
+        row[4] += msgpack_stream.frame_size(msgpack_frame)
+        if len(json_frame) > len(largest.get(label, "").encode("utf-8")):
+            largest[label] = text
+
+    print(
+        f"{len(deliveries)} sends to {len(streams)} sockets, sample pack, "
+        f"{args.groups} groups; bytes are means per send"
+    )
+    print(
+        f"{'packet':<28} {'sends':>5} {'json B':>7} {'msgpack B':>9} {'json+defl':>9} "
+        f"{'mp+defl':>7} {'json us':>7} {'msgpack us':>10} {'json->mp us':>11}"
+    )
+    for label in sorted(totals, key=lambda name: -totals[name][1] / totals[name][0]):
+        sends, json_bytes, msgpack_bytes, json_deflated, msgpack_deflated = totals[label]
+        text = largest[label]
+        pkt = frames[text][0]
+        json_us = _time_us(
+            lambda: packet_class(
+                pkt.packet_type, pkt.data, namespace=pkt.namespace, id=pkt.id
+            ).encode(),
+            args.repeat,
+        )
+        msgpack_us = _time_us(
+            lambda: MsgPackPacket(
+                pkt.packet_type, pkt.data, namespace=pkt.namespace or "/", id=pkt.id
+            ).encode(),
+            args.repeat,
+        )
+        convert_us = _time_us(
+            lambda: msgpack_message(packet_class(encoded_packet=text)),
+            args.repeat,
+        )
+        print(
+            f"{label:<28} {sends:>5} {json_bytes / sends:>7.0f} {msgpack_bytes / sends:>9.0f} "
+            f"{json_deflated / sends:>9.0f} {msgpack_deflated / sends:>7.0f} "
+            f"{json_us:>7.1f} {msgpack_us:>10.1f} {convert_us:>11.1f}"
+        )
+    columns = [sum(row[index] for row in totals.values()) for index in range(5)]
+    print(
+        f"{'total bytes':<28} {columns[0]:>5} {columns[1]:>7} {columns[2]:>9} "
+        f"{columns[3]:>9} {columns[4]:>7}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,80 @@
+"""Sequential and process-pool parsing of a synthetic question pack corpus.
+
+Every pack is a copy of `fixtures/sample_questions` whose question texts are
+extended with extra Markdown paragraphs, lists and links, so Markdown
+rendering and sanitizing dominate as they do for real long packs. Each corpus
+pack is parsed with every requested worker count.
+
+    python benchmarks/pack_parse.py --packs 4 --paragraphs 200 --workers 1 2 4
+
+Process-pool parsing only helps with free CPU cores; on a single core the
+pool start-up and result pickling make it slower than the in-process loop.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+from pathlib import Path
+import shutil
+import sys
+import tempfile
+import time
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+SAMPLE_DIR = BACKEND_DIR.parent / "fixtures" / "sample_questions"
+
+sys.path.insert(0, str(BACKEND_DIR))
+
+from questions import parse_question_pack  # noqa: E402
+
+
+_FILLER = (
+    "Абзац {index} с **жирным**, _курсивом_, `кодом` и [ссылкой](https://example.com/{index}).\n\n"
+    "- пункт {index}.1\n- пункт {index}.2\n\n"
+)
+
+
+def _make_corpus(directory: Path, packs: int, paragraphs: int) -> list[Path]:
+    filler = "".join(_FILLER.format(index=index) for index in range(paragraphs))
+    corpus = []
+    for number in range(packs):
+        pack_path = directory / f"pack-{number:02d}"
+        shutil.copytree(SAMPLE_DIR, pack_path)
+        for question in pack_path.rglob("question.md"):
+            text = question.read_text(encoding="utf-8")
+            question.write_text(text.replace("# Вопрос\n", f"# Вопрос\n\n{filler}", 1), encoding="utf-8")
+        corpus.append(pack_path)
+    return corpus
+
+
+def run(corpus: list[Path], workers: int) -> float:
+    """Return the mean seconds per pack."""
+    started = time.perf_counter()
+    for pack_path in corpus:
+        parse_question_pack(pack_path, workers=workers)
+    return (time.perf_counter() - started) / len(corpus)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--packs", type=int, default=4)
+    parser.add_argument("--paragraphs", type=int, default=200)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args(argv)
+
+    print(f"CPU cores available: {os.cpu_count()}")
+    print(f"{'workers':>7} {'ms/pack':>9} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        corpus = _make_corpus(Path(directory), args.packs, args.paragraphs)
+        baseline = None
+        for workers in args.workers:
+            seconds = run(corpus, workers)
+            baseline = baseline or seconds
+            print(f"{workers:>7} {seconds * 1000:>9.1f} {baseline / seconds:>7.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
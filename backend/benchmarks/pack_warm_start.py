@@ -0,0 +1,61 @@
+"""Cold parse against warm compiled-cache load of the sample question pack.
+
+The cold run parses the pack and writes the compiled artifact into a fresh
+temporary cache directory; every warm run loads that artifact back. Times are
+reported, not asserted: the unit suite only checks that a warm start does not
+parse.
+
+    python benchmarks/pack_warm_start.py --repeats 5
+
+Parsing renders and sanitizes every section, while the warm load only reads
+and decodes the artifact, so the gap grows with the pack's text volume.
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import sys
+import tempfile
+import time
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+SAMPLE_DIR = BACKEND_DIR.parent / "fixtures" / "sample_questions"
+
+sys.path.insert(0, str(BACKEND_DIR))
+
+from pack_cache import load_question_pack  # noqa: E402
+
+
+def _timed_load(pack_path: Path, cache_dir: Path) -> tuple[float, bool]:
+    started = time.perf_counter()
+    _pack, loaded_from_cache, write_error = load_question_pack(pack_path, cache_dir=cache_dir)
+    if write_error is not None:
+        raise write_error
+    return time.perf_counter() - started, loaded_from_cache
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pack", type=Path, default=SAMPLE_DIR)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        cold, cold_cached = _timed_load(args.pack, Path(directory))
+        warm_runs = [_timed_load(args.pack, Path(directory)) for _ in range(args.repeats)]
+    if cold_cached or not all(cached for _seconds, cached in warm_runs):
+        print("unexpected cache state: the cold run must parse and warm runs must hit the cache")
+        return 1
+    warm = min(seconds for seconds, _cached in warm_runs)
+
+    print(f"{'start':>5} {'ms':>8}")
+    print(f"{'cold':>5} {cold * 1000:>8.1f}")
+    print(f"{'warm':>5} {warm * 1000:>8.1f}")
+    print(f"speedup {cold / warm:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,126 @@
+"""Roster lookups when every group of a large game reconnects at once.
+
+After a proxy restart each group's new socket restores by player token, the
+old socket's `disconnect` arrives by sid, and the host keeps picking
+respondents by participant id. The former roster was a list of dicts scanned
+for each of these; `Roster` answers them from its indexes. Memory is the
+`tracemalloc` peak of building the roster from the join payloads, indexes
+included.
+
+    python benchmarks/roster_reconnect.py --groups 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import sys
+import time
+import tracemalloc
+
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from roster import GroupRecord, Participant, Roster  # noqa: E402
+
+
+PARTICIPANTS_PER_GROUP = 3
+
+
+def _groups(count: int) -> list[dict]:
+    return [
+        {
+            "sid": f"old-{index}",
+            "name": f"Команда {index}",
+            "role": "player",
+            "token": f"token-{index}",
+            "group_id": f"group-{index}",
+            "participants": [
+                {"id": f"participant-{index}-{slot}", "name": f"Игрок {slot}"}
+                for slot in range(PARTICIPANTS_PER_GROUP)
+            ],
+            "online": True,
+            "pending": False,
+        }
+        for index in range(count)
+    ]
+
+
+def _list_roster(records: list[dict]) -> list[dict]:
+    return [
+        {**record, "participants": [dict(item) for item in record["participants"]]}
+        for record in records
+    ]
+
+
+def _legacy_reconnect(players: list[dict], index: int) -> None:
+    old = next(p for p in players if p["sid"] == f"old-{index}")
+    old["online"] = False
+    record = next(p for p in players if p.get("token") == f"token-{index}")
+    record["sid"] = f"new-{index}"
+    record["online"] = True
+    participant_id = f"participant-{index}-0"
+    next(
+        (group, participant)
+        for group in players
+        for participant in group["participants"]
+        if participant["id"] == participant_id
+    )
+
+
+def _build_roster(records: list[dict]) -> Roster:
+    roster = Roster()
+    for record in records:
+        roster.add(
+            GroupRecord(
+                sid=record["sid"],
+                name=record["name"],
+                token=record["token"],
+                group_id=record["group_id"],
+                participants=[
+                    Participant(item["id"], item["name"]) for item in record["participants"]
+                ],
+            )
+        )
+    return roster
+
+
+def _roster_reconnect(roster: Roster, index: int) -> None:
+    roster.by_sid(f"old-{index}").online = False
+    record = roster.by_token(f"token-{index}")
+    roster.rebind(record, f"new-{index}")
+    record.online = True
+    roster.by_participant(f"participant-{index}-0")
+
+
+def _measure(build, reconnect, groups: int) -> tuple[float, float]:
+    """Return (ms for every group to reconnect, MiB peak to build)."""
+    records = _groups(groups)
+    tracemalloc.start()
+    roster = build(records)
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    started = time.perf_counter()
+    for index in range(groups):
+        reconnect(roster, index)
+    return (time.perf_counter() - started) * 1000, peak / 2**20
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--groups", type=int, nargs="+", default=[500, 5000])
+    args = parser.parse_args(argv)
+
+    print(f"{'groups':>7} {'mode':<8} {'reconnect ms':>13} {'build MiB':>10}")
+    for groups in args.groups:
+        for name, build, reconnect in (
+            ("list", _list_roster, _legacy_reconnect),
+            ("roster", _build_roster, _roster_reconnect),
+        ):
+            elapsed, peak = _measure(build, reconnect, groups)
+            print(f"{groups:>7} {name:<8} {elapsed:>13.1f} {peak:>10.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
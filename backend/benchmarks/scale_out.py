@@ -0,0 +1,148 @@
+"""Throughput of game rooms spread over 1, 2, 4... worker processes.
+
+Each worker is a separate process with its own `main` module and plays only
+the rooms that `room_worker()` assigns to it, as Nginx would route them. All
+sockets of a room are on its worker, so no pub/sub server is needed. Every
+room has one admin and a number of spectator sockets registered with the real
+python-socketio client manager; only the final engine.io write is replaced by
+a counter, so packet encoding and fan-out are measured. The journal is an
+in-memory SQLite database per worker.
+
+    python benchmarks/scale_out.py --workers 1 2 4 --rooms 64 --seconds 5
+
+Throughput scales with the number of workers up to the number of free CPU
+cores; on a single core the extra processes only share it.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+from pathlib import Path
+import sys
+import time
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+def _configure_environment() -> None:
+    os.environ.update(
+        {
+            "CHGKA_ENV": "development",
+            "ADMIN_PASSWORD": "benchmark-password",
+            "ALLOWED_ORIGINS": "http://localhost:5173",
+            "CHGKA_DB_PATH": ":memory:",
+            "CHGKA_MAX_ROOMS": "1000",
+        }
+    )
+    if str(BACKEND_DIR) not in sys.path:
+        sys.path.insert(0, str(BACKEND_DIR))
+
+
+async def _play(room_ids: list[str], spectators: int, seconds: float, start_at: float) -> tuple[int, int]:
+    import main
+
+    sent = 0
+
+    async def count_packet(_eio_sid, _packet):
+        nonlocal sent
+        sent += 1
+
+    async def allow_admin(_sid):
+        return True
+
+    main.sio._send_eio_packet = count_packet
+    main.require_admin = allow_admin
+    main.game_journal.initialize()
+    main.game_journal.configure_pack(fingerprint="benchmark", name="benchmark", path=".")
+
+    admins = []
+    for room_id in room_ids:
+        room = main.rooms.open(room_id)
+        for index in range(spectators + 1):
+            sid = await main.sio.manager.connect(f"{room_id}-{index}", "/")
+            await main.sio.manager.enter_room(sid, "/", room.channel)
+            main.rooms.attach(sid, room)
+            if index == 0:
+                admins.append(sid)
+
+    operations = 0
+
+    async def drive(sid: str, deadline: float) -> None:
+        nonlocal operations
+        score = 0
+        while time.monotonic() < deadline:
+            score = (score + 1) % 7
+            await main.admin_set_score(sid, {"znatoki": score, "tv": 0})
+            operations += 1
+
+    await asyncio.sleep(max(0.0, start_at - time.time()))
+    deadline = time.monotonic() + seconds
+    await asyncio.gather(*(drive(sid, deadline) for sid in admins))
+    main.game_journal.close()
+    return operations, sent
+
+
+def _worker(workers: int, index: int, rooms: int, spectators: int, seconds: float, start_at: float, results) -> None:
+    _configure_environment()
+    from scale_out import room_worker
+
+    room_ids = [
+        room_id
+        for room_id in (f"load-{number}" for number in range(rooms))
+        if room_worker(room_id, workers) == index
+    ]
+    results.put(asyncio.run(_play(room_ids, spectators, seconds, start_at)))
+
+
+def run(workers: int, *, rooms: int, spectators: int, seconds: float) -> tuple[float, float]:
+    """Return (state changes per second, socket packets per second)."""
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    # Leave every worker time to import the application before the clock starts.
+    start_at = time.time() + 2.0 + 0.5 * workers
+    processes = [
+        context.Process(
+            target=_worker,
+            args=(workers, index, rooms, spectators, seconds, start_at, results),
+        )
+        for index in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    totals = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    operations = sum(item[0] for item in totals)
+    packets = sum(item[1] for item in totals)
+    return operations / seconds, packets / seconds
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--rooms", type=int, default=64)
+    parser.add_argument("--spectators", type=int, default=20)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args(argv)
+
+    print(f"CPU cores available: {os.cpu_count()}")
+    print(f"{'workers':>7} {'changes/s':>10} {'packets/s':>10} {'speedup':>8}")
+    baseline = None
+    for workers in args.workers:
+        changes, packets = run(
+            workers,
+            rooms=args.rooms,
+            spectators=args.spectators,
+            seconds=args.seconds,
+        )
+        baseline = baseline or changes
+        print(f"{workers:>7} {changes:>10.0f} {packets:>10.0f} {changes / baseline:>7.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,118 @@
+"""A client that reads slower than the game emits, with and without coalescing.
+
+One socket is registered with the real python-socketio manager; its transport
+is replaced by a writer that takes one packet every `--read-ms`. Each
+transition emits what a busy round sends to a player: `settings_update`, a
+`play_sound` and the `state_update`. The plain server queues every packet; the
+coalescing server keeps only the newest state and settings while the socket is
+behind. Reported are the packets written, the deepest queue and how long after
+the last transition the client saw the final state.
+
+    python benchmarks/slow_client.py --transitions 300 --emit-ms 2 --read-ms 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+from pathlib import Path
+import sys
+import time
+
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import socketio  # noqa: E402
+
+from outbound import CoalescingServer  # noqa: E402
+from state_sync import PacketJson  # noqa: E402
+
+
+class _SlowSocket:
+    def __init__(self) -> None:
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.closed = False
+        self.max_depth = 0
+
+    async def send(self, pkt) -> None:
+        await self.queue.put(pkt)
+
+    async def close(self, **_kwargs) -> None:
+        self.closed = True
+
+
+async def _run(
+    server: socketio.AsyncServer,
+    *,
+    transitions: int,
+    emit_seconds: float,
+    read_seconds: float,
+) -> tuple[int, int, float]:
+    sid = await server.manager.connect("slow", "/")
+    socket = server.eio.sockets["slow"] = _SlowSocket()
+    written = 0
+    final_seen = asyncio.Event()
+
+    def depth() -> int:
+        outbound = getattr(server, "outbound", None)
+        return outbound.depth("slow") if outbound is not None else socket.queue.qsize()
+
+    async def read() -> None:
+        nonlocal written
+        while True:
+            pkt = await socket.queue.get()
+            written += 1
+            event, *data = json.loads(pkt.data[1:])
+            if event == "state_update" and data[0]["revision"] == transitions - 1:
+                final_seen.set()
+            await asyncio.sleep(read_seconds)
+
+    reader = asyncio.create_task(read())
+    for revision in range(transitions):
+        await server.emit("settings_update", {"volume": revision % 100}, to=sid)
+        await server.emit("play_sound", {"sound": "gong"}, to=sid)
+        await server.emit("state_update", {"revision": revision, "pad": "x" * 512}, to=sid)
+        socket.max_depth = max(socket.max_depth, depth())
+        await asyncio.sleep(emit_seconds)
+    emitted_at = time.perf_counter()
+    await final_seen.wait()
+    lag = time.perf_counter() - emitted_at
+    reader.cancel()
+    return written, socket.max_depth, lag
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--transitions", type=int, default=300)
+    parser.add_argument("--emit-ms", type=float, default=2.0)
+    parser.add_argument("--read-ms", type=float, default=5.0)
+    args = parser.parse_args(argv)
+
+    print(
+        f"{args.transitions} transitions every {args.emit_ms:g} ms, "
+        f"client reads one packet every {args.read_ms:g} ms"
+    )
+    print(f"{'server':<12} {'packets':>8} {'max depth':>10} {'final state lag ms':>19}")
+    servers = (
+        ("plain", lambda: socketio.AsyncServer(async_mode="asgi", json=PacketJson)),
+        (
+            "coalescing",
+            lambda: CoalescingServer(async_mode="asgi", json=PacketJson, slow_client_timeout=600),
+        ),
+    )
+    for name, factory in servers:
+        written, max_depth, lag = asyncio.run(
+            _run(
+                factory(),
+                transitions=args.transitions,
+                emit_seconds=args.emit_ms / 1000,
+                read_seconds=args.read_ms / 1000,
+            )
+        )
+        print(f"{name:<12} {written:>8} {max_depth:>10} {lag * 1000:>19.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
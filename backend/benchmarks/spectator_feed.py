@@ -0,0 +1,112 @@
+"""Fan-out cost per event to spectators: the SSE feed against Socket.IO rooms.
+
+`--spectators` subscribers follow one `SpectatorFeed` in their own tasks, as
+`GET /spectate` responses do; the ASGI send is left out. For comparison the
+same number of sockets are registered with the real python-socketio manager
+and only the final Engine.IO write is a no-op. Each transition publishes a
+`play_sound` and a `state_update` of a realistic size. Reported are the CPU
+time per event and per subscriber, and the memory held per subscriber.
+
+    python benchmarks/spectator_feed.py --spectators 1000 5000 --transitions 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+from pathlib import Path
+import sys
+import time
+import tracemalloc
+
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import socketio  # noqa: E402
+
+from spectators import SpectatorFeed  # noqa: E402
+from state import create_initial_app_state, public_game_state  # noqa: E402
+from state_sync import EncodedState, PacketJson  # noqa: E402
+
+
+def _snapshot(revision: int) -> EncodedState:
+    state = create_initial_app_state()
+    state["game"]["score"]["znatoki"] = revision % 7
+    state["logs"] = [f"[20:{index:02d}:00] Событие {index}" for index in range(50)]
+    return EncodedState({**public_game_state(state, now_ms=revision), "revision": revision})
+
+
+async def _feed(spectators: int, transitions: int) -> tuple[float, float]:
+    feed = SpectatorFeed()
+    received = 0
+
+    async def follow() -> None:
+        nonlocal received
+        async for chunk in feed.stream(feed.cursor, b""):
+            received += len(chunk)
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tasks = [asyncio.create_task(follow()) for _ in range(spectators)]
+    await asyncio.sleep(0)
+    held = sum(
+        stat.size_diff for stat in tracemalloc.take_snapshot().compare_to(before, "filename")
+    )
+    tracemalloc.stop()
+    started = time.process_time()
+    for revision in range(1, transitions + 1):
+        feed.publish("play_sound", {"sound": "gong"})
+        feed.publish_state(_snapshot(revision).encoded, revision)
+        await asyncio.sleep(0)
+    elapsed = time.process_time() - started
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return elapsed, held / spectators
+
+
+async def _sockets(spectators: int, transitions: int) -> float:
+    server = socketio.AsyncServer(async_mode="asgi", json=PacketJson)
+
+    async def write(_eio_sid, _packet):
+        pass
+
+    server._send_eio_packet = write
+    for index in range(spectators):
+        sid = await server.manager.connect(f"spectator-{index}", "/")
+        await server.manager.enter_room(sid, "/", "game:main")
+    started = time.process_time()
+    for revision in range(1, transitions + 1):
+        await server.emit("play_sound", {"sound": "gong"}, room="game:main")
+        await server.emit("state_update", _snapshot(revision), room="game:main")
+    return time.process_time() - started
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--spectators", type=int, nargs="+", default=[1000, 5000])
+    parser.add_argument("--transitions", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    size = len(_snapshot(1).encoded)
+    print(f"{args.transitions} transitions of play_sound + {size} B state_update")
+    print(
+        f"{'spectators':>10} {'SSE us/event':>13} {'ns/event/sub':>13} "
+        f"{'bytes/sub':>10} {'Socket.IO us/event':>19} {'ns/event/sub':>13}"
+    )
+    events = args.transitions * 2
+    for spectators in args.spectators:
+        feed_seconds, held = asyncio.run(_feed(spectators, args.transitions))
+        socket_seconds = asyncio.run(_sockets(spectators, args.transitions))
+        print(
+            f"{spectators:>10} {feed_seconds / events * 1e6:>13.0f} "
+            f"{feed_seconds / events / spectators * 1e9:>13.0f} {held:>10.0f} "
+            f"{socket_seconds / events * 1e6:>19.0f} "
+            f"{socket_seconds / events / spectators * 1e9:>13.0f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -6,12 +6,35 @@ from pathlib import Path
 from typing import Mapping, Optional
 from urllib.parse import urlsplit
 
+from game_journal import WRITE_MODES, WRITES_STRICT
+from media import (
+    MEDIA_PREFETCH_MODES,
+    MEDIA_PREFETCH_OFF,
+    MEDIA_TOKEN_MODES,
+    MEDIA_TOKENS_OPAQUE,
+    MEDIA_TOKENS_SIGNED,
+    MIN_MEDIA_TOKEN_SECRET_LENGTH,
+)
+from scale_out import MEMORY_PUBSUB_SCHEME, PUBSUB_SCHEMES
+
 
 DEVELOPMENT = "development"
 PRODUCTION = "production"
 DEFAULT_ADMIN_TOKEN_TTL_SECONDS = 12 * 60 * 60
 MIN_ADMIN_TOKEN_TTL_SECONDS = 60
 MAX_ADMIN_TOKEN_TTL_SECONDS = 24 * 60 * 60
+DEFAULT_MAX_ROOMS = 200
+MAX_MAX_ROOMS = 1000
+MAX_WORKERS = 16
+DEFAULT_GROUP_OFFLINE_TTL_SECONDS = 3 * 60 * 60
+MIN_GROUP_OFFLINE_TTL_SECONDS = 60
+MAX_GROUP_OFFLINE_TTL_SECONDS = 7 * 24 * 60 * 60
+DEFAULT_MAX_GROUPS = 300
+MIN_MAX_GROUPS = 10
+MAX_MAX_GROUPS = 10_000
+DEFAULT_SLOW_CLIENT_TIMEOUT_SECONDS = 30
+MIN_SLOW_CLIENT_TIMEOUT_SECONDS = 5
+MAX_SLOW_CLIENT_TIMEOUT_SECONDS = 600
 
 
 class ConfigError(RuntimeError):
@@ -25,6 +48,18 @@ class AppConfig:
     allowed_origins: tuple[str, ...]
     admin_token_ttl_seconds: int
     database_path: str
+    max_rooms: int = DEFAULT_MAX_ROOMS
+    workers: int = 1
+    worker_index: int = 0
+    pubsub_url: Optional[str] = None
+    journal_writes: str = WRITES_STRICT
+    media_tokens: str = MEDIA_TOKENS_OPAQUE
+    media_token_secret: Optional[str] = None
+    media_accel_prefix: Optional[str] = None
+    media_prefetch: str = MEDIA_PREFETCH_OFF
+    group_offline_ttl_seconds: int = DEFAULT_GROUP_OFFLINE_TTL_SECONDS
+    max_groups: int = DEFAULT_MAX_GROUPS
+    slow_client_timeout_seconds: int = DEFAULT_SLOW_CLIENT_TIMEOUT_SECONDS
 
     @property
     def is_development(self) -> bool:
@@ -38,6 +73,14 @@ def _required_value(environ: Mapping[str, str], name: str) -> str:
     return value
 
 
+def _integer_value(environ: Mapping[str, str], name: str, default: int) -> int:
+    raw_value = environ.get(name, str(default)).strip()
+    try:
+        return int(raw_value)
+    except ValueError as error:
+        raise ConfigError(f"{name} must be an integer") from error
+
+
 def _parse_origins(raw_origins: str, *, production: bool) -> tuple[str, ...]:
     origins: list[str] = []
     for raw_origin in raw_origins.split(","):
@@ -119,10 +162,100 @@ def load_app_config(environ: Optional[Mapping[str, str]] = None) -> AppConfig:
         if not Path(database_path).is_absolute():
             raise ConfigError("Production CHGKA_DB_PATH must be an absolute path")
 
+    max_rooms = _integer_value(source, "CHGKA_MAX_ROOMS", DEFAULT_MAX_ROOMS)
+    if not 1 <= max_rooms <= MAX_MAX_ROOMS:
+        raise ConfigError(f"CHGKA_MAX_ROOMS must be between 1 and {MAX_MAX_ROOMS}")
+
+    workers = _integer_value(source, "CHGKA_WORKERS", 1)
+    if not 1 <= workers <= MAX_WORKERS:
+        raise ConfigError(f"CHGKA_WORKERS must be between 1 and {MAX_WORKERS}")
+    worker_index = _integer_value(source, "CHGKA_WORKER_INDEX", 0)
+    if not 0 <= worker_index < workers:
+        raise ConfigError("CHGKA_WORKER_INDEX must be between 0 and CHGKA_WORKERS - 1")
+
+    pubsub_url = source.get("CHGKA_PUBSUB_URL", "").strip() or None
+    if pubsub_url is not None:
+        scheme = urlsplit(pubsub_url).scheme.lower()
+        if scheme not in PUBSUB_SCHEMES:
+            raise ConfigError(
+                "CHGKA_PUBSUB_URL must use one of: " + ", ".join(PUBSUB_SCHEMES)
+            )
+        if scheme == MEMORY_PUBSUB_SCHEME and workers > 1:
+            raise ConfigError("memory:// pub/sub cannot connect several workers")
+    elif workers > 1:
+        raise ConfigError("CHGKA_PUBSUB_URL is required when CHGKA_WORKERS > 1")
+
+    journal_writes = source.get("CHGKA_JOURNAL_WRITES", WRITES_STRICT).strip().lower()
+    if journal_writes not in WRITE_MODES:
+        raise ConfigError("CHGKA_JOURNAL_WRITES must be strict or batched")
+
+    media_tokens = source.get("CHGKA_MEDIA_TOKENS", MEDIA_TOKENS_OPAQUE).strip().lower()
+    if media_tokens not in MEDIA_TOKEN_MODES:
+        raise ConfigError("CHGKA_MEDIA_TOKENS must be opaque or signed")
+    media_token_secret = source.get("CHGKA_MEDIA_TOKEN_SECRET", "").strip() or None
+    if media_tokens == MEDIA_TOKENS_SIGNED and (
+        media_token_secret is None
+        or len(media_token_secret) < MIN_MEDIA_TOKEN_SECRET_LENGTH
+    ):
+        raise ConfigError(
+            "CHGKA_MEDIA_TOKENS=signed requires CHGKA_MEDIA_TOKEN_SECRET of at least "
+            f"{MIN_MEDIA_TOKEN_SECRET_LENGTH} characters"
+        )
+
+    media_accel_prefix = source.get("CHGKA_MEDIA_ACCEL_PREFIX", "").strip() or None
+    if media_accel_prefix is not None and not (
+        media_accel_prefix.startswith("/") and media_accel_prefix.endswith("/")
+    ):
+        raise ConfigError("CHGKA_MEDIA_ACCEL_PREFIX must start and end with /")
+
+    media_prefetch = source.get("CHGKA_MEDIA_PREFETCH", MEDIA_PREFETCH_OFF).strip().lower()
+    if media_prefetch not in MEDIA_PREFETCH_MODES:
+        raise ConfigError("CHGKA_MEDIA_PREFETCH must be off or question")
+
+    group_offline_ttl_seconds = _integer_value(
+        source,
+        "CHGKA_GROUP_OFFLINE_TTL_SECONDS",
+        DEFAULT_GROUP_OFFLINE_TTL_SECONDS,
+    )
+    if not MIN_GROUP_OFFLINE_TTL_SECONDS <= group_offline_ttl_seconds <= MAX_GROUP_OFFLINE_TTL_SECONDS:
+        raise ConfigError(
+            "CHGKA_GROUP_OFFLINE_TTL_SECONDS must be between "
+            f"{MIN_GROUP_OFFLINE_TTL_SECONDS} and {MAX_GROUP_OFFLINE_TTL_SECONDS}"
+        )
+    max_groups = _integer_value(source, "CHGKA_MAX_GROUPS", DEFAULT_MAX_GROUPS)
+    if not MIN_MAX_GROUPS <= max_groups <= MAX_MAX_GROUPS:
+        raise ConfigError(f"CHGKA_MAX_GROUPS must be between {MIN_MAX_GROUPS} and {MAX_MAX_GROUPS}")
+    slow_client_timeout_seconds = _integer_value(
+        source,
+        "CHGKA_SLOW_CLIENT_TIMEOUT_SECONDS",
+        DEFAULT_SLOW_CLIENT_TIMEOUT_SECONDS,
+    )
+    if not (
+        MIN_SLOW_CLIENT_TIMEOUT_SECONDS
+        <= slow_client_timeout_seconds
+        <= MAX_SLOW_CLIENT_TIMEOUT_SECONDS
+    ):
+        raise ConfigError(
+            "CHGKA_SLOW_CLIENT_TIMEOUT_SECONDS must be between "
+            f"{MIN_SLOW_CLIENT_TIMEOUT_SECONDS} and {MAX_SLOW_CLIENT_TIMEOUT_SECONDS}"
+        )
+
     return AppConfig(
         environment=environment,
         admin_password=admin_password,
         allowed_origins=allowed_origins,
         admin_token_ttl_seconds=admin_token_ttl_seconds,
         database_path=database_path,
+        max_rooms=max_rooms,
+        workers=workers,
+        worker_index=worker_index,
+        pubsub_url=pubsub_url,
+        journal_writes=journal_writes,
+        media_tokens=media_tokens,
+        media_token_secret=media_token_secret,
+        media_accel_prefix=media_accel_prefix,
+        media_prefetch=media_prefetch,
+        group_offline_ttl_seconds=group_offline_ttl_seconds,
+        max_groups=max_groups,
+        slow_client_timeout_seconds=slow_client_timeout_seconds,
     )
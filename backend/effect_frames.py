@@ -0,0 +1,52 @@
+"""The Socket.IO events of one transition, collected for one send.
+
+`_apply_transition_effects` used to emit every effect as it went: settings,
+sounds, the state and the admin-only question each became its own packet to
+every socket. While an `EffectFrame` is active those emits are recorded with
+their audience instead. The frame is then delivered once: legacy sockets get
+the same events one by one, in the same order, and sockets that asked for
+batching get a single `effects` packet with the `[event, data]` pairs meant
+for them.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, TypedDict
+
+
+EFFECTS_EVENT = "effects"
+
+# Who receives an entry: every socket of the room, delta subscribers
+# (`state_patch`), full-snapshot subscribers (`state_update`) or the
+# authorized admins.
+AUDIENCE_ALL = "all"
+AUDIENCE_DELTA = "delta"
+AUDIENCE_SNAPSHOT = "snapshot"
+AUDIENCE_ADMINS = "admins"
+
+
+class EffectsEnvelope(TypedDict):
+    events: list[list[Any]]
+
+
+@dataclass
+class EffectFrame:
+    # (audience, event, data) in emission order.
+    entries: list[tuple[str, str, Any]] = field(default_factory=list)
+
+    def add(self, audience: str, event: str, data: Any = None) -> None:
+        self.entries.append((audience, event, data))
+
+    def envelope(self, *, delta: bool, admin: bool) -> EffectsEnvelope:
+        """The entries one kind of batched socket receives, in order."""
+        audiences = {AUDIENCE_ALL, AUDIENCE_DELTA if delta else AUDIENCE_SNAPSHOT}
+        if admin:
+            audiences.add(AUDIENCE_ADMINS)
+        return {
+            "events": [
+                [event, data]
+                for audience, event, data in self.entries
+                if audience in audiences
+            ],
+        }
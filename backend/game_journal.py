@@ -2,13 +2,17 @@
 
 from __future__ import annotations
 
+import base64
 from collections.abc import Callable, Mapping
 from datetime import datetime, timezone
 import json
 from pathlib import Path
+import queue
 import sqlite3
 import threading
+import time
 import uuid
+import weakref
 
 
 MODE_REGULAR = "regular"
@@ -20,8 +24,62 @@ STATUS_ACTIVE = "active"
 STATUS_COMPLETED = "completed"
 STATUS_RESET = "reset"
 STATUS_INTERRUPTED = "interrupted"
+SESSION_STATUSES = (
+    STATUS_LOBBY,
+    STATUS_ACTIVE,
+    STATUS_COMPLETED,
+    STATUS_RESET,
+    STATUS_INTERRUPTED,
+)
 
-SCHEMA_VERSION = 1
+MAX_SESSION_PAGE = 200
+MAX_EVENT_PAGE = 500
+MAX_USED_QUESTION_PAGE = 500
+
+SCHEMA_VERSION = 2
+
+# `strict` commits every event before `record_event` returns. `batched` assigns
+# the sequence number immediately and leaves the INSERT to a writer thread that
+# commits queued events in one transaction; `flush()` waits for it. In-memory
+# databases cannot be shared with a second connection and always use `strict`.
+WRITES_STRICT = "strict"
+WRITES_BATCHED = "batched"
+WRITE_MODES = (WRITES_STRICT, WRITES_BATCHED)
+DEFAULT_BATCH_SIZE = 256
+DEFAULT_BATCH_DELAY_SECONDS = 0.05
+
+_INSERT_EVENT = """
+    INSERT INTO game_events (
+        session_id, sequence_number, occurred_at,
+        event_type, payload_json, display_message
+    ) VALUES (?, ?, ?, ?, ?, ?)
+"""
+_INSERT_OPENING = """
+    INSERT INTO question_openings (
+        session_id, sequence_number, question_id, parent_question_id,
+        sector, part_index, opened_at, payload_json
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+_RESPONDENT_KEYS = ("participant_id", "group_id", "name")
+# Counts and timestamps keep the order of the former Python aggregation: the
+# payload of the earliest opening wins, later ties keep the stored one.
+_UPSERT_USAGE = """
+    INSERT INTO question_usage (
+        question_id, first_opened_at, last_opened_at, open_count, payload_json
+    ) VALUES (?, ?, ?, 1, ?)
+    ON CONFLICT(question_id) DO UPDATE SET
+        open_count = open_count + 1,
+        last_opened_at = MAX(last_opened_at, excluded.last_opened_at),
+        payload_json = CASE
+            WHEN excluded.first_opened_at < first_opened_at THEN excluded.payload_json
+            ELSE payload_json
+        END,
+        first_opened_at = MIN(first_opened_at, excluded.first_opened_at)
+"""
+_OPENED_COUNT = """(
+    SELECT COUNT(DISTINCT o.question_id) FROM question_openings o
+    WHERE o.session_id = s.id
+) AS opened_count"""
 
 
 class JournalError(RuntimeError):
@@ -32,6 +90,293 @@ def _default_clock() -> datetime:
     return datetime.now(timezone.utc)
 
 
+_STOP = object()
+
+
+def _is_sequence_conflict(error: sqlite3.IntegrityError) -> bool:
+    return "UNIQUE" in str(error)
+
+
+def _index_event(
+    connection: sqlite3.Connection,
+    session_id: str,
+    sequence: int,
+    occurred_at: str,
+    event_type: str,
+    payload_json: str,
+) -> None:
+    """Maintain `question_openings` for one stored event."""
+    if event_type not in ("question_opened", "respondent_selected"):
+        return
+    payload = json.loads(payload_json)
+    question_id = payload.get("question_id")
+    if not question_id:
+        return
+    if event_type == "respondent_selected":
+        respondent = {key: payload.get(key) for key in _RESPONDENT_KEYS}
+        connection.execute(
+            """
+            UPDATE question_openings SET respondent_json = ?
+            WHERE session_id = ? AND question_id = ?
+            """,
+            (
+                json.dumps(respondent, ensure_ascii=False, separators=(",", ":")),
+                session_id,
+                question_id,
+            ),
+        )
+        return
+    connection.execute(
+        _INSERT_OPENING,
+        (
+            session_id,
+            sequence,
+            question_id,
+            payload.get("parent_question_id"),
+            payload.get("sector"),
+            payload.get("part_index"),
+            occurred_at,
+            payload_json,
+        ),
+    )
+    mode = connection.execute(
+        "SELECT mode FROM game_sessions WHERE id = ?",
+        (session_id,),
+    ).fetchone()
+    if mode is not None and mode[0] == MODE_REGULAR:
+        connection.execute(
+            _UPSERT_USAGE,
+            (question_id, occurred_at, occurred_at, payload_json),
+        )
+
+
+def _rebuild_question_usage(
+    connection: sqlite3.Connection,
+    session_id: str | None = None,
+) -> None:
+    """Recompute `question_usage` for the questions of one or all sessions."""
+    if session_id is None:
+        scope, parameters = "", ()
+        connection.execute("DELETE FROM question_usage")
+    else:
+        scope = (
+            "AND o.question_id IN "
+            "(SELECT question_id FROM question_openings WHERE session_id = ?)"
+        )
+        parameters = (session_id,)
+        connection.execute(
+            """
+            DELETE FROM question_usage WHERE question_id IN (
+                SELECT question_id FROM question_openings WHERE session_id = ?
+            )
+            """,
+            parameters,
+        )
+    connection.execute(
+        f"""
+        INSERT INTO question_usage (
+            question_id, first_opened_at, last_opened_at, open_count, payload_json
+        )
+        SELECT o.question_id, MIN(o.opened_at), MAX(o.opened_at), COUNT(*),
+               (
+                   SELECT f.payload_json
+                   FROM question_openings f
+                   JOIN game_sessions fs ON fs.id = f.session_id
+                   WHERE f.question_id = o.question_id AND fs.mode = ?
+                   ORDER BY f.opened_at ASC, f.rowid ASC
+                   LIMIT 1
+               )
+        FROM question_openings o
+        JOIN game_sessions s ON s.id = o.session_id
+        WHERE s.mode = ? {scope}
+        GROUP BY o.question_id
+        """,
+        (MODE_REGULAR, MODE_REGULAR, *parameters),
+    )
+
+
+def _write_event(connection: sqlite3.Connection, row: tuple) -> int:
+    """Insert an event row inside the caller's transaction.
+
+    A sequence number already taken is replaced by the next free one; the
+    stored number is returned.
+    """
+    session_id, sequence, occurred_at, event_type, payload_json, _message = row
+    try:
+        connection.execute(_INSERT_EVENT, row)
+    except sqlite3.IntegrityError as error:
+        if not _is_sequence_conflict(error):
+            raise
+        sequence = _stored_next_sequence(connection, session_id)
+        connection.execute(_INSERT_EVENT, (session_id, sequence, *row[2:]))
+    _index_event(connection, session_id, sequence, occurred_at, event_type, payload_json)
+    return sequence
+
+
+def _validate_limit(limit: object, maximum: int, what: str) -> int:
+    if not isinstance(limit, int) or isinstance(limit, bool) or not 1 <= limit <= maximum:
+        raise JournalError(f"{what} limit must be between 1 and {maximum}")
+    return limit
+
+
+def _encode_cursor(*values: str) -> str:
+    encoded = json.dumps(values, ensure_ascii=False, separators=(",", ":"))
+    return base64.urlsafe_b64encode(encoded.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: object, size: int) -> list[str]:
+    """Values of a cursor made by `_encode_cursor`; anything else is rejected."""
+    if not isinstance(cursor, str) or not cursor:
+        raise JournalError("Invalid history cursor")
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        raise JournalError("Invalid history cursor") from None
+    if (
+        not isinstance(values, list)
+        or len(values) != size
+        or not all(isinstance(value, str) for value in values)
+    ):
+        raise JournalError("Invalid history cursor")
+    return values
+
+
+def _normalize_timestamp(value: object, name: str) -> str:
+    """ISO 8601 input in the stored UTC millisecond format, for comparisons."""
+    if not isinstance(value, str):
+        raise JournalError(f"{name} must be an ISO 8601 timestamp")
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise JournalError(f"{name} must be an ISO 8601 timestamp") from None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).isoformat(timespec="milliseconds")
+
+
+def _stored_next_sequence(connection: sqlite3.Connection, session_id: str) -> int:
+    return connection.execute(
+        """
+        SELECT COALESCE(MAX(sequence_number), 0) + 1
+        FROM game_events WHERE session_id = ?
+        """,
+        (session_id,),
+    ).fetchone()[0]
+
+
+class _BatchWriter:
+    """Writer thread that commits queued event rows in group transactions.
+
+    A batch ends when it holds `batch_size` rows, `max_delay` seconds after
+    its first row, or at a flush barrier. A failed batch is retried row by row
+    so one bad row does not drop its neighbours: a row whose sequence number
+    is already taken is renumbered after the stored maximum and `on_repair`
+    moves the journal's counter; any other error is reported by the next
+    `flush()`.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        *,
+        batch_size: int,
+        max_delay: float,
+        on_repair: Callable[[str, int], None],
+    ) -> None:
+        self._db_path = db_path
+        self._on_repair = on_repair
+        self._batch_size = batch_size
+        self._max_delay = max_delay
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._error: sqlite3.Error | None = None
+        # Rows handed over and rows the thread has finished with; a flush
+        # with nothing in between returns without waiting for the thread.
+        self._submitted = 0
+        self._written = 0
+        self._thread = threading.Thread(
+            target=self._run,
+            name="game-journal-writer",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def submit(self, row: tuple) -> None:
+        self._submitted += 1
+        self._queue.put(row)
+
+    @property
+    def pending(self) -> bool:
+        """Whether `flush()` has rows to wait for or an error to raise."""
+        return self._written < self._submitted or self._error is not None
+
+    def flush(self) -> None:
+        if not self.pending:
+            return
+        barrier = threading.Event()
+        self._queue.put(barrier)
+        barrier.wait()
+        error, self._error = self._error, None
+        if error is not None:
+            raise JournalError(f"Game journal write failed: {error}")
+
+    def stop(self) -> None:
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def _next_batch(self) -> tuple[list[tuple], list[threading.Event], bool]:
+        rows: list[tuple] = []
+        barriers: list[threading.Event] = []
+        item = self._queue.get()
+        deadline = time.monotonic() + self._max_delay
+        while True:
+            if item is _STOP:
+                return rows, barriers, True
+            if isinstance(item, threading.Event):
+                barriers.append(item)
+                return rows, barriers, False
+            rows.append(item)
+            remaining = deadline - time.monotonic()
+            if len(rows) >= self._batch_size or remaining <= 0:
+                return rows, barriers, False
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                return rows, barriers, False
+
+    def _write(self, connection: sqlite3.Connection, rows: list[tuple]) -> None:
+        written: list[tuple[tuple, int]] = []
+        try:
+            with connection:
+                written = [(row, _write_event(connection, row)) for row in rows]
+        except sqlite3.Error:
+            written = []
+            for row in rows:
+                try:
+                    with connection:
+                        written.append((row, _write_event(connection, row)))
+                except sqlite3.Error as error:
+                    self._error = self._error or error
+        for row, sequence in written:
+            if sequence != row[1]:
+                self._on_repair(row[0], sequence + 1)
+
+    def _run(self) -> None:
+        connection = sqlite3.connect(self._db_path, timeout=5)
+        connection.execute("PRAGMA foreign_keys = ON")
+        try:
+            while True:
+                rows, barriers, stop = self._next_batch()
+                if rows:
+                    self._write(connection, rows)
+                    self._written += len(rows)
+                for barrier in barriers:
+                    barrier.set()
+                if stop:
+                    return
+        finally:
+            connection.close()
+
+
 class GameJournal:
     def __init__(
         self,
@@ -40,8 +385,20 @@ class GameJournal:
         default_mode: str,
         clock: Callable[[], datetime] = _default_clock,
         id_factory: Callable[[], object] = uuid.uuid4,
+        writes: str = WRITES_STRICT,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        batch_delay_seconds: float = DEFAULT_BATCH_DELAY_SECONDS,
     ):
+        if writes not in WRITE_MODES:
+            raise JournalError(f"Unsupported journal write mode: {writes}")
         self._db_path = str(db_path)
+        self._writes = writes
+        self._batch_size = batch_size
+        self._batch_delay_seconds = batch_delay_seconds
+        self._writer: _BatchWriter | None = None
+        # Next sequence number per session, seeded once from the database when
+        # a session is created or first written after a restart.
+        self._sequences: dict[str, int] = {}
         self._default_mode = self._validate_mode(default_mode)
         self._pending_mode = self._default_mode
         self._clock = clock
@@ -52,6 +409,28 @@ class GameJournal:
         self._pack_fingerprint: str | None = None
         self._pack_name: str | None = None
         self._pack_path: str | None = None
+        # Room journals share the root connection, lock and pack configuration
+        # but track their own current session.
+        self._root: GameJournal = self
+        self._room_journals: weakref.WeakSet[GameJournal] = weakref.WeakSet()
+
+    def open_room(self) -> GameJournal:
+        """Return a journal for one more concurrently running game."""
+        root = self._root
+        journal = GameJournal(
+            root._db_path,
+            default_mode=root._default_mode,
+            clock=root._clock,
+            id_factory=root._id_factory,
+        )
+        journal._root = root
+        journal._lock = root._lock
+        root._room_journals.add(journal)
+        return journal
+
+    def _journals(self) -> list[GameJournal]:
+        root = self._root
+        return [root, *root._room_journals]
 
     @staticmethod
     def _validate_mode(mode: object) -> str:
@@ -66,6 +445,9 @@ class GameJournal:
         return value.astimezone(timezone.utc).isoformat(timespec="milliseconds")
 
     def initialize(self) -> None:
+        if self._root is not self:
+            self._root.initialize()
+            return
         with self._lock:
             if self._connection is not None:
                 return
@@ -84,7 +466,7 @@ class GameJournal:
             if self._db_path != ":memory:":
                 connection.execute("PRAGMA journal_mode = WAL")
             version = connection.execute("PRAGMA user_version").fetchone()[0]
-            if version not in (0, SCHEMA_VERSION):
+            if version not in (0, 1, SCHEMA_VERSION):
                 connection.close()
                 raise JournalError(
                     f"Unsupported game journal schema version: {version}"
@@ -122,24 +504,102 @@ class GameJournal:
                     ON game_events(session_id, sequence_number);
                 CREATE INDEX IF NOT EXISTS game_events_type
                     ON game_events(event_type);
+                CREATE INDEX IF NOT EXISTS game_sessions_created
+                    ON game_sessions(created_at, id);
+                CREATE INDEX IF NOT EXISTS game_sessions_mode_created
+                    ON game_sessions(mode, created_at, id);
+                CREATE INDEX IF NOT EXISTS game_sessions_pack_created
+                    ON game_sessions(pack_fingerprint, created_at, id);
+
+                CREATE TABLE IF NOT EXISTS question_openings (
+                    session_id TEXT NOT NULL REFERENCES game_sessions(id),
+                    sequence_number INTEGER NOT NULL,
+                    question_id TEXT NOT NULL,
+                    parent_question_id TEXT,
+                    sector INTEGER,
+                    part_index INTEGER,
+                    opened_at TEXT NOT NULL,
+                    payload_json TEXT NOT NULL,
+                    respondent_json TEXT,
+                    PRIMARY KEY (session_id, sequence_number)
+                );
+
+                CREATE INDEX IF NOT EXISTS question_openings_session_question
+                    ON question_openings(session_id, question_id);
+                CREATE INDEX IF NOT EXISTS question_openings_question
+                    ON question_openings(question_id, opened_at);
+
+                CREATE TABLE IF NOT EXISTS question_usage (
+                    question_id TEXT PRIMARY KEY,
+                    first_opened_at TEXT NOT NULL,
+                    last_opened_at TEXT NOT NULL,
+                    open_count INTEGER NOT NULL,
+                    payload_json TEXT NOT NULL
+                );
+
+                CREATE INDEX IF NOT EXISTS question_usage_recent
+                    ON question_usage(last_opened_at, question_id);
                 """
             )
+            if version == 1:
+                self._backfill_question_openings(connection)
             connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
             connection.commit()
             self._connection = connection
+            if self._writes == WRITES_BATCHED and self._db_path != ":memory:":
+                self._writer = _BatchWriter(
+                    self._db_path,
+                    batch_size=self._batch_size,
+                    max_delay=self._batch_delay_seconds,
+                    on_repair=self._repair_sequence,
+                )
+
+    @staticmethod
+    def _backfill_question_openings(connection: sqlite3.Connection) -> None:
+        """Fill `question_openings` from the events of a version 1 journal."""
+        rows = connection.execute(
+            """
+            SELECT session_id, sequence_number, occurred_at, event_type, payload_json
+            FROM game_events
+            WHERE event_type IN ('question_opened', 'respondent_selected')
+            ORDER BY session_id, sequence_number
+            """
+        )
+        for row in rows.fetchall():
+            _index_event(connection, *row)
+        _rebuild_question_usage(connection)
 
     def close(self) -> None:
+        if self._root is self and self._writer is not None:
+            self._writer.stop()
+            self._writer = None
+            self._sequences.clear()
         with self._lock:
-            if self._connection is not None:
+            if self._root is self and self._connection is not None:
                 self._connection.close()
                 self._connection = None
             self._current_session_id = None
             self._pending_mode = self._default_mode
 
     def _db(self) -> sqlite3.Connection:
-        self.initialize()
-        assert self._connection is not None
-        return self._connection
+        root = self._root
+        root.initialize()
+        assert root._connection is not None
+        return root._connection
+
+    def flush(self) -> None:
+        """Wait until every queued event is committed.
+
+        Raises `JournalError` if a queued event could not be written.
+        """
+        writer = self._root._writer
+        if writer is not None:
+            writer.flush()
+
+    def has_pending_writes(self) -> bool:
+        """Whether `flush()` would wait for the batched writer."""
+        writer = self._root._writer
+        return writer is not None and writer.pending
 
     def configure_pack(
         self,
@@ -150,9 +610,10 @@ class GameJournal:
     ) -> None:
         if not fingerprint or not name:
             raise JournalError("Pack fingerprint and name are required")
-        self._pack_fingerprint = fingerprint
-        self._pack_name = name
-        self._pack_path = str(Path(path).resolve())
+        root = self._root
+        root._pack_fingerprint = fingerprint
+        root._pack_name = name
+        root._pack_path = str(Path(path).resolve())
 
     def recover_interrupted_sessions(self) -> int:
         with self._lock, self._db() as connection:
@@ -169,13 +630,15 @@ class GameJournal:
                     STATUS_ACTIVE,
                 ),
             )
-            self._current_session_id = None
+            for journal in self._journals():
+                journal._current_session_id = None
             return cursor.rowcount
 
     def _ensure_session(self) -> str:
         if self._current_session_id is not None:
             return self._current_session_id
-        if not self._pack_fingerprint or not self._pack_name or not self._pack_path:
+        root = self._root
+        if not root._pack_fingerprint or not root._pack_name or not root._pack_path:
             raise JournalError("Question pack is not configured for the game journal")
         session_id = str(self._id_factory())
         created_at = self._timestamp()
@@ -192,12 +655,13 @@ class GameJournal:
                     self._pending_mode,
                     STATUS_LOBBY,
                     created_at,
-                    self._pack_fingerprint,
-                    self._pack_name,
-                    self._pack_path,
+                    root._pack_fingerprint,
+                    root._pack_name,
+                    root._pack_path,
                 ),
             )
         self._current_session_id = session_id
+        root._sequences[session_id] = 1
         return session_id
 
     def mark_started(self) -> str:
@@ -225,6 +689,7 @@ class GameJournal:
 
     def set_current_mode(self, mode: object) -> str:
         normalized = self._validate_mode(mode)
+        self.flush()
         with self._lock:
             self._pending_mode = normalized
             if self._current_session_id is not None:
@@ -233,6 +698,7 @@ class GameJournal:
                         "UPDATE game_sessions SET mode = ? WHERE id = ?",
                         (normalized, self._current_session_id),
                     )
+                    _rebuild_question_usage(connection, self._current_session_id)
         return normalized
 
     def current_mode(self) -> str:
@@ -243,6 +709,7 @@ class GameJournal:
         if not isinstance(session_id, str) or not session_id:
             raise JournalError("Session id is required")
         normalized = self._validate_mode(mode)
+        self.flush()
         with self._lock, self._db() as connection:
             cursor = connection.execute(
                 "UPDATE game_sessions SET mode = ? WHERE id = ?",
@@ -250,8 +717,10 @@ class GameJournal:
             )
             if cursor.rowcount != 1:
                 raise JournalError("Game session not found")
-            if session_id == self._current_session_id:
-                self._pending_mode = normalized
+            _rebuild_question_usage(connection, session_id)
+            for journal in self._journals():
+                if session_id == journal._current_session_id:
+                    journal._pending_mode = normalized
         return normalized
 
     def record_event(
@@ -271,30 +740,20 @@ class GameJournal:
                 separators=(",", ":"),
                 sort_keys=True,
             )
-            with self._db() as connection:
-                sequence = connection.execute(
-                    """
-                    SELECT COALESCE(MAX(sequence_number), 0) + 1
-                    FROM game_events WHERE session_id = ?
-                    """,
-                    (session_id,),
-                ).fetchone()[0]
-                connection.execute(
-                    """
-                    INSERT INTO game_events (
-                        session_id, sequence_number, occurred_at,
-                        event_type, payload_json, display_message
-                    ) VALUES (?, ?, ?, ?, ?, ?)
-                    """,
-                    (
-                        session_id,
-                        sequence,
-                        occurred_at,
-                        event_type,
-                        encoded_payload,
-                        message,
-                    ),
-                )
+            row = (
+                session_id,
+                self._next_sequence(session_id),
+                occurred_at,
+                event_type,
+                encoded_payload,
+                message,
+            )
+            writer = self._root._writer
+            if writer is not None:
+                writer.submit(row)
+                sequence = row[1]
+            else:
+                sequence = self._insert_event(row)
             return {
                 "session_id": session_id,
                 "sequence_number": sequence,
@@ -304,7 +763,29 @@ class GameJournal:
                 "display_message": message,
             }
 
+    def _next_sequence(self, session_id: str) -> int:
+        sequences = self._root._sequences
+        sequence = sequences.get(session_id)
+        if sequence is None:
+            sequence = _stored_next_sequence(self._db(), session_id)
+        sequences[session_id] = sequence + 1
+        return sequence
+
+    def _repair_sequence(self, session_id: str, next_sequence: int) -> None:
+        """Move a counter past a sequence number another writer already used."""
+        with self._lock:
+            sequences = self._root._sequences
+            sequences[session_id] = max(sequences.get(session_id, 1), next_sequence)
+
+    def _insert_event(self, row: tuple) -> int:
+        with self._db() as connection:
+            sequence = _write_event(connection, row)
+        if sequence != row[1]:
+            self._repair_sequence(row[0], sequence + 1)
+        return sequence
+
     def complete_current(self, score: Mapping[str, object]) -> None:
+        self.flush()
         with self._lock:
             if self._current_session_id is None:
                 return
@@ -324,7 +805,38 @@ class GameJournal:
                     ),
                 )
 
+    def close_room(self) -> None:
+        """End a room journal whose game is being discarded.
+
+        A session still in the lobby or running is marked interrupted, as a
+        restart would; completed sessions are left as they are.
+        """
+        if self._root is self:
+            raise JournalError("The root journal is closed with close()")
+        self.flush()
+        with self._lock:
+            if self._current_session_id is not None:
+                with self._db() as connection:
+                    connection.execute(
+                        """
+                        UPDATE game_sessions
+                        SET status = ?, ended_at = COALESCE(ended_at, ?)
+                        WHERE id = ? AND status IN (?, ?)
+                        """,
+                        (
+                            STATUS_INTERRUPTED,
+                            self._timestamp(),
+                            self._current_session_id,
+                            STATUS_LOBBY,
+                            STATUS_ACTIVE,
+                        ),
+                    )
+                self._root._sequences.pop(self._current_session_id, None)
+            self._current_session_id = None
+            self._root._room_journals.discard(self)
+
     def rotate_after_reset(self, score: Mapping[str, object]) -> str:
+        self.flush()
         with self._lock:
             if self._current_session_id is not None:
                 with self._db() as connection:
@@ -373,31 +885,14 @@ class GameJournal:
             "opened_questions": opened_count,
         }
 
-    def _opened_question_count(self, session_id: str) -> int:
-        event_rows = self._db().execute(
-            """
-            SELECT payload_json FROM game_events
-            WHERE session_id = ? AND event_type = 'question_opened'
-            """,
-            (session_id,),
-        ).fetchall()
-        return len(
-            {
-                payload.get("question_id")
-                for event_row in event_rows
-                for payload in [json.loads(event_row["payload_json"])]
-                if payload.get("question_id")
-            }
-        )
-
     def _session_summary(self, session_id: str) -> dict | None:
         row = self._db().execute(
-            "SELECT * FROM game_sessions WHERE id = ?",
+            f"SELECT s.*, {_OPENED_COUNT} FROM game_sessions s WHERE s.id = ?",
             (session_id,),
         ).fetchone()
         if row is None:
             return None
-        return self._session_dict(row, self._opened_question_count(session_id))
+        return self._session_dict(row, row["opened_count"])
 
     def list_sessions(
         self,
@@ -405,37 +900,111 @@ class GameJournal:
         limit: int = 50,
         mode: str | None = None,
     ) -> list[dict]:
-        if not isinstance(limit, int) or isinstance(limit, bool) or not 1 <= limit <= 200:
-            raise JournalError("Session limit must be between 1 and 200")
-        normalized_mode = None if mode is None else self._validate_mode(mode)
+        return self.page_sessions(limit=limit, mode=mode)["sessions"]
+
+    def page_sessions(
+        self,
+        *,
+        limit: int = 50,
+        cursor: object = None,
+        mode: object = None,
+        status: object = None,
+        pack_fingerprint: object = None,
+        created_from: object = None,
+        created_before: object = None,
+    ) -> dict:
+        """Sessions newest first, `limit` at a time.
+
+        `next_cursor` continues after the last returned session and is `None`
+        on the last page. The date range is `created_from <= created_at <
+        created_before`.
+        """
+        _validate_limit(limit, MAX_SESSION_PAGE, "Session")
+        clauses: list[str] = []
+        parameters: list[object] = []
+        if mode is not None:
+            clauses.append("s.mode = ?")
+            parameters.append(self._validate_mode(mode))
+        if status is not None:
+            if status not in SESSION_STATUSES:
+                raise JournalError("Unknown game session status")
+            clauses.append("s.status = ?")
+            parameters.append(status)
+        if pack_fingerprint is not None:
+            if not isinstance(pack_fingerprint, str) or not pack_fingerprint:
+                raise JournalError("Pack fingerprint must be a non-empty string")
+            clauses.append("s.pack_fingerprint = ?")
+            parameters.append(pack_fingerprint)
+        if created_from is not None:
+            clauses.append("s.created_at >= ?")
+            parameters.append(_normalize_timestamp(created_from, "created_from"))
+        if created_before is not None:
+            clauses.append("s.created_at < ?")
+            parameters.append(_normalize_timestamp(created_before, "created_before"))
+        if cursor is not None:
+            clauses.append("(s.created_at, s.id) < (?, ?)")
+            parameters.extend(_decode_cursor(cursor, 2))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        self.flush()
         with self._lock:
-            if normalized_mode is None:
-                rows = self._db().execute(
-                    """
-                    SELECT * FROM game_sessions
-                    ORDER BY created_at DESC, id DESC
-                    LIMIT ?
-                    """,
-                    (limit,),
-                ).fetchall()
-            else:
-                rows = self._db().execute(
-                    """
-                    SELECT * FROM game_sessions
-                    WHERE mode = ?
-                    ORDER BY created_at DESC, id DESC
-                    LIMIT ?
-                    """,
-                    (normalized_mode, limit),
-                ).fetchall()
-            return [
-                self._session_dict(row, self._opened_question_count(row["id"]))
-                for row in rows
-            ]
+            rows = self._db().execute(
+                f"""
+                SELECT s.*, {_OPENED_COUNT} FROM game_sessions s
+                {where}
+                ORDER BY s.created_at DESC, s.id DESC
+                LIMIT ?
+                """,
+                (*parameters, limit + 1),
+            ).fetchall()
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = _encode_cursor(last["created_at"], last["id"])
+        return {
+            "sessions": [self._session_dict(row, row["opened_count"]) for row in rows[:limit]],
+            "next_cursor": next_cursor,
+        }
+
+    @staticmethod
+    def _event_dict(row: sqlite3.Row) -> dict:
+        return {
+            "sequence_number": row["sequence_number"],
+            "occurred_at": row["occurred_at"],
+            "event_type": row["event_type"],
+            "payload": json.loads(row["payload_json"]),
+            "display_message": row["display_message"],
+        }
+
+    def _opened_questions(self, session_id: str) -> list[dict]:
+        opening_rows = self._db().execute(
+            """
+            SELECT question_id, opened_at, payload_json, respondent_json
+            FROM question_openings
+            WHERE session_id = ?
+            ORDER BY sequence_number ASC
+            """,
+            (session_id,),
+        ).fetchall()
+        opened: dict[str, dict] = {}
+        for opening in opening_rows:
+            item = opened.get(opening["question_id"])
+            if item is None:
+                item = opened[opening["question_id"]] = {
+                    **json.loads(opening["payload_json"]),
+                    "opened_at": opening["opened_at"],
+                    "open_count": 0,
+                }
+            item["open_count"] += 1
+            item["last_opened_at"] = opening["opened_at"]
+            # The latest respondent is stored on every opening made before it.
+            if opening["respondent_json"] is not None:
+                item["respondent"] = json.loads(opening["respondent_json"])
+        return list(opened.values())
 
     def get_session(self, session_id: object) -> dict:
         if not isinstance(session_id, str) or not session_id:
             raise JournalError("Session id is required")
+        self.flush()
         with self._lock:
             row = self._db().execute(
                 "SELECT * FROM game_sessions WHERE id = ?",
@@ -453,82 +1022,132 @@ class GameJournal:
                 """,
                 (session_id,),
             ).fetchall()
-            events = [
-                {
-                    "sequence_number": event_row["sequence_number"],
-                    "occurred_at": event_row["occurred_at"],
-                    "event_type": event_row["event_type"],
-                    "payload": json.loads(event_row["payload_json"]),
-                    "display_message": event_row["display_message"],
-                }
-                for event_row in event_rows
-            ]
-            opened: dict[str, dict] = {}
-            for event in events:
-                if event["event_type"] == "respondent_selected":
-                    question_id = event["payload"].get("question_id")
-                    if question_id in opened:
-                        opened[question_id]["respondent"] = {
-                            key: event["payload"].get(key)
-                            for key in ("participant_id", "group_id", "name")
-                        }
-                    continue
-                if event["event_type"] != "question_opened":
-                    continue
-                question_id = event["payload"].get("question_id")
-                if not question_id:
-                    continue
-                item = opened.setdefault(
-                    question_id,
-                    {
-                        **event["payload"],
-                        "opened_at": event["occurred_at"],
-                        "open_count": 0,
-                    },
-                )
-                item["open_count"] += 1
-                item["last_opened_at"] = event["occurred_at"]
+            opened = self._opened_questions(session_id)
             return {
                 "session": self._session_dict(row, len(opened)),
-                "events": events,
-                "opened_questions": list(opened.values()),
+                "events": [self._event_dict(event_row) for event_row in event_rows],
+                "opened_questions": opened,
+            }
+
+    def page_events(
+        self,
+        session_id: object,
+        *,
+        limit: int = 200,
+        cursor: object = None,
+        event_types: object = None,
+    ) -> dict:
+        """Events of one session in sequence order, `limit` at a time.
+
+        The cursor is the last sequence number already received. The first
+        page (without a cursor) also carries the session summary and its
+        opened questions.
+        """
+        if not isinstance(session_id, str) or not session_id:
+            raise JournalError("Session id is required")
+        _validate_limit(limit, MAX_EVENT_PAGE, "Event")
+        if cursor is None:
+            after = 0
+        elif isinstance(cursor, int) and not isinstance(cursor, bool) and cursor >= 0:
+            after = cursor
+        else:
+            raise JournalError("Invalid history cursor")
+        type_filter = ""
+        types: tuple[str, ...] = ()
+        if event_types is not None:
+            if (
+                not isinstance(event_types, (list, tuple))
+                or not event_types
+                or not all(isinstance(item, str) and item for item in event_types)
+            ):
+                raise JournalError("Event types must be a non-empty list of strings")
+            types = tuple(dict.fromkeys(event_types))
+            type_filter = f"AND event_type IN ({', '.join('?' * len(types))})"
+        self.flush()
+        with self._lock:
+            summary = self._session_summary(session_id)
+            if summary is None:
+                raise JournalError("Game session not found")
+            event_rows = self._db().execute(
+                f"""
+                SELECT sequence_number, occurred_at, event_type,
+                       payload_json, display_message
+                FROM game_events
+                WHERE session_id = ? AND sequence_number > ? {type_filter}
+                ORDER BY sequence_number ASC
+                LIMIT ?
+                """,
+                (session_id, after, *types, limit + 1),
+            ).fetchall()
+            page = {
+                "session": summary,
+                "events": [self._event_dict(event_row) for event_row in event_rows[:limit]],
+                "next_cursor": (
+                    event_rows[limit - 1]["sequence_number"]
+                    if len(event_rows) > limit
+                    else None
+                ),
             }
+            if cursor is None:
+                page["opened_questions"] = self._opened_questions(session_id)
+            return page
+
+    @staticmethod
+    def _used_question_dict(row: sqlite3.Row) -> dict:
+        return {
+            **json.loads(row["payload_json"]),
+            "first_opened_at": row["first_opened_at"],
+            "open_count": row["open_count"],
+            "last_opened_at": row["last_opened_at"],
+        }
 
     def used_questions(self) -> list[dict]:
+        self.flush()
         with self._lock:
             rows = self._db().execute(
                 """
-                SELECT e.occurred_at, e.payload_json
-                FROM game_events e
-                JOIN game_sessions s ON s.id = e.session_id
-                WHERE e.event_type = 'question_opened' AND s.mode = ?
-                ORDER BY e.occurred_at ASC, e.id ASC
+                SELECT * FROM question_usage
+                ORDER BY last_opened_at DESC, question_id DESC
+                """
+            ).fetchall()
+            return [self._used_question_dict(row) for row in rows]
+
+    def page_used_questions(self, *, limit: int = 100, cursor: object = None) -> dict:
+        """Questions of regular sessions, most recently opened first."""
+        _validate_limit(limit, MAX_USED_QUESTION_PAGE, "Question")
+        keyset = ""
+        parameters: list[object] = []
+        if cursor is not None:
+            keyset = "WHERE (last_opened_at, question_id) < (?, ?)"
+            parameters.extend(_decode_cursor(cursor, 2))
+        self.flush()
+        with self._lock:
+            rows = self._db().execute(
+                f"""
+                SELECT * FROM question_usage
+                {keyset}
+                ORDER BY last_opened_at DESC, question_id DESC
+                LIMIT ?
                 """,
-                (MODE_REGULAR,),
+                (*parameters, limit + 1),
             ).fetchall()
-            used: dict[str, dict] = {}
-            for row in rows:
-                payload = json.loads(row["payload_json"])
-                question_id = payload.get("question_id")
-                if not question_id:
-                    continue
-                item = used.setdefault(
-                    question_id,
-                    {
-                        **payload,
-                        "first_opened_at": row["occurred_at"],
-                        "open_count": 0,
-                    },
-                )
-                item["open_count"] += 1
-                item["last_opened_at"] = row["occurred_at"]
-            return sorted(
-                used.values(),
-                key=lambda item: (item.get("last_opened_at", ""), item["question_id"]),
-                reverse=True,
-            )
+            total = self._db().execute("SELECT COUNT(*) FROM question_usage").fetchone()[0]
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = _encode_cursor(last["last_opened_at"], last["question_id"])
+        return {
+            "questions": [self._used_question_dict(row) for row in rows[:limit]],
+            "total": total,
+            "next_cursor": next_cursor,
+        }
+
+    def current_session_id(self) -> str | None:
+        with self._lock:
+            return self._current_session_id
 
     def snapshot(self, *, limit: int = 50, mode: str | None = None) -> dict:
+        self.flush()
         with self._lock:
             current = None
             if self._current_session_id is not None:
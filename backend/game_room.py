@@ -0,0 +1,211 @@
+"""Independent games hosted by one backend process.
+
+A `GameRoom` owns everything that used to be a module global in `main.py` and
+belongs to one game: the app state, the connection roster, media tokens, sound
+settings, the single admin token and the journal's current session. The
+question pack and the SQLite database stay process-wide.
+
+Only the host creates rooms. A room other than the default one is discarded
+once its last socket and spectator have left while its game is in the lobby
+or over, so abandoned ids do not use up the room limit.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from dataclasses import dataclass, field
+import re
+from typing import Callable, Iterator, Optional
+
+from auth import AdminTokenStore
+from game_journal import GameJournal
+from media import MediaTokenStore, RoundMediaCache
+from roster import Roster
+from sound_control import create_sound_control_state
+from spectators import SpectatorFeed
+from state import PHASE_GAME_OVER, PHASE_LOGIN, AppState, create_initial_app_state
+from state_sync import StateSnapshotCache, StateStream
+
+
+DEFAULT_ROOM_ID = "main"
+ROOM_ID_PATTERN = re.compile(r"[a-z0-9][a-z0-9-]{0,39}")
+
+# Audience rooms; a socket is in at most one of them. Admins are the live host
+# UI, history the admin history page, pending the groups awaiting approval.
+ADMINS_AUDIENCE = "admins"
+PLAYERS_AUDIENCE = "players"
+PENDING_AUDIENCE = "pending"
+HISTORY_AUDIENCE = "history"
+
+
+class RoomError(ValueError):
+    """A socket asked for a room that cannot be opened."""
+
+    def __init__(self, code: str, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def _default_settings() -> dict:
+    return {
+        "volume": 1.0,
+        "sound_control": create_sound_control_state(),
+    }
+
+
+@dataclass(eq=False)
+class GameRoom:
+    id: str
+    journal: GameJournal
+    admin_tokens: AdminTokenStore
+    state: AppState = field(default_factory=create_initial_app_state)
+    # Player records own a stable participant group; admin records keep their
+    # smaller role/token shape. Assigning a list of records builds a roster.
+    players: Roster = field(default_factory=Roster)
+    # media_id -> token info, in memory only.
+    media_tokens: MediaTokenStore = field(default_factory=MediaTokenStore)
+    round_media: RoundMediaCache = field(default_factory=RoundMediaCache)
+    # Bumped whenever the media tokens are cleared; signed tokens of an older
+    # epoch are refused.
+    media_epoch: int = 0
+    # media_ref -> opaque key shared by its prefetch and shared-media entries
+    # in the current round, and player sid -> running prefetch downloads.
+    prefetch_keys: dict[str, str] = field(default_factory=dict)
+    prefetch_downloads: dict[str, int] = field(default_factory=dict)
+    # Stops the shared audio/video at its known end; see `_schedule_media_end`.
+    media_end_task: Optional[asyncio.Task] = None
+    settings: dict = field(default_factory=_default_settings)
+    state_stream: StateStream = field(default_factory=StateStream)
+    state_delta_sids: set[str] = field(default_factory=set)
+    # Sockets that take a transition's events as one `effects` packet.
+    effect_batch_sids: set[str] = field(default_factory=set)
+    state_snapshots: StateSnapshotCache = field(default_factory=StateSnapshotCache)
+    # sid -> its audience room. Admins were authorized with
+    # `admin_audience_token`; once it is no longer valid the room is emptied.
+    audiences: dict[str, str] = field(default_factory=dict)
+    admin_audience_token: Optional[str] = None
+    # Encoded events for `GET /spectate` subscribers.
+    spectators: SpectatorFeed = field(default_factory=SpectatorFeed)
+
+    @property
+    def channel(self) -> str:
+        """Socket.IO room joined by every socket of this game."""
+        return f"game:{self.id}"
+
+    @property
+    def delta_channel(self) -> str:
+        """Socket.IO room of the sockets that receive `state_patch`."""
+        return f"game:{self.id}:state_delta"
+
+    @property
+    def batch_channel(self) -> str:
+        """Socket.IO room of the sockets that receive `effects` packets."""
+        return f"game:{self.id}:effects"
+
+    def audience_channel(self, audience: str) -> str:
+        """Socket.IO room of one audience, e.g. `game:main:admins`."""
+        return f"game:{self.id}:{audience}"
+
+    def audience_sids(self, audience: str) -> set[str]:
+        return {sid for sid, member_of in self.audiences.items() if member_of == audience}
+
+    @property
+    def game_is_running(self) -> bool:
+        return self.state["game"]["phase"] not in (PHASE_LOGIN, PHASE_GAME_OVER)
+
+    def close(self) -> None:
+        """Release what the room holds outside itself once it is discarded."""
+        if self.media_end_task is not None:
+            self.media_end_task.cancel()
+            self.media_end_task = None
+        self.journal.close_room()
+
+
+class GameRooms:
+    """Rooms by id plus the room of every connected socket.
+
+    The default room always exists, so clients that do not ask for a room and
+    code running outside any socket keep the single-game behavior.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[str], GameRoom],
+        *,
+        max_rooms: int,
+        is_local: Callable[[str], bool] = lambda _room_id: True,
+    ) -> None:
+        self._factory = factory
+        self._max_rooms = max_rooms
+        self._is_local = is_local
+        self._rooms: dict[str, GameRoom] = {}
+        self._socket_rooms: dict[str, GameRoom] = {}
+        # Attached sockets per room.
+        self._members: Counter[GameRoom] = Counter()
+        self.closed = 0
+        # Created even when another worker owns it: code outside a socket
+        # handler needs a room, but sockets of `main` are refused here.
+        self.default = factory(DEFAULT_ROOM_ID)
+        self._rooms[DEFAULT_ROOM_ID] = self.default
+
+    def __iter__(self) -> Iterator[GameRoom]:
+        return iter(list(self._rooms.values()))
+
+    def __len__(self) -> int:
+        return len(self._rooms)
+
+    def get(self, room_id: object) -> Optional[GameRoom]:
+        return self._rooms.get(room_id) if isinstance(room_id, str) else None
+
+    def open(self, room_id: object, *, create: bool = True) -> GameRoom:
+        """Return an existing room, or create it on first use if `create`."""
+        if room_id is None or room_id == "":
+            room_id = DEFAULT_ROOM_ID
+        if not isinstance(room_id, str) or not ROOM_ID_PATTERN.fullmatch(room_id):
+            raise RoomError("invalid_room", "Некорректный идентификатор игры")
+        if not self._is_local(room_id):
+            raise RoomError("wrong_worker", "Игра обслуживается другим процессом сервера")
+        room = self._rooms.get(room_id)
+        if room is not None:
+            return room
+        if not create:
+            raise RoomError("room_not_found", "Ведущий ещё не открыл эту игру")
+        if len(self._rooms) >= self._max_rooms:
+            raise RoomError("too_many_rooms", "Сервер не может открыть ещё одну игру")
+        room = self._factory(room_id)
+        self._rooms[room_id] = room
+        return room
+
+    def attach(self, sid: str, room: GameRoom) -> None:
+        self.detach(sid)
+        self._socket_rooms[sid] = room
+        self._members[room] += 1
+
+    def detach(self, sid: str) -> Optional[GameRoom]:
+        room = self._socket_rooms.pop(sid, None)
+        if room is not None:
+            self._members[room] -= 1
+            if self._members[room] <= 0:
+                del self._members[room]
+        return room
+
+    def for_socket(self, sid: str) -> GameRoom:
+        return self._socket_rooms.get(sid, self.default)
+
+    def close_if_idle(self, room: GameRoom) -> bool:
+        """Discard `room` if nobody follows it and its game is not running."""
+        if (
+            room is self.default
+            or self._rooms.get(room.id) is not room
+            or self._members[room] > 0
+            or room.spectators.subscribers
+            or room.game_is_running
+        ):
+            return False
+        del self._rooms[room.id]
+        self._members.pop(room, None)
+        room.close()
+        self.closed += 1
+        return True
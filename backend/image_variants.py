@@ -0,0 +1,190 @@
+"""Downscaled copies of pack images for thumbnails and player screens.
+
+Pack authors drop camera JPEGs of several megabytes into a pack, while the
+admin panel shows them as inline thumbnails and players on phones or a
+projector never need more than a display-size picture. At pack load (and with
+`validate_pack --compile`) every image and author photo gets a `thumb` and a
+`display` variant whose longest side is at most `IMAGE_VARIANTS[name]`
+pixels.
+
+Variant files are named after the source's SHA-256 and the variant size, so a
+changed source gets new files and an unchanged one is never decoded again.
+A variant is only used when it is smaller than its source; an image that is
+already small enough, cannot be decoded or is animated is served as it is,
+and later loads only read its header.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import hashlib
+import os
+from pathlib import Path
+import tempfile
+from typing import Optional
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from questions import MediaType, QuestionPack
+
+
+# Variant name -> longest side in pixels.
+IMAGE_VARIANTS = {"thumb": 320, "display": 1600}
+VARIANTS_DIR_NAME = ".chgka-variants"
+JPEG_QUALITY = 82
+
+
+@dataclass
+class VariantReport:
+    """Bytes of the pack's images and of each variant that replaces them."""
+
+    images: int = 0
+    generated: int = 0
+    failed: int = 0
+    source_bytes: int = 0
+    # Variant name -> bytes served for all images with that variant; an image
+    # without a smaller variant counts with its source size.
+    variant_bytes: dict[str, int] = field(default_factory=dict)
+
+    def summary(self) -> str:
+        mib = 1024 * 1024
+        parts = [f"{self.images} images, {self.source_bytes / mib:.1f} MiB originals"]
+        for name in IMAGE_VARIANTS:
+            size = self.variant_bytes.get(name, self.source_bytes)
+            saved = self.source_bytes - size
+            share = saved / self.source_bytes * 100 if self.source_bytes else 0.0
+            parts.append(f"{name} {size / mib:.1f} MiB (saves {saved / mib:.1f} MiB, {share:.0f}%)")
+        if self.generated or self.failed:
+            parts.append(f"{self.generated} files generated, {self.failed} images skipped")
+        return "; ".join(parts)
+
+
+def variants_dir(pack_path: Path, cache_dir: Optional[Path] = None) -> Path:
+    """Where the variants of `pack_path` live, next to its compiled artifact."""
+    pack_path = Path(pack_path).resolve()
+    if cache_dir is None:
+        return pack_path / VARIANTS_DIR_NAME
+    digest = hashlib.sha256(pack_path.as_posix().encode("utf-8")).hexdigest()[:16]
+    return Path(cache_dir) / f"variants-{digest}"
+
+
+def pack_images(pack: QuestionPack) -> list[Path]:
+    """Every image and author photo of the pack, once each."""
+    images: dict[Path, None] = {}
+    for question in pack.questions:
+        for item in [question, *question.parts]:
+            if item.author_photo is not None:
+                images[item.author_photo] = None
+            for media in item.media:
+                if media.type == MediaType.IMAGE:
+                    images[media.path] = None
+    return list(images)
+
+
+def _has_alpha(image: Image.Image) -> bool:
+    return image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+
+
+def _save_atomically(image: Image.Image, destination: Path, image_format: str) -> None:
+    descriptor, temporary = tempfile.mkstemp(dir=destination.parent, prefix=".variant-")
+    try:
+        with os.fdopen(descriptor, "wb") as output:
+            if image_format == "JPEG":
+                image.save(output, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+            else:
+                image.save(output, "PNG", optimize=True)
+        os.replace(temporary, destination)
+    except BaseException:
+        Path(temporary).unlink(missing_ok=True)
+        raise
+
+
+def _render_variants(source: Path, targets: dict[str, Path]) -> None:
+    """Write every missing target of `source`; `targets` maps name -> file."""
+    with Image.open(source) as image:
+        targets = {
+            name: destination
+            for name, destination in targets.items()
+            if IMAGE_VARIANTS[name] < max(image.size)
+        }
+        if not targets or getattr(image, "is_animated", False):
+            return
+        longest = max(IMAGE_VARIANTS[name] for name in targets)
+        # JPEG decodes at a reduced scale directly, which is most of the cost
+        # for camera photos.
+        image.draft("RGB", (longest, longest))
+        image = ImageOps.exif_transpose(image)
+        has_alpha = _has_alpha(image)
+        image = image.convert("RGBA" if has_alpha else "RGB")
+        # Largest first, each smaller variant scaled from the previous one.
+        for name in sorted(targets, key=IMAGE_VARIANTS.get, reverse=True):
+            edge = IMAGE_VARIANTS[name]
+            image = image.copy()
+            image.thumbnail((edge, edge), Image.Resampling.LANCZOS)
+            _save_atomically(image, targets[name], "PNG" if has_alpha else "JPEG")
+
+
+def build_image_variants(
+    pack: QuestionPack,
+    directory: Path,
+) -> tuple[dict[str, dict[str, Path]], VariantReport]:
+    """Create missing variants in `directory` and map the usable ones.
+
+    Returns `relative source path -> variant name -> file` and the report.
+    Hashes come from `pack.content_hashes` and are computed for files the
+    manifest does not cover. An unwritable directory raises `OSError`.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    root = pack.path
+    variants: dict[str, dict[str, Path]] = {}
+    report = VariantReport(variant_bytes={name: 0 for name in IMAGE_VARIANTS})
+
+    for source in pack_images(pack):
+        relative = source.relative_to(root).as_posix()
+        source_size = source.stat().st_size
+        digest = pack.content_hashes.get(relative) or hashlib.sha256(source.read_bytes()).hexdigest()
+        report.images += 1
+        report.source_bytes += source_size
+
+        try:
+            with Image.open(source) as probe:
+                extension = "png" if _has_alpha(probe) else "jpg"
+        except (OSError, UnidentifiedImageError):
+            report.failed += 1
+            for name in report.variant_bytes:
+                report.variant_bytes[name] += source_size
+            continue
+        files = {
+            name: directory / f"{digest[:32]}-{name}{edge}.{extension}"
+            for name, edge in IMAGE_VARIANTS.items()
+        }
+        missing = {name: path for name, path in files.items() if not path.is_file()}
+        if missing:
+            try:
+                _render_variants(source, missing)
+            except (OSError, UnidentifiedImageError, Image.DecompressionBombError, ValueError):
+                report.failed += 1
+            else:
+                report.generated += sum(path.is_file() for path in missing.values())
+
+        usable = {}
+        for name, path in files.items():
+            size = path.stat().st_size if path.is_file() else source_size
+            if size < source_size:
+                usable[name] = path
+            report.variant_bytes[name] += min(size, source_size)
+        if usable:
+            variants[relative] = usable
+    return variants, report
+
+
+def image_variant_path(pack: Optional[QuestionPack], path: str | Path, variant: Optional[str]) -> str | Path:
+    """The file to send for `path` in `variant`, the source when there is none."""
+    if pack is None or variant not in IMAGE_VARIANTS:
+        return path
+    try:
+        relative = Path(path).relative_to(pack.path).as_posix()
+    except ValueError:
+        return path
+    return pack.image_variants.get(relative, {}).get(variant, path)
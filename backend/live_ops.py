@@ -443,6 +443,8 @@ def live_ops_force_phase(
 
 def live_ops_reset_to_intro(
     state: AppState,
+    *,
+    asset_token: Optional[str] = None,
 ) -> TransitionEffects:
     old_phase = state["game"]["phase"]
     old_score = dict(state["game"]["score"])
@@ -451,6 +453,7 @@ def live_ops_reset_to_intro(
         "slide_index": 0,
         "started_at_ms": None,
         "duration_ms": INTRO_DURATION_MS,
+        "asset_token": asset_token,
     }
     return TransitionEffects(
         events=(
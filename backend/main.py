@@ -1,23 +1,47 @@
 import socketio
 import random
 import asyncio
+import functools
 import hmac
 import logging
 import secrets
 import os
 import time
+import weakref
 from pathlib import Path
 from typing import Callable, Mapping, Optional
-from contextlib import asynccontextmanager
+from contextlib import aclosing, asynccontextmanager, contextmanager
+from contextvars import ContextVar
 from datetime import datetime
+from urllib.parse import parse_qs
 from fastapi import FastAPI
 from fastapi import HTTPException
+from fastapi import Request
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
 
 from auth import AdminTokenStore
 from config import load_app_config
+from effect_frames import (
+    AUDIENCE_ADMINS,
+    AUDIENCE_ALL,
+    AUDIENCE_DELTA,
+    AUDIENCE_SNAPSHOT,
+    EFFECTS_EVENT,
+    EffectFrame,
+)
 from game_events import GameEvent
+from roster import EVICTED_OFFLINE, AdminRecord, GroupRecord, Participant, RosterRecord
+from game_room import (
+    ADMINS_AUDIENCE,
+    DEFAULT_ROOM_ID,
+    HISTORY_AUDIENCE,
+    PENDING_AUDIENCE,
+    PLAYERS_AUDIENCE,
+    GameRoom,
+    GameRooms,
+    RoomError,
+)
 from game_journal import (
     MODE_DEBUG,
     MODE_REGULAR,
@@ -35,28 +59,47 @@ from live_ops import (
     live_ops_set_timer,
 )
 from media import (
+    MEDIA_PREFETCH_QUESTION,
+    MEDIA_TOKENS_SIGNED,
+    CurrentMedia,
     MediaPlaybackError,
+    MediaTokenSigner,
+    RoundMedia,
     complete_shared_media,
     create_author_media_token_info,
     create_media_token_info,
     create_shared_media,
-    current_author_media,
-    current_media_catalog as build_current_media_catalog,
+    current_round_key,
     media_token_is_current,
-    next_media_in_section,
     pause_shared_media,
+    prefetch_candidates,
     play_shared_media,
+    signed_media_token_info,
     stop_shared_media,
 )
-from questions import parse_question_pack, QuestionParseError, QuestionPack
+from media_files import MediaFileResponse, MediaFiles
+from outbound import CoalescingServer
+from image_variants import build_image_variants, image_variant_path, variants_dir
+from pack_cache import load_question_pack
+from questions import QuestionParseError, QuestionPack
+from scale_out import create_client_manager, room_worker
 from sound_control import (
     FADE_DURATION_MS,
     begin_fade,
     complete_fade,
-    create_sound_control_state,
     public_sound_control,
     supersede_fade,
 )
+from spectators import (
+    MAX_SPECTATORS,
+    RETRY_FRAME,
+    SPECTATOR_EVENTS,
+    STATE_EVENT,
+    SpectatorSlot,
+    event_frame,
+    parse_last_event_id,
+    sse_frame,
+)
 from state import (
     PHASE_INTRO,
     PHASE_LOGIN,
@@ -64,9 +107,13 @@ from state import (
     PHASE_DISCUSSION,
     PHASE_TEAM_ANSWER,
     PHASE_POST_ROUND,
-    create_initial_app_state,
     public_game_state,
 )
+from state_sync import (
+    STATE_PROTOCOL_DELTA,
+    STATE_PROTOCOLS,
+    PacketJson,
+)
 from transitions import (
     TransitionEffects,
     TransitionError,
@@ -109,6 +156,7 @@ DEBUG = APP_CONFIG.is_development
 game_journal = GameJournal(
     APP_CONFIG.database_path,
     default_mode=MODE_DEBUG if DEBUG else MODE_REGULAR,
+    writes=APP_CONFIG.journal_writes,
 )
 MIN_SPIN_DURATION = 5.0 if DEBUG else 10.0
 MAX_SPIN_DURATION = 10.0 if DEBUG else 20.0
@@ -123,25 +171,56 @@ MAX_PARTICIPANTS_PER_GROUP = 12
 
 # Media access
 MEDIA_TOKEN_TTL_SECONDS = 10 * 60  # 10 minutes
+# Question media offered to players for prefetch while the question is read.
+MEDIA_PREFETCH_MAX_ITEMS = 4
+MEDIA_PREFETCH_MAX_BYTES = 64 * 1024 * 1024
+# Parallel prefetch downloads per player socket; more get 429.
+MEDIA_PREFETCH_CONCURRENCY = 1
+# Browsers keep author photos fetched with the intro asset token this long,
+# so a preloaded photo is shown from cache when its slide comes up.
+INTRO_ASSET_MAX_AGE_SECONDS = 30 * 60
+# Slack after a known duration before the server ends playback, so clients
+# that stalled briefly still play the last moments.
+MEDIA_END_GRACE_MS = 1_000
+# Signed media tokens carry their own round context; `None` keeps opaque ones.
+media_token_signer: Optional[MediaTokenSigner] = (
+    MediaTokenSigner(APP_CONFIG.media_token_secret)
+    if APP_CONFIG.media_tokens == MEDIA_TOKENS_SIGNED
+    else None
+)
 
-sio = socketio.AsyncServer(
+# With several workers every emit also goes through the shared pub/sub, so it
+# reaches the socket whichever worker holds it. Each socket's packets then pass
+# its outbound queue, which coalesces state for clients that fall behind.
+sio = CoalescingServer(
     async_mode="asgi",
+    json=PacketJson,
+    client_manager=create_client_manager(APP_CONFIG.pubsub_url),
     cors_allowed_origins=list(APP_CONFIG.allowed_origins),
+    slow_client_timeout=APP_CONFIG.slow_client_timeout_seconds,
 )
 
 
 @asynccontextmanager
 async def lifespan(_app: FastAPI):
     game_journal.initialize()
-    recovered = game_journal.recover_interrupted_sessions()
-    if recovered:
-        logger.info("Marked %s unfinished game session(s) as interrupted", recovered)
+    # `run_workers` recovers once before starting several workers; a worker
+    # must not interrupt the live sessions of its siblings.
+    if APP_CONFIG.workers == 1:
+        recovered = game_journal.recover_interrupted_sessions()
+        if recovered:
+            logger.info("Marked %s unfinished game session(s) as interrupted", recovered)
     # Load question pack once when the app starts.
     _load_question_pack_on_startup()
     try:
         yield
     finally:
-        game_journal.close()
+        try:
+            game_journal.flush()
+        except JournalError:
+            logger.exception("Could not write the queued journal events on shutdown")
+        finally:
+            game_journal.close()
 
 
 fastapi_app = FastAPI(lifespan=lifespan)
@@ -156,23 +235,95 @@ fastapi_app.add_middleware(
 
 app = socketio.ASGIApp(sio, other_asgi_app=fastapi_app)
 
+# Loaded question pack (kept on server; admin UI may request more details later)
+loaded_pack: Optional[QuestionPack] = None
+
+# Admin-only pack info (safe subset to send over socket)
+pack_admin_info: dict = {}
+
+# Stat results and ETags of the loaded pack's files for /media and /intro.
+media_files = MediaFiles()
+
+# --- ИГРОВЫЕ КОМНАТЫ ---
+# Every game lives in its own GameRoom; the pack and the database are shared.
+# Socket.IO handlers run with the sender's room active, everything else
+# (startup, tests, HTTP routes without `room`) uses the default room.
+_active_room: ContextVar[Optional[GameRoom]] = ContextVar("active_room", default=None)
+# Set while `_apply_transition_effects` collects the emits of one transition.
+_active_effect_frame: ContextVar[Optional[EffectFrame]] = ContextVar(
+    "active_effect_frame",
+    default=None,
+)
+
+
+def _create_room(room_id: str) -> GameRoom:
+    room = GameRoom(
+        room_id,
+        journal=(
+            game_journal
+            if room_id == DEFAULT_ROOM_ID
+            else game_journal.open_room()
+        ),
+        admin_tokens=AdminTokenStore(APP_CONFIG.admin_token_ttl_seconds),
+    )
+    if loaded_pack is not None:
+        _apply_pack_to_state(room.state, loaded_pack)
+    return room
+
+
+def _room_is_local(room_id: str) -> bool:
+    return room_worker(room_id, APP_CONFIG.workers) == APP_CONFIG.worker_index
+
+
+rooms = GameRooms(
+    _create_room,
+    max_rooms=APP_CONFIG.max_rooms,
+    is_local=_room_is_local,
+)
+
+
+def current_room() -> GameRoom:
+    room = _active_room.get()
+    return room if room is not None else rooms.default
+
+
+@contextmanager
+def _entered_room(room: GameRoom):
+    token = _active_room.set(room)
+    try:
+        yield room
+    finally:
+        _active_room.reset(token)
+
+
+def room_event(handler):
+    """Register a Socket.IO handler that runs in the sender's game room."""
+
+    @functools.wraps(handler)
+    async def handle_in_room(sid, *args):
+        with _entered_room(rooms.for_socket(sid)):
+            return await handler(sid, *args)
+
+    return sio.on(handler.__name__)(handle_in_room)
+
+
 # --- СИСТЕМА АВТОРИЗАЦИИ ---
-# Хранилище единственного активного admin token (в памяти).
-admin_tokens = AdminTokenStore(APP_CONFIG.admin_token_ttl_seconds)
+# Единственный активный admin token каждой комнаты хранится в памяти.
 
 def generate_admin_token():
     """Генерирует безопасный токен для админа"""
-    token = admin_tokens.issue()
-    logger.info(f"Generated admin token (total active: {len(admin_tokens)})")
+    room = current_room()
+    token = room.admin_tokens.issue()
+    logger.info(f"Generated admin token for room {room.id} (total active: {len(room.admin_tokens)})")
     return token
 
 def validate_admin_token(token):
     """Проверяет, валиден ли токен"""
-    return admin_tokens.validate(token)
+    return current_room().admin_tokens.validate(token)
 
 
 def revoke_admin_token(token) -> None:
-    admin_tokens.revoke(token)
+    current_room().admin_tokens.revoke(token)
 
 
 def _admin_password_matches(password: object) -> bool:
@@ -184,12 +335,49 @@ def _admin_password_matches(password: object) -> bool:
     )
 
 
-def _admin_record_is_authorized(player: dict) -> bool:
-    return (
-        player.get("role") == "admin"
-        and player.get("online", False)
-        and validate_admin_token(player.get("token"))
-    )
+async def _set_audience(sid: str, audience: Optional[str]) -> None:
+    """Move `sid` into one audience room of its game, or out of all of them."""
+    room = current_room()
+    previous = room.audiences.get(sid)
+    if previous == audience:
+        return
+    if previous is not None:
+        del room.audiences[sid]
+        await sio.leave_room(sid, room.audience_channel(previous))
+    if audience is not None:
+        room.audiences[sid] = audience
+        await sio.enter_room(sid, room.audience_channel(audience))
+
+
+async def _join_admin_audience(sid: str, token: str) -> None:
+    """Admit an authorized host socket; members of an older token leave."""
+    room = current_room()
+    if room.admin_audience_token != token:
+        for member in room.audience_sids(ADMINS_AUDIENCE):
+            await _set_audience(member, None)
+        room.admin_audience_token = token
+    await _set_audience(sid, ADMINS_AUDIENCE)
+
+
+async def _admin_audience_sids() -> set[str]:
+    """Members of the admins room, emptied once their token has expired.
+
+    Authorization is checked when a socket joins; per emit only the one
+    shared token is validated.
+    """
+    room = current_room()
+    members = room.audience_sids(ADMINS_AUDIENCE)
+    if members and not validate_admin_token(room.admin_audience_token):
+        for member in members:
+            await _set_audience(member, None)
+        room.admin_audience_token = None
+        return set()
+    return members
+
+
+async def _emit_to_admin_room(event: str, data: object) -> None:
+    if await _admin_audience_sids():
+        await sio.emit(event, data, room=current_room().audience_channel(ADMINS_AUDIENCE))
 
 async def get_client_role(sid):
     """Получает роль клиента из сессии Socket.IO"""
@@ -205,14 +393,13 @@ async def get_client_role(sid):
 
 async def _expire_admin_session(sid: str, token: object) -> None:
     """Downgrade an expired/revoked admin socket and clear its public record."""
-    global players_list
+    room = current_room()
 
     revoke_admin_token(token)
-    players_list = [
-        player
-        for player in players_list
-        if not (player.get("role") == "admin" and player.get("sid") == sid)
-    ]
+    for record in room.players.with_sid(sid):
+        if isinstance(record, AdminRecord):
+            room.players.remove(record)
+    await _set_audience(sid, None)
     try:
         await sio.save_session(sid, {"role": "player"})
     except Exception:
@@ -243,28 +430,18 @@ async def require_admin(sid):
 
 async def _captain_actor_for_sid(sid: str) -> Optional[dict[str, str]]:
     """Return the current captain actor only for their active admitted group socket."""
+    room = current_room()
 
     try:
         session = await sio.get_session(sid)
     except Exception:
         return None
     group_id = session.get("player_group_id")
-    captain = app_state["game"]["team"].get("captain")
+    captain = room.state["game"]["team"].get("captain")
     if not captain or captain.get("group_id") != group_id:
         return None
-    group = next(
-        (
-            record
-            for record in players_list
-            if record.get("role") == "player"
-            and record.get("group_id") == group_id
-            and not record.get("pending", False)
-            and record.get("online", False)
-            and record.get("sid") == sid
-        ),
-        None,
-    )
-    if group is None:
+    group = room.players.by_group(group_id)
+    if group is None or group.pending or not group.online or group.sid != sid:
         return None
     return {
         "role": "captain",
@@ -273,46 +450,60 @@ async def _captain_actor_for_sid(sid: str) -> Optional[dict[str, str]]:
         "name": captain["name"],
     }
 
-global_settings = {
-    "volume": 1.0,
-    "sound_control": create_sound_control_state(),
-}
-
 
 def _now_ms() -> int:
     return int(time.time() * 1000)
 
 
 def _public_settings(*, now_ms: Optional[int] = None) -> dict:
+    room = current_room()
     timestamp_ms = _now_ms() if now_ms is None else now_ms
     return {
-        "volume": global_settings["volume"],
+        "volume": room.settings["volume"],
         "sound_control": public_sound_control(
-            global_settings["sound_control"],
+            room.settings["sound_control"],
             now_ms=timestamp_ms,
         ),
     }
 
 
+async def _emit_to_room(event: str, data: object = None) -> None:
+    """Emit to every socket of the room, or record it in the active frame."""
+    if event in SPECTATOR_EVENTS:
+        current_room().spectators.publish(event, data)
+    frame = _active_effect_frame.get()
+    if frame is not None:
+        frame.add(AUDIENCE_ALL, event, data)
+    elif data is None:
+        await sio.emit(event, room=current_room().channel)
+    else:
+        await sio.emit(event, data, room=current_room().channel)
+
+
+async def _emit_to_admins(event: str, data: object) -> None:
+    """Emit to every authorized admin, or record it in the active frame."""
+    frame = _active_effect_frame.get()
+    if frame is not None:
+        frame.add(AUDIENCE_ADMINS, event, data)
+        return
+    await _emit_to_admin_room(event, data)
+
+
 async def emit_settings_update(to: Optional[str] = None) -> None:
     payload = _public_settings()
     if to is None:
-        await sio.emit("settings_update", payload)
+        await _emit_to_room("settings_update", payload)
     else:
         await sio.emit("settings_update", payload, to=to)
 
 
 def _supersede_sound_fade(*, mode: str) -> int:
     """Synchronously invalidate pending fade completion before network awaits."""
-    return supersede_fade(global_settings["sound_control"], mode=mode)
-
-# In-memory connection roster. Player records own a stable participant group;
-# admin records intentionally keep their smaller role/token shape.
-players_list = []
+    return supersede_fade(current_room().settings["sound_control"], mode=mode)
 
 
-def _participant_group_name(participants: list[dict]) -> str:
-    return ", ".join(participant["name"] for participant in participants)
+def _participant_group_name(participants: list[Participant]) -> str:
+    return ", ".join(participant.name for participant in participants)
 
 
 def _normalize_participant_names(data: object) -> list[str]:
@@ -334,66 +525,80 @@ def _normalize_participant_names(data: object) -> list[str]:
     return names
 
 
-def _public_roster_record(record: dict) -> dict:
+def _public_roster_record(record: RosterRecord) -> dict:
     public = {
-        "name": record["name"],
-        "role": record["role"],
-        "online": record.get("online", False),
-        "pending": record.get("pending", False),
+        "name": record.name,
+        "role": record.role,
+        "online": record.online,
+        "pending": isinstance(record, GroupRecord) and record.pending,
     }
-    if record.get("role") == "player":
+    if isinstance(record, GroupRecord):
         public.update(
             {
-                "group_id": record["group_id"],
-                "participants": [dict(item) for item in record["participants"]],
+                "group_id": record.group_id,
+                "participants": [item.as_dict() for item in record.participants],
             }
         )
     return public
 
 
-def _player_join_payload(record: dict, *, include_token: bool = False) -> dict:
+def _player_join_payload(record: GroupRecord, *, include_token: bool = False) -> dict:
     payload = {
-        "name": record["name"],
-        "group_id": record["group_id"],
-        "participants": [dict(item) for item in record["participants"]],
+        "name": record.name,
+        "group_id": record.group_id,
+        "participants": [item.as_dict() for item in record.participants],
     }
     if include_token:
-        payload["token"] = record["token"]
+        payload["token"] = record.token
     return payload
 
 
-def _find_approved_participant(participant_id: object) -> Optional[tuple[dict, dict]]:
-    if not isinstance(participant_id, str) or not participant_id:
-        return None
-    for group in players_list:
-        if group.get("role") != "player" or group.get("pending", False):
-            continue
-        for participant in group.get("participants", []):
-            if participant.get("id") == participant_id:
-                return group, participant
-    return None
-
-# Хранилище состояния игры
-app_state = create_initial_app_state()
+def _evict_groups(*, reserve: int = 0) -> list[GroupRecord]:
+    """Apply the roster eviction policy and journal every evicted group.
 
-# Loaded question pack (kept on server; admin UI may request more details later)
-loaded_pack: Optional[QuestionPack] = None
+    The captain's and the current respondent's groups are never evicted.
+    """
+    room = current_room()
+    game = room.state["game"]
+    captain = game["team"].get("captain") or {}
+    respondent = (game.get("round") or {}).get("respondent") or {}
+    evicted = room.players.evict(
+        offline_ttl=APP_CONFIG.group_offline_ttl_seconds,
+        max_groups=APP_CONFIG.max_groups,
+        reserve=reserve,
+        protected=(captain.get("group_id"), respondent.get("group_id")),
+    )
+    for group, reason in evicted:
+        why = "долго не в сети" if reason == EVICTED_OFFLINE else "слишком много подключений"
+        add_log(
+            f"{group.name} удалены из списка участников: {why}",
+            event_type="group_evicted",
+            payload={
+                "group_id": group.group_id,
+                "participants": [item.as_dict() for item in group.participants],
+                "reason": reason,
+            },
+        )
+    return [group for group, _reason in evicted]
 
-# Admin-only pack info (safe subset to send over socket)
-pack_admin_info: dict = {}
 
-# Temporary media tokens (media_id -> info)
-# Stored only in-memory; safe enough for development.
-media_tokens: dict = {}
+def _find_approved_participant(
+    participant_id: object,
+) -> Optional[tuple[GroupRecord, Participant]]:
+    found = current_room().players.by_participant(participant_id)
+    if found is None or found[0].pending:
+        return None
+    return found
 
 def _get_round_ctx_and_sector() -> Optional[tuple[dict, int]]:
     """
     Common validation helper: ensure we have a loaded pack, an active round context,
     and a valid sector (1..SECTORS_COUNT). Returns (round_ctx, sector) or None.
     """
+    room = current_room()
     if loaded_pack is None:
         return None
-    round_ctx = app_state["game"]["round"]
+    round_ctx = room.state["game"]["round"]
     if not round_ctx:
         return None
     sector = round_ctx.get("sector")
@@ -421,24 +626,54 @@ def _effective_blackbox(question, round_ctx: dict) -> bool:
 
 
 def _cleanup_expired_media_tokens(now_ts: Optional[float] = None) -> None:
+    room = current_room()
     now = now_ts if now_ts is not None else time.time()
-    shared_media = app_state["presentation"].get("shared_media")
-    active_shared_id = shared_media.get("media_id") if shared_media else None
-    expired = [
-        mid
-        for mid, info in media_tokens.items()
-        if mid != active_shared_id and info.get("expires_at", 0) <= now
-    ]
-    for mid in expired:
-        media_tokens.pop(mid, None)
+    shared_media = room.state["presentation"].get("shared_media")
+    room.media_tokens.expire(
+        now,
+        keep=shared_media.get("media_id") if shared_media else None,
+    )
 
 
 def _clear_all_media_tokens() -> None:
-    media_tokens.clear()
+    room = current_room()
+    room.media_tokens.clear()
+    room.round_media.invalidate()
+    room.prefetch_keys.clear()
+    room.media_epoch += 1
+
+
+def _mint_media_token(info: dict) -> str:
+    room = current_room()
+    if media_token_signer is not None:
+        return media_token_signer.sign(info, room_id=room.id, epoch=room.media_epoch)
+    media_id = secrets.token_urlsafe(16)
+    room.media_tokens[media_id] = info
+    return media_id
+
+
+def _media_token_info(media_id: str) -> Optional[dict]:
+    """Token info of `media_id` in the current room, not yet validated."""
+    room = current_room()
+    if media_token_signer is None:
+        return room.media_tokens.get(media_id)
+    claims = media_token_signer.verify(media_id)
+    if (
+        claims is None
+        or claims.get("room") != room.id
+        or claims.get("epoch") != room.media_epoch
+    ):
+        return None
+    return signed_media_token_info(claims, loaded_pack, media=_get_round_media())
+
+
+def _get_round_media() -> RoundMedia:
+    room = current_room()
+    return room.round_media.get(loaded_pack, room.state)
 
 
 def _get_current_media_catalog() -> dict:
-    return build_current_media_catalog(loaded_pack, app_state)
+    return _get_round_media().catalog
 
 
 def _media_token_is_current(
@@ -450,14 +685,36 @@ def _media_token_is_current(
     return media_token_is_current(
         info,
         loaded_pack,
-        app_state,
+        current_room().state,
         now_ts=now_ts if now_ts is not None else time.time(),
         allow_expired=allow_expired,
+        media=_get_round_media(),
     )
 
+def _apply_pack_to_state(state: dict, pack: QuestionPack) -> None:
+    """Expose per-sector question types and intro author cards via app state."""
+    state["pack"]["question_types"] = [q.type.value for q in pack.questions]
+    state["pack"]["intro_authors"] = [
+        [
+            {
+                "sector": sector,
+                "slot": slot,
+                "name": author_question.author,
+                "city": author_question.city,
+                "has_photo": author_question.author_photo is not None,
+            }
+            for slot, author_question in enumerate(
+                question.parts or [question],
+                start=1,
+            )
+        ]
+        for sector, question in enumerate(pack.questions[:12], start=1)
+    ]
+
+
 def _load_question_pack_on_startup() -> None:
     """
-    Load questions pack once at startup and expose per-sector question types via app_state.
+    Load questions pack once at startup and expose it to every game room.
     """
     env_path = os.getenv("QUESTIONS_PACK_PATH")
     if not env_path:
@@ -466,36 +723,46 @@ def _load_question_pack_on_startup() -> None:
     pack_path = Path(env_path).resolve()
     if not pack_path.exists():
         raise RuntimeError(f"QUESTIONS_PACK_PATH does not exist: {pack_path}")
+    cache_dir = os.getenv("CHGKA_PACK_CACHE_DIR") or None
     global loaded_pack
     global pack_admin_info
+    started = time.perf_counter()
     try:
-        pack = parse_question_pack(pack_path)
+        pack, from_cache, cache_error = load_question_pack(
+            pack_path,
+            cache_dir=Path(cache_dir) if cache_dir else None,
+        )
     except QuestionParseError as e:
         logger.error(f"Failed to load question pack from {pack_path}: {e}")
         raise
+    if cache_error is not None:
+        logger.warning(f"Compiled question pack was not saved: {cache_error}")
+    logger.info(
+        "Question pack %s in %.1f ms",
+        "loaded from compiled cache" if from_cache else "parsed",
+        (time.perf_counter() - started) * 1000,
+    )
+    try:
+        pack.image_variants, variant_report = build_image_variants(
+            pack,
+            variants_dir(pack_path, Path(cache_dir) if cache_dir else None),
+        )
+    except OSError as error:
+        logger.warning(f"Image variants were not created, originals are served: {error}")
+    else:
+        logger.info("Image variants: %s", variant_report.summary())
 
     types = [q.type.value for q in pack.questions]
     if len(types) != SECTORS_COUNT:
         raise RuntimeError(f"Question pack must contain {SECTORS_COUNT} questions, got {len(types)}")
 
-    app_state["pack"]["question_types"] = types
-    app_state["pack"]["intro_authors"] = [
-        [
-            {
-                "sector": sector,
-                "slot": slot,
-                "name": author_question.author,
-                "city": author_question.city,
-                "has_photo": author_question.author_photo is not None,
-            }
-            for slot, author_question in enumerate(
-                question.parts or [question],
-                start=1,
-            )
-        ]
-        for sector, question in enumerate(pack.questions[:12], start=1)
-    ]
+    for room in rooms:
+        _apply_pack_to_state(room.state, pack)
+        room.state_snapshots.invalidate()
+        room.round_media.invalidate()
+        room.media_epoch += 1
     loaded_pack = pack
+    media_files.configure(pack.path, pack.content_hashes)
     game_journal.configure_pack(
         fingerprint=pack.fingerprint,
         name=pack.path.name,
@@ -530,6 +797,7 @@ async def _emit_pack_info_to_admin(sid: str) -> None:
 
 async def _emit_current_question_to_admins() -> None:
     """Send current question content to all online admins (admin-only)."""
+    room = current_room()
     res = _get_round_ctx_and_sector()
     if not res:
         return
@@ -544,7 +812,7 @@ async def _emit_current_question_to_admins() -> None:
     payload = {
         "sector": sector,
         "kind": kind,
-        "phase": app_state["game"]["phase"],
+        "phase": room.state["game"]["phase"],
         "blackbox": _effective_blackbox(q, round_ctx),
     }
 
@@ -585,27 +853,21 @@ async def _emit_current_question_to_admins() -> None:
         media.public_descriptor()
         for media in _get_current_media_catalog().values()
     ]
-    if app_state["game"]["phase"] == PHASE_QUESTION_READING:
+    if room.state["game"]["phase"] == PHASE_QUESTION_READING:
         payload["author_media"] = _store_current_author_media_token()
 
-    for p in players_list:
-        if _admin_record_is_authorized(p):
-            await sio.emit("admin_question", payload, to=p["sid"])
+    await _emit_to_admins("admin_question", payload)
 
 
 async def _clear_admin_question_for_admins() -> None:
     """Remove stale admin-only question content after recovery clears a round."""
-    for player in players_list:
-        if _admin_record_is_authorized(player):
-            await sio.emit("admin_question", None, to=player["sid"])
+    await _emit_to_admins("admin_question", None)
 
 
 async def _emit_current_game_mode_to_admins() -> None:
     """Keep the live host UI synchronized with journal mode changes."""
-    payload = {"mode": game_journal.current_mode()}
-    for player in players_list:
-        if _admin_record_is_authorized(player):
-            await sio.emit("admin_game_mode_update", payload, to=player["sid"])
+    room = current_room()
+    await _emit_to_admins("admin_game_mode_update", {"mode": room.journal.current_mode()})
 
 
 def _journal_payload(event: GameEvent) -> dict[str, object]:
@@ -680,22 +942,61 @@ def add_log(
     event_type: str = "admin_note",
     payload: Optional[Mapping[str, object]] = None,
 ):
-    game_journal.record_event(event_type, message, payload)
+    room = current_room()
+    room.journal.record_event(event_type, message, payload)
     time_str = datetime.now().strftime("%H:%M:%S")
     log_entry = f"[{time_str}] {message}"
-    app_state["logs"].insert(0, log_entry) # Новые сверху
+    room.state["logs"].insert(0, log_entry) # Новые сверху
+    room.state_snapshots.invalidate()
     # Ограничим размер лога
-    if len(app_state["logs"]) > 50:
-        app_state["logs"] = app_state["logs"][:50]
+    if len(room.state["logs"]) > 50:
+        room.state["logs"] = room.state["logs"][:50]
     return log_entry
 
 
+async def _publish_state() -> dict:
+    """Serialize state once per generation and fan out the delta."""
+    room = current_room()
+    now_ms = _now_ms()
+    cached = room.state_snapshots.lookup(room.state, now_ms)
+    if cached is not None:
+        return cached
+    payload = public_game_state(room.state, now_ms=now_ms)
+    patch = room.state_stream.publish(payload)
+    frame = _active_effect_frame.get()
+    if patch is not None and frame is not None:
+        frame.add(AUDIENCE_DELTA, "state_patch", patch)
+    elif patch is not None and room.state_delta_sids:
+        await sio.emit("state_patch", patch, room=room.delta_channel)
+    return room.state_snapshots.store(
+        room.state,
+        {**payload, "revision": room.state_stream.revision},
+        now_ms,
+    )
+
+
 async def emit_state_update(to: Optional[str] = None) -> None:
-    payload = public_game_state(app_state)
+    room = current_room()
     if to is None:
-        await sio.emit("state_update", payload)
-    else:
+        # A broadcast always follows a change, so never trust the cache here.
+        room.state_snapshots.invalidate()
+    payload = await _publish_state()
+    if to is None:
+        room.spectators.publish_state(payload.encoded, payload["revision"])
+    frame = _active_effect_frame.get()
+    if to is not None:
         await sio.emit("state_update", payload, to=to)
+    elif frame is not None:
+        frame.add(AUDIENCE_SNAPSHOT, "state_update", payload)
+    elif room.state_delta_sids:
+        await sio.emit(
+            "state_update",
+            payload,
+            room=room.channel,
+            skip_sid=sorted(room.state_delta_sids),
+        )
+    else:
+        await sio.emit("state_update", payload, room=room.channel)
 
 
 async def _emit_transition_error(sid: str, error: TransitionError) -> None:
@@ -708,7 +1009,81 @@ async def _emit_transition_error(sid: str, error: TransitionError) -> None:
 
 
 async def _apply_transition_effects(effects: TransitionEffects) -> None:
-    """Deliver side effects after a transition has atomically mutated state."""
+    """Deliver side effects after a transition has atomically mutated state.
+
+    The room-wide and admin emits are collected in one `EffectFrame` and sent
+    together by `_send_effect_frame`; private per-player emits follow it.
+    """
+    frame = EffectFrame()
+    frame_token = _active_effect_frame.set(frame)
+    try:
+        await _record_transition_effects(effects)
+    finally:
+        _active_effect_frame.reset(frame_token)
+    await _send_effect_frame(frame)
+    if effects.clear_media_tokens or any(
+        event.event_type == "question_opened" for event in effects.events
+    ):
+        await _emit_media_prefetch()
+
+
+async def _send_effect_frame(frame: EffectFrame) -> None:
+    """Send a frame: event by event to legacy sockets, one packet to batched ones."""
+    room = current_room()
+    batched = room.effect_batch_sids
+    admin_sids = await _admin_audience_sids()
+    admins_channel = room.audience_channel(ADMINS_AUDIENCE)
+
+    def skipping(sids: set[str]) -> dict:
+        return {"skip_sid": sorted(sids)} if sids else {}
+
+    for audience, event, data in frame.entries:
+        args = () if data is None and audience == AUDIENCE_ALL else (data,)
+        if audience == AUDIENCE_ALL:
+            await sio.emit(event, *args, room=room.channel, **skipping(batched))
+        elif audience == AUDIENCE_DELTA:
+            if room.state_delta_sids - batched:
+                await sio.emit(event, *args, room=room.delta_channel, **skipping(batched))
+        elif audience == AUDIENCE_SNAPSHOT:
+            await sio.emit(
+                event,
+                *args,
+                room=room.channel,
+                **skipping(room.state_delta_sids | batched),
+            )
+        elif admin_sids - batched:
+            await sio.emit(event, *args, room=admins_channel, **skipping(batched))
+
+    if not batched:
+        return
+    for delta in (False, True):
+        receivers = {
+            sid for sid in admin_sids & batched if (sid in room.state_delta_sids) == delta
+        }
+        envelope = frame.envelope(delta=delta, admin=True)
+        if receivers and envelope["events"]:
+            await sio.emit(
+                EFFECTS_EVENT,
+                envelope,
+                room=admins_channel,
+                **skipping(admin_sids - receivers),
+            )
+    players = batched.difference(admin_sids)
+    for delta in (False, True):
+        receivers = {sid for sid in players if (sid in room.state_delta_sids) == delta}
+        envelope = frame.envelope(delta=delta, admin=False)
+        if receivers and envelope["events"]:
+            await sio.emit(
+                EFFECTS_EVENT,
+                envelope,
+                room=room.batch_channel,
+                **skipping(batched - receivers),
+            )
+
+
+async def _record_transition_effects(effects: TransitionEffects) -> None:
+    room = current_room()
+    room.state_snapshots.invalidate()
     game_mode_changed = False
     if effects.clear_media_tokens:
         _clear_all_media_tokens()
@@ -716,24 +1091,26 @@ async def _apply_transition_effects(effects: TransitionEffects) -> None:
         event.event_type in ("game_started", "spin_started", "question_opened")
         for event in effects.events
     ):
-        game_journal.mark_started()
+        room.journal.mark_started()
     for event in effects.events:
         payload = _journal_payload(event)
         add_log(event.message, event_type=event.event_type, payload=payload)
         if event.event_type == "game_completed":
-            game_journal.complete_current(payload.get("score", {}))
+            await _flush_journal(room.journal)
+            room.journal.complete_current(payload.get("score", {}))
         elif event.event_type == "game_reset":
-            game_journal.rotate_after_reset(payload.get("score", {}))
+            await _flush_journal(room.journal)
+            room.journal.rotate_after_reset(payload.get("score", {}))
             game_mode_changed = True
     if effects.stop_sounds:
         _supersede_sound_fade(mode="stopped")
         await emit_settings_update()
-        await sio.emit("stop_sound")
+        await _emit_to_room("stop_sound")
     if effects.start_sound_output or effects.sounds:
         _supersede_sound_fade(mode="normal")
         await emit_settings_update()
     for sound in effects.sounds:
-        await sio.emit("play_sound", {"sound": sound})
+        await _emit_to_room("play_sound", {"sound": sound})
     await emit_state_update()
     if game_mode_changed:
         await _emit_current_game_mode_to_admins()
@@ -809,57 +1186,186 @@ def calculate_spin_result(force_sector=None, used_questions=None):
 
 async def broadcast_players(target_sid=None):
     """Рассылает список игроков. Админам полный, остальным - ничего (или кол-во)"""
+    room = current_room()
     
-    public_list = [_public_roster_record(record) for record in players_list]
+    payload = {
+        'players': [_public_roster_record(record) for record in room.players],
+        'evicted': room.players.eviction_summary(),
+    }
     
     # Если нужно послать конкретному клиенту
     if target_sid:
         role = await get_client_role(target_sid)
         if role == 'admin':
-            await sio.emit('players_update', {'players': public_list}, to=target_sid)
+            await sio.emit('players_update', payload, to=target_sid)
     else:
         # Рассылаем всем админам
-        for p in players_list:
-            if _admin_record_is_authorized(p):
-                await sio.emit('players_update', {'players': public_list}, to=p['sid'])
+        await _emit_to_admin_room('players_update', payload)
 
 @fastapi_app.get("/")
 async def root():
     return {"message": "Сервер игры «Что? Где? Когда?» работает"}
 
 
-@fastapi_app.get("/media/{media_id}")
-async def get_media(media_id: str):
-    _cleanup_expired_media_tokens()
-    info = media_tokens.get(media_id)
-    shared_media = app_state["presentation"].get("shared_media")
-    is_active_shared = bool(
-        shared_media and shared_media.get("media_id") == media_id
+@fastapi_app.get("/metrics")
+async def metrics():
+    """Internal counters; production proxies do not forward this route."""
+    snapshot_stats = [room.state_snapshots.stats() for room in rooms]
+    return {
+        "rooms": len(rooms),
+        "rooms_closed": rooms.closed,
+        "state_snapshots": {
+            "hits": sum(stats["hits"] for stats in snapshot_stats),
+            "misses": sum(stats["misses"] for stats in snapshot_stats),
+        },
+        "outbound": sio.outbound_stats(),
+        "spectators": sum(room.spectators.subscribers for room in rooms),
+    }
+
+
+@fastapi_app.get("/spectate")
+async def spectate(request: Request, room: str = DEFAULT_ROOM_ID):
+    """Read-only Server-Sent Events feed of the state and sounds of a game.
+
+    A reconnect whose `Last-Event-ID` is the current state revision does not
+    receive the snapshot again.
+    """
+    # Watching never opens a room; only the host does (see `connect`).
+    game_room = _http_room(room, "Игра не найдена")
+    if sum(open_room.spectators.subscribers for open_room in rooms) >= MAX_SPECTATORS:
+        raise HTTPException(status_code=503, detail="Слишком много зрителей")
+    feed = game_room.spectators
+    # Counted before the first await, so concurrent requests see each other.
+    slot = feed.reserve()
+    try:
+        # Taken first: anything published while the snapshot is built follows it.
+        cursor = feed.cursor
+        with _entered_room(game_room):
+            frames = [RETRY_FRAME, event_frame("settings_update", _public_settings())]
+            payload = await _publish_state()
+        revision = payload["revision"]
+        if parse_last_event_id(request.headers.get("last-event-id")) != revision:
+            frames.append(sse_frame(STATE_EVENT, payload.encoded, revision))
+    except BaseException:
+        slot.release()
+        raise
+    stream = _spectator_stream(game_room, slot, cursor, b"".join(frames))
+    # A response that never starts never runs the stream's `finally`.
+    weakref.finalize(stream, slot.release)
+    return StreamingResponse(
+        stream,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-store", "X-Accel-Buffering": "no"},
     )
-    if not info or not _media_token_is_current(
-        info,
-        allow_expired=is_active_shared,
-    ):
-        media_tokens.pop(media_id, None)
+
+
+async def _spectator_stream(game_room: GameRoom, slot: SpectatorSlot, cursor: int, first: bytes):
+    try:
+        async with aclosing(game_room.spectators.stream(cursor, first, slot)) as stream:
+            async for chunk in stream:
+                yield chunk
+    finally:
+        slot.release()
+        if rooms.close_if_idle(game_room):
+            logger.info("Closed idle game room %s", game_room.id)
+
+
+def _http_room(room_id: str, detail: str) -> GameRoom:
+    """The room of an HTTP request, or 404.
+
+    Nginx routes HTTP requests by room like the socket, so a room of another
+    worker is a routing error. Every worker has a `main` room of its own, and
+    only the hosting one holds its real state.
+    """
+    room = rooms.get(room_id) if _room_is_local(room_id) else None
+    if room is None:
+        raise HTTPException(status_code=404, detail=detail)
+    return room
+
+
+def _prefetch_download_done(room: GameRoom, client_sid: str) -> None:
+    remaining = room.prefetch_downloads.get(client_sid, 0) - 1
+    if remaining > 0:
+        room.prefetch_downloads[client_sid] = remaining
+    else:
+        room.prefetch_downloads.pop(client_sid, None)
+
+
+@fastapi_app.get("/media/{media_id}")
+async def get_media(
+    media_id: str,
+    room: str = DEFAULT_ROOM_ID,
+    variant: Optional[str] = None,
+):
+    on_complete = None
+    # Only the hosting worker can check a token's epoch, round and spin.
+    game_room = _http_room(room, "Медиа не найдено")
+    with _entered_room(game_room):
+        _cleanup_expired_media_tokens()
+        info = _media_token_info(media_id)
+        shared_media = game_room.state["presentation"].get("shared_media")
+        is_active_shared = bool(
+            shared_media and shared_media.get("media_id") == media_id
+        )
+        is_current = bool(info) and _media_token_is_current(
+            info,
+            allow_expired=is_active_shared,
+        )
+    if not is_current:
+        game_room.media_tokens.pop(media_id, None)
         raise HTTPException(status_code=404, detail="Медиа не найдено")
     path = info.get("path")
-    if not path:
-        raise HTTPException(status_code=404, detail="Медиа не найдено")
-    p = Path(path)
-    if not p.exists() or not p.is_file():
+    client_sid = info.get("prefetch_sid")
+    # Behind X-Accel-Redirect the response ends before Nginx sends the
+    # bytes, so there Nginx has to limit the downloads itself.
+    if client_sid is not None and APP_CONFIG.media_accel_prefix is None:
+        downloads = game_room.prefetch_downloads.get(client_sid, 0)
+        if downloads >= MEDIA_PREFETCH_CONCURRENCY:
+            raise HTTPException(status_code=429, detail="Слишком много загрузок")
+        game_room.prefetch_downloads[client_sid] = downloads + 1
+        on_complete = functools.partial(_prefetch_download_done, game_room, client_sid)
+    # Images may be sent as a downscaled `thumb` or `display` variant.
+    media_file = media_files.get(image_variant_path(loaded_pack, path, variant)) if path else None
+    if media_file is None:
+        if on_complete is not None:
+            on_complete()
         raise HTTPException(status_code=404, detail="Медиа не найдено")
-    # Inline display
-    return FileResponse(str(p))
+    # Inline display; browsers revalidate with If-None-Match on every reuse,
+    # so the token is checked again before a 304.
+    return MediaFileResponse(
+        media_file,
+        accel_prefix=APP_CONFIG.media_accel_prefix,
+        headers={"Cache-Control": "private, no-cache"},
+        on_complete=on_complete,
+    )
 
 
 @fastapi_app.get("/intro/author-photo/{sector}/{slot}")
-async def get_intro_author_photo(sector: int, slot: int):
+async def get_intro_author_photo(
+    sector: int,
+    slot: int,
+    room: str = DEFAULT_ROOM_ID,
+    variant: Optional[str] = None,
+    bundle: Optional[str] = None,
+):
+    """Author photo of the current intro slide, or of any slide with `bundle`.
+
+    `bundle` is the intro's `asset_token`; with it clients preload every
+    photo at intro start and the browser may cache the response.
+    """
+    game_room = _http_room(room, "Фото автора не найдено")
     if loaded_pack is None or not 1 <= sector <= 12:
         raise HTTPException(status_code=404, detail="Фото автора не найдено")
-    intro = app_state["presentation"]["intro"]
-    if app_state["game"]["phase"] != PHASE_INTRO or intro is None:
+    intro = game_room.state["presentation"]["intro"]
+    if game_room.state["game"]["phase"] != PHASE_INTRO or intro is None:
         raise HTTPException(status_code=404, detail="Фото автора не найдено")
-    if intro["slide_index"] != sector:
+    asset_token = intro.get("asset_token")
+    bundled = (
+        bundle is not None
+        and asset_token is not None
+        and hmac.compare_digest(bundle, asset_token)
+    )
+    if not bundled and intro["slide_index"] != sector:
         raise HTTPException(status_code=404, detail="Фото автора не найдено")
 
     question = loaded_pack.get_by_sector(sector)
@@ -868,28 +1374,101 @@ async def get_intro_author_photo(sector: int, slot: int):
         raise HTTPException(status_code=404, detail="Фото автора не найдено")
 
     photo_path = author_questions[slot - 1].author_photo
-    if photo_path is None or not photo_path.is_file():
+    media_file = (
+        media_files.get(image_variant_path(loaded_pack, photo_path, variant))
+        if photo_path is not None
+        else None
+    )
+    if media_file is None:
         raise HTTPException(status_code=404, detail="Фото автора не найдено")
-    return FileResponse(
-        str(photo_path),
-        headers={"Cache-Control": "no-store"},
+    return MediaFileResponse(
+        media_file,
+        accel_prefix=APP_CONFIG.media_accel_prefix,
+        headers={
+            "Cache-Control": (
+                f"private, max-age={INTRO_ASSET_MAX_AGE_SECONDS}" if bundled else "no-store"
+            ),
+        },
     )
 
-@sio.event
-async def connect(sid, environ):
-    logger.info(f"Client connected: {sid}")
-    
-    await sio.save_session(sid, {'role': 'player'})
-    
-    # Settings go first so a reconnecting client knows whether sound is fading
-    # or stopped before a spinning wheel/shared audio is rendered from state.
-    await emit_settings_update(to=sid)
-    await emit_state_update(to=sid)
-    await sio.emit('role_update', {'role': 'player'}, to=sid)
+
+def _requested_room_id(environ: Mapping, auth: object) -> Optional[str]:
+    """Room from the Socket.IO `auth` payload or the `?room=` handshake query."""
+    if isinstance(auth, dict) and auth.get("room") is not None:
+        return auth["room"]
+    query = parse_qs(environ.get("QUERY_STRING", "")) if isinstance(environ, Mapping) else {}
+    values = query.get("room")
+    return values[0] if values else None
+
+
+def _connect_creates_room(auth: object) -> bool:
+    """Only the host opens a new game, by connecting with the admin password."""
+    return isinstance(auth, dict) and _admin_password_matches(auth.get("admin_password"))
+
 
 @sio.event
+async def connect(sid, environ, auth=None):
+    try:
+        room = rooms.open(
+            _requested_room_id(environ, auth),
+            create=_connect_creates_room(auth),
+        )
+    except RoomError as error:
+        logger.warning("Rejected connection %s: %s", sid, error.code)
+        raise socketio.exceptions.ConnectionRefusedError(error.code, {"message": error.message})
+    rooms.attach(sid, room)
+    await sio.enter_room(sid, room.channel)
+    logger.info(f"Client connected: {sid} (room {room.id})")
+
+    with _entered_room(room):
+        await sio.save_session(sid, {'role': 'player'})
+
+        # Settings go first so a reconnecting client knows whether sound is fading
+        # or stopped before a spinning wheel/shared audio is rendered from state.
+        await emit_settings_update(to=sid)
+        await emit_state_update(to=sid)
+        await sio.emit('role_update', {'role': 'player'}, to=sid)
+
+
+@room_event
+async def state_subscribe(sid, data=None):
+    """Choose full snapshots or revisioned deltas for this socket.
+
+    Clients call it again after detecting a revision gap; the acknowledgement
+    always carries a complete snapshot of the current revision.
+    """
+    room = current_room()
+    payload = data if isinstance(data, dict) else {}
+    protocol = payload.get("protocol")
+    if protocol not in STATE_PROTOCOLS:
+        return {"ok": False, "error": "unsupported_protocol"}
+    batch = payload.get("batch") is True
+    if batch:
+        await sio.enter_room(sid, room.batch_channel)
+        room.effect_batch_sids.add(sid)
+    elif sid in room.effect_batch_sids:
+        room.effect_batch_sids.discard(sid)
+        await sio.leave_room(sid, room.batch_channel)
+    if protocol == STATE_PROTOCOL_DELTA:
+        # Join before publishing so no patch after the snapshot is missed.
+        await sio.enter_room(sid, room.delta_channel)
+        room.state_delta_sids.add(sid)
+    elif sid in room.state_delta_sids:
+        room.state_delta_sids.discard(sid)
+        await sio.leave_room(sid, room.delta_channel)
+    state = await _publish_state()
+    return {
+        "ok": True,
+        "protocol": protocol,
+        "batch": batch,
+        "revision": state["revision"],
+        "state": state,
+    }
+
+@room_event
 async def restore_session(sid, data):
     """Клиент отправляет токен администратора или игрока при переподключении"""
+    room = current_room()
     payload = data if isinstance(data, dict) else {}
     admin_token = payload.get('token')
     player_token = payload.get('player_token')
@@ -907,8 +1486,9 @@ async def restore_session(sid, data):
         logger.info(f"Session restored for {sid}: admin")
 
         if history_only:
+            await _set_audience(sid, HISTORY_AUDIENCE)
             await sio.emit('role_update', {'role': 'admin'}, to=sid)
-            expires_at = admin_tokens.expires_at(admin_token)
+            expires_at = room.admin_tokens.expires_at(admin_token)
             await sio.emit(
                 'auth_restored',
                 {
@@ -919,23 +1499,25 @@ async def restore_session(sid, data):
             return
         
         # Ищем админа в списке игроков
-        admin_record = next((p for p in players_list if p['role'] == 'admin'), None)
+        admin_record = room.players.admin()
         
         if not admin_record:
             # Если админа не было в списке, добавляем
-            players_list.append({'sid': sid, 'name': ADMIN_NAME, 'role': 'admin', 'token': admin_token, 'online': True})
+            room.players.add(AdminRecord(sid=sid, name=ADMIN_NAME, token=admin_token))
         else:
             # Если был - обновляем SID (перехват сессии)
-            if admin_record['sid'] != sid:
-                logger.info(f"Admin reconnected from new SID: {sid} (old: {admin_record['sid']})")
-                admin_record['sid'] = sid
-            admin_record['online'] = True
+            if admin_record.sid != sid:
+                logger.info(f"Admin reconnected from new SID: {sid} (old: {admin_record.sid})")
+                await _set_audience(admin_record.sid, None)
+                room.players.rebind(admin_record, sid)
+            admin_record.online = True
+        await _join_admin_audience(sid, admin_token)
 
         await sio.emit('role_update', {'role': 'admin'}, to=sid)
         await emit_state_update(to=sid)
         await _emit_pack_info_to_admin(sid)
         await _emit_current_question_to_admins()
-        expires_at = admin_tokens.expires_at(admin_token)
+        expires_at = room.admin_tokens.expires_at(admin_token)
         await sio.emit(
             'auth_restored',
             {
@@ -947,6 +1529,7 @@ async def restore_session(sid, data):
         return
     if admin_token:
         await sio.save_session(sid, session_data)
+        await _set_audience(sid, None)
         await sio.emit('role_update', {'role': 'player'}, to=sid)
         await sio.emit(
             'auth_expired',
@@ -958,37 +1541,44 @@ async def restore_session(sid, data):
     # 2. Проверка игрока по токену
     if player_token:
         # Ищем игрока с таким токеном
-        player_record = next((p for p in players_list if p.get('token') == player_token), None)
+        player_record = room.players.by_token(player_token)
         
         if player_record:
             # Игрок найден - восстанавливаем сессию
-            session_data['player_group_id'] = player_record['group_id']
+            session_data['player_group_id'] = player_record.group_id
             await sio.save_session(sid, session_data)
             
             # Обновляем SID (перехват)
-            if player_record['sid'] != sid:
-                 logger.info(f"Player {player_record['name']} reconnected from new SID: {sid} (old: {player_record['sid']})")
-                 player_record['sid'] = sid
-            player_record['online'] = True
+            if player_record.sid != sid:
+                 logger.info(f"Player {player_record.name} reconnected from new SID: {sid} (old: {player_record.sid})")
+                 await _set_audience(player_record.sid, None)
+                 room.players.rebind(player_record, sid)
+            room.players.set_online(player_record, True)
+            await _set_audience(
+                sid,
+                PENDING_AUDIENCE if player_record.pending else PLAYERS_AUDIENCE,
+            )
 
             await sio.emit('role_update', {'role': 'player'}, to=sid)
             await emit_state_update(to=sid)
-            if player_record.get('pending', False):
+            if player_record.pending:
                 await sio.emit('join_pending', _player_join_payload(player_record), to=sid)
             else:
                 await sio.emit('join_success', _player_join_payload(player_record), to=sid)
+                await _emit_media_prefetch(to=sid)
             # Уведомляем админов об изменении статуса
             await broadcast_players()
             return
     
     # Если ничего не подошло - остаемся гостем
+    await _set_audience(sid, None)
     await sio.emit('role_update', {'role': 'player'}, to=sid)
     await emit_state_update(to=sid)
 
-@sio.event
+@room_event
 async def authenticate_admin(sid, data):
     """Проверка пароля и выдача токена"""
-    global players_list
+    room = current_room()
 
     payload = data if isinstance(data, dict) else {}
     password = payload.get('password')
@@ -996,9 +1586,7 @@ async def authenticate_admin(sid, data):
 
     if _admin_password_matches(password):
         previous_admins = [
-            player.copy()
-            for player in players_list
-            if player.get('role') == 'admin'
+            (record.sid, record.online) for record in room.players.admins()
         ]
         token = generate_admin_token()
         await sio.save_session(
@@ -1015,9 +1603,10 @@ async def authenticate_admin(sid, data):
         )
         logger.info(f"Admin authenticated: {sid}")
 
-        for previous in previous_admins:
-            previous_sid = previous.get('sid')
-            if previous_sid and previous_sid != sid and previous.get('online', False):
+        for previous_sid, previous_online in previous_admins:
+            if previous_sid and previous_sid != sid:
+                await _set_audience(previous_sid, None)
+            if previous_sid and previous_sid != sid and previous_online:
                 try:
                     await sio.save_session(previous_sid, {'role': 'player'})
                 except Exception:
@@ -1030,10 +1619,10 @@ async def authenticate_admin(sid, data):
                 )
 
         if history_only:
-            players_list = [
-                player for player in players_list if player.get("role") != "admin"
-            ]
-            expires_at = admin_tokens.expires_at(token)
+            for record in room.players.admins():
+                room.players.remove(record)
+            await _set_audience(sid, HISTORY_AUDIENCE)
+            expires_at = room.admin_tokens.expires_at(token)
             await sio.emit(
                 'auth_success',
                 {
@@ -1046,18 +1635,19 @@ async def authenticate_admin(sid, data):
             return
         
         # Добавляем/обновляем админа
-        admin_record = next((p for p in players_list if p['role'] == 'admin'), None)
+        admin_record = room.players.admin()
         if not admin_record:
-            players_list.append({'sid': sid, 'name': ADMIN_NAME, 'role': 'admin', 'token': token, 'online': True})
+            room.players.add(AdminRecord(sid=sid, name=ADMIN_NAME, token=token))
             add_log("Ведущий присоединился", event_type="host_joined")
         else:
-             admin_record['sid'] = sid
-             admin_record['token'] = token
-             admin_record['online'] = True
+             room.players.rebind(admin_record, sid)
+             admin_record.token = token
+             admin_record.online = True
+        await _join_admin_audience(sid, token)
 
         await broadcast_players()
         
-        expires_at = admin_tokens.expires_at(token)
+        expires_at = room.admin_tokens.expires_at(token)
         await sio.emit(
             'auth_success',
             {
@@ -1075,24 +1665,19 @@ async def authenticate_admin(sid, data):
         logger.warning(f"Failed admin auth attempt from {sid}")
         await sio.emit('auth_failed', {'message': 'Неверный пароль'}, to=sid)
 
-@sio.event
+@room_event
 async def join_game(sid, data):
     """Create one immutable participant group for this browser login."""
+    room = current_room()
     try:
         participant_names = _normalize_participant_names(data)
     except ValueError as error:
         await sio.emit('join_failed', {'message': str(error)}, to=sid)
         return
 
-    existing_group = next(
-        (
-            record for record in players_list
-            if record.get("role") == "player" and record.get("sid") == sid
-        ),
-        None,
-    )
+    existing_group = room.players.group_by_sid(sid)
     if existing_group is not None:
-        event = "join_pending" if existing_group.get("pending", False) else "join_success"
+        event = "join_pending" if existing_group.pending else "join_success"
         await sio.emit(
             event,
             _player_join_payload(existing_group, include_token=True),
@@ -1100,10 +1685,20 @@ async def join_game(sid, data):
         )
         return
 
+    _evict_groups(reserve=1)
+    if room.players.group_count() >= APP_CONFIG.max_groups:
+        await sio.emit(
+            'join_failed',
+            {'message': 'В игре слишком много подключений. Попросите ведущего отключить лишние.'},
+            to=sid,
+        )
+        await broadcast_players()
+        return
+
     player_token = secrets.token_urlsafe(16)
     group_id = secrets.token_urlsafe(12)
     participants = [
-        {"id": secrets.token_urlsafe(12), "name": name}
+        Participant(secrets.token_urlsafe(12), name)
         for name in participant_names
     ]
     group_name = _participant_group_name(participants)
@@ -1113,24 +1708,23 @@ async def join_game(sid, data):
     await sio.save_session(sid, session)
     
     # Если игра уже началась (не LOGIN), требуется одобрение админа
-    needs_approval = app_state["game"]["phase"] != PHASE_LOGIN
+    needs_approval = room.state["game"]["phase"] != PHASE_LOGIN
     
     # Добавляем нового игрока
-    group = {
-        'sid': sid, 
-        'name': group_name,
-        'role': 'player', 
-        'token': player_token, 
-        'group_id': group_id,
-        'participants': participants,
-        'online': True,
-        'pending': needs_approval  # Ожидает одобрения
-    }
-    players_list.append(group)
+    group = GroupRecord(
+        sid=sid,
+        name=group_name,
+        token=player_token,
+        group_id=group_id,
+        participants=participants,
+        pending=needs_approval,  # Ожидает одобрения
+    )
+    room.players.add(group)
+    await _set_audience(sid, PENDING_AUDIENCE if needs_approval else PLAYERS_AUDIENCE)
 
     journal_payload = {
         "group_id": group_id,
-        "participants": [dict(item) for item in participants],
+        "participants": [item.as_dict() for item in participants],
     }
     
     if needs_approval:
@@ -1167,13 +1761,12 @@ async def join_game(sid, data):
 
 async def notify_admin(event_type, data):
     """Отправляет уведомление всем онлайн админам"""
-    for p in players_list:
-        if _admin_record_is_authorized(p):
-            await sio.emit('admin_notification', {'type': event_type, **data}, to=p['sid'])
+    await _emit_to_admin_room('admin_notification', {'type': event_type, **data})
 
-@sio.event
+@room_event
 async def admin_approve(sid, data):
     """Approve an entire pending participant group."""
+    room = current_room()
     if not await require_admin(sid):
         return
     
@@ -1183,70 +1776,74 @@ async def admin_approve(sid, data):
         return
     
     # Ищем pending игрока
-    group = next(
-        (
-            record for record in players_list
-            if record.get('group_id') == group_id and record.get('pending')
-        ),
-        None,
-    )
-    if not group:
+    group = room.players.by_group(group_id)
+    if not group or not group.pending:
         return
     
     # Одобряем
-    group['pending'] = False
+    group.pending = False
+    if group.online:
+        await _set_audience(group.sid, PLAYERS_AUDIENCE)
     add_log(
-        f"{group['name']} допущены к игре",
+        f"{group.name} допущены к игре",
         event_type="player_approved",
         payload={
             "group_id": group_id,
-            "participants": [dict(item) for item in group["participants"]],
+            "participants": [item.as_dict() for item in group.participants],
         },
     )
     
     await broadcast_players()
     
     # Уведомляем игрока
-    await sio.emit('join_success', _player_join_payload(group), to=group['sid'])
+    await sio.emit('join_success', _player_join_payload(group), to=group.sid)
+    await _emit_media_prefetch(to=group.sid)
 
-@sio.event
+def _new_intro_asset_token() -> str:
+    return secrets.token_urlsafe(18)
+
+
+@room_event
 async def start_game(sid):
     """Админ запускает intro перед первым раундом."""
+    room = current_room()
     if not await require_admin(sid):
         return
     
     try:
-        effects = transition_start_game(app_state)
+        effects = transition_start_game(room.state, asset_token=_new_intro_asset_token())
     except TransitionError as error:
         await _emit_transition_error(sid, error)
         return
     await _apply_transition_effects(effects)
 
 
-@sio.event
+@room_event
 async def admin_start_intro_music(sid):
     """Один раз запустить общий intro-трек по команде ведущего."""
+    room = current_room()
     if not await require_admin(sid):
         return
 
     try:
-        effects = transition_start_intro_music(app_state, now_ms=_now_ms())
+        effects = transition_start_intro_music(room.state, now_ms=_now_ms())
     except TransitionError as error:
         await _emit_transition_error(sid, error)
         return
     await _apply_transition_effects(effects)
 
 
-@sio.event
+@room_event
 async def admin_advance_intro(sid, data):
     """Переключить ровно один intro-слайд или перейти к первому раунду."""
+    room = current_room()
     if not await require_admin(sid):
         return
 
     payload = data if isinstance(data, dict) else {}
     try:
         effects = transition_advance_intro(
-            app_state,
+            room.state,
             expected_slide=payload.get("expected_slide"),
         )
     except TransitionError as error:
@@ -1255,16 +1852,17 @@ async def admin_advance_intro(sid, data):
     await _apply_transition_effects(effects)
 
 
-@sio.event
+@room_event
 async def admin_skip_intro(sid, data=None):
     """Сразу завершить intro и перейти к ожиданию первого вращения."""
+    room = current_room()
     if not await require_admin(sid):
         return {"ok": False, "error": "not_admin"}
 
     payload = data if isinstance(data, dict) else {}
     try:
         effects = transition_skip_intro(
-            app_state,
+            room.state,
             expected_slide=payload.get("expected_slide"),
         )
     except TransitionError as error:
@@ -1273,10 +1871,10 @@ async def admin_skip_intro(sid, data=None):
     await _apply_transition_effects(effects)
     return {"ok": True}
 
-@sio.event
+@room_event
 async def leave_game(sid):
     """Явный выход игрока (кнопка Выход). Освобождает имя."""
-    global players_list
+    room = current_room()
 
     try:
         session = await sio.get_session(sid)
@@ -1284,36 +1882,35 @@ async def leave_game(sid):
         session = {}
     session_admin_token = session.get("admin_token")
 
-    player = next((p for p in players_list if p['sid'] == sid), None)
-    if player:
+    records = room.players.with_sid(sid)
+    if records:
         captain_effects = TransitionEffects()
-        player_name = player['name']
-        player_role = player['role']
+        player = records[0]
         
         # Удаляем из списка
-        players_list = [p for p in players_list if p['sid'] != sid]
+        for record in records:
+            room.players.remove(record)
+        await _set_audience(sid, None)
         
-        if player_role == 'admin':
+        if isinstance(player, AdminRecord):
             add_log("Ведущий вышел", event_type="host_left")
-            revoke_admin_token(player.get('token'))
+            revoke_admin_token(player.token)
         else:
             add_log(
-                f"{player_name} вышел из игры",
+                f"{player.name} вышел из игры",
                 event_type="player_left",
                 payload={
-                    "group_id": player.get("group_id"),
-                    "participants": [
-                        dict(item) for item in player.get("participants", [])
-                    ],
+                    "group_id": player.group_id,
+                    "participants": [item.as_dict() for item in player.participants],
                 },
             )
             captain_effects = transition_clear_captain(
-                app_state,
-                expected_group_id=player.get("group_id"),
+                room.state,
+                expected_group_id=player.group_id,
                 reason="player_left",
             )
         
-        logger.info(f"Player {player_name} left the game (explicit logout)")
+        logger.info(f"Player {player.name} left the game (explicit logout)")
         await broadcast_players()
         if captain_effects.events:
             await _apply_transition_effects(captain_effects)
@@ -1325,24 +1922,35 @@ async def leave_game(sid):
     except Exception:
         pass
 
-@sio.event
-async def disconnect(sid):
+@room_event
+async def disconnect(sid, reason=None):
+    room = current_room()
     logger.info(f"Client disconnected: {sid}")
+    room.state_delta_sids.discard(sid)
+    room.effect_batch_sids.discard(sid)
+    # Socket.IO drops the socket from its rooms by itself.
+    room.audiences.pop(sid, None)
     
     # Ставим offline, но НЕ удаляем (чтобы можно было переподключиться)
-    player = next((p for p in players_list if p['sid'] == sid), None)
+    player = room.players.by_sid(sid)
     if player:
-        player['online'] = False
+        room.players.set_online(player, False)
+        _evict_groups()
         await broadcast_players()
+    rooms.detach(sid)
+    await _flush_journal(room.journal)
+    if rooms.close_if_idle(room):
+        logger.info("Closed idle game room %s", room.id)
 
-@sio.event
+@room_event
 async def admin_spin(sid, data=None):
+    room = current_room()
     if not await require_admin(sid):
         return
 
     force_sector = data.get('force_sector') if data else None
     try:
-        validate_spin_start(app_state)
+        validate_spin_start(room.state)
         if force_sector is not None:
             if (
                 not isinstance(force_sector, int)
@@ -1350,16 +1958,16 @@ async def admin_spin(sid, data=None):
                 or not 1 <= force_sector <= SECTORS_COUNT
             ):
                 raise TransitionError("invalid_sector", f"Некорректный сектор: {force_sector}")
-            if force_sector in app_state["game"]["used_questions"]:
+            if force_sector in room.state["game"]["used_questions"]:
                 raise TransitionError("sector_used", f"Сектор {force_sector} уже сыгран")
 
         raw_angle, raw_sector = calculate_spin_result(
             force_sector,
-            app_state["game"]["used_questions"],
+            room.state["game"]["used_questions"],
         )
         duration = random.uniform(MIN_SPIN_DURATION, MAX_SPIN_DURATION)
         effects = transition_start_spin(
-            app_state,
+            room.state,
             raw_angle=raw_angle,
             raw_sector=raw_sector,
             duration=duration,
@@ -1374,21 +1982,22 @@ async def admin_spin(sid, data=None):
     await asyncio.sleep(duration)
 
     try:
-        effects = transition_complete_spin(app_state, spin_id=spin_id)
+        effects = transition_complete_spin(room.state, spin_id=spin_id)
     except TransitionError as error:
         if error.code != "stale_spin":
             await _emit_transition_error(sid, error)
         return
     await _apply_transition_effects(effects)
 
-@sio.event
+@room_event
 async def admin_score(sid, data):
+    room = current_room()
     if not await require_admin(sid):
         return
     winner = data.get('winner')
     try:
         effects = transition_score(
-            app_state,
+            room.state,
             winner=winner,
             correct_sound=random.choice(["yes1", "yes2"]),
             incorrect_sound=random.choice(["no1", "no2"]),
@@ -1399,66 +2008,71 @@ async def admin_score(sid, data):
     await _apply_transition_effects(effects)
 
 
-@sio.event
+@room_event
 async def admin_set_score(sid, data):
+    room = current_room()
     data = data if isinstance(data, dict) else {}
     return await _apply_live_ops_action(
         sid,
         lambda: live_ops_set_score(
-            app_state,
+            room.state,
             znatoki=data.get("znatoki"),
             tv=data.get("tv"),
         ),
     )
 
 
-@sio.event
+@room_event
 async def admin_set_team_resources(sid, data):
+    room = current_room()
     data = data if isinstance(data, dict) else {}
     return await _apply_live_ops_action(
         sid,
         lambda: live_ops_set_team_resources(
-            app_state,
+            room.state,
             earned_minutes=data.get("earned_minutes"),
             credit_state=data.get("credit_state"),
         ),
     )
 
 
-@sio.event
+@room_event
 async def admin_set_sector_used(sid, data):
+    room = current_room()
     data = data if isinstance(data, dict) else {}
     return await _apply_live_ops_action(
         sid,
         lambda: live_ops_set_sector_used(
-            app_state,
+            room.state,
             sector=data.get("sector"),
             used=data.get("used"),
         ),
     )
 
 
-@sio.event
+@room_event
 async def admin_open_round(sid, data):
+    room = current_room()
     data = data if isinstance(data, dict) else {}
     return await _apply_live_ops_action(
         sid,
         lambda: live_ops_open_round(
-            app_state,
+            room.state,
             sector=data.get("sector"),
             part_index=data.get("part_index"),
         ),
     )
 
 
-@sio.event
+@room_event
 async def admin_force_phase(sid, data):
+    room = current_room()
     data = data if isinstance(data, dict) else {}
     now_ms = int(time.time() * 1000)
     return await _apply_live_ops_action(
         sid,
         lambda: live_ops_force_phase(
-            app_state,
+            room.state,
             phase=data.get("phase"),
             now_ms=now_ms,
             normal_discussion_seconds=NORMAL_DISCUSSION_SECONDS,
@@ -1467,37 +2081,40 @@ async def admin_force_phase(sid, data):
     )
 
 
-@sio.event
+@room_event
 async def admin_reset_to_intro(sid, data=None):
+    room = current_room()
     return await _apply_live_ops_action(
         sid,
-        lambda: live_ops_reset_to_intro(app_state),
+        lambda: live_ops_reset_to_intro(room.state, asset_token=_new_intro_asset_token()),
     )
 
 
-@sio.event
+@room_event
 async def admin_cancel_spin(sid, data=None):
+    room = current_room()
     return await _apply_live_ops_action(
         sid,
-        lambda: live_ops_cancel_spin(app_state),
+        lambda: live_ops_cancel_spin(room.state),
     )
 
 
-@sio.event
+@room_event
 async def admin_set_timer(sid, data):
+    room = current_room()
     data = data if isinstance(data, dict) else {}
     now_ms = int(time.time() * 1000)
     return await _apply_live_ops_action(
         sid,
         lambda: live_ops_set_timer(
-            app_state,
+            room.state,
             seconds=data.get("seconds"),
             now_ms=now_ms,
         ),
     )
 
 
-@sio.event
+@room_event
 async def admin_end_round(sid, data=None):
     """
     POST_ROUND handler.
@@ -1505,11 +2122,12 @@ async def admin_end_round(sid, data=None):
     - Blitz flow: if round has advance_next_part, then POST_ROUND -> QUESTION_READING and advances to next part
       WITHOUT gong.
     """
+    room = current_room()
     if not await require_admin(sid):
         return
     try:
         effects = transition_end_round(
-            app_state,
+            room.state,
             gong_sound=random.choice(["gong1", "gong2", "gong3"]),
         )
     except TransitionError as error:
@@ -1518,9 +2136,10 @@ async def admin_end_round(sid, data=None):
     await _apply_transition_effects(effects)
 
 
-@sio.event
+@room_event
 async def admin_start_blackbox(sid, data=None):
     """Start the static black-box presentation for the active pack question."""
+    room = current_room()
     if not await require_admin(sid):
         return {"ok": False, "error": "not_admin"}
 
@@ -1531,7 +2150,7 @@ async def admin_start_blackbox(sid, data=None):
     try:
         question = loaded_pack.get_by_sector(sector)
         effects = transition_start_blackbox(
-            app_state,
+            room.state,
             enabled=_effective_blackbox(question, round_ctx),
             now_ms=_now_ms(),
         )
@@ -1543,15 +2162,16 @@ async def admin_start_blackbox(sid, data=None):
     return {"ok": True}
 
 
-@sio.event
+@room_event
 async def admin_stop_blackbox(sid, data=None):
     """Stop only the active black-box presentation."""
+    room = current_room()
     if not await require_admin(sid):
         return {"ok": False, "error": "not_admin"}
     payload = data if isinstance(data, dict) else {}
     try:
         effects = transition_end_blackbox(
-            app_state,
+            room.state,
             expected_generation=payload.get("playback_generation"),
         )
     except TransitionError as error:
@@ -1562,15 +2182,16 @@ async def admin_stop_blackbox(sid, data=None):
     return {"ok": True}
 
 
-@sio.event
+@room_event
 async def admin_blackbox_ended(sid, data=None):
     """Accept natural music completion only from the current host generation."""
+    room = current_room()
     if not await require_admin(sid):
         return {"ok": False, "error": "not_admin"}
     payload = data if isinstance(data, dict) else {}
     try:
         effects = transition_end_blackbox(
-            app_state,
+            room.state,
             expected_generation=payload.get("playback_generation"),
             natural=True,
         )
@@ -1582,39 +2203,38 @@ async def admin_blackbox_ended(sid, data=None):
 
 
 def _store_current_media_token(media) -> tuple[str, dict]:
-    media_id = secrets.token_urlsafe(16)
     info = create_media_token_info(
         media,
-        app_state,
+        current_room().state,
         expires_at=time.time() + MEDIA_TOKEN_TTL_SECONDS,
     )
-    media_tokens[media_id] = info
-    return media_id, info
+    return _mint_media_token(info), info
 
 
 def _store_current_author_media_token() -> Optional[dict]:
-    author = current_author_media(loaded_pack, app_state)
+    room = current_room()
+    author = _get_round_media().author
     if author is None:
         return None
 
     _cleanup_expired_media_tokens()
-    for media_id, info in media_tokens.items():
-        if (
-            info.get("presentation_kind") == "author"
-            and _media_token_is_current(info)
-        ):
+    for media_id in room.media_tokens.find(
+        "author",
+        current_round_key(room.state),
+        room.state["wheel"].get("spin_id", 0),
+    ):
+        if _media_token_is_current(room.media_tokens[media_id]):
             return {
                 "media_id": media_id,
                 **author.public_descriptor(),
             }
 
-    media_id = secrets.token_urlsafe(16)
     info = create_author_media_token_info(
         author,
-        app_state,
+        room.state,
         expires_at=time.time() + MEDIA_TOKEN_TTL_SECONDS,
     )
-    media_tokens[media_id] = info
+    media_id = _mint_media_token(info)
     return {
         "media_id": media_id,
         **author.public_descriptor(),
@@ -1624,27 +2244,103 @@ def _store_current_author_media_token() -> Optional[dict]:
 def _create_current_shared_media(media_id: str, info: dict) -> dict:
     has_next = False
     if info.get("presentation_kind") != "author":
-        catalog = _get_current_media_catalog()
-        has_next = next_media_in_section(catalog, info["media_ref"]) is not None
-    return create_shared_media(media_id, info, has_next=has_next)
+        has_next = _get_round_media().next_in_section(info["media_ref"]) is not None
+    return create_shared_media(
+        media_id,
+        info,
+        has_next=has_next,
+        prefetch_key=current_room().prefetch_keys.get(info["media_ref"]),
+    )
 
 
-@sio.event
+def _media_prefetch_items() -> list[tuple[CurrentMedia, int]]:
+    """Question media of the current part that fit the prefetch budget."""
+    room = current_room()
+    if (
+        APP_CONFIG.media_prefetch != MEDIA_PREFETCH_QUESTION
+        or loaded_pack is None
+        or room.state["game"]["phase"] != PHASE_QUESTION_READING
+        or not room.state["game"]["round"]
+        or room.state["wheel"]["is_spinning"]
+    ):
+        return []
+    items = []
+    total_bytes = 0
+    for media in prefetch_candidates(_get_round_media()):
+        media_file = media_files.get(media.path)
+        if media_file is None:
+            continue
+        size = media_file.stat.st_size
+        if total_bytes + size > MEDIA_PREFETCH_MAX_BYTES:
+            continue
+        total_bytes += size
+        items.append((media, size))
+        if len(items) == MEDIA_PREFETCH_MAX_ITEMS:
+            break
+    return items
+
+
+async def _emit_media_prefetch(to: Optional[str] = None) -> None:
+    """Offer each approved player its own tokens for the question's media.
+
+    An empty list tells the clients to drop what they prefetched before.
+    """
+    room = current_room()
+    if APP_CONFIG.media_prefetch != MEDIA_PREFETCH_QUESTION:
+        return
+    items = _media_prefetch_items()
+    for media, _size in items:
+        room.prefetch_keys.setdefault(media.media_ref, secrets.token_urlsafe(8))
+    if not items and to is None:
+        # Nothing to offer is the same message for every approved player.
+        await sio.emit(
+            "media_prefetch",
+            {"concurrency": MEDIA_PREFETCH_CONCURRENCY, "items": []},
+            room=room.audience_channel(PLAYERS_AUDIENCE),
+        )
+        return
+    expires_at = time.time() + MEDIA_TOKEN_TTL_SECONDS
+    groups = room.players.groups() if to is None else [room.players.group_by_sid(to)]
+    for group in groups:
+        if group is None or group.pending or not group.online:
+            continue
+        sid = group.sid
+        offered = []
+        for media, size in items:
+            info = create_media_token_info(media, room.state, expires_at=expires_at)
+            info["prefetch_sid"] = sid
+            offered.append(
+                {
+                    "media_id": _mint_media_token(info),
+                    "prefetch_key": room.prefetch_keys[media.media_ref],
+                    "type": media.type,
+                    "bytes": size,
+                }
+            )
+        await sio.emit(
+            "media_prefetch",
+            {"concurrency": MEDIA_PREFETCH_CONCURRENCY, "items": offered},
+            to=sid,
+        )
+
+
+@room_event
 async def admin_resolve_media(sid, data):
     """
     Resolve an admin-only opaque media_ref to a secure media_id.
     Returns acknowledgement payload to the caller (admin).
     """
+    room = current_room()
     if not await require_admin(sid):
         return {"ok": False, "error": "not_admin"}
     data = data if isinstance(data, dict) else {}
 
-    phase = app_state["game"]["phase"]
+    phase = room.state["game"]["phase"]
     if phase not in (PHASE_QUESTION_READING, PHASE_DISCUSSION, PHASE_TEAM_ANSWER, PHASE_POST_ROUND):
         return {"ok": False, "error": f"bad_phase:{phase}"}
-    if app_state["wheel"]["is_spinning"]:
+    if room.state["wheel"]["is_spinning"]:
         return {"ok": False, "error": "spinning"}
-    if not app_state["game"]["round"]:
+    if not room.state["game"]["round"]:
         return {"ok": False, "error": "no_round"}
 
     media_ref = (data.get("media_ref") or "").strip()
@@ -1667,20 +2363,21 @@ async def admin_resolve_media(sid, data):
     }
 
 
-@sio.event
+@room_event
 async def admin_share_media(sid, data):
     """Share resolved media_id to all clients (rendered instead of the table)."""
+    room = current_room()
     if not await require_admin(sid):
         return {"ok": False, "error": "not_admin"}
     data = data if isinstance(data, dict) else {}
-    phase = app_state["game"]["phase"]
+    phase = room.state["game"]["phase"]
     if phase not in (PHASE_QUESTION_READING, PHASE_DISCUSSION, PHASE_TEAM_ANSWER, PHASE_POST_ROUND):
         return {"ok": False, "error": f"bad_phase:{phase}"}
-    if app_state["wheel"]["is_spinning"]:
+    if room.state["wheel"]["is_spinning"]:
         return {"ok": False, "error": "spinning"}
-    if app_state["presentation"].get("blackbox") is not None:
+    if room.state["presentation"].get("blackbox") is not None:
         return {"ok": False, "error": "blackbox_active"}
-    if not app_state["game"]["round"]:
+    if not room.state["game"]["round"]:
         return {"ok": False, "error": "no_round"}
 
     media_id = (data.get("media_id") or "").strip()
@@ -1688,7 +2385,7 @@ async def admin_share_media(sid, data):
         return {"ok": False, "error": "missing_media_id"}
 
     _cleanup_expired_media_tokens()
-    info = media_tokens.get(media_id)
+    info = _media_token_info(media_id)
     if not info:
         await sio.emit(
             "admin_notification",
@@ -1698,13 +2395,15 @@ async def admin_share_media(sid, data):
         return {"ok": False, "error": "media_expired"}
 
     if not _media_token_is_current(info):
-        media_tokens.pop(media_id, None)
+        room.media_tokens.pop(media_id, None)
         await sio.emit(
             "admin_notification",
             {"type": "warning", "message": "Медиа больше не относится к текущему вопросу."},
             to=sid,
         )
         return {"ok": False, "error": "media_not_current"}
+    if info.get("prefetch_sid") is not None:
+        return {"ok": False, "error": "media_not_allowed"}
 
     is_author = info.get("presentation_kind") == "author"
     if is_author and phase != PHASE_QUESTION_READING:
@@ -1714,13 +2413,13 @@ async def admin_share_media(sid, data):
             "message": "Автора можно показывать только во время чтения вопроса",
         }
 
-    previous = app_state["presentation"].get("shared_media")
+    previous = room.state["presentation"].get("shared_media")
     previous_id = previous.get("media_id") if previous else None
-    app_state["presentation"]["shared_media"] = _create_current_shared_media(media_id, info)
+    room.state["presentation"]["shared_media"] = _create_current_shared_media(media_id, info)
     if previous_id and previous_id != media_id:
-        previous_info = media_tokens.get(previous_id)
+        previous_info = _media_token_info(previous_id)
         if previous_info is None or previous_info.get("presentation_kind") != "author":
-            media_tokens.pop(previous_id, None)
+            room.media_tokens.pop(previous_id, None)
     display_name = media_display_name(info)
     add_log(
         (
@@ -1749,22 +2448,23 @@ async def admin_share_media(sid, data):
     return {"ok": True}
 
 
-@sio.event
+@room_event
 async def admin_share_next_media(sid, data=None):
     """Replace shared media with the next item in the same source section."""
+    room = current_room()
     if not await require_admin(sid):
         return {"ok": False, "error": "not_admin"}
     data = data if isinstance(data, dict) else {}
 
-    phase = app_state["game"]["phase"]
+    phase = room.state["game"]["phase"]
     if phase not in (PHASE_QUESTION_READING, PHASE_DISCUSSION, PHASE_TEAM_ANSWER, PHASE_POST_ROUND):
         return {"ok": False, "error": f"bad_phase:{phase}"}
-    if app_state["wheel"]["is_spinning"]:
+    if room.state["wheel"]["is_spinning"]:
         return {"ok": False, "error": "spinning"}
-    if app_state["presentation"].get("blackbox") is not None:
+    if room.state["presentation"].get("blackbox") is not None:
         return {"ok": False, "error": "blackbox_active"}
 
-    shared_media = app_state["presentation"].get("shared_media")
+    shared_media = room.state["presentation"].get("shared_media")
     expected_media_id = data.get("expected_media_id")
     if not isinstance(expected_media_id, str) or not expected_media_id:
         return {"ok": False, "error": "missing_expected_media_id"}
@@ -1774,19 +2474,19 @@ async def admin_share_next_media(sid, data=None):
     if info is None:
         return {"ok": False, "error": "no_current_media"}
 
-    catalog = _get_current_media_catalog()
-    next_media = next_media_in_section(catalog, info["media_ref"])
+    next_media = _get_round_media().next_in_section(info["media_ref"])
     if next_media is None:
         shared_media["has_next"] = False
+        room.state_snapshots.invalidate()
         return {"ok": False, "error": "no_next_media"}
 
     next_id, next_info = _store_current_media_token(next_media)
     previous_id = shared_media["media_id"]
-    app_state["presentation"]["shared_media"] = _create_current_shared_media(
+    room.state["presentation"]["shared_media"] = _create_current_shared_media(
         next_id,
         next_info,
     )
-    media_tokens.pop(previous_id, None)
+    room.media_tokens.pop(previous_id, None)
     add_log(
         f"Следующее медиа показано игрокам: {next_info['name']}",
         event_type="media_shared",
@@ -1806,11 +2506,11 @@ async def admin_share_next_media(sid, data=None):
 
 
 def _get_current_shared_media_token_info() -> Optional[dict]:
-    shared_media = app_state["presentation"].get("shared_media")
+    room = current_room()
+    shared_media = room.state["presentation"].get("shared_media")
     if not shared_media:
         return None
-    media_id = shared_media.get("media_id")
-    info = media_tokens.get(media_id)
+    info = _media_token_info(shared_media.get("media_id"))
     if not info or not _media_token_is_current(info, allow_expired=True):
         return None
     if info.get("media_ref") != shared_media.get("media_ref"):
@@ -1819,13 +2519,14 @@ def _get_current_shared_media_token_info() -> Optional[dict]:
 
 
 async def _admin_media_playback_action(sid: str, action: str) -> None:
+    room = current_room()
     if not await require_admin(sid):
         return
 
-    shared_media = app_state["presentation"].get("shared_media")
+    shared_media = room.state["presentation"].get("shared_media")
     info = _get_current_shared_media_token_info()
     if shared_media is None or info is None:
-        app_state["presentation"]["shared_media"] = None
+        room.state["presentation"]["shared_media"] = None
         await sio.emit(
             "admin_notification",
             {"type": "warning", "message": "Сначала покажи актуальное медиа игрокам."},
@@ -1863,6 +2564,8 @@ async def _admin_media_playback_action(sid: str, action: str) -> None:
     # unrelated game sounds.
     _supersede_sound_fade(mode="normal")
     await emit_settings_update()
+    if changed and action == "play":
+        _schedule_media_end(shared_media, info)
     if changed:
         labels = {"play": "запущено", "pause": "на паузе", "stop": "остановлено"}
         add_log(
@@ -1878,24 +2581,80 @@ async def _admin_media_playback_action(sid: str, action: str) -> None:
         await emit_state_update()
 
 
-@sio.event
+def _log_media_completed(info: dict, *, source: str) -> None:
+    add_log(
+        f"Медиа завершено: {media_display_name(info)}",
+        event_type="media_completed",
+        payload={
+            "media_ref": info.get("media_ref"),
+            "media_type": info.get("type"),
+            "name": info.get("name"),
+            "source": source,
+        },
+    )
+
+
+def _schedule_media_end(shared_media: dict, info: dict) -> None:
+    """End the playing generation at its manifest duration.
+
+    A later play, pause, stop, hide or host report changes the generation or
+    the shared media, which turns the pending end into a no-op. Media without
+    a known duration still wait for `admin_media_ended`.
+    """
+    room = current_room()
+    if room.media_end_task is not None:
+        room.media_end_task.cancel()
+        room.media_end_task = None
+    duration_ms = info.get("duration_ms")
+    if not duration_ms:
+        return
+    remaining_ms = max(0, duration_ms - int(shared_media.get("position_ms", 0)))
+    room.media_end_task = asyncio.create_task(
+        _end_media_after(
+            shared_media["media_id"],
+            int(shared_media["playback_generation"]),
+            (remaining_ms + MEDIA_END_GRACE_MS) / 1000,
+        )
+    )
+
+
+async def _end_media_after(media_id: str, generation: int, delay_seconds: float) -> None:
+    room = current_room()
+    await asyncio.sleep(delay_seconds)
+    shared_media = room.state["presentation"].get("shared_media")
+    if shared_media is None or shared_media.get("media_id") != media_id:
+        return
+    info = _get_current_shared_media_token_info()
+    if info is None:
+        return
+    try:
+        if not complete_shared_media(shared_media, expected_generation=generation):
+            return
+    except MediaPlaybackError:
+        return
+    _log_media_completed(info, source="duration")
+    await emit_state_update()
+
+
+@room_event
 async def admin_play_media(sid, data=None):
     await _admin_media_playback_action(sid, "play")
 
 
-@sio.event
+@room_event
 async def admin_pause_media(sid, data=None):
     await _admin_media_playback_action(sid, "pause")
 
 
-@sio.event
+@room_event
 async def admin_stop_media(sid, data=None):
     await _admin_media_playback_action(sid, "stop")
 
 
-@sio.event
+@room_event
 async def admin_media_ended(sid, data):
     """Accept natural completion from the host for the current play generation."""
+    room = current_room()
     if not await require_admin(sid):
         return {"ok": False, "error": "not_admin"}
     data = data if isinstance(data, dict) else {}
@@ -1907,7 +2666,7 @@ async def admin_media_ended(sid, data):
     if not isinstance(generation, int) or isinstance(generation, bool) or generation < 0:
         return {"ok": False, "error": "invalid_generation"}
 
-    shared_media = app_state["presentation"].get("shared_media")
+    shared_media = room.state["presentation"].get("shared_media")
     if shared_media is None or shared_media.get("media_id") != media_id:
         return {"ok": False, "error": "stale_media"}
     info = _get_current_shared_media_token_info()
@@ -1924,31 +2683,24 @@ async def admin_media_ended(sid, data):
     if not changed:
         return {"ok": False, "error": "stale_playback"}
 
-    add_log(
-        f"Медиа завершено: {media_display_name(info)}",
-        event_type="media_completed",
-        payload={
-            "media_ref": info.get("media_ref"),
-            "media_type": info.get("type"),
-            "name": info.get("name"),
-        },
-    )
+    _log_media_completed(info, source="host")
     await emit_state_update()
     return {"ok": True}
 
 
-@sio.event
+@room_event
 async def admin_hide_media(sid, data=None):
     """Hide shared media for all clients."""
+    room = current_room()
     if not await require_admin(sid):
         return {"ok": False, "error": "not_admin"}
-    shared_media = app_state["presentation"].get("shared_media")
-    app_state["presentation"]["shared_media"] = None
+    shared_media = room.state["presentation"].get("shared_media")
+    room.state["presentation"]["shared_media"] = None
     is_author = bool(
         shared_media and shared_media.get("presentation_kind") == "author"
     )
     if shared_media and not is_author:
-        media_tokens.pop(shared_media.get("media_id"), None)
+        room.media_tokens.pop(shared_media.get("media_id"), None)
     add_log(
         "Автор скрыт" if is_author else "Медиа скрыто",
         event_type="author_hidden" if is_author else "media_hidden",
@@ -1957,19 +2709,20 @@ async def admin_hide_media(sid, data=None):
     return {"ok": True}
 
 
-@sio.event
+@room_event
 async def admin_start_discussion(sid, data=None):
     """Переход QUESTION_READING -> DISCUSSION."""
+    room = current_room()
     if not await require_admin(sid):
         return
-    round_ctx = app_state["game"]["round"] or {}
+    round_ctx = room.state["game"]["round"] or {}
     kind = round_ctx.get("kind", "normal")
     seconds = BLITZ_DISCUSSION_SECONDS if kind in ("blitz", "superblitz") else NORMAL_DISCUSSION_SECONDS
     started_at_ms = _now_ms()
     deadline_ms = started_at_ms + seconds * 1000
     try:
         effects = transition_start_discussion(
-            app_state,
+            room.state,
             started_at_ms=started_at_ms,
             deadline_ms=deadline_ms,
         )
@@ -1979,15 +2732,16 @@ async def admin_start_discussion(sid, data=None):
     await _apply_transition_effects(effects)
 
 
-@sio.event
+@room_event
 async def admin_early_answer(sid, data=None):
+    room = current_room()
     if not await require_admin(sid):
         return {"ok": False, "error": "not_admin"}
     payload = data if isinstance(data, dict) else {}
     return await _apply_strategy_action(
         sid,
         lambda: transition_early_answer(
-            app_state,
+            room.state,
             now_ms=_now_ms(),
             actor={"role": "host"},
             expected_generation=payload.get("timer_generation"),
@@ -1995,8 +2749,9 @@ async def admin_early_answer(sid, data=None):
     )
 
 
-@sio.event
+@room_event
 async def captain_early_answer(sid, data=None):
+    room = current_room()
     actor = await _captain_actor_for_sid(sid)
     if actor is None:
         error = TransitionError("not_captain", "Действие доступно только капитану")
@@ -2006,7 +2761,7 @@ async def captain_early_answer(sid, data=None):
     return await _apply_strategy_action(
         sid,
         lambda: transition_request_early_answer(
-            app_state,
+            room.state,
             now_ms=_now_ms(),
             actor=actor,
             expected_generation=payload.get("timer_generation"),
@@ -2015,6 +2770,7 @@ async def captain_early_answer(sid, data=None):
 
 
 async def _strategic_minute_action(sid, data, *, action, admin: bool) -> dict:
+    room = current_room()
     if admin:
         if not await require_admin(sid):
             return {"ok": False, "error": "not_admin"}
@@ -2029,7 +2785,7 @@ async def _strategic_minute_action(sid, data, *, action, admin: bool) -> dict:
     return await _apply_strategy_action(
         sid,
         lambda: action(
-            app_state,
+            room.state,
             now_ms=_now_ms(),
             actor=actor,
             expected_generation=payload.get("timer_generation"),
@@ -2037,7 +2793,7 @@ async def _strategic_minute_action(sid, data, *, action, admin: bool) -> dict:
     )
 
 
-@sio.event
+@room_event
 async def admin_spend_earned_minute(sid, data=None):
     return await _strategic_minute_action(
         sid,
@@ -2047,7 +2803,7 @@ async def admin_spend_earned_minute(sid, data=None):
     )
 
 
-@sio.event
+@room_event
 async def captain_spend_earned_minute(sid, data=None):
     return await _strategic_minute_action(
         sid,
@@ -2057,7 +2813,7 @@ async def captain_spend_earned_minute(sid, data=None):
     )
 
 
-@sio.event
+@room_event
 async def admin_take_credit_minute(sid, data=None):
     return await _strategic_minute_action(
         sid,
@@ -2067,8 +2823,9 @@ async def admin_take_credit_minute(sid, data=None):
     )
 
 
-@sio.event
+@room_event
 async def captain_take_credit_minute(sid, data=None):
+    room = current_room()
     actor = await _captain_actor_for_sid(sid)
     if actor is None:
         error = TransitionError("not_captain", "Действие доступно только капитану")
@@ -2078,7 +2835,7 @@ async def captain_take_credit_minute(sid, data=None):
     return await _apply_strategy_action(
         sid,
         lambda: transition_request_credit_minute(
-            app_state,
+            room.state,
             now_ms=_now_ms(),
             actor=actor,
             expected_generation=payload.get("timer_generation"),
@@ -2086,15 +2843,16 @@ async def captain_take_credit_minute(sid, data=None):
     )
 
 
-@sio.event
+@room_event
 async def admin_resolve_strategy_request(sid, data=None):
+    room = current_room()
     if not await require_admin(sid):
         return {"ok": False, "error": "not_admin"}
     payload = data if isinstance(data, dict) else {}
     return await _apply_strategy_action(
         sid,
         lambda: transition_resolve_strategy_request(
-            app_state,
+            room.state,
             approve=payload.get("approve"),
             now_ms=_now_ms(),
         ),
@@ -2102,6 +2860,7 @@ async def admin_resolve_strategy_request(sid, data=None):
 
 
 async def _schedule_repayment_action(sid, *, admin: bool) -> dict:
+    room = current_room()
     if admin:
         if not await require_admin(sid):
             return {"ok": False, "error": "not_admin"}
@@ -2115,53 +2874,56 @@ async def _schedule_repayment_action(sid, *, admin: bool) -> dict:
     if admin:
         return await _apply_strategy_action(
             sid,
-            lambda: transition_schedule_credit_repayment(app_state, actor=actor),
+            lambda: transition_schedule_credit_repayment(room.state, actor=actor),
         )
     return await _apply_strategy_action(
         sid,
         lambda: transition_request_credit_repayment(
-            app_state,
+            room.state,
             now_ms=_now_ms(),
             actor=actor,
         ),
     )
 
 
-@sio.event
+@room_event
 async def admin_schedule_credit_repayment(sid, data=None):
     return await _schedule_repayment_action(sid, admin=True)
 
 
-@sio.event
+@room_event
 async def captain_schedule_credit_repayment(sid, data=None):
     return await _schedule_repayment_action(sid, admin=False)
 
 
-@sio.event
+@room_event
 async def admin_repayment_answer(sid, data=None):
+    room = current_room()
     if not await require_admin(sid):
         return {"ok": False, "error": "not_admin"}
     return await _apply_strategy_action(
         sid,
-        lambda: transition_repayment_answer(app_state),
+        lambda: transition_repayment_answer(room.state),
     )
 
 
-@sio.event
+@room_event
 async def admin_team_answer(sid, data=None):
     """Переход DISCUSSION -> TEAM_ANSWER."""
+    room = current_room()
     if not await require_admin(sid):
         return
     try:
-        effects = transition_team_answer(app_state)
+        effects = transition_team_answer(room.state)
     except TransitionError as error:
         await _emit_transition_error(sid, error)
         return
     await _apply_transition_effects(effects)
 
 
-@sio.event
+@room_event
 async def admin_select_captain(sid, data):
+    room = current_room()
     if not await require_admin(sid):
         return {"ok": False, "error": "not_admin"}
     payload = data if isinstance(data, dict) else {}
@@ -2177,27 +2939,29 @@ async def admin_select_captain(sid, data):
     return await _apply_strategy_action(
         sid,
         lambda: transition_select_captain(
-            app_state,
-            participant_id=participant["id"],
-            group_id=group["group_id"],
-            name=participant["name"],
+            room.state,
+            participant_id=participant.id,
+            group_id=group.group_id,
+            name=participant.name,
         ),
     )
 
 
-@sio.event
+@room_event
 async def admin_clear_captain(sid, data=None):
+    room = current_room()
     if not await require_admin(sid):
         return {"ok": False, "error": "not_admin"}
     return await _apply_strategy_action(
         sid,
-        lambda: transition_clear_captain(app_state, reason="live_ops"),
+        lambda: transition_clear_captain(room.state, reason="live_ops"),
     )
 
 
-@sio.event
+@room_event
 async def admin_select_respondent(sid, data):
     """Select one approved physical participant for the current question part."""
+    room = current_room()
     if not await require_admin(sid):
         return {"ok": False, "error": "not_admin"}
     payload = data if isinstance(data, dict) else {}
@@ -2213,10 +2977,10 @@ async def admin_select_respondent(sid, data):
     group, participant = found
     try:
         effects = transition_select_respondent(
-            app_state,
-            participant_id=participant["id"],
-            group_id=group["group_id"],
-            name=participant["name"],
+            room.state,
+            participant_id=participant.id,
+            group_id=group.group_id,
+            name=participant.name,
         )
     except TransitionError as error:
         await _emit_transition_error(sid, error)
@@ -2225,23 +2989,24 @@ async def admin_select_respondent(sid, data):
     return {"ok": True}
 
 
-@sio.event
+@room_event
 async def admin_ten_seconds(sid, data=None):
     """
     Force 10 seconds left: play warning signal to everyone and reset timer to 10 seconds.
     Allowed only in DISCUSSION.
     """
+    room = current_room()
     if not await require_admin(sid):
         return
     deadline_ms = int(time.time() * 1000) + TEN_SECONDS * 1000
     try:
-        effects = transition_ten_seconds(app_state, deadline_ms=deadline_ms)
+        effects = transition_ten_seconds(room.state, deadline_ms=deadline_ms)
     except TransitionError as error:
         await _emit_transition_error(sid, error)
         return
     await _apply_transition_effects(effects)
 
-@sio.event
+@room_event
 async def admin_sound(sid, data):
     if not await require_admin(sid):
         return
@@ -2253,50 +3018,53 @@ async def admin_sound(sid, data):
         payload={"sound": data.get("sound")},
     )
     await emit_settings_update()
-    await sio.emit('play_sound', data)
+    await _emit_to_room("play_sound", data)
 
-@sio.event
+@room_event
 async def admin_volume(sid, data):
+    room = current_room()
     if not await require_admin(sid):
         return
     
     try:
         vol = float(data.get('volume', 1.0))
         vol = max(0.0, min(1.0, vol))
-        global_settings["volume"] = vol
+        room.settings["volume"] = vol
         await emit_settings_update()
     except ValueError:
         pass
 
-@sio.event
+@room_event
 async def admin_stop_sounds(sid):
+    room = current_room()
     if not await require_admin(sid):
         return
 
     media_stopped = False
     try:
         media_stopped = stop_shared_media(
-            app_state["presentation"].get("shared_media")
+            room.state["presentation"].get("shared_media")
         )
     except MediaPlaybackError:
         pass
-    blackbox_stopped = clear_blackbox_presentation(app_state)
+    blackbox_stopped = clear_blackbox_presentation(room.state)
 
     _supersede_sound_fade(mode="stopped")
     add_log("Звук остановлен", event_type="sounds_stopped")
     await emit_settings_update()
-    await sio.emit('stop_sound')
+    await _emit_to_room("stop_sound")
     if media_stopped or blackbox_stopped:
         await emit_state_update()
 
 
-@sio.event
+@room_event
 async def admin_fade_sounds(sid, data=None):
+    room = current_room()
     if not await require_admin(sid):
         return {"ok": False, "error": "not_admin"}
 
     generation = begin_fade(
-        global_settings["sound_control"],
+        room.settings["sound_control"],
         now_ms=_now_ms(),
         duration_ms=FADE_DURATION_MS,
     )
@@ -2312,7 +3080,7 @@ async def admin_fade_sounds(sid, data=None):
     # A later Play, Stop, Silence, spin, effect, or Fade advances generation.
     # The obsolete coroutine must not stop any sound from that later command.
     if not complete_fade(
-        global_settings["sound_control"],
+        room.settings["sound_control"],
         generation=generation,
     ):
         return {"ok": True, "completed": False}
@@ -2320,22 +3088,22 @@ async def admin_fade_sounds(sid, data=None):
     media_stopped = False
     try:
         media_stopped = stop_shared_media(
-            app_state["presentation"].get("shared_media")
+            room.state["presentation"].get("shared_media")
         )
     except MediaPlaybackError:
         pass
-    blackbox_stopped = clear_blackbox_presentation(app_state)
+    blackbox_stopped = clear_blackbox_presentation(room.state)
 
-    await sio.emit("stop_sound")
+    await _emit_to_room("stop_sound")
     await emit_settings_update()
     if media_stopped or blackbox_stopped:
         await emit_state_update()
     return {"ok": True, "completed": True}
 
-@sio.event
+@room_event
 async def admin_kick(sid, data):
     """Disconnect and remove one entire participant group."""
-    global players_list
+    room = current_room()
     
     if not await require_admin(sid):
         return
@@ -2345,35 +3113,27 @@ async def admin_kick(sid, data):
     if not group_id:
         return
     
-    group = next(
-        (
-            record for record in players_list
-            if record.get('group_id') == group_id and record.get('role') == 'player'
-        ),
-        None,
-    )
+    group = room.players.by_group(group_id)
     if not group:
         return
     
-    player_sid = group['sid']
+    player_sid = group.sid
     
     # Удаляем из списка
-    players_list = [
-        record for record in players_list
-        if record.get('group_id') != group_id
-    ]
+    room.players.remove(group)
+    await _set_audience(player_sid, None)
     
     add_log(
-        f"{group['name']} отключены ведущим",
+        f"{group.name} отключены ведущим",
         event_type="player_kicked",
         payload={
             "group_id": group_id,
-            "participants": [dict(item) for item in group["participants"]],
+            "participants": [item.as_dict() for item in group.participants],
         },
     )
     logger.info("Participant group %s kicked by admin", group_id)
     captain_effects = transition_clear_captain(
-        app_state,
+        room.state,
         expected_group_id=group_id,
         reason="player_kicked",
     )
@@ -2386,7 +3146,7 @@ async def admin_kick(sid, data):
     if captain_effects.events:
         await _apply_transition_effects(captain_effects)
 
-@sio.event
+@room_event
 async def admin_log(sid, data):
     if not await require_admin(sid):
         return
@@ -2397,80 +3157,165 @@ async def admin_log(sid, data):
         await emit_state_update()
 
 
+async def _flush_journal(journal: GameJournal) -> None:
+    """Wait for batched journal writes in a thread, not on the event loop.
+
+    Journal reads, mode changes and session ends flush first; once this has
+    returned, their own `flush()` has nothing left to wait for.
+    """
+    while journal.has_pending_writes():
+        await asyncio.to_thread(journal.flush)
+
+
 def _journal_error_payload(error: JournalError) -> dict:
     logger.warning("Rejected game journal action: %s", error)
     return {"ok": False, "error": "invalid_journal_action", "message": str(error)}
 
 
-@sio.event
+@room_event
 async def admin_get_game_history(sid, data=None):
     if not await require_admin(sid):
         return {"ok": False, "error": "not_admin"}
+    room = current_room()
     payload = data if isinstance(data, dict) else {}
     requested_mode = payload.get("mode", MODE_REGULAR)
     session_mode = None if requested_mode == "all" else requested_mode
     try:
+        await _flush_journal(room.journal)
         return {
             "ok": True,
-            "history": game_journal.snapshot(mode=session_mode),
+            "history": room.journal.snapshot(mode=session_mode),
         }
     except JournalError as error:
         return _journal_error_payload(error)
 
 
-@sio.event
+@room_event
 async def admin_get_game_session(sid, data):
     if not await require_admin(sid):
         return {"ok": False, "error": "not_admin"}
+    room = current_room()
     payload = data if isinstance(data, dict) else {}
     try:
+        await _flush_journal(room.journal)
         return {
             "ok": True,
-            "detail": game_journal.get_session(payload.get("session_id")),
+            "detail": room.journal.get_session(payload.get("session_id")),
         }
     except JournalError as error:
         return _journal_error_payload(error)
 
 
-@sio.event
+@room_event
+async def admin_list_game_sessions(sid, data=None):
+    if not await require_admin(sid):
+        return {"ok": False, "error": "not_admin"}
+    room = current_room()
+    payload = data if isinstance(data, dict) else {}
+    requested_mode = payload.get("mode", MODE_REGULAR)
+    try:
+        await _flush_journal(room.journal)
+        page = room.journal.page_sessions(
+            limit=payload.get("limit", 50),
+            cursor=payload.get("cursor"),
+            mode=None if requested_mode == "all" else requested_mode,
+            status=payload.get("status"),
+            pack_fingerprint=payload.get("pack_fingerprint"),
+            created_from=payload.get("created_from"),
+            created_before=payload.get("created_before"),
+        )
+    except JournalError as error:
+        return _journal_error_payload(error)
+    return {
+        "ok": True,
+        **page,
+        "current_session_id": room.journal.current_session_id(),
+        "current_mode": room.journal.current_mode(),
+    }
+
+
+@room_event
+async def admin_list_game_events(sid, data):
+    if not await require_admin(sid):
+        return {"ok": False, "error": "not_admin"}
+    room = current_room()
+    payload = data if isinstance(data, dict) else {}
+    try:
+        await _flush_journal(room.journal)
+        page = room.journal.page_events(
+            payload.get("session_id"),
+            limit=payload.get("limit", 200),
+            cursor=payload.get("cursor"),
+            event_types=payload.get("event_types"),
+        )
+    except JournalError as error:
+        return _journal_error_payload(error)
+    return {"ok": True, **page}
+
+
+@room_event
+async def admin_list_used_questions(sid, data=None):
+    if not await require_admin(sid):
+        return {"ok": False, "error": "not_admin"}
+    room = current_room()
+    payload = data if isinstance(data, dict) else {}
+    try:
+        await _flush_journal(room.journal)
+        page = room.journal.page_used_questions(
+            limit=payload.get("limit", 100),
+            cursor=payload.get("cursor"),
+        )
+    except JournalError as error:
+        return _journal_error_payload(error)
+    return {"ok": True, **page}
+
+
+@room_event
 async def admin_get_current_game_mode(sid, data=None):
     if not await require_admin(sid):
         return {"ok": False, "error": "not_admin"}
-    return {"ok": True, "mode": game_journal.current_mode()}
+    room = current_room()
+    return {"ok": True, "mode": room.journal.current_mode()}
 
 
-@sio.event
+@room_event
 async def admin_set_current_game_mode(sid, data):
     if not await require_admin(sid):
         return {"ok": False, "error": "not_admin"}
+    room = current_room()
     payload = data if isinstance(data, dict) else {}
     try:
-        mode = game_journal.set_current_mode(payload.get("mode"))
+        await _flush_journal(room.journal)
+        mode = room.journal.set_current_mode(payload.get("mode"))
         await _emit_current_game_mode_to_admins()
         return {"ok": True, "mode": mode}
     except JournalError as error:
         return _journal_error_payload(error)
 
 
-@sio.event
+@room_event
 async def admin_set_game_session_mode(sid, data):
     if not await require_admin(sid):
         return {"ok": False, "error": "not_admin"}
+    room = current_room()
     payload = data if isinstance(data, dict) else {}
     try:
-        mode = game_journal.set_session_mode(
+        await _flush_journal(room.journal)
+        mode = room.journal.set_session_mode(
             payload.get("session_id"),
             payload.get("mode"),
         )
         await _emit_current_game_mode_to_admins()
-        return {"ok": True, "mode": mode, "history": game_journal.snapshot()}
+        await _flush_journal(room.journal)
+        return {"ok": True, "mode": mode, "history": room.journal.snapshot()}
     except JournalError as error:
         return _journal_error_payload(error)
 
-@sio.event
+@room_event
 async def admin_reset(sid):
+    room = current_room()
     if not await require_admin(sid):
         return
 
-    effects = transition_reset(app_state)
+    effects = transition_reset(room.state)
     await _apply_transition_effects(effects)
@@ -2,7 +2,14 @@
 
 from __future__ import annotations
 
+import base64
+from collections.abc import Iterator, Mapping, MutableMapping
 from dataclasses import dataclass
+import hashlib
+import heapq
+import hmac
+import itertools
+import json
 from pathlib import Path
 from typing import Literal, Optional
 
@@ -12,6 +19,15 @@ from questions import Question, QuestionPack
 MediaScope = Literal["round", "part"]
 PlaybackState = Literal["stopped", "playing", "paused"]
 
+MEDIA_TOKENS_OPAQUE = "opaque"
+MEDIA_TOKENS_SIGNED = "signed"
+MEDIA_TOKEN_MODES = (MEDIA_TOKENS_OPAQUE, MEDIA_TOKENS_SIGNED)
+MIN_MEDIA_TOKEN_SECRET_LENGTH = 32
+
+MEDIA_PREFETCH_OFF = "off"
+MEDIA_PREFETCH_QUESTION = "question"
+MEDIA_PREFETCH_MODES = (MEDIA_PREFETCH_OFF, MEDIA_PREFETCH_QUESTION)
+
 
 @dataclass(frozen=True)
 class CurrentMedia:
@@ -25,6 +41,9 @@ class CurrentMedia:
     source_section: str
     order: int
     name: str
+    # From the pack's media manifest; `None` when unknown.
+    duration_ms: Optional[int] = None
+    size: Optional[int] = None
 
     def public_descriptor(self) -> dict:
         return {
@@ -33,6 +52,8 @@ class CurrentMedia:
             "section": self.section,
             "order": self.order,
             "name": self.name,
+            "duration_ms": self.duration_ms,
+            "bytes": self.size,
         }
 
 
@@ -87,6 +108,7 @@ def current_round_key(state: dict) -> Optional[tuple[int, str, int]]:
 
 def _add_question_media(
     catalog: dict[str, CurrentMedia],
+    pack: QuestionPack,
     question: Question,
     *,
     scope: MediaScope,
@@ -96,6 +118,10 @@ def _add_question_media(
     for item in question.media:
         if only_section is not None and item.section != only_section:
             continue
+        try:
+            manifest = pack.media_manifest.get(item.path.relative_to(pack.path).as_posix(), {})
+        except ValueError:
+            manifest = {}
         descriptor = CurrentMedia(
             media_ref=item.ref,
             type=item.type.value,
@@ -105,6 +131,8 @@ def _add_question_media(
             source_section=item.section,
             order=item.order,
             name=item.path.name,
+            duration_ms=manifest.get("duration_ms"),
+            size=manifest.get("size"),
         )
         catalog[descriptor.media_ref] = descriptor
 
@@ -114,7 +142,13 @@ def current_media_catalog(
     state: dict,
 ) -> dict[str, CurrentMedia]:
     """Return the exact media references selectable in the active round/part."""
-    key = current_round_key(state)
+    return _round_catalog(pack, current_round_key(state))
+
+
+def _round_catalog(
+    pack: Optional[QuestionPack],
+    key: Optional[tuple[int, str, int]],
+) -> dict[str, CurrentMedia]:
     if pack is None or key is None:
         return {}
 
@@ -128,16 +162,17 @@ def current_media_catalog(
     if kind in ("blitz", "superblitz"):
         _add_question_media(
             catalog,
+            pack,
             question,
             scope="round",
             only_section="question",
             section_override="intro",
         )
         if 0 <= part_index < len(question.parts):
-            _add_question_media(catalog, question.parts[part_index], scope="part")
+            _add_question_media(catalog, pack, question.parts[part_index], scope="part")
         return catalog
 
-    _add_question_media(catalog, question, scope="round")
+    _add_question_media(catalog, pack, question, scope="round")
     return catalog
 
 
@@ -146,7 +181,13 @@ def current_author_media(
     state: dict,
 ) -> Optional[CurrentAuthorMedia]:
     """Return the author card for the exact active normal question or part."""
-    key = current_round_key(state)
+    return _round_author(pack, current_round_key(state))
+
+
+def _round_author(
+    pack: Optional[QuestionPack],
+    key: Optional[tuple[int, str, int]],
+) -> Optional[CurrentAuthorMedia]:
     if pack is None or key is None:
         return None
 
@@ -204,6 +245,110 @@ def next_media_in_section(
     return min(candidates, key=lambda media: media.order, default=None)
 
 
+@dataclass(frozen=True)
+class RoundMedia:
+    """The media catalog and author card of one round context.
+
+    `next_refs` maps each media ref to its `next_media_in_section` ref, so the
+    share-next action does not rescan the catalog.
+    """
+
+    catalog: dict[str, CurrentMedia]
+    author: Optional[CurrentAuthorMedia]
+    next_refs: dict[str, str]
+
+    def next_in_section(self, current_ref: str) -> Optional[CurrentMedia]:
+        next_ref = self.next_refs.get(current_ref)
+        return self.catalog[next_ref] if next_ref is not None else None
+
+
+def prefetch_candidates(media: RoundMedia) -> list[CurrentMedia]:
+    """Audio and video of the round's question section, in share order.
+
+    Answer and comment media are never prefetched: a player could read them
+    from the browser cache before the host reveals them.
+    """
+    return sorted(
+        (
+            item
+            for item in media.catalog.values()
+            if item.source_section == "question" and item.type in ("audio", "video")
+        ),
+        key=lambda item: (item.scope != "round", item.order),
+    )
+
+
+def _next_refs(catalog: dict[str, CurrentMedia]) -> dict[str, str]:
+    sections: dict[tuple[str, str], list[CurrentMedia]] = {}
+    for media in catalog.values():
+        sections.setdefault((media.scope, media.source_section), []).append(media)
+
+    next_refs: dict[str, str] = {}
+    for items in sections.values():
+        items.sort(key=lambda media: media.order)
+        following: Optional[CurrentMedia] = None
+        for index in range(len(items) - 1, -1, -1):
+            media = items[index]
+            if index + 1 < len(items) and items[index + 1].order > media.order:
+                following = items[index + 1]
+            if following is not None:
+                next_refs[media.media_ref] = following.media_ref
+    return next_refs
+
+
+def round_media(pack: Optional[QuestionPack], state: dict) -> RoundMedia:
+    """Build the media catalog, author card and section order of the round."""
+    return round_media_for_key(pack, current_round_key(state))
+
+
+def round_media_for_key(
+    pack: Optional[QuestionPack],
+    key: Optional[tuple[int, str, int]],
+) -> RoundMedia:
+    """`round_media()` of the round with `key`, whatever the state says."""
+    catalog = _round_catalog(pack, key)
+    return RoundMedia(
+        catalog=catalog,
+        author=_round_author(pack, key),
+        next_refs=_next_refs(catalog),
+    )
+
+
+class RoundMediaCache:
+    """`round_media()` of the latest pack, round key and spin id.
+
+    One entry is enough for a game room: any other round context replaces it.
+    The pack fingerprint is only recomputed when a different pack is passed.
+    """
+
+    def __init__(self) -> None:
+        self._pack: Optional[QuestionPack] = None
+        self._fingerprint: Optional[str] = None
+        self._key: Optional[tuple] = None
+        self._media: Optional[RoundMedia] = None
+
+    def get(self, pack: Optional[QuestionPack], state: dict) -> RoundMedia:
+        if pack is not self._pack:
+            self._pack = pack
+            self._fingerprint = pack.fingerprint if pack is not None else None
+            self._media = None
+        key = (
+            self._fingerprint,
+            current_round_key(state),
+            state["wheel"].get("spin_id", 0),
+        )
+        if self._media is None or key != self._key:
+            self._key = key
+            self._media = round_media(pack, state)
+        return self._media
+
+    def invalidate(self) -> None:
+        self._pack = None
+        self._fingerprint = None
+        self._key = None
+        self._media = None
+
+
 def create_media_token_info(
     media: CurrentMedia,
     state: dict,
@@ -211,16 +356,31 @@ def create_media_token_info(
     expires_at: float,
 ) -> dict:
     """Create the server-side record stored behind an opaque media token."""
+    return _media_token_info(
+        media,
+        current_round_key(state),
+        state["wheel"].get("spin_id", 0),
+        expires_at,
+    )
+
+
+def _media_token_info(
+    media: CurrentMedia,
+    round_key: Optional[tuple[int, str, int]],
+    spin_id: int,
+    expires_at: float,
+) -> dict:
     return {
         "path": str(media.path),
         "type": media.type,
-        "round_key": current_round_key(state),
-        "spin_id": state["wheel"].get("spin_id", 0),
+        "round_key": round_key,
+        "spin_id": spin_id,
         "scope": media.scope,
         "section": media.section,
         "source_section": media.source_section,
         "media_ref": media.media_ref,
         "name": media.name,
+        "duration_ms": media.duration_ms,
         "expires_at": expires_at,
     }
 
@@ -232,11 +392,25 @@ def create_author_media_token_info(
     expires_at: float,
 ) -> dict:
     """Create a round/part-bound token for a private author preview."""
+    return _author_token_info(
+        author,
+        current_round_key(state),
+        state["wheel"].get("spin_id", 0),
+        expires_at,
+    )
+
+
+def _author_token_info(
+    author: CurrentAuthorMedia,
+    round_key: Optional[tuple[int, str, int]],
+    spin_id: int,
+    expires_at: float,
+) -> dict:
     return {
         "path": str(author.path) if author.path is not None else None,
         "type": "image",
-        "round_key": current_round_key(state),
-        "spin_id": state["wheel"].get("spin_id", 0),
+        "round_key": round_key,
+        "spin_id": spin_id,
         "scope": author.scope,
         "section": "author",
         "source_section": "author",
@@ -251,6 +425,204 @@ def create_author_media_token_info(
     }
 
 
+def _token_index_key(info: dict) -> tuple:
+    return (info.get("presentation_kind"), info.get("round_key"), info.get("spin_id"))
+
+
+class MediaTokenStore(MutableMapping):
+    """`media_id -> token info` with expiry order and a round/kind index.
+
+    A min-heap of `(expires_at, entry, media_id)` makes cleanup cost
+    proportional to the expired tokens. Heap entries of removed or replaced
+    tokens are skipped lazily, and a token whose `expires_at` was extended
+    after insertion is pushed back with its new expiry. `find()` returns the
+    tokens of one presentation kind, round key and spin without a scan.
+    """
+
+    def __init__(self, tokens: Optional[Mapping[str, dict]] = None) -> None:
+        self._tokens: dict[str, dict] = {}
+        self._entries: dict[str, int] = {}
+        self._heap: list[tuple[float, int, str]] = []
+        self._index: dict[tuple, dict[str, None]] = {}
+        self._counter = itertools.count()
+        self.update(tokens or {})
+
+    def __getitem__(self, media_id: str) -> dict:
+        return self._tokens[media_id]
+
+    def __setitem__(self, media_id: str, info: dict) -> None:
+        if media_id in self._tokens:
+            self._unindex(media_id)
+        entry = next(self._counter)
+        self._tokens[media_id] = info
+        self._entries[media_id] = entry
+        self._index.setdefault(_token_index_key(info), {})[media_id] = None
+        heapq.heappush(self._heap, (info.get("expires_at", 0), entry, media_id))
+        if len(self._heap) > 2 * len(self._tokens) + 64:
+            self._compact()
+
+    def __delitem__(self, media_id: str) -> None:
+        self._unindex(media_id)
+        del self._tokens[media_id]
+        del self._entries[media_id]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._tokens)
+
+    def __len__(self) -> int:
+        return len(self._tokens)
+
+    def __repr__(self) -> str:
+        return f"MediaTokenStore({self._tokens!r})"
+
+    def clear(self) -> None:
+        self._tokens.clear()
+        self._entries.clear()
+        self._heap.clear()
+        self._index.clear()
+
+    def _unindex(self, media_id: str) -> None:
+        key = _token_index_key(self._tokens[media_id])
+        bucket = self._index.get(key)
+        if bucket is not None:
+            bucket.pop(media_id, None)
+            if not bucket:
+                del self._index[key]
+
+    def _compact(self) -> None:
+        self._heap = [
+            (self._tokens[media_id].get("expires_at", 0), entry, media_id)
+            for media_id, entry in self._entries.items()
+        ]
+        heapq.heapify(self._heap)
+
+    def find(self, presentation_kind: Optional[str], round_key, spin_id) -> list[str]:
+        """Media ids of one presentation kind in one round and spin, oldest first."""
+        return list(self._index.get((presentation_kind, round_key, spin_id), ()))
+
+    def expire(self, now: float, *, keep: Optional[str] = None) -> list[str]:
+        """Drop tokens with `expires_at <= now`, except `keep`; return their ids."""
+        expired: list[str] = []
+        kept: list[tuple[float, int, str]] = []
+        while self._heap and self._heap[0][0] <= now:
+            item = heapq.heappop(self._heap)
+            _expires_at, entry, media_id = item
+            if self._entries.get(media_id) != entry:
+                continue
+            current_expiry = self._tokens[media_id].get("expires_at", 0)
+            if current_expiry > now:
+                heapq.heappush(self._heap, (current_expiry, entry, media_id))
+            elif media_id == keep:
+                kept.append(item)
+            else:
+                del self[media_id]
+                expired.append(media_id)
+        for item in kept:
+            heapq.heappush(self._heap, item)
+        return expired
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+class MediaTokenSigner:
+    """Stateless media tokens: signed claims instead of a `media_tokens` entry.
+
+    A token is `<claims>.<signature>` in URL-safe base64: compact JSON claims
+    and their HMAC-SHA256 under the server secret. The claims name the room
+    and its media epoch, the media reference and presentation kind, the round
+    key, spin id, scope and expiry. The file path and display fields are not
+    in the token; they are looked up in the pack again on every request.
+    """
+
+    def __init__(self, secret: str) -> None:
+        self._key = secret.encode("utf-8")
+
+    def _signature(self, payload: bytes) -> bytes:
+        return hmac.new(self._key, payload, hashlib.sha256).digest()
+
+    def sign(self, info: dict, *, room_id: str, epoch: int) -> str:
+        claims = {
+            "room": room_id,
+            "epoch": epoch,
+            "media_ref": info["media_ref"],
+            "kind": info.get("presentation_kind"),
+            "round_key": info["round_key"],
+            "spin_id": info["spin_id"],
+            "scope": info["scope"],
+            "expires_at": info["expires_at"],
+        }
+        if info.get("prefetch_sid") is not None:
+            claims["client"] = info["prefetch_sid"]
+        payload = json.dumps(claims, ensure_ascii=False, separators=(",", ":"))
+        payload_bytes = payload.encode("utf-8")
+        return f"{_b64encode(payload_bytes)}.{_b64encode(self._signature(payload_bytes))}"
+
+    def verify(self, token: object) -> Optional[dict]:
+        """Return the claims of an authentic token; expiry is not checked here."""
+        if not isinstance(token, str) or token.count(".") != 1:
+            return None
+        encoded_payload, encoded_signature = token.split(".")
+        try:
+            payload = _b64decode(encoded_payload)
+            signature = _b64decode(encoded_signature)
+        except ValueError:
+            return None
+        if not hmac.compare_digest(signature, self._signature(payload)):
+            return None
+        try:
+            claims = json.loads(payload)
+        except ValueError:
+            return None
+        return claims if isinstance(claims, dict) else None
+
+
+def signed_media_token_info(
+    claims: dict,
+    pack: Optional[QuestionPack],
+    *,
+    media: Optional[RoundMedia] = None,
+) -> Optional[dict]:
+    """Rebuild the token info of verified claims from the pack.
+
+    `media` is the room's current `RoundMedia`; without it the claimed round
+    is looked up directly. The result is then checked like an opaque token's
+    record, so a token from another round or spin still fails
+    `media_token_is_current()`.
+    """
+    raw_key = claims.get("round_key")
+    if not isinstance(raw_key, list) or len(raw_key) != 3:
+        return None
+    round_key = tuple(raw_key)
+    expires_at = claims.get("expires_at")
+    if not isinstance(expires_at, (int, float)):
+        return None
+    if media is None:
+        media = round_media_for_key(pack, round_key)
+
+    media_ref = claims.get("media_ref")
+    if claims.get("kind") == "author":
+        author = media.author
+        if author is None or author.media_ref != media_ref:
+            return None
+        info = _author_token_info(author, round_key, claims.get("spin_id"), expires_at)
+    else:
+        current = media.catalog.get(media_ref)
+        if current is None:
+            return None
+        info = _media_token_info(current, round_key, claims.get("spin_id"), expires_at)
+    if info["scope"] != claims.get("scope"):
+        return None
+    if claims.get("client") is not None:
+        info["prefetch_sid"] = claims["client"]
+    return info
+
+
 def media_token_is_current(
     info: dict,
     pack: Optional[QuestionPack],
@@ -258,8 +630,12 @@ def media_token_is_current(
     *,
     now_ts: float,
     allow_expired: bool = False,
+    media: Optional[RoundMedia] = None,
 ) -> bool:
-    """Validate expiry plus every current-round identity field of a token."""
+    """Validate expiry plus every current-round identity field of a token.
+
+    `media` is the already built `round_media(pack, state)`, if any.
+    """
     if not allow_expired and info.get("expires_at", 0) <= now_ts:
         return False
     if info.get("round_key") != current_round_key(state):
@@ -267,8 +643,11 @@ def media_token_is_current(
     if info.get("spin_id") != state["wheel"].get("spin_id", 0):
         return False
 
+    if media is None:
+        media = round_media(pack, state)
+
     if info.get("presentation_kind") == "author":
-        author = current_author_media(pack, state)
+        author = media.author
         if author is None:
             return False
         return all(
@@ -289,24 +668,29 @@ def media_token_is_current(
             )
         )
 
-    media_ref = info.get("media_ref")
-    media = current_media_catalog(pack, state).get(media_ref)
-    if media is None:
+    current = media.catalog.get(info.get("media_ref"))
+    if current is None:
         return False
 
     return all(
         (
-            info.get("path") == str(media.path),
-            info.get("type") == media.type,
-            info.get("scope") == media.scope,
-            info.get("section") == media.section,
-            info.get("source_section") == media.source_section,
-            info.get("name") == media.name,
+            info.get("path") == str(current.path),
+            info.get("type") == current.type,
+            info.get("scope") == current.scope,
+            info.get("section") == current.section,
+            info.get("source_section") == current.source_section,
+            info.get("name") == current.name,
         )
     )
 
 
-def create_shared_media(media_id: str, info: dict, *, has_next: bool = False) -> dict:
+def create_shared_media(
+    media_id: str,
+    info: dict,
+    *,
+    has_next: bool = False,
+    prefetch_key: Optional[str] = None,
+) -> dict:
     shared = {
         "media_id": media_id,
         "media_ref": info["media_ref"],
@@ -329,6 +713,8 @@ def create_shared_media(media_id: str, info: dict, *, has_next: bool = False) ->
                 "has_photo": bool(info.get("has_photo")),
             }
         )
+    if prefetch_key is not None:
+        shared["prefetch_key"] = prefetch_key
     return shared
 
 
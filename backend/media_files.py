@@ -0,0 +1,156 @@
+"""Delivery of authorized pack files: cached stat, validators, X-Accel-Redirect.
+
+`get_media` and the intro author photos authorize a request in Python and then
+hand the file to `MediaFileResponse`. Pack files do not change while a pack is
+loaded (the compiled-pack cache relies on that too), so their stat results and
+ETags are computed once per file and pack load. The ETag is the file's SHA-256
+from the pack manifest when the pack was loaded through `pack_cache`, and
+size plus mtime otherwise.
+
+Starlette's `FileResponse` already answers `Range` and `If-Range` with 206 or
+416 and streams through the ASGI `pathsend` extension when the server offers
+it. On top of that this module answers `If-None-Match` with 304 and, with an
+accel prefix, returns only an `X-Accel-Redirect` header so the Nginx in front
+of the backend sends the file itself with `sendfile`.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+from email.utils import formatdate
+import os
+from pathlib import Path
+import stat
+from typing import Callable, Optional
+from urllib.parse import quote
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.types import Receive, Scope, Send
+
+
+@dataclass(frozen=True)
+class MediaFile:
+    path: Path
+    # Path below the pack root, `None` for a file outside it.
+    relative_path: Optional[str]
+    stat: os.stat_result
+    etag: str
+
+
+class MediaFiles:
+    """Stat results and ETags of the loaded pack's files."""
+
+    def __init__(self) -> None:
+        self._root: Optional[Path] = None
+        self._hashes: Mapping[str, str] = {}
+        self._files: dict[str, MediaFile] = {}
+
+    def configure(self, root: Optional[Path], content_hashes: Mapping[str, str]) -> None:
+        """Start over for a newly loaded pack."""
+        self._root = Path(root).resolve() if root is not None else None
+        self._hashes = dict(content_hashes)
+        self._files.clear()
+
+    def get(self, path: str | Path) -> Optional[MediaFile]:
+        """The regular file at `path`, or `None`; misses are not cached."""
+        key = str(path)
+        cached = self._files.get(key)
+        if cached is not None:
+            return cached
+        file_path = Path(path)
+        try:
+            file_stat = file_path.stat()
+        except OSError:
+            return None
+        if not stat.S_ISREG(file_stat.st_mode):
+            return None
+
+        relative_path = None
+        if self._root is not None:
+            try:
+                relative_path = file_path.resolve().relative_to(self._root).as_posix()
+            except ValueError:
+                relative_path = None
+        digest = self._hashes.get(relative_path) if relative_path is not None else None
+        etag = (
+            f'"{digest[:32]}"'
+            if digest
+            else f'"{file_stat.st_size:x}-{file_stat.st_mtime_ns:x}"'
+        )
+        media_file = MediaFile(file_path, relative_path, file_stat, etag)
+        self._files[key] = media_file
+        return media_file
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an `If-None-Match` header, as RFC 9110 requires."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        candidate.strip().removeprefix("W/") == etag
+        for candidate in if_none_match.split(",")
+    )
+
+
+class MediaFileResponse(FileResponse):
+    """`FileResponse` of a `MediaFile` with 304 and X-Accel-Redirect support."""
+
+    def __init__(
+        self,
+        media_file: MediaFile,
+        *,
+        accel_prefix: Optional[str] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        on_complete: Optional[Callable[[], None]] = None,
+    ) -> None:
+        super().__init__(
+            media_file.path,
+            headers={"etag": media_file.etag, **(headers or {})},
+            stat_result=media_file.stat,
+        )
+        self.media_file = media_file
+        self.accel_prefix = accel_prefix if media_file.relative_path is not None else None
+        # Runs once the response is sent or the client went away.
+        self.on_complete = on_complete
+
+    def _validator_headers(self) -> dict[str, str]:
+        headers = {
+            "etag": self.media_file.etag,
+            "last-modified": formatdate(self.media_file.stat.st_mtime, usegmt=True),
+        }
+        if "cache-control" in self.headers:
+            headers["cache-control"] = self.headers["cache-control"]
+        return headers
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await self._send_file(scope, receive, send)
+        finally:
+            if self.on_complete is not None:
+                self.on_complete()
+
+    async def _send_file(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            request_headers = Headers(scope=scope)
+            if etag_matches(request_headers.get("if-none-match"), self.media_file.etag):
+                response = Response(status_code=304, headers=self._validator_headers())
+                await response(scope, receive, send)
+                return
+            if self.accel_prefix is not None:
+                response = Response(
+                    headers={
+                        **self._validator_headers(),
+                        "x-accel-redirect": self.accel_prefix + quote(self.media_file.relative_path),
+                    },
+                    media_type=self.media_type,
+                )
+                await response(scope, receive, send)
+                return
+        await super().__call__(scope, receive, send)
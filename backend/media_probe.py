@@ -0,0 +1,240 @@
+"""Playback durations read from audio/video container headers.
+
+Only the formats a pack may contain are understood: MP3, WAV and Ogg
+(Vorbis/Opus) audio, MP4 and WebM video. Each reader looks at the few header
+bytes that state the duration, so probing never decodes media and needs no
+external tool. A file that does not parse gets `None`, and the host's
+browser then reports the natural end as before.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+import struct
+from typing import BinaryIO, Callable, Optional
+
+
+def _mp4_duration_ms(source: BinaryIO, size: int) -> Optional[int]:
+    def boxes(start: int, end: int):
+        offset = start
+        while offset + 8 <= end:
+            source.seek(offset)
+            box_size, box_type = struct.unpack(">I4s", source.read(8))
+            header = 8
+            if box_size == 1:
+                box_size = struct.unpack(">Q", source.read(8))[0]
+                header = 16
+            elif box_size == 0:
+                box_size = end - offset
+            if box_size < header:
+                return
+            yield box_type, offset + header, offset + box_size
+            offset += box_size
+
+    for box_type, start, end in boxes(0, size):
+        if box_type != b"moov":
+            continue
+        for child_type, child_start, _child_end in boxes(start, end):
+            if child_type != b"mvhd":
+                continue
+            source.seek(child_start)
+            version = source.read(4)[0]
+            if version == 1:
+                _created, _modified, timescale, duration = struct.unpack(">QQIQ", source.read(28))
+            else:
+                _created, _modified, timescale, duration = struct.unpack(">IIII", source.read(16))
+            if not timescale:
+                return None
+            return duration * 1000 // timescale
+    return None
+
+
+def _read_vint(source: BinaryIO, *, keep_marker: bool) -> Optional[int]:
+    first = source.read(1)
+    if not first:
+        return None
+    length = 1
+    mask = 0x80
+    while length <= 8 and not first[0] & mask:
+        length += 1
+        mask >>= 1
+    if length > 8:
+        return None
+    value = first[0] if keep_marker else first[0] & (mask - 1)
+    for byte in source.read(length - 1):
+        value = (value << 8) | byte
+    if not keep_marker and value == (1 << (7 * length)) - 1:
+        return -1  # unknown size
+    return value
+
+
+_EBML_HEADER = 0x1A45DFA3
+_SEGMENT = 0x18538067
+_INFO = 0x1549A966
+_TIMECODE_SCALE = 0x2AD7B1
+_DURATION = 0x4489
+
+
+def _webm_duration_ms(source: BinaryIO, size: int) -> Optional[int]:
+    def elements(end: int):
+        while source.tell() < end:
+            element_id = _read_vint(source, keep_marker=True)
+            element_size = _read_vint(source, keep_marker=False)
+            if element_id is None or element_size is None:
+                return
+            start = source.tell()
+            stop = end if element_size < 0 else start + element_size
+            yield element_id, start, stop
+            source.seek(stop)
+
+    source.seek(0)
+    for element_id, start, stop in elements(size):
+        if element_id == _EBML_HEADER:
+            continue
+        if element_id != _SEGMENT:
+            return None
+        source.seek(start)
+        for child_id, child_start, child_stop in elements(stop):
+            if child_id != _INFO:
+                continue
+            source.seek(child_start)
+            scale_ns = 1_000_000
+            duration = None
+            for field_id, field_start, field_stop in elements(child_stop):
+                source.seek(field_start)
+                raw = source.read(field_stop - field_start)
+                if field_id == _TIMECODE_SCALE:
+                    scale_ns = int.from_bytes(raw, "big")
+                elif field_id == _DURATION and len(raw) in (4, 8):
+                    duration = struct.unpack(">f" if len(raw) == 4 else ">d", raw)[0]
+            if duration is None:
+                return None
+            return int(duration * scale_ns / 1_000_000)
+        return None
+    return None
+
+
+def _wav_duration_ms(source: BinaryIO, size: int) -> Optional[int]:
+    source.seek(12)
+    byte_rate = None
+    while source.tell() + 8 <= size:
+        chunk_id, chunk_size = struct.unpack("<4sI", source.read(8))
+        start = source.tell()
+        if chunk_id == b"fmt " and chunk_size >= 12:
+            byte_rate = struct.unpack("<HHII", source.read(12))[3]
+        elif chunk_id == b"data":
+            if not byte_rate:
+                return None
+            return min(chunk_size, size - start) * 1000 // byte_rate
+        source.seek(start + chunk_size + (chunk_size & 1))
+    return None
+
+
+def _ogg_duration_ms(source: BinaryIO, size: int) -> Optional[int]:
+    source.seek(0)
+    first_page = source.read(4096)
+    segments = first_page[26]
+    packet = first_page[27 + segments:]
+    pre_skip = 0
+    if packet.startswith(b"\x01vorbis"):
+        rate = struct.unpack_from("<I", packet, 12)[0]
+    elif packet.startswith(b"OpusHead"):
+        pre_skip = struct.unpack_from("<H", packet, 10)[0]
+        rate = 48_000  # Opus granules always count 48 kHz samples
+    else:
+        return None
+
+    tail_start = max(0, size - 65_536)
+    source.seek(tail_start)
+    tail = source.read()
+    last_page = tail.rfind(b"OggS")
+    if last_page < 0 or last_page + 14 > len(tail) or not rate:
+        return None
+    granule = struct.unpack_from("<q", tail, last_page + 6)[0]
+    return max(0, granule - pre_skip) * 1000 // rate
+
+
+_MP3_BITRATES_KBPS = {
+    # (MPEG-1, layer) and (MPEG-2/2.5, layer)
+    (1, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (1, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (1, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (2, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (2, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (2, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_MP3_SAMPLE_RATES = {
+    3: (44_100, 48_000, 32_000),  # MPEG-1
+    2: (22_050, 24_000, 16_000),  # MPEG-2
+    0: (11_025, 12_000, 8_000),  # MPEG-2.5
+}
+
+
+def _mp3_duration_ms(source: BinaryIO, size: int) -> Optional[int]:
+    source.seek(0)
+    start = 0
+    header = source.read(10)
+    if header.startswith(b"ID3") and len(header) == 10:
+        tag_size = 0
+        for byte in header[6:10]:
+            tag_size = (tag_size << 7) | (byte & 0x7F)
+        start = 10 + tag_size + (10 if header[5] & 0x10 else 0)
+    end = size
+    if size >= 128:
+        source.seek(size - 128)
+        if source.read(3) == b"TAG":
+            end -= 128
+
+    source.seek(start)
+    window = source.read(65_536)
+    for offset in range(len(window) - 4):
+        if window[offset] != 0xFF or window[offset + 1] & 0xE0 != 0xE0:
+            continue
+        version_bits = (window[offset + 1] >> 3) & 0x03
+        layer = 4 - ((window[offset + 1] >> 1) & 0x03)
+        bitrate_index = window[offset + 2] >> 4
+        rate_index = (window[offset + 2] >> 2) & 0x03
+        if version_bits == 1 or layer == 4 or bitrate_index in (0, 15) or rate_index == 3:
+            continue
+        mpeg1 = version_bits == 3
+        sample_rate = _MP3_SAMPLE_RATES[version_bits][rate_index]
+        bitrate = _MP3_BITRATES_KBPS[(1 if mpeg1 else 2, layer)][bitrate_index] * 1000
+        mono = (window[offset + 3] >> 6) == 3
+        samples = 384 if layer == 1 else (1152 if mpeg1 or layer == 2 else 576)
+
+        # A Xing/Info or VBRI header in the first frame counts the frames.
+        side_info = (17 if mono else 32) if mpeg1 else (9 if mono else 17)
+        xing = window[offset + 4 + side_info:offset + 4 + side_info + 12]
+        if xing[:4] in (b"Xing", b"Info") and len(xing) == 12 and xing[7] & 0x01:
+            frames = struct.unpack(">I", xing[8:12])[0]
+            return frames * samples * 1000 // sample_rate
+        vbri = window[offset + 36:offset + 54]
+        if vbri[:4] == b"VBRI" and len(vbri) == 18:
+            frames = struct.unpack(">I", vbri[14:18])[0]
+            return frames * samples * 1000 // sample_rate
+        # Constant bitrate: the audio bytes divided by the byte rate.
+        return (end - start - offset) * 8 * 1000 // bitrate
+    return None
+
+
+_PROBES: dict[str, Callable[[BinaryIO, int], Optional[int]]] = {
+    ".mp3": _mp3_duration_ms,
+    ".wav": _wav_duration_ms,
+    ".ogg": _ogg_duration_ms,
+    ".mp4": _mp4_duration_ms,
+    ".webm": _webm_duration_ms,
+}
+
+
+def probe_duration_ms(path: Path) -> Optional[int]:
+    """Duration of the audio/video file at `path` in ms, `None` when unknown."""
+    probe = _PROBES.get(Path(path).suffix.lower())
+    if probe is None:
+        return None
+    try:
+        with open(path, "rb") as source:
+            size = source.seek(0, 2)
+            duration = probe(source, size)
+    except (OSError, struct.error, IndexError, ValueError, OverflowError):
+        return None
+    return duration if duration is not None and duration > 0 else None
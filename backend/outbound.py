@@ -0,0 +1,288 @@
+"""Per-socket outbound queues that coalesce state for clients that fall behind.
+
+python-socketio hands every packet straight to the Engine.IO socket queue,
+which only empties as fast as the client reads. A phone on a bad connection
+therefore collects every `state_update` of a busy round and replays them one
+after another when it catches up, long after they stopped being true.
+
+`CoalescingServer` routes each outgoing packet through `OutboundQueues`. While
+the transport queue of a socket is short, packets go straight through. Once it
+reaches `TRANSPORT_HIGH_WATER`, new packets wait in a backlog, where a full
+`state_update`, `settings_update` or `players_update` replaces the older copies
+still waiting (a full state also replaces waiting `state_patch` packets). Every
+other packet, such as `play_sound` and `stop_sound`, stays in the backlog in
+order. The client therefore receives a subsequence of what was emitted, and
+every dropped packet was superseded by a later one it does receive.
+
+A drain task moves the backlog to the transport as it empties. A socket whose
+backlog stays non-empty for `slow_client_timeout` seconds, or holds more than
+`MAX_BACKLOG` packets, is disconnected; the client reconnects and restores a
+fresh state.
+
+The server also speaks MessagePack to clients that ask for it (see
+`wire_format`). Their packets are converted before they are queued, so they
+coalesce by the same event names.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+import inspect
+import logging
+import re
+import time
+from typing import Any, Callable, Optional
+
+from engineio import packet as eio_packet
+import socketio
+from socketio import packet as sio_packet
+from socketio.msgpack_packet import MsgPackPacket
+
+from wire_format import (
+    WIRE_MSGPACK,
+    MsgPackVariants,
+    msgpack_message,
+    packet_event_name,
+    requested_wire_format,
+)
+
+
+logger = logging.getLogger(__name__)
+
+# Event -> the waiting events that a new packet of it makes obsolete.
+COALESCED_EVENTS: dict[str, frozenset[str]] = {
+    "state_update": frozenset({"state_update", "state_patch"}),
+    "settings_update": frozenset({"settings_update"}),
+    "players_update": frozenset({"players_update"}),
+}
+TRANSPORT_HIGH_WATER = 16
+MAX_BACKLOG = 256
+DRAIN_INTERVAL_SECONDS = 0.05
+
+# A Socket.IO EVENT packet: type 2, optional namespace and ack id, then the
+# JSON array whose first item is the event name.
+_EVENT_PACKET = re.compile(r'2(?:/[^,]*,)?\d*\["([^"\\]*)"')
+
+
+def packet_event(pkt: eio_packet.Packet) -> Optional[str]:
+    """The Socket.IO event name carried by an Engine.IO message, if any."""
+    if pkt.packet_type != eio_packet.MESSAGE or not isinstance(pkt.data, str):
+        return None
+    match = _EVENT_PACKET.match(pkt.data)
+    return match.group(1) if match else None
+
+
+class _Backlog:
+    __slots__ = ("packets", "since", "drain")
+
+    def __init__(self, since: float) -> None:
+        # (event or None, packet) in emission order.
+        self.packets: deque[tuple[Optional[str], eio_packet.Packet]] = deque()
+        self.since = since
+        self.drain: Optional[asyncio.Task] = None
+
+
+class OutboundQueues:
+    """The backlogs of the sockets of one Engine.IO server."""
+
+    def __init__(
+        self,
+        eio: Any,
+        *,
+        slow_client_timeout: float,
+        high_water: int = TRANSPORT_HIGH_WATER,
+        max_backlog: int = MAX_BACKLOG,
+        drain_interval: float = DRAIN_INTERVAL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._eio = eio
+        self.slow_client_timeout = slow_client_timeout
+        self.high_water = high_water
+        self.max_backlog = max_backlog
+        self.drain_interval = drain_interval
+        self._clock = clock
+        self._backlogs: dict[str, _Backlog] = {}
+        self.coalesced = 0
+        self.slow_disconnects = 0
+
+    async def send(
+        self,
+        eio_sid: str,
+        pkt: eio_packet.Packet,
+        event: Optional[str] = None,
+    ) -> None:
+        """Send `pkt` now or queue it; `event` names a binary packet's event."""
+        socket = self._open_socket(eio_sid)
+        backlog = self._backlogs.get(eio_sid)
+        if socket is None or (backlog is None and socket.queue.qsize() < self.high_water):
+            # Engine.IO logs and drops packets for sockets that are gone.
+            await self._eio.send_packet(eio_sid, pkt)
+            return
+        if backlog is None:
+            backlog = self._backlogs[eio_sid] = _Backlog(self._clock())
+            backlog.drain = asyncio.create_task(self._drain(eio_sid, backlog))
+        self._enqueue(backlog, pkt, event if event is not None else packet_event(pkt))
+        if len(backlog.packets) > self.max_backlog:
+            await self._disconnect_slow(eio_sid, f"{len(backlog.packets)} packets waiting")
+
+    def depth(self, eio_sid: str) -> int:
+        """Packets not yet taken by the transport writer of `eio_sid`."""
+        socket = self._open_socket(eio_sid)
+        backlog = self._backlogs.get(eio_sid)
+        return (socket.queue.qsize() if socket is not None else 0) + (
+            len(backlog.packets) if backlog is not None else 0
+        )
+
+    def depths(self) -> dict[str, int]:
+        """Non-zero depths of every open socket, by Engine.IO sid."""
+        depths = {eio_sid: self.depth(eio_sid) for eio_sid in list(self._eio.sockets)}
+        return {eio_sid: depth for eio_sid, depth in depths.items() if depth}
+
+    def backlogged(self) -> int:
+        return len(self._backlogs)
+
+    def _open_socket(self, eio_sid: str) -> Any:
+        socket = self._eio.sockets.get(eio_sid)
+        return None if socket is None or socket.closed else socket
+
+    def _enqueue(self, backlog: _Backlog, pkt: eio_packet.Packet, event: Optional[str]) -> None:
+        superseded = COALESCED_EVENTS.get(event)
+        if superseded:
+            waiting = len(backlog.packets)
+            backlog.packets = deque(
+                item for item in backlog.packets if item[0] not in superseded
+            )
+            self.coalesced += waiting - len(backlog.packets)
+        backlog.packets.append((event, pkt))
+
+    async def _drain(self, eio_sid: str, backlog: _Backlog) -> None:
+        try:
+            while backlog.packets:
+                socket = self._open_socket(eio_sid)
+                if socket is None:
+                    return
+                if self._clock() - backlog.since > self.slow_client_timeout:
+                    await self._disconnect_slow(eio_sid, "behind for too long")
+                    return
+                while backlog.packets and socket.queue.qsize() < self.high_water:
+                    _event, pkt = backlog.packets.popleft()
+                    await socket.send(pkt)
+                if backlog.packets:
+                    await asyncio.sleep(self.drain_interval)
+        finally:
+            if self._backlogs.get(eio_sid) is backlog:
+                del self._backlogs[eio_sid]
+
+    async def _disconnect_slow(self, eio_sid: str, reason: str) -> None:
+        backlog = self._backlogs.pop(eio_sid, None)
+        if backlog is not None and backlog.drain is not asyncio.current_task():
+            backlog.drain.cancel()
+        self.slow_disconnects += 1
+        logger.warning("Disconnecting slow client %s: %s", eio_sid, reason)
+        await self._eio.disconnect(eio_sid)
+
+
+# Private `socketio.AsyncServer` coroutines that `CoalescingServer` overrides
+# or calls, with the parameters it passes. python-socketio may change them in
+# any release, so the server refuses to start when they no longer match.
+SERVER_HOOKS = {
+    "_handle_eio_connect": ("eio_sid", "environ"),
+    "_handle_eio_message": ("eio_sid", "data"),
+    "_handle_eio_disconnect": ("eio_sid", "reason"),
+    "_send_packet": ("eio_sid", "pkt"),
+    "_send_eio_packet": ("eio_sid", "eio_pkt"),
+    "_handle_connect": ("eio_sid", "namespace", "data"),
+    "_handle_disconnect": ("eio_sid", "namespace", "reason"),
+    "_handle_event": ("eio_sid", "namespace", "id", "data"),
+    "_handle_ack": ("eio_sid", "namespace", "id", "data"),
+}
+
+
+def check_server_hooks(server_class: type = socketio.AsyncServer) -> None:
+    """Raise `RuntimeError` if `server_class` lacks a hook of `SERVER_HOOKS`."""
+    for name, expected in SERVER_HOOKS.items():
+        method = getattr(server_class, name, None)
+        if method is None or not inspect.iscoroutinefunction(method):
+            raise RuntimeError(f"python-socketio no longer provides {name}()")
+        parameters = tuple(inspect.signature(method).parameters)[1:]
+        if parameters != expected:
+            raise RuntimeError(
+                f"python-socketio changed {name}{parameters}, expected {expected}"
+            )
+
+
+class CoalescingServer(socketio.AsyncServer):
+    """`socketio.AsyncServer` whose packets go through `OutboundQueues`.
+
+    Clients that asked for MessagePack in the handshake get their packets in
+    that format, and their messages are decoded with it.
+    """
+
+    def __init__(self, *args: Any, slow_client_timeout: float, **kwargs: Any) -> None:
+        check_server_hooks()
+        super().__init__(*args, **kwargs)
+        self.outbound = OutboundQueues(self.eio, slow_client_timeout=slow_client_timeout)
+        self.msgpack_sids: set[str] = set()
+        self._msgpack_variants = MsgPackVariants(self.packet_class)
+
+    async def _handle_eio_connect(self, eio_sid: str, environ: dict) -> Any:
+        if requested_wire_format(environ) == WIRE_MSGPACK:
+            self.msgpack_sids.add(eio_sid)
+        return await super()._handle_eio_connect(eio_sid, environ)
+
+    async def _handle_eio_message(self, eio_sid: str, data: Any) -> None:
+        if eio_sid not in self.msgpack_sids:
+            await super()._handle_eio_message(eio_sid, data)
+            return
+        if not isinstance(data, bytes):
+            raise ValueError("Expected a MessagePack packet")
+        pkt = MsgPackPacket(encoded_packet=data)
+        if pkt.packet_type == sio_packet.CONNECT:
+            await self._handle_connect(eio_sid, pkt.namespace, pkt.data)
+        elif pkt.packet_type == sio_packet.DISCONNECT:
+            await self._handle_disconnect(
+                eio_sid, pkt.namespace, self.reason.CLIENT_DISCONNECT
+            )
+        elif pkt.packet_type == sio_packet.EVENT:
+            await self._handle_event(eio_sid, pkt.namespace, pkt.id, pkt.data)
+        elif pkt.packet_type == sio_packet.ACK:
+            await self._handle_ack(eio_sid, pkt.namespace, pkt.id, pkt.data)
+        else:
+            raise ValueError("Unexpected MessagePack packet type")
+
+    async def _handle_eio_disconnect(self, eio_sid: str, reason: Any) -> None:
+        try:
+            await super()._handle_eio_disconnect(eio_sid, reason)
+        finally:
+            self.msgpack_sids.discard(eio_sid)
+
+    async def _send_packet(self, eio_sid: str, pkt: Any) -> None:
+        if eio_sid in self.msgpack_sids:
+            await self.outbound.send(eio_sid, msgpack_message(pkt), packet_event_name(pkt))
+            return
+        encoded = pkt.encode()
+        for data in encoded if isinstance(encoded, list) else [encoded]:
+            await self.outbound.send(eio_sid, eio_packet.Packet(eio_packet.MESSAGE, data=data))
+
+    async def _send_eio_packet(self, eio_sid: str, eio_pkt: eio_packet.Packet) -> None:
+        if eio_sid in self.msgpack_sids and isinstance(eio_pkt.data, str):
+            event, eio_pkt = self._msgpack_variants.get(eio_pkt)
+            await self.outbound.send(eio_sid, eio_pkt, event)
+            return
+        await self.outbound.send(eio_sid, eio_pkt)
+
+    def outbound_stats(self) -> dict[str, Any]:
+        """Queue depths by Socket.IO sid, the coalescing counters and wire formats."""
+        depths = {}
+        for eio_sid, depth in self.outbound.depths().items():
+            sid = self.manager.sid_from_eio_sid(eio_sid, "/") or eio_sid
+            depths[sid] = depth
+        return {
+            "depths": depths,
+            "max_depth": max(depths.values(), default=0),
+            "backlogged_sockets": self.outbound.backlogged(),
+            "coalesced": self.outbound.coalesced,
+            "slow_disconnects": self.outbound.slow_disconnects,
+            "msgpack_sockets": len(self.msgpack_sids),
+        }
@@ -0,0 +1,277 @@
+"""Compiled question packs cached on disk.
+
+Parsing a pack renders and sanitizes every Markdown section. After a successful
+parse the result is written as a versioned binary artifact together with a
+manifest of every file in the pack (size, mtime and SHA-256) and a media
+manifest with the size, hash and playback duration of every referenced media
+file. A later start loads the artifact instead of parsing when the pack path,
+the compiler (this format, the parser sources and the Markdown/nh3 versions)
+and the size and mtime of every pack file still match. Anything else, including a damaged
+artifact, falls back to a full parse.
+
+The artifact is zlib-compressed JSON behind a magic header, so loading it never
+executes code from the cache directory.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from importlib import metadata
+import json
+import os
+from pathlib import Path
+import struct
+import tempfile
+from typing import Optional
+import zlib
+
+import markdown
+
+from image_variants import VARIANTS_DIR_NAME
+from media_probe import probe_duration_ms
+from questions import Media, MediaType, Question, QuestionPack, QuestionType, parse_question_pack
+
+
+ARTIFACT_MAGIC = b"CHGKAPK\0"
+ARTIFACT_VERSION = 2
+ARTIFACT_NAME = ".chgka-compiled-pack"
+_HEADER = struct.Struct(">8sI")
+_COMPILER_SOURCES = ("questions.py", "safe_html.py", "media_probe.py")
+
+
+def artifact_path(pack_path: Path, cache_dir: Optional[Path] = None) -> Path:
+    """Where the compiled artifact of `pack_path` lives.
+
+    Without a cache directory the artifact is written next to the pack
+    folders; a shared cache directory keeps one file per pack path.
+    """
+    pack_path = Path(pack_path).resolve()
+    if cache_dir is None:
+        return pack_path / ARTIFACT_NAME
+    digest = hashlib.sha256(pack_path.as_posix().encode("utf-8")).hexdigest()[:16]
+    return Path(cache_dir) / f"pack-{digest}.chgkapack"
+
+
+def compiler_identity() -> str:
+    """Changes whenever the same files could compile to a different pack."""
+    backend_dir = Path(__file__).resolve().parent
+    digest = hashlib.sha256(str(ARTIFACT_VERSION).encode("ascii"))
+    digest.update(f"\0markdown={markdown.__version__}\0nh3={metadata.version('nh3')}".encode())
+    for name in _COMPILER_SOURCES:
+        digest.update(b"\0" + (backend_dir / name).read_bytes())
+    return digest.hexdigest()
+
+
+def _pack_files(pack_path: Path) -> list[tuple[str, os.stat_result, Path]]:
+    files = []
+    for path in pack_path.rglob("*"):
+        if path.name == ARTIFACT_NAME or not path.is_file():
+            continue
+        relative = path.relative_to(pack_path)
+        if relative.parts[0] == VARIANTS_DIR_NAME:
+            continue
+        files.append((relative.as_posix(), path.stat(), path))
+    return sorted(files, key=lambda item: item[0])
+
+
+def pack_manifest(pack_path: Path, *, with_hashes: bool = True) -> dict[str, dict]:
+    """`relative path -> {size, mtime_ns[, sha256]}` for every pack file."""
+    manifest = {}
+    for relative, stat, path in _pack_files(Path(pack_path).resolve()):
+        entry = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        if with_hashes:
+            entry["sha256"] = hashlib.sha256(path.read_bytes()).hexdigest()
+        manifest[relative] = entry
+    return manifest
+
+
+def _manifest_matches(stored: dict, current: dict) -> bool:
+    if stored.keys() != current.keys():
+        return False
+    return all(
+        stored[name]["size"] == entry["size"] and stored[name]["mtime_ns"] == entry["mtime_ns"]
+        for name, entry in current.items()
+    )
+
+
+def _content_hashes(manifest: dict) -> dict[str, str]:
+    return {name: entry["sha256"] for name, entry in manifest.items() if "sha256" in entry}
+
+
+def media_manifest(pack: QuestionPack, manifest: dict) -> dict[str, dict]:
+    """`relative path -> {type, size, sha256, duration_ms}` of every media reference.
+
+    Durations are read from audio/video headers; images and files whose
+    header does not parse get `None`.
+    """
+    entries = {}
+    for question in pack.questions:
+        for item in [question, *question.parts]:
+            for media in item.media:
+                relative = media.path.relative_to(pack.path).as_posix()
+                if relative in entries:
+                    continue
+                file_entry = manifest.get(relative, {})
+                entries[relative] = {
+                    "type": media.type.value,
+                    "size": file_entry.get("size", media.path.stat().st_size),
+                    "sha256": file_entry.get("sha256"),
+                    "duration_ms": (
+                        probe_duration_ms(media.path)
+                        if media.type in (MediaType.AUDIO, MediaType.VIDEO)
+                        else None
+                    ),
+                }
+    return entries
+
+
+def _relative(path: Optional[Path], root: Path) -> Optional[str]:
+    return None if path is None else path.relative_to(root).as_posix()
+
+
+def _question_to_dict(question: Question, root: Path) -> dict:
+    return {
+        "id": question.id,
+        "title": question.title,
+        "question_html": question.question_html,
+        "answer_html": question.answer_html,
+        "author": question.author,
+        "city": question.city,
+        "author_photo": _relative(question.author_photo, root),
+        "blackbox": question.blackbox,
+        "comment_html": question.comment_html,
+        "sources_html": question.sources_html,
+        "media": [
+            {
+                "type": item.type.value,
+                "path": _relative(item.path, root),
+                "section": item.section,
+                "order": item.order,
+                "ref": item.ref,
+            }
+            for item in question.media
+        ],
+        "type": question.type.value,
+        "parts": [_question_to_dict(part, root) for part in question.parts],
+    }
+
+
+def _question_from_dict(data: dict, root: Path) -> Question:
+    return Question(
+        id=data["id"],
+        title=data["title"],
+        question_html=data["question_html"],
+        answer_html=data["answer_html"],
+        author=data["author"],
+        city=data["city"],
+        author_photo=None if data["author_photo"] is None else root / data["author_photo"],
+        blackbox=data["blackbox"],
+        comment_html=data["comment_html"],
+        sources_html=data["sources_html"],
+        media=[
+            Media(
+                type=MediaType(item["type"]),
+                path=root / item["path"],
+                section=item["section"],
+                order=item["order"],
+                ref=item["ref"],
+            )
+            for item in data["media"]
+        ],
+        type=QuestionType(data["type"]),
+        parts=[_question_from_dict(part, root) for part in data["parts"]],
+    )
+
+
+def write_compiled_pack(
+    pack: QuestionPack,
+    destination: Path,
+    *,
+    manifest: Optional[dict] = None,
+) -> Path:
+    """Atomically write `pack` to `destination`.
+
+    Pass the manifest taken before parsing, so a file edited during the parse
+    invalidates the artifact instead of being hidden by it.
+    """
+    root = pack.path
+    manifest = pack_manifest(root) if manifest is None else manifest
+    document = {
+        "pack_path": root.as_posix(),
+        "compiler": compiler_identity(),
+        "manifest": manifest,
+        "media_manifest": pack.media_manifest or media_manifest(pack, manifest),
+        "intro_html": pack.intro_html,
+        "questions": [_question_to_dict(question, root) for question in pack.questions],
+    }
+    payload = zlib.compress(
+        json.dumps(document, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    )
+    destination = Path(destination)
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    descriptor, temporary = tempfile.mkstemp(dir=destination.parent, prefix=".chgkapack-")
+    try:
+        with os.fdopen(descriptor, "wb") as output:
+            output.write(_HEADER.pack(ARTIFACT_MAGIC, ARTIFACT_VERSION))
+            output.write(payload)
+        os.replace(temporary, destination)
+    except BaseException:
+        Path(temporary).unlink(missing_ok=True)
+        raise
+    return destination
+
+
+def load_compiled_pack(pack_path: Path, source: Path) -> Optional[QuestionPack]:
+    """The cached pack, or `None` when the artifact is missing or stale."""
+    root = Path(pack_path).resolve()
+    try:
+        data = Path(source).read_bytes()
+    except OSError:
+        return None
+    if len(data) < _HEADER.size:
+        return None
+    magic, version = _HEADER.unpack_from(data)
+    if magic != ARTIFACT_MAGIC or version != ARTIFACT_VERSION:
+        return None
+    try:
+        document = json.loads(zlib.decompress(data[_HEADER.size:]))
+        if document["pack_path"] != root.as_posix() or document["compiler"] != compiler_identity():
+            return None
+        if not _manifest_matches(document["manifest"], pack_manifest(root, with_hashes=False)):
+            return None
+        return QuestionPack(
+            questions=[_question_from_dict(item, root) for item in document["questions"]],
+            path=root,
+            intro_html=document["intro_html"],
+            content_hashes=_content_hashes(document["manifest"]),
+            media_manifest=document["media_manifest"],
+        )
+    except (ValueError, KeyError, TypeError, zlib.error):
+        return None
+
+
+def load_question_pack(
+    pack_path: Path,
+    *,
+    cache_dir: Optional[Path] = None,
+) -> tuple[QuestionPack, bool, Optional[OSError]]:
+    """Load a pack from its compiled artifact or parse and compile it.
+
+    Returns `(pack, loaded_from_cache, write_error)`. A cache that cannot be
+    written (for example a read-only pack mount) does not stop the load. The
+    pack's `content_hashes` and `media_manifest` are filled either way.
+    """
+    root = Path(pack_path).resolve()
+    destination = artifact_path(root, cache_dir)
+    cached = load_compiled_pack(root, destination)
+    if cached is not None:
+        return cached, True, None
+    manifest = pack_manifest(root)
+    pack = parse_question_pack(root)
+    pack.content_hashes = _content_hashes(manifest)
+    pack.media_manifest = media_manifest(pack, manifest)
+    try:
+        write_compiled_pack(pack, destination, manifest=manifest)
+    except OSError as error:
+        return pack, False, error
+    return pack, False, None
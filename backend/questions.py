@@ -5,6 +5,7 @@ Question format: Markdown files with YAML frontmatter.
 See fixtures/sample_questions for examples.
 """
 
+from concurrent.futures import ProcessPoolExecutor
 import hashlib
 import re
 import uuid
@@ -520,6 +521,12 @@ class QuestionPack:
     questions: list[Question]
     path: Path  # path to the pack folder
     intro_html: Optional[str] = None  # admin-only intro speech
+    # relative file path -> SHA-256, filled from the compiled-pack manifest
+    content_hashes: dict[str, str] = field(default_factory=dict, compare=False, repr=False)
+    # relative media path -> {type, size, sha256, duration_ms}, see pack_cache
+    media_manifest: dict[str, dict] = field(default_factory=dict, compare=False, repr=False)
+    # relative image path -> variant name -> downscaled file, see image_variants
+    image_variants: dict[str, dict[str, Path]] = field(default_factory=dict, compare=False, repr=False)
     
     def get_by_sector(self, sector: int) -> Question:
         """Get question by sector number (1-13)."""
@@ -559,16 +566,49 @@ def _validate_pack_authors(question: Question) -> None:
             )
 
 
+def _parse_sector(pack_folder: Path, sector: int, require_ids: bool) -> Question:
+    qdir = pack_folder / f"{sector:02d}"
+    if not qdir.exists() or not qdir.is_dir():
+        raise QuestionParseError(f"Missing question folder for sector {sector}: {qdir}")
+    try:
+        question = parse_question(qdir, require_id=require_ids)
+        _validate_pack_authors(question)
+    except QuestionParseError as e:
+        raise QuestionParseError(f"Failed to parse sector {sector} ({qdir}): {e}") from e
+    return question
+
+
+def _parse_sectors(pack_folder: Path, *, require_ids: bool, workers: int) -> list[Question]:
+    sectors = range(1, 14)
+    if workers == 1:
+        return [_parse_sector(pack_folder, sector, require_ids) for sector in sectors]
+    with ProcessPoolExecutor(max_workers=min(workers, len(sectors))) as executor:
+        futures = [
+            executor.submit(_parse_sector, pack_folder, sector, require_ids)
+            for sector in sectors
+        ]
+        try:
+            # Results are collected in sector order, so the reported error is
+            # the one of the lowest failing sector, as in the sequential loop.
+            return [future.result() for future in futures]
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+
 def parse_question_pack(
     pack_folder: Path,
     *,
     require_ids: bool = True,
+    workers: int = 1,
 ) -> QuestionPack:
     """
     Parse a question pack from a folder containing 13 question subfolders: 01..13.
 
     Args:
         pack_folder: Path to pack folder
+        workers: Processes that render sectors in parallel; 1 parses in-process
 
     Returns:
         QuestionPack with questions ordered by sector (index 0 = sector 1)
@@ -576,6 +616,8 @@ def parse_question_pack(
     Raises:
         QuestionParseError: If the pack structure is invalid or any question fails to parse.
     """
+    if not isinstance(workers, int) or isinstance(workers, bool) or workers < 1:
+        raise ValueError("workers must be a positive integer")
     pack_folder = Path(pack_folder)
     if not pack_folder.exists() or not pack_folder.is_dir():
         raise QuestionParseError(f"Pack folder does not exist: {pack_folder}")
@@ -621,17 +663,7 @@ def parse_question_pack(
             markdown.markdown(intro_md, extensions=["extra", "sane_lists"])
         )
 
-    questions: list[Question] = []
-    for sector in range(1, 14):
-        qdir = pack_folder / f"{sector:02d}"
-        if not qdir.exists() or not qdir.is_dir():
-            raise QuestionParseError(f"Missing question folder for sector {sector}: {qdir}")
-        try:
-            question = parse_question(qdir, require_id=require_ids)
-            _validate_pack_authors(question)
-            questions.append(question)
-        except QuestionParseError as e:
-            raise QuestionParseError(f"Failed to parse sector {sector} ({qdir}): {e}") from e
+    questions = _parse_sectors(pack_folder, require_ids=require_ids, workers=workers)
 
     question_ids = [
         question_id
@@ -0,0 +1,276 @@
+"""The connection roster of one game, indexed by every key it is looked up by.
+
+The roster used to be a list of dicts that each handler scanned: reconnects
+by player token, `join_game` and `disconnect` by sid, respondent selection by
+participant id, approval and kick by group id. A `Roster` keeps the records
+in join order and maintains a dict per key, so each of those lookups is O(1)
+however many groups an evening accumulates.
+
+Records are `__slots__` objects instead of dicts; `as_dict()` gives the
+fields as a plain dict for payloads and tests. A reconnect moves a record to a new sid through `Roster.rebind`;
+tokens, group ids and participants are fixed once a record is added. A group
+goes offline and back through `Roster.set_online`, which keeps the groups in
+the order they went offline for `Roster.evict`; the remaining fields are plain
+attributes.
+
+Groups are never removed just for disconnecting, so a long evening or a client
+that opens fresh tabs would grow the roster without bound. `evict` drops
+groups that have been offline longer than a TTL and, above a group limit, the
+longest-offline ones, sparing the protected groups (captain and respondent).
+Only a count and the last few names of evicted groups are kept.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+import time
+from typing import Any, Callable, Iterable, Iterator, Optional, Union
+
+
+EVICTED_OFFLINE = "offline"
+EVICTED_OVER_LIMIT = "over_limit"
+RECENT_EVICTIONS = 5
+
+
+class _SlotRecord:
+    __slots__ = ()
+    _FIELDS: tuple[str, ...] = ()
+
+    def as_dict(self) -> dict[str, Any]:
+        fields = {name: getattr(self, name) for name in self._FIELDS}
+        if "participants" in fields:
+            fields["participants"] = [item.as_dict() for item in fields["participants"]]
+        return fields
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.as_dict()!r})"
+
+
+class Participant(_SlotRecord):
+    """One physical player inside a group; the id is what actions refer to."""
+
+    __slots__ = ("id", "name")
+    _FIELDS = ("id", "name")
+
+    def __init__(self, id: str, name: str) -> None:
+        self.id = id
+        self.name = name
+
+
+class AdminRecord(_SlotRecord):
+    __slots__ = ("sid", "name", "token", "online")
+    _FIELDS = ("sid", "name", "role", "token", "online")
+    role = "admin"
+
+    def __init__(self, *, sid: str, name: str, token: Optional[str], online: bool = True) -> None:
+        self.sid = sid
+        self.name = name
+        self.token = token
+        self.online = online
+
+
+class GroupRecord(_SlotRecord):
+    """A browser login: one sid and reconnect token for fixed participants."""
+
+    __slots__ = (
+        "sid",
+        "name",
+        "token",
+        "group_id",
+        "participants",
+        "online",
+        "pending",
+        "offline_since",
+    )
+    _FIELDS = ("sid", "name", "role", "token", "group_id", "participants", "online", "pending")
+    role = "player"
+
+    def __init__(
+        self,
+        *,
+        sid: str,
+        name: str,
+        token: Optional[str],
+        group_id: Optional[str],
+        participants: Iterable[Participant] = (),
+        online: bool = True,
+        pending: bool = False,
+    ) -> None:
+        self.sid = sid
+        self.name = name
+        self.token = token
+        self.group_id = group_id
+        self.participants = list(participants)
+        self.online = online
+        self.pending = pending
+        # Set by the roster while the group is offline; not part of `as_dict()`.
+        self.offline_since: Optional[float] = None
+
+
+RosterRecord = Union[AdminRecord, GroupRecord]
+
+
+class Roster:
+    """Admin and group records in join order with O(1) lookups."""
+
+    def __init__(self, *, clock: Callable[[], float] = time.time) -> None:
+        self._clock = clock
+        # id(record) -> record; a dict keeps join order and removes in O(1).
+        self._records: dict[int, RosterRecord] = {}
+        self._admins: dict[int, AdminRecord] = {}
+        # An admin socket may also have joined as a group, so one sid can
+        # belong to more than one record.
+        self._by_sid: dict[str, list[RosterRecord]] = {}
+        self._by_token: dict[str, GroupRecord] = {}
+        self._by_group: dict[str, GroupRecord] = {}
+        self._by_participant: dict[str, tuple[GroupRecord, Participant]] = {}
+        # Offline groups, in the order they went offline.
+        self._offline: dict[int, GroupRecord] = {}
+        self.evicted_count = 0
+        self.recent_evictions: deque[dict[str, str]] = deque(maxlen=RECENT_EVICTIONS)
+
+    def add(self, record: RosterRecord) -> RosterRecord:
+        self._records[id(record)] = record
+        self._by_sid.setdefault(record.sid, []).append(record)
+        if isinstance(record, AdminRecord):
+            self._admins[id(record)] = record
+        else:
+            if record.token:
+                self._by_token[record.token] = record
+            if record.group_id:
+                self._by_group[record.group_id] = record
+            for participant in record.participants:
+                self._by_participant[participant.id] = (record, participant)
+            if not record.online:
+                record.offline_since = self._clock()
+                self._offline[id(record)] = record
+        return record
+
+    def remove(self, record: RosterRecord) -> None:
+        if self._records.pop(id(record), None) is None:
+            return
+        self._unindex_sid(record)
+        if isinstance(record, AdminRecord):
+            del self._admins[id(record)]
+        else:
+            if self._by_token.get(record.token) is record:
+                del self._by_token[record.token]
+            if self._by_group.get(record.group_id) is record:
+                del self._by_group[record.group_id]
+            for participant in record.participants:
+                if self._by_participant.get(participant.id, (None,))[0] is record:
+                    del self._by_participant[participant.id]
+            self._offline.pop(id(record), None)
+
+    def set_online(self, record: RosterRecord, online: bool) -> None:
+        record.online = online
+        if not isinstance(record, GroupRecord) or id(record) not in self._records:
+            return
+        if online:
+            record.offline_since = None
+            self._offline.pop(id(record), None)
+        elif id(record) not in self._offline:
+            record.offline_since = self._clock()
+            self._offline[id(record)] = record
+
+    def group_count(self) -> int:
+        return len(self._records) - len(self._admins)
+
+    def evict(
+        self,
+        *,
+        offline_ttl: float,
+        max_groups: int,
+        reserve: int = 0,
+        protected: Iterable[Optional[str]] = (),
+    ) -> list[tuple[GroupRecord, str]]:
+        """Remove stale offline groups and return them with the reason.
+
+        Groups offline for `offline_ttl` seconds go first. Then, while the
+        groups plus `reserve` new ones would exceed `max_groups`, the
+        longest-offline groups go. Online groups and groups whose id is in
+        `protected` are never evicted, so the limit can still be exceeded.
+        """
+        protected = set(protected)
+        cutoff = self._clock() - offline_ttl
+        evicted = []
+        for record in list(self._offline.values()):
+            if record.offline_since > cutoff:
+                break
+            if record.group_id not in protected:
+                evicted.append((record, EVICTED_OFFLINE))
+                self.remove(record)
+        excess = self.group_count() + reserve - max_groups
+        for record in list(self._offline.values()):
+            if excess <= 0:
+                break
+            if record.group_id not in protected:
+                evicted.append((record, EVICTED_OVER_LIMIT))
+                self.remove(record)
+                excess -= 1
+        self.evicted_count += len(evicted)
+        self.recent_evictions.extend(
+            {"name": record.name, "reason": reason} for record, reason in evicted
+        )
+        return evicted
+
+    def eviction_summary(self) -> dict[str, Any]:
+        """What the admin sees of evicted groups instead of their rows."""
+        return {"count": self.evicted_count, "recent": list(self.recent_evictions)}
+
+    def rebind(self, record: RosterRecord, sid: str) -> None:
+        """Move `record` to the socket that reconnected or took it over."""
+        if record.sid == sid:
+            return
+        self._unindex_sid(record)
+        record.sid = sid
+        self._by_sid.setdefault(sid, []).append(record)
+
+    def _unindex_sid(self, record: RosterRecord) -> None:
+        remaining = [item for item in self._by_sid.get(record.sid, ()) if item is not record]
+        if remaining:
+            self._by_sid[record.sid] = remaining
+        else:
+            self._by_sid.pop(record.sid, None)
+
+    def by_sid(self, sid: str) -> Optional[RosterRecord]:
+        records = self._by_sid.get(sid)
+        return records[0] if records else None
+
+    def group_by_sid(self, sid: str) -> Optional[GroupRecord]:
+        return next(
+            (record for record in self._by_sid.get(sid, ()) if isinstance(record, GroupRecord)),
+            None,
+        )
+
+    def with_sid(self, sid: str) -> list[RosterRecord]:
+        return list(self._by_sid.get(sid, ()))
+
+    def by_token(self, token: object) -> Optional[GroupRecord]:
+        return self._by_token.get(token) if isinstance(token, str) else None
+
+    def by_group(self, group_id: object) -> Optional[GroupRecord]:
+        return self._by_group.get(group_id) if isinstance(group_id, str) else None
+
+    def by_participant(self, participant_id: object) -> Optional[tuple[GroupRecord, Participant]]:
+        if not isinstance(participant_id, str):
+            return None
+        return self._by_participant.get(participant_id)
+
+    def admins(self) -> list[AdminRecord]:
+        return list(self._admins.values())
+
+    def admin(self) -> Optional[AdminRecord]:
+        return next(iter(self._admins.values()), None)
+
+    def groups(self) -> Iterator[GroupRecord]:
+        return (record for record in self._records.values() if isinstance(record, GroupRecord))
+
+    def __iter__(self) -> Iterator[RosterRecord]:
+        return iter(list(self._records.values()))
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __repr__(self) -> str:
+        return f"Roster({list(self)!r})"
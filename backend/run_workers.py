@@ -0,0 +1,104 @@
+"""Start one Uvicorn process per backend worker.
+
+Worker `i` listens on `--base-port + i` and owns the rooms that the frontend
+Nginx `hash` sends to its upstream server `i`. Interrupted sessions are
+recovered once here, before any worker accepts a game. When one worker exits
+the others are stopped as well, so the container restart policy brings back
+a consistent set.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+
+from config import load_app_config
+from game_journal import MODE_DEBUG, MODE_REGULAR, GameJournal
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m run_workers",
+        description="Run CHGKA_WORKERS Uvicorn workers on consecutive ports.",
+    )
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--base-port", type=int, default=8000)
+    # Any other argument, for example --no-access-log, is passed to Uvicorn.
+    return parser
+
+
+def worker_command(index: int, *, host: str, base_port: int, extra: list[str]) -> list[str]:
+    return [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        "main:app",
+        "--host",
+        host,
+        "--port",
+        str(base_port + index),
+        *extra,
+    ]
+
+
+def _recover_sessions() -> None:
+    config = load_app_config()
+    journal = GameJournal(
+        config.database_path,
+        default_mode=MODE_DEBUG if config.is_development else MODE_REGULAR,
+    )
+    try:
+        journal.initialize()
+        recovered = journal.recover_interrupted_sessions()
+    finally:
+        journal.close()
+    if recovered:
+        print(f"Marked {recovered} unfinished game session(s) as interrupted", flush=True)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args, uvicorn_args = _build_parser().parse_known_args(argv)
+    config = load_app_config()
+    if config.workers == 1:
+        os.execv(
+            sys.executable,
+            worker_command(0, host=args.host, base_port=args.base_port, extra=uvicorn_args),
+        )
+
+    _recover_sessions()
+    processes = [
+        subprocess.Popen(
+            worker_command(
+                index,
+                host=args.host,
+                base_port=args.base_port,
+                extra=uvicorn_args,
+            ),
+            env={**os.environ, "CHGKA_WORKER_INDEX": str(index)},
+        )
+        for index in range(config.workers)
+    ]
+
+    def stop(_signum=None, _frame=None) -> None:
+        for process in processes:
+            if process.poll() is None:
+                process.terminate()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    try:
+        while all(process.poll() is None for process in processes):
+            time.sleep(0.5)
+    finally:
+        stop()
+        for process in processes:
+            process.wait()
+    return max(abs(process.returncode) for process in processes)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,92 @@
+"""Running game rooms in several backend worker processes.
+
+Every room lives in exactly one worker. The frontend Nginx chooses the worker
+with `hash $chgka_room`, and `room_worker()` reproduces that choice so a worker
+can refuse rooms that belong to another process instead of silently starting a
+second copy of the game.
+
+Socket.IO emits travel through a pub/sub client manager, so a broadcast or a
+`to=sid` emit reaches the socket whichever worker holds it. Production uses a
+Redis-compatible server; `memory://` is an in-process stand-in for tests and
+single-process development.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, AsyncIterator, Optional
+from urllib.parse import urlsplit
+import zlib
+
+import socketio
+from socketio.async_pubsub_manager import AsyncPubSubManager
+
+
+PUBSUB_CHANNEL = "chgka"
+MEMORY_PUBSUB_SCHEME = "memory"
+REDIS_PUBSUB_SCHEMES = ("redis", "rediss", "valkey", "valkeys")
+PUBSUB_SCHEMES = (MEMORY_PUBSUB_SCHEME, *REDIS_PUBSUB_SCHEMES)
+
+
+def room_worker(room_id: str, workers: int) -> int:
+    """Index of the worker that Nginx `hash` sends `room_id` to.
+
+    Nginx's generic hash is compatible with Cache::Memcached: the first choice
+    among equally weighted servers is `((crc32(key) >> 16) & 0x7fff) % n`.
+    """
+    if workers <= 1:
+        return 0
+    return ((zlib.crc32(room_id.encode("utf-8")) >> 16) & 0x7FFF) % workers
+
+
+class InProcessBus:
+    """Fan-out message bus shared by client managers of one process."""
+
+    def __init__(self) -> None:
+        self._queues: list[asyncio.Queue] = []
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue()
+        self._queues.append(queue)
+        return queue
+
+    def publish(self, message: str) -> None:
+        for queue in self._queues:
+            queue.put_nowait(message)
+
+
+class InProcessManager(AsyncPubSubManager):
+    """`AsyncPubSubManager` over an `InProcessBus`.
+
+    Messages are encoded exactly like the Redis manager does, so tests cover
+    the same serialization path as production.
+    """
+
+    name = "inprocess"
+
+    def __init__(self, bus: InProcessBus, channel: str = PUBSUB_CHANNEL, **kwargs: Any):
+        super().__init__(channel=channel, **kwargs)
+        self._bus = bus
+        self._queue = bus.subscribe()
+
+    async def _publish(self, data: Any) -> None:
+        self._bus.publish(self.json.dumps(data))
+
+    async def _listen(self) -> AsyncIterator[str]:
+        while True:
+            yield await self._queue.get()
+
+
+_memory_bus = InProcessBus()
+
+
+def create_client_manager(url: Optional[str]) -> Optional[socketio.AsyncManager]:
+    """Client manager for `CHGKA_PUBSUB_URL`, or `None` for the local default."""
+    if not url:
+        return None
+    scheme = urlsplit(url).scheme.lower()
+    if scheme == MEMORY_PUBSUB_SCHEME:
+        return InProcessManager(_memory_bus)
+    if scheme in REDIS_PUBSUB_SCHEMES:
+        return socketio.AsyncRedisManager(url, channel=PUBSUB_CHANNEL)
+    raise ValueError(f"Unsupported pub/sub URL scheme: {scheme}")
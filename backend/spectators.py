@@ -0,0 +1,188 @@
+"""Read-only spectator feed of one room over Server-Sent Events.
+
+Viewers who only watch the table, the score and shared media do not need a
+Socket.IO session: `GET /spectate` streams the room's `state_update`,
+`settings_update`, `play_sound` and `stop_sound` events as SSE.
+
+Every published event is encoded into its SSE frame once, when it is
+published, and kept in a short log. Subscribers only hold a cursor into that
+log. When the log moves, subscribers at the same cursor receive the same
+joined `bytes` chunk, built by whichever of them asks first. A subscriber that
+has fallen out of the log skips to the newest state, like a coalescing socket
+queue. Keep-alive comments come from one timer per feed that wakes every
+subscriber, not from a timeout per subscriber.
+
+A subscriber is counted from `reserve()`, before its stream starts, so a
+limit checked against `subscribers` also covers requests that are still
+building their first frames.
+
+`state_update` frames carry the state revision as their SSE id. Sound events
+carry none, so the browser's `Last-Event-ID` is always the last revision it
+received; a reconnect with the current revision skips the full snapshot.
+One-shot sounds are never replayed on reconnect.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+import json
+from typing import Any, AsyncIterator, Optional
+
+
+SPECTATOR_EVENTS = frozenset({"settings_update", "play_sound", "stop_sound"})
+STATE_EVENT = "state_update"
+FEED_LOG_SIZE = 64
+HEARTBEAT_SECONDS = 15.0
+RECONNECT_MS = 3_000
+MAX_SPECTATORS = 5_000
+
+HEARTBEAT_FRAME = b": keep-alive\n\n"
+RETRY_FRAME = f"retry: {RECONNECT_MS}\n\n".encode("ascii")
+
+
+def sse_frame(event: str, data: str, event_id: Optional[int] = None) -> bytes:
+    """One SSE event; `data` is compact JSON, so it has no newlines."""
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\ndata: {data}\n\n".encode("utf-8")
+
+
+def event_frame(event: str, data: Any = None) -> bytes:
+    return sse_frame(event, json.dumps(data, separators=(",", ":")))
+
+
+def parse_last_event_id(value: Optional[str]) -> Optional[int]:
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class SpectatorSlot:
+    """One counted subscriber of a feed; `release` may be called repeatedly."""
+
+    __slots__ = ("_feed",)
+
+    def __init__(self, feed: "SpectatorFeed") -> None:
+        self._feed: Optional[SpectatorFeed] = feed
+
+    def release(self) -> None:
+        feed, self._feed = self._feed, None
+        if feed is not None:
+            feed._leave()
+
+
+class SpectatorFeed:
+    """Encoded events of one room and the subscribers following them."""
+
+    def __init__(
+        self,
+        *,
+        log_size: int = FEED_LOG_SIZE,
+        heartbeat: float = HEARTBEAT_SECONDS,
+    ) -> None:
+        # (sequence, is_state, frame); sequences start at 1.
+        self._log: deque[tuple[int, bool, bytes]] = deque(maxlen=log_size)
+        self._sequence = 0
+        self._last_state: Optional[bytes] = None
+        self.revision = 0
+        self._changed = asyncio.Event()
+        # cursor -> frames after it, shared by every subscriber at that cursor.
+        self._chunks: dict[int, bytes] = {}
+        self._heartbeat = heartbeat
+        self._heartbeat_timer: Optional[asyncio.TimerHandle] = None
+        self.subscribers = 0
+
+    @property
+    def cursor(self) -> int:
+        return self._sequence
+
+    def publish_state(self, encoded: str, revision: int) -> None:
+        """Publish a new revision; rebroadcasts of the same one are skipped."""
+        if revision == self.revision:
+            return
+        self.revision = revision
+        self._last_state = sse_frame(STATE_EVENT, encoded, revision)
+        self._append(True, self._last_state)
+
+    def publish(self, event: str, data: Any = None) -> None:
+        self._append(False, event_frame(event, data))
+
+    def _append(self, is_state: bool, frame: bytes) -> None:
+        self._sequence += 1
+        self._log.append((self._sequence, is_state, frame))
+        self._chunks.clear()
+        self._wake()
+
+    def _wake(self) -> None:
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    def _beat(self) -> None:
+        # Subscribers woken without a new entry send a keep-alive comment.
+        self._wake()
+        self._heartbeat_timer = asyncio.get_running_loop().call_later(
+            self._heartbeat, self._beat
+        )
+
+    def since(self, cursor: int) -> bytes:
+        """Frames a subscriber at `cursor` has not received yet."""
+        chunk = self._chunks.get(cursor)
+        if chunk is None:
+            chunk = self._chunks[cursor] = self._frames_since(cursor)
+        return chunk
+
+    def _frames_since(self, cursor: int) -> bytes:
+        pending = [entry for entry in self._log if entry[0] > cursor]
+        missed = bool(pending) and pending[0][0] > cursor + 1
+        states = [index for index, (_sequence, is_state, _frame) in enumerate(pending) if is_state]
+        newest_state = states[-1] if states else None
+        frames = [
+            frame
+            for index, (_sequence, is_state, frame) in enumerate(pending)
+            if not is_state or index == newest_state
+        ]
+        if missed and newest_state is None and self._last_state is not None:
+            frames.insert(0, self._last_state)
+        return b"".join(frames)
+
+    def reserve(self) -> SpectatorSlot:
+        """Count a subscriber whose stream has not started yet."""
+        self.subscribers += 1
+        return SpectatorSlot(self)
+
+    def _leave(self) -> None:
+        self.subscribers -= 1
+        if not self.subscribers and self._heartbeat_timer is not None:
+            self._heartbeat_timer.cancel()
+            self._heartbeat_timer = None
+
+    async def stream(
+        self,
+        cursor: int,
+        first: bytes,
+        slot: Optional[SpectatorSlot] = None,
+    ) -> AsyncIterator[bytes]:
+        """Yield `first`, then every chunk after `cursor` until cancelled.
+
+        The stream releases `slot`, or a slot of its own if none is given.
+        """
+        slot = slot or self.reserve()
+        if self._heartbeat_timer is None:
+            self._heartbeat_timer = asyncio.get_running_loop().call_later(
+                self._heartbeat, self._beat
+            )
+        try:
+            yield first
+            while True:
+                if cursor == self._sequence:
+                    await self._changed.wait()
+                    if cursor == self._sequence:
+                        yield HEARTBEAT_FRAME
+                        continue
+                chunk = self.since(cursor)
+                cursor = self._sequence
+                if chunk:
+                    yield chunk
+        finally:
+            slot.release()
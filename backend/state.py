@@ -140,6 +140,8 @@ class SharedMediaState(_RequiredSharedMediaState, total=False):
     author_city: Optional[str]
     author_asset: Literal["photo", "fallback", "sector13"]
     has_photo: bool
+    # Opaque key of the same item in the clients' `media_prefetch` list.
+    prefetch_key: str
 
 
 class _RequiredPublicSharedMediaState(TypedDict):
@@ -163,6 +165,7 @@ class PublicSharedMediaState(_RequiredPublicSharedMediaState, total=False):
     author_city: Optional[str]
     author_asset: Literal["photo", "fallback", "sector13"]
     has_photo: bool
+    prefetch_key: str
 
 
 class GameProgressState(TypedDict):
@@ -235,6 +238,16 @@ class IntroState(TypedDict):
     slide_index: int
     started_at_ms: Optional[int]
     duration_ms: int
+    # Lets clients fetch every author photo of the intro ahead of its slide;
+    # valid only while this intro lasts.
+    asset_token: Optional[str]
+
+
+class IntroPhotoState(TypedDict):
+    """One author photo a client may preload with the intro asset token."""
+
+    sector: int
+    slot: int
 
 
 class IntroAuthorState(TypedDict):
@@ -252,6 +265,7 @@ class PublicIntroState(IntroState):
 
     server_now_ms: int
     authors: list[IntroAuthorState]
+    asset_photos: list[IntroPhotoState]
 
 
 class BlackboxState(TypedDict):
@@ -437,10 +451,18 @@ def public_game_state(
             if 1 <= slide_index <= 12 and len(intro_authors) >= slide_index
             else []
         )
+        # Photo positions only: names and cities stay on their own slide.
+        asset_photos = [
+            {"sector": author["sector"], "slot": author["slot"]}
+            for sector_authors in intro_authors[:12]
+            for author in sector_authors
+            if author["has_photo"]
+        ] if internal_intro.get("asset_token") else []
         intro = {
             **internal_intro,
             "server_now_ms": timestamp_ms,
             "authors": authors,
+            "asset_photos": asset_photos,
         }
     shared_media: Optional[PublicSharedMediaState] = None
     if internal_media is not None:
@@ -464,6 +486,8 @@ def public_game_state(
                     "has_photo": bool(internal_media.get("has_photo")),
                 }
             )
+        if internal_media.get("prefetch_key"):
+            shared_media["prefetch_key"] = internal_media["prefetch_key"]
     internal_blackbox = state["presentation"].get("blackbox")
     blackbox: Optional[PublicBlackboxState] = None
     if internal_blackbox is not None:
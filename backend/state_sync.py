@@ -0,0 +1,333 @@
+"""Revisioned `state_update` stream with JSON-patch style deltas.
+
+The flat public snapshot from `state.public_game_state()` stays the protocol
+contract. This module only versions consecutive snapshots and describes the
+difference between two of them as RFC 6902 `add`/`remove`/`replace`
+operations, so delta-capable clients can receive a small `state_patch` while
+legacy clients keep receiving full `state_update` payloads.
+
+`StateSnapshotCache` keeps the most recent snapshot together with its compact
+JSON text, so unchanged state is neither rebuilt nor re-encoded for every
+broadcast and reconnecting socket.
+"""
+
+from __future__ import annotations
+
+import json
+from copy import deepcopy
+from typing import Any, Optional, TypedDict
+
+
+STATE_PROTOCOL_FULL = "full"
+STATE_PROTOCOL_DELTA = "delta"
+STATE_PROTOCOLS = (STATE_PROTOCOL_FULL, STATE_PROTOCOL_DELTA)
+
+# Serialization timestamps change on every snapshot. They are still carried in
+# a patch next to a real change, but alone they never create a new revision.
+_VOLATILE_KEYS = frozenset({"server_now_ms"})
+
+# python-socketio always encodes packets with these separators.
+_PACKET_SEPARATORS = (",", ":")
+
+
+class PatchOperation(TypedDict, total=False):
+    op: str
+    path: str
+    value: Any
+
+
+class StatePatch(TypedDict):
+    base_revision: int
+    revision: int
+    ops: list[PatchOperation]
+
+
+class StatePatchError(ValueError):
+    """A patch cannot be applied to the given document."""
+
+
+def _escape(key: str) -> str:
+    return key.replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def _diff_list(
+    previous: list,
+    current: list,
+    path: str,
+    ops: list[PatchOperation],
+) -> None:
+    if previous == current:
+        return
+    # Append-only growth, for example `used_questions`.
+    if len(current) > len(previous) and current[: len(previous)] == previous:
+        for item in current[len(previous):]:
+            ops.append({"op": "add", "path": f"{path}/-", "value": deepcopy(item)})
+        return
+    # Newest-first capped lists such as `logs`: entries are inserted at the
+    # head and the tail is truncated.
+    for inserted in range(1, len(current) + 1):
+        kept = current[inserted:]
+        if kept and kept == previous[: len(kept)]:
+            for index, item in enumerate(current[:inserted]):
+                ops.append(
+                    {"op": "add", "path": f"{path}/{index}", "value": deepcopy(item)}
+                )
+            for index in range(len(previous) + inserted - 1, len(current) - 1, -1):
+                ops.append({"op": "remove", "path": f"{path}/{index}"})
+            return
+    ops.append({"op": "replace", "path": path, "value": deepcopy(current)})
+
+
+def _diff_value(
+    previous: Any,
+    current: Any,
+    path: str,
+    ops: list[PatchOperation],
+) -> None:
+    if isinstance(previous, dict) and isinstance(current, dict):
+        for key in previous:
+            if key not in current:
+                ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        for key, value in current.items():
+            child_path = f"{path}/{_escape(key)}"
+            if key not in previous:
+                ops.append({"op": "add", "path": child_path, "value": deepcopy(value)})
+            else:
+                _diff_value(previous[key], value, child_path, ops)
+        return
+    if isinstance(previous, list) and isinstance(current, list):
+        _diff_list(previous, current, path, ops)
+        return
+    if type(previous) is not type(current) or previous != current:
+        ops.append({"op": "replace", "path": path, "value": deepcopy(current)})
+
+
+def diff_state(previous: dict, current: dict) -> list[PatchOperation]:
+    """Return operations that transform `previous` into `current`."""
+    ops: list[PatchOperation] = []
+    _diff_value(previous, current, "", ops)
+    return ops
+
+
+def _is_volatile(operation: PatchOperation) -> bool:
+    return operation["path"].rsplit("/", 1)[-1] in _VOLATILE_KEYS
+
+
+def _parent_and_key(document: Any, path: str) -> tuple[Any, str]:
+    if not path.startswith("/"):
+        raise StatePatchError(f"Invalid patch path: {path!r}")
+    tokens = [_unescape(token) for token in path[1:].split("/")]
+    parent = document
+    for token in tokens[:-1]:
+        if isinstance(parent, list):
+            try:
+                parent = parent[int(token)]
+            except (ValueError, IndexError) as error:
+                raise StatePatchError(f"Invalid patch path: {path!r}") from error
+        elif isinstance(parent, dict) and token in parent:
+            parent = parent[token]
+        else:
+            raise StatePatchError(f"Invalid patch path: {path!r}")
+    return parent, tokens[-1]
+
+
+def apply_state_patch(document: dict, ops: list[PatchOperation]) -> dict:
+    """Apply patch operations to a copy of `document` and return it."""
+    result = deepcopy(document)
+    for operation in ops:
+        op = operation.get("op")
+        path = operation.get("path", "")
+        if path == "":
+            if op != "replace" or not isinstance(operation.get("value"), dict):
+                raise StatePatchError("Only a full-object replace may target the root")
+            result = deepcopy(operation["value"])
+            continue
+        parent, key = _parent_and_key(result, path)
+        if isinstance(parent, list):
+            if op == "add" and key == "-":
+                parent.append(deepcopy(operation["value"]))
+                continue
+            try:
+                index = int(key)
+            except ValueError as error:
+                raise StatePatchError(f"Invalid patch path: {path!r}") from error
+            if op == "add" and 0 <= index <= len(parent):
+                parent.insert(index, deepcopy(operation["value"]))
+            elif op == "remove" and 0 <= index < len(parent):
+                del parent[index]
+            elif op == "replace" and 0 <= index < len(parent):
+                parent[index] = deepcopy(operation["value"])
+            else:
+                raise StatePatchError(f"Invalid patch operation: {operation!r}")
+        elif isinstance(parent, dict):
+            if op in ("add", "replace"):
+                parent[key] = deepcopy(operation["value"])
+            elif op == "remove" and key in parent:
+                del parent[key]
+            else:
+                raise StatePatchError(f"Invalid patch operation: {operation!r}")
+        else:
+            raise StatePatchError(f"Invalid patch path: {path!r}")
+    return result
+
+
+class StateStream:
+    """Monotonic revisions of the public snapshot shared by every client."""
+
+    def __init__(self) -> None:
+        self._revision = 0
+        self._snapshot: Optional[dict] = None
+
+    @property
+    def revision(self) -> int:
+        return self._revision
+
+    def publish(self, snapshot: dict) -> Optional[StatePatch]:
+        """Record a freshly serialized snapshot.
+
+        Returns the patch from the previous revision, or `None` when there is
+        no previous revision or nothing changed at all. When only serialization
+        timestamps changed, the patch refreshes them without a new revision:
+        its `base_revision` equals its `revision`, so delta clients correct
+        their clock as often as full clients do. The snapshot must not be
+        mutated after it is published.
+        """
+        if self._snapshot is None:
+            self._snapshot = snapshot
+            self._revision += 1
+            return None
+        ops = diff_state(self._snapshot, snapshot)
+        if not ops:
+            return None
+        self._snapshot = snapshot
+        if all(_is_volatile(operation) for operation in ops):
+            return {
+                "base_revision": self._revision,
+                "revision": self._revision,
+                "ops": ops,
+            }
+        base_revision = self._revision
+        self._revision += 1
+        return {
+            "base_revision": base_revision,
+            "revision": self._revision,
+            "ops": ops,
+        }
+
+
+class EncodedState(dict):
+    """A public snapshot that carries its own compact JSON encoding.
+
+    It is still a plain mapping for handlers and tests; `PacketJson` splices
+    `encoded` into outgoing packets instead of serializing the mapping again.
+    """
+
+    __slots__ = ("encoded",)
+
+    def __init__(self, snapshot: dict, encoded: Optional[str] = None) -> None:
+        super().__init__(snapshot)
+        self.encoded = (
+            encoded
+            if encoded is not None
+            else json.dumps(snapshot, separators=_PACKET_SEPARATORS)
+        )
+
+
+class PacketJson:
+    """`json` replacement for python-socketio packets.
+
+    Event packets are encoded as `[event, payload]`; when the payload is an
+    `EncodedState` its stored text is reused. Everything else goes through the
+    standard `json` module unchanged.
+    """
+
+    @staticmethod
+    def dumps(obj: Any, **kwargs: Any) -> str:
+        if (
+            isinstance(obj, list)
+            and kwargs == {"separators": _PACKET_SEPARATORS}
+            and any(isinstance(item, EncodedState) for item in obj)
+        ):
+            return "[" + ",".join(
+                item.encoded
+                if isinstance(item, EncodedState)
+                else json.dumps(item, **kwargs)
+                for item in obj
+            ) + "]"
+        return json.dumps(obj, **kwargs)
+
+    @staticmethod
+    def loads(text: Any, **kwargs: Any) -> Any:
+        return json.loads(text, **kwargs)
+
+
+class StateSnapshotCache:
+    """The current public snapshot, serialized once per state generation.
+
+    Callers `invalidate()` after mutating app state. Until then `lookup()`
+    returns the cached snapshot with only its `server_now_ms` fields moved to
+    the send time, so reconnect projections stay exact without a rebuild.
+    """
+
+    def __init__(self) -> None:
+        self._generation = 0
+        self._source: Optional[object] = None
+        self._cached_generation = -1
+        self._snapshot: Optional[EncodedState] = None
+        self._now_ms = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def invalidate(self) -> None:
+        self._generation += 1
+
+    def lookup(self, source: object, now_ms: int) -> Optional[EncodedState]:
+        if (
+            self._snapshot is None
+            or self._source is not source
+            or self._cached_generation != self._generation
+        ):
+            self.misses += 1
+            return None
+        self.hits += 1
+        if now_ms == self._now_ms:
+            return self._snapshot
+        return _with_server_time(self._snapshot, self._now_ms, now_ms)
+
+    def store(self, source: object, snapshot: dict, now_ms: int) -> EncodedState:
+        """Cache a snapshot built from `source` with `server_now_ms=now_ms`."""
+        encoded = EncodedState(snapshot)
+        self._source = source
+        self._cached_generation = self._generation
+        self._snapshot = encoded
+        self._now_ms = now_ms
+        return encoded
+
+    def stats(self) -> dict:
+        return {
+            "generation": self._generation,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def _with_server_time(snapshot: EncodedState, built_ms: int, now_ms: int) -> EncodedState:
+    refreshed = dict(snapshot)
+    for key, value in snapshot.items():
+        if isinstance(value, dict) and "server_now_ms" in value:
+            refreshed[key] = {**value, "server_now_ms": now_ms}
+    # Every timestamp in one snapshot shares the same value, and an unescaped
+    # `"server_now_ms":` can only be an object key, so this is exact.
+    encoded = snapshot.encoded.replace(
+        f'"server_now_ms":{built_ms}',
+        f'"server_now_ms":{now_ms}',
+    )
+    return EncodedState(refreshed, encoded)
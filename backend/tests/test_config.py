@@ -86,12 +86,111 @@ def test_admin_token_ttl_is_bounded(ttl):
         load_app_config(_environment(ADMIN_TOKEN_TTL_SECONDS=ttl))
 
 
+@pytest.mark.parametrize("max_rooms", ["many", "0", "1001"])
+def test_room_limit_is_bounded(max_rooms):
+    with pytest.raises(ConfigError, match="CHGKA_MAX_ROOMS"):
+        load_app_config(_environment(CHGKA_MAX_ROOMS=max_rooms))
+
+
+@pytest.mark.parametrize(
+    ("overrides", "message"),
+    [
+        ({"CHGKA_GROUP_OFFLINE_TTL_SECONDS": "59"}, "CHGKA_GROUP_OFFLINE_TTL_SECONDS"),
+        ({"CHGKA_GROUP_OFFLINE_TTL_SECONDS": "soon"}, "CHGKA_GROUP_OFFLINE_TTL_SECONDS"),
+        ({"CHGKA_MAX_GROUPS": "9"}, "CHGKA_MAX_GROUPS"),
+        ({"CHGKA_MAX_GROUPS": "10001"}, "CHGKA_MAX_GROUPS"),
+    ],
+)
+def test_group_eviction_limits_are_bounded(overrides, message):
+    with pytest.raises(ConfigError, match=message):
+        load_app_config(_environment(**overrides))
+
+
+@pytest.mark.parametrize(
+    ("overrides", "message"),
+    [
+        ({"CHGKA_WORKERS": "17"}, "CHGKA_WORKERS"),
+        ({"CHGKA_WORKERS": "2", "CHGKA_WORKER_INDEX": "2"}, "CHGKA_WORKER_INDEX"),
+        ({"CHGKA_WORKERS": "2"}, "CHGKA_PUBSUB_URL is required"),
+        ({"CHGKA_WORKERS": "2", "CHGKA_PUBSUB_URL": "memory://"}, "memory://"),
+        ({"CHGKA_PUBSUB_URL": "amqp://queue"}, "CHGKA_PUBSUB_URL"),
+    ],
+)
+def test_worker_settings_are_validated(overrides, message):
+    with pytest.raises(ConfigError, match=message):
+        load_app_config(_environment(**overrides))
+
+
+def test_journal_write_mode_is_validated():
+    assert load_app_config(_environment(CHGKA_JOURNAL_WRITES="Batched")).journal_writes == "batched"
+    with pytest.raises(ConfigError, match="CHGKA_JOURNAL_WRITES"):
+        load_app_config(_environment(CHGKA_JOURNAL_WRITES="async"))
+
+
+def test_signed_media_tokens_require_a_long_secret():
+    secret = "s" * 32
+    config = load_app_config(
+        _environment(CHGKA_MEDIA_TOKENS="Signed", CHGKA_MEDIA_TOKEN_SECRET=secret)
+    )
+
+    assert (config.media_tokens, config.media_token_secret) == ("signed", secret)
+    with pytest.raises(ConfigError, match="CHGKA_MEDIA_TOKEN_SECRET"):
+        load_app_config(_environment(CHGKA_MEDIA_TOKENS="signed"))
+    with pytest.raises(ConfigError, match="CHGKA_MEDIA_TOKEN_SECRET"):
+        load_app_config(
+            _environment(CHGKA_MEDIA_TOKENS="signed", CHGKA_MEDIA_TOKEN_SECRET="short")
+        )
+    with pytest.raises(ConfigError, match="CHGKA_MEDIA_TOKENS"):
+        load_app_config(_environment(CHGKA_MEDIA_TOKENS="jwt"))
+
+
+def test_media_accel_prefix_is_a_location_path():
+    config = load_app_config(_environment(CHGKA_MEDIA_ACCEL_PREFIX="/chgka-pack/"))
+
+    assert config.media_accel_prefix == "/chgka-pack/"
+    assert load_app_config(_environment()).media_accel_prefix is None
+    with pytest.raises(ConfigError, match="CHGKA_MEDIA_ACCEL_PREFIX"):
+        load_app_config(_environment(CHGKA_MEDIA_ACCEL_PREFIX="/chgka-pack"))
+
+
+def test_media_prefetch_is_off_unless_enabled():
+    assert load_app_config(_environment()).media_prefetch == "off"
+    assert load_app_config(_environment(CHGKA_MEDIA_PREFETCH="Question")).media_prefetch == "question"
+    with pytest.raises(ConfigError, match="CHGKA_MEDIA_PREFETCH"):
+        load_app_config(_environment(CHGKA_MEDIA_PREFETCH="all"))
+
+
+def test_workers_share_a_pubsub_url():
+    config = load_app_config(
+        _environment(
+            CHGKA_WORKERS="4",
+            CHGKA_WORKER_INDEX="3",
+            CHGKA_PUBSUB_URL="redis://pubsub:6379/0",
+        )
+    )
+
+    assert (config.workers, config.worker_index) == (4, 3)
+    assert config.pubsub_url == "redis://pubsub:6379/0"
+
+
+@pytest.mark.parametrize("timeout", ["4", "601", "later"])
+def test_slow_client_timeout_is_bounded(timeout):
+    with pytest.raises(ConfigError, match="CHGKA_SLOW_CLIENT_TIMEOUT_SECONDS"):
+        load_app_config(_environment(CHGKA_SLOW_CLIENT_TIMEOUT_SECONDS=timeout))
+
+
 def test_development_defaults_to_twelve_hour_admin_token():
     config = load_app_config(_environment())
 
     assert config.is_development is True
     assert config.admin_token_ttl_seconds == 43_200
     assert config.database_path == ":memory:"
+    assert config.max_rooms == 200
+    assert (config.group_offline_ttl_seconds, config.max_groups) == (10_800, 300)
+    assert config.slow_client_timeout_seconds == 30
+    assert (config.workers, config.worker_index, config.pubsub_url) == (1, 0, None)
+    assert config.journal_writes == "strict"
+    assert (config.media_tokens, config.media_token_secret) == ("opaque", None)
 
 
 @pytest.mark.parametrize("database_path", [":memory:", "relative.sqlite3"])
@@ -0,0 +1,39 @@
+from effect_frames import (
+    AUDIENCE_ADMINS,
+    AUDIENCE_ALL,
+    AUDIENCE_DELTA,
+    AUDIENCE_SNAPSHOT,
+    EffectFrame,
+)
+
+
+def _frame():
+    frame = EffectFrame()
+    frame.add(AUDIENCE_ALL, "settings_update", {"sound": "normal"})
+    frame.add(AUDIENCE_ALL, "play_sound", {"sound": "gong"})
+    frame.add(AUDIENCE_DELTA, "state_patch", {"revision": 2})
+    frame.add(AUDIENCE_SNAPSHOT, "state_update", {"revision": 2})
+    frame.add(AUDIENCE_ADMINS, "admin_question", None)
+    return frame
+
+
+def test_envelope_keeps_emission_order_for_each_kind_of_socket():
+    frame = _frame()
+
+    assert frame.envelope(delta=True, admin=True) == {
+        "events": [
+            ["settings_update", {"sound": "normal"}],
+            ["play_sound", {"sound": "gong"}],
+            ["state_patch", {"revision": 2}],
+            ["admin_question", None],
+        ],
+    }
+    assert [event for event, _data in frame.envelope(delta=False, admin=False)["events"]] == [
+        "settings_update",
+        "play_sound",
+        "state_update",
+    ]
+
+
+def test_empty_frame_has_no_events():
+    assert EffectFrame().envelope(delta=False, admin=True) == {"events": []}
@@ -1,14 +1,19 @@
 from datetime import datetime, timedelta, timezone
+import sqlite3
 
 import pytest
 
 from game_journal import (
     MODE_DEBUG,
     MODE_REGULAR,
+    STATUS_ACTIVE,
     STATUS_COMPLETED,
     STATUS_INTERRUPTED,
     STATUS_RESET,
+    WRITES_BATCHED,
+    WRITES_STRICT,
     GameJournal,
+    JournalError,
 )
 
 
@@ -212,3 +217,261 @@ def test_reset_rotates_session_and_restart_marks_open_session_interrupted(journa
     assert restarted.recover_interrupted_sessions() == 1
     sessions = {item["id"]: item for item in restarted.list_sessions()}
     assert sessions["session-after-reset"]["status"] == STATUS_INTERRUPTED
+
+
+def test_room_journals_share_the_database_but_not_the_current_session(journal_factory):
+    ids = iter(("session-main", "session-room"))
+    journal = journal_factory(id_factory=lambda: next(ids))
+    room = journal.open_room()
+    journal.record_event("spin_started", "Вращение", {})
+    room.record_event("spin_started", "Вращение", {})
+
+    assert room.snapshot()["current_session"]["id"] == "session-room"
+    assert journal.snapshot()["current_session"]["id"] == "session-main"
+    assert {item["id"] for item in journal.list_sessions()} == {
+        "session-main",
+        "session-room",
+    }
+
+    assert journal.set_session_mode("session-room", MODE_REGULAR) == MODE_REGULAR
+    assert room.current_mode() == MODE_REGULAR
+    assert journal.current_mode() == MODE_DEBUG
+
+    assert journal.recover_interrupted_sessions() == 2
+    assert room.snapshot()["current_session"] is None
+
+
+def test_closing_a_room_journal_interrupts_its_open_session(journal_factory):
+    ids = iter(("session-lobby", "session-over"))
+    journal = journal_factory(id_factory=lambda: next(ids))
+    lobby = journal.open_room()
+    over = journal.open_room()
+    lobby.record_event("group_joined", "Команда", {})
+    over.mark_started()
+    over.complete_current({"znatoki": 6, "tv": 3})
+
+    lobby.close_room()
+    over.close_room()
+
+    sessions = {item["id"]: item["status"] for item in journal.list_sessions()}
+    assert sessions == {"session-lobby": STATUS_INTERRUPTED, "session-over": STATUS_COMPLETED}
+    assert lobby.current_session_id() is None
+    assert journal._journals() == [journal]
+    with pytest.raises(JournalError):
+        journal.close_room()
+
+
+def test_batched_writes_are_committed_by_flush_and_visible_to_reads(tmp_path):
+    journal = GameJournal(
+        tmp_path / "journal.sqlite3",
+        default_mode=MODE_REGULAR,
+        clock=Clock(),
+        id_factory=lambda: "session-1",
+        writes=WRITES_BATCHED,
+        batch_delay_seconds=60,
+    )
+    journal.initialize()
+    journal.configure_pack(fingerprint="pack", name="sample_questions", path=tmp_path)
+    recorded = [
+        journal.record_event("question_opened", f"Вопрос {index}", _opened(
+            f"q-{index}", title=f"Вопрос {index}", sector=index,
+        ))
+        for index in range(1, 4)
+    ]
+    assert [event["sequence_number"] for event in recorded] == [1, 2, 3]
+    assert journal.has_pending_writes() is True
+
+    with sqlite3.connect(tmp_path / "journal.sqlite3") as reader:
+        assert reader.execute("SELECT COUNT(*) FROM game_events").fetchone() == (0,)
+    journal.flush()
+    assert journal.has_pending_writes() is False
+    with sqlite3.connect(tmp_path / "journal.sqlite3") as reader:
+        assert reader.execute("SELECT COUNT(*) FROM game_events").fetchone() == (3,)
+
+    journal.record_event("game_completed", "Игра окончена", {})
+    journal.complete_current({"znatoki": 6, "tv": 2})
+    detail = journal.get_session("session-1")
+    assert [event["sequence_number"] for event in detail["events"]] == [1, 2, 3, 4]
+    assert detail["session"]["status"] == STATUS_COMPLETED
+    assert len(journal.used_questions()) == 3
+    journal.close()
+
+
+def _take_sequence_behind_journal(db_path, sequence):
+    with sqlite3.connect(db_path) as other:
+        other.execute(
+            "INSERT INTO game_events (session_id, sequence_number, occurred_at,"
+            " event_type, payload_json, display_message)"
+            " VALUES ('session-1', ?, 'x', 'admin_note', '{}', 'Чужая')",
+            (sequence,),
+        )
+
+
+@pytest.mark.parametrize("writes", [WRITES_STRICT, WRITES_BATCHED])
+def test_sequence_counter_repairs_unique_conflicts(tmp_path, writes):
+    db_path = tmp_path / "journal.sqlite3"
+    journal = GameJournal(
+        db_path,
+        default_mode=MODE_DEBUG,
+        id_factory=lambda: "session-1",
+        writes=writes,
+    )
+    journal.initialize()
+    journal.configure_pack(fingerprint="pack", name="sample_questions", path=tmp_path)
+    journal.record_event("admin_note", "Первая", {})
+    journal.flush()
+    _take_sequence_behind_journal(db_path, 2)
+
+    journal.record_event("admin_note", "Вторая", {})
+    journal.record_event("admin_note", "Третья", {})
+    journal.flush()
+
+    events = journal.get_session("session-1")["events"]
+    assert [(event["sequence_number"], event["display_message"]) for event in events] == [
+        (1, "Первая"),
+        (2, "Чужая"),
+        (3, "Вторая"),
+        (4, "Третья"),
+    ]
+    assert journal.record_event("admin_note", "Четвёртая", {})["sequence_number"] == 5
+    journal.close()
+
+
+def test_sequence_counter_is_seeded_from_stored_events_after_restart(journal_factory):
+    ids = iter(("session-main", "session-room"))
+    journal = journal_factory(id_factory=lambda: next(ids))
+    journal.record_event("admin_note", "Первая", {})
+    journal.record_event("admin_note", "Вторая", {})
+    room = journal.open_room()
+    # A fresh counter, as after a restart, reads the stored maximum once.
+    journal._sequences.clear()
+
+    assert journal.record_event("admin_note", "Третья", {})["sequence_number"] == 3
+    assert room.record_event("admin_note", "Другая игра", {})["sequence_number"] == 1
+
+
+def _play_history(journal):
+    journal.mark_started()
+    journal.record_event("question_opened", "Вопрос 1", _opened("q-1", title="Первый", sector=1))
+    journal.record_event(
+        "respondent_selected",
+        "Отвечает: Мария",
+        {"question_id": "q-1", "participant_id": "p-2", "group_id": "g-1", "name": "Мария"},
+    )
+    journal.record_event("question_opened", "Вопрос 2", _opened("q-2", title="Второй", sector=2))
+    journal.record_event("question_opened", "Вопрос 1", _opened("q-1", title="Первый", sector=1))
+    journal.complete_current({"znatoki": 1, "tv": 1})
+
+
+def test_schema_v1_journal_is_migrated_and_question_openings_backfilled(tmp_path):
+    journal = _journal(tmp_path, mode=MODE_REGULAR)
+    _play_history(journal)
+    expected = (journal.get_session("session-1"), journal.list_sessions(), journal.used_questions())
+    journal.close()
+    with sqlite3.connect(tmp_path / "journal.sqlite3") as connection:
+        connection.execute("DROP TABLE question_openings")
+        connection.execute("DROP TABLE question_usage")
+        connection.execute("PRAGMA user_version = 1")
+
+    migrated = _journal(tmp_path, mode=MODE_REGULAR)
+    with sqlite3.connect(tmp_path / "journal.sqlite3") as connection:
+        assert connection.execute("PRAGMA user_version").fetchone() == (2,)
+        assert connection.execute("SELECT COUNT(*) FROM question_openings").fetchone() == (3,)
+
+    detail = migrated.get_session("session-1")
+    assert (detail, migrated.list_sessions(), migrated.used_questions()) == expected
+    assert detail["session"]["opened_questions"] == 2
+    assert detail["opened_questions"][0]["open_count"] == 2
+    assert detail["opened_questions"][0]["respondent"]["name"] == "Мария"
+    assert [item["question_id"] for item in expected[2]] == ["q-1", "q-2"]
+    migrated.close()
+
+
+@pytest.mark.parametrize("writes", [WRITES_STRICT, WRITES_BATCHED])
+def test_question_openings_follow_repaired_sequence_numbers(tmp_path, writes):
+    db_path = tmp_path / "journal.sqlite3"
+    journal = GameJournal(
+        db_path,
+        default_mode=MODE_REGULAR,
+        id_factory=lambda: "session-1",
+        writes=writes,
+    )
+    journal.initialize()
+    journal.configure_pack(fingerprint="pack", name="sample_questions", path=tmp_path)
+    journal.record_event("admin_note", "Первая", {})
+    journal.flush()
+    _take_sequence_behind_journal(db_path, 2)
+
+    journal.record_event("question_opened", "Вопрос", _opened("q-1", title="Первый", sector=1))
+    journal.flush()
+
+    with sqlite3.connect(db_path) as reader:
+        assert reader.execute(
+            "SELECT sequence_number, question_id FROM question_openings"
+        ).fetchall() == [(3, "q-1")]
+    assert journal.list_sessions()[0]["opened_questions"] == 1
+    journal.close()
+
+
+def test_session_pages_follow_keyset_cursor_and_filters(journal_factory):
+    ids = iter(f"session-{index}" for index in range(1, 6))
+    journal = journal_factory(mode=MODE_REGULAR, id_factory=lambda: next(ids))
+    for index in range(4):
+        journal.record_event("admin_note", f"Игра {index}", {})
+        journal.complete_current({"znatoki": 6, "tv": index})
+        journal.rotate_after_reset({"znatoki": 6, "tv": index})
+
+    first = journal.page_sessions(limit=2)
+    second = journal.page_sessions(limit=2, cursor=first["next_cursor"])
+    last = journal.page_sessions(limit=2, cursor=second["next_cursor"])
+    assert [session["id"] for page in (first, second, last) for session in page["sessions"]] == [
+        "session-5", "session-4", "session-3", "session-2", "session-1",
+    ]
+    assert last["next_cursor"] is None
+
+    active = journal.page_sessions(status=STATUS_ACTIVE)
+    assert [session["id"] for session in active["sessions"]] == ["session-5"]
+    assert len(journal.page_sessions(status=STATUS_COMPLETED)["sessions"]) == 4
+    assert journal.page_sessions(pack_fingerprint="other-pack")["sessions"] == []
+    created_at = [session["created_at"] for session in first["sessions"]]
+    in_range = journal.page_sessions(created_from=created_at[1], created_before=created_at[0])
+    assert [session["id"] for session in in_range["sessions"]] == ["session-4"]
+
+    for invalid in (
+        {"cursor": "not-a-cursor"},
+        {"status": "paused"},
+        {"created_from": "yesterday"},
+        {"limit": 201},
+    ):
+        with pytest.raises(JournalError):
+            journal.page_sessions(**invalid)
+
+
+def test_event_and_used_question_pages(journal_factory):
+    journal = journal_factory(mode=MODE_REGULAR)
+    for index in range(1, 6):
+        journal.record_event("question_opened", f"Вопрос {index}", _opened(
+            f"q-{index}", title=f"Вопрос {index}", sector=index,
+        ))
+        journal.record_event("admin_note", f"Заметка {index}", {})
+
+    first = journal.page_events("session-1", limit=4)
+    assert [event["sequence_number"] for event in first["events"]] == [1, 2, 3, 4]
+    assert first["next_cursor"] == 4
+    assert len(first["opened_questions"]) == 5
+    rest = journal.page_events("session-1", cursor=first["next_cursor"])
+    assert [event["sequence_number"] for event in rest["events"]] == [5, 6, 7, 8, 9, 10]
+    assert rest["next_cursor"] is None
+    assert "opened_questions" not in rest
+    notes = journal.page_events("session-1", event_types=["admin_note"], limit=2)
+    assert [event["sequence_number"] for event in notes["events"]] == [2, 4]
+    with pytest.raises(JournalError):
+        journal.page_events("session-1", cursor="4")
+
+    pages = [journal.page_used_questions(limit=2)]
+    while pages[-1]["next_cursor"]:
+        pages.append(journal.page_used_questions(limit=2, cursor=pages[-1]["next_cursor"]))
+    assert [item["question_id"] for page in pages for item in page["questions"]] == [
+        item["question_id"] for item in journal.used_questions()
+    ] == ["q-5", "q-4", "q-3", "q-2", "q-1"]
+    assert pages[0]["total"] == 5
@@ -0,0 +1,128 @@
+import pytest
+
+from auth import AdminTokenStore
+from game_journal import MODE_DEBUG, GameJournal
+from game_room import DEFAULT_ROOM_ID, GameRoom, GameRooms, RoomError
+from state import PHASE_GAME_OVER, PHASE_PRE_ROUND
+from scale_out import room_worker
+
+
+def _rooms(max_rooms=3, **kwargs):
+    journal = GameJournal(":memory:", default_mode=MODE_DEBUG)
+
+    def create(room_id):
+        return GameRoom(
+            room_id,
+            journal=journal if room_id == DEFAULT_ROOM_ID else journal.open_room(),
+            admin_tokens=AdminTokenStore(60),
+        )
+
+    return GameRooms(create, max_rooms=max_rooms, **kwargs)
+
+
+def test_default_room_serves_empty_requests_and_unknown_sockets():
+    rooms = _rooms()
+
+    assert rooms.default.id == DEFAULT_ROOM_ID
+    assert rooms.open(None) is rooms.default
+    assert rooms.open("") is rooms.default
+    assert rooms.for_socket("never-connected") is rooms.default
+    assert rooms.default.channel == "game:main"
+    assert rooms.default.delta_channel == "game:main:state_delta"
+
+
+def test_rooms_are_opened_once_and_bound_to_sockets():
+    rooms = _rooms()
+    room = rooms.open("friday-game")
+
+    assert rooms.open("friday-game") is room
+    assert rooms.get("friday-game") is room
+    assert rooms.get(7) is None
+    assert room.state is not rooms.default.state
+    assert room.settings is not rooms.default.settings
+
+    rooms.attach("sid-1", room)
+    assert rooms.for_socket("sid-1") is room
+    assert rooms.detach("sid-1") is room
+    assert rooms.for_socket("sid-1") is rooms.default
+    assert rooms.detach("sid-1") is None
+
+
+@pytest.mark.parametrize("room_id", ["Main", "-game", "a" * 41, "игра", 5])
+def test_invalid_room_ids_are_rejected(room_id):
+    with pytest.raises(RoomError) as error:
+        _rooms().open(room_id)
+    assert error.value.code == "invalid_room"
+
+
+def test_room_limit_counts_the_default_room():
+    rooms = _rooms(max_rooms=2)
+    rooms.open("second")
+
+    with pytest.raises(RoomError) as error:
+        rooms.open("third")
+    assert error.value.code == "too_many_rooms"
+    assert [room.id for room in rooms] == [DEFAULT_ROOM_ID, "second"]
+    assert len(rooms) == 2
+
+
+def test_rooms_of_other_workers_are_refused():
+    rooms = _rooms(is_local=lambda room_id: room_worker(room_id, 2) == 1)
+    local = next(f"game-{index}" for index in range(50) if room_worker(f"game-{index}", 2) == 1)
+    remote = next(f"game-{index}" for index in range(50) if room_worker(f"game-{index}", 2) == 0)
+
+    assert rooms.open(local).id == local
+    with pytest.raises(RoomError) as error:
+        rooms.open(remote)
+    assert error.value.code == "wrong_worker"
+    assert rooms.get(remote) is None
+
+
+def test_unknown_rooms_are_only_created_on_request():
+    rooms = _rooms()
+
+    with pytest.raises(RoomError) as error:
+        rooms.open("friday", create=False)
+    assert error.value.code == "room_not_found"
+    assert rooms.get("friday") is None
+    assert rooms.open(None, create=False) is rooms.default
+    room = rooms.open("friday")
+    assert rooms.open("friday", create=False) is room
+
+
+def test_idle_rooms_are_closed_once_nobody_follows_them():
+    rooms = _rooms(max_rooms=2)
+    room = rooms.open("friday")
+    rooms.attach("host", room)
+    rooms.attach("phone", room)
+
+    rooms.detach("host")
+    assert not rooms.close_if_idle(room)
+    room.state["game"]["phase"] = PHASE_PRE_ROUND
+    rooms.detach("phone")
+    # A running game waits for its players to come back.
+    assert not rooms.close_if_idle(room)
+    room.spectators.subscribers = 1
+    room.state["game"]["phase"] = PHASE_GAME_OVER
+    assert not rooms.close_if_idle(room)
+
+    room.spectators.subscribers = 0
+    assert rooms.close_if_idle(room)
+    assert rooms.get("friday") is None
+    assert rooms.closed == 1
+    assert not rooms.close_if_idle(room)
+    assert not rooms.close_if_idle(rooms.default)
+    # The closed room no longer counts against the limit.
+    assert rooms.open("saturday").id == "saturday"
+
+
+def test_reattached_sockets_are_counted_once():
+    rooms = _rooms()
+    first = rooms.open("first")
+    second = rooms.open("second")
+
+    rooms.attach("sid", first)
+    rooms.attach("sid", second)
+
+    assert rooms.close_if_idle(first)
+    assert not rooms.close_if_idle(second)
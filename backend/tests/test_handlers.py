@@ -1,16 +1,22 @@
 import asyncio
+import json
 from dataclasses import replace
 import shutil
+import threading
 from pathlib import Path
 
 import pytest
 
 import main
+import pack_cache
 from auth import AdminTokenStore
 from game_events import game_event
-from game_journal import MODE_DEBUG, MODE_REGULAR, STATUS_COMPLETED, GameJournal
+from game_journal import MODE_DEBUG, MODE_REGULAR, STATUS_COMPLETED, WRITES_BATCHED, GameJournal
+from media import MediaTokenSigner, MediaTokenStore
 from questions import parse_question_pack
 from sound_control import begin_fade, create_sound_control_state
+from roster import AdminRecord, GroupRecord, Participant, Roster
+from state_sync import PacketJson, StateSnapshotCache, StateStream, apply_state_patch
 from state import (
     PHASE_DISCUSSION,
     PHASE_GAME_OVER,
@@ -20,6 +26,7 @@ from state import (
     PHASE_QUESTION_READING,
     PHASE_TEAM_ANSWER,
     create_initial_app_state,
+    public_game_state,
 )
 
 
@@ -30,6 +37,7 @@ class FakeSio:
     def __init__(self, *, yield_on_emit=True):
         self.events = []
         self.sessions = {}
+        self.rooms = {}
         self.yield_on_emit = yield_on_emit
 
     async def emit(self, event, data=None, **kwargs):
@@ -43,6 +51,15 @@ class FakeSio:
     async def get_session(self, sid):
         return self.sessions.get(sid, {"role": "player"})
 
+    async def enter_room(self, sid, room):
+        self.rooms.setdefault(room, set()).add(sid)
+
+    async def leave_room(self, sid, room):
+        self.rooms.get(room, set()).discard(sid)
+
+    def outbound_stats(self):
+        return {"depths": {}, "max_depth": 0}
+
 
 async def _allow_admin(_sid):
     return True
@@ -66,27 +83,29 @@ def _authorized_admin(monkeypatch, fake_sio, *, sid="admin"):
         token_factory=lambda: "valid-admin-token",
     )
     token = store.issue()
-    monkeypatch.setattr(main, "admin_tokens", store)
+    room = main.rooms.default
+    monkeypatch.setattr(room, "admin_tokens", store)
     fake_sio.sessions[sid] = {
         "role": "admin",
         "admin_token": token,
     }
-    return {
-        "sid": sid,
-        "name": main.ADMIN_NAME,
-        "role": "admin",
-        "token": token,
-        "online": True,
-    }
+    # What `_join_admin_audience` does when the admin logs in.
+    room.audiences[sid] = main.ADMINS_AUDIENCE
+    room.admin_audience_token = token
+    fake_sio.rooms.setdefault(room.audience_channel(main.ADMINS_AUDIENCE), set()).add(sid)
+    return AdminRecord(sid=sid, name=main.ADMIN_NAME, token=token)
+
+
+def _roster(*records):
+    """A roster holding `records`, added one by one as the handlers add them."""
+    roster = Roster()
+    for record in records:
+        roster.add(record)
+    return roster
 
 
 @pytest.fixture(autouse=True)
-def _isolated_global_settings(monkeypatch):
-    monkeypatch.setattr(
-        main,
-        "global_settings",
-        {"volume": 1.0, "sound_control": create_sound_control_state()},
-    )
+def _isolated_rooms(monkeypatch):
     journal = GameJournal(":memory:", default_mode=MODE_DEBUG)
     journal.initialize()
     sample_pack = parse_question_pack(SAMPLE_PACK)
@@ -96,6 +115,7 @@ def _isolated_global_settings(monkeypatch):
         path=SAMPLE_PACK,
     )
     monkeypatch.setattr(main, "game_journal", journal)
+    monkeypatch.setattr(main, "rooms", main.GameRooms(main._create_room, max_rooms=8))
     yield
     journal.close()
 
@@ -108,9 +128,9 @@ def test_blitz_open_events_use_each_part_id(monkeypatch):
         question_types=[question.type.value for question in pack.questions],
     )
     monkeypatch.setattr(main, "sio", fake_sio)
-    monkeypatch.setattr(main, "app_state", state)
+    monkeypatch.setattr(main.rooms.default, "state", state)
     monkeypatch.setattr(main, "loaded_pack", pack)
-    monkeypatch.setattr(main, "players_list", [])
+    monkeypatch.setattr(main.rooms.default, "players", _roster())
 
     async def run():
         started = main.transition_start_spin(
@@ -170,9 +190,9 @@ def test_concurrent_score_handlers_award_only_one_point(monkeypatch):
     }
     monkeypatch.setattr(main, "sio", fake_sio)
     monkeypatch.setattr(main, "require_admin", _allow_admin)
-    monkeypatch.setattr(main, "app_state", state)
+    monkeypatch.setattr(main.rooms.default, "state", state)
     monkeypatch.setattr(main, "loaded_pack", None)
-    monkeypatch.setattr(main, "players_list", [])
+    monkeypatch.setattr(main.rooms.default, "players", _roster())
 
     async def run():
         await asyncio.gather(
@@ -191,8 +211,8 @@ def test_intro_handlers_broadcast_each_slide_once_and_stop_on_completion(monkeyp
     state = create_initial_app_state()
     monkeypatch.setattr(main, "sio", fake_sio)
     monkeypatch.setattr(main, "require_admin", _allow_admin)
-    monkeypatch.setattr(main, "app_state", state)
-    monkeypatch.setattr(main, "players_list", [])
+    monkeypatch.setattr(main.rooms.default, "state", state)
+    monkeypatch.setattr(main.rooms.default, "players", _roster())
     monkeypatch.setattr(main, "_now_ms", lambda: 10_000)
 
     async def run():
@@ -240,7 +260,7 @@ def test_intro_advance_requires_admin(monkeypatch):
     }
     monkeypatch.setattr(main, "sio", fake_sio)
     monkeypatch.setattr(main, "require_admin", _deny_admin)
-    monkeypatch.setattr(main, "app_state", state)
+    monkeypatch.setattr(main.rooms.default, "state", state)
 
     asyncio.run(main.admin_advance_intro("player", {"expected_slide": 0}))
 
@@ -257,9 +277,9 @@ def test_intro_skip_handler_is_admin_only_atomic_and_journaled(monkeypatch):
     )
     monkeypatch.setattr(main, "sio", fake_sio)
     monkeypatch.setattr(main, "require_admin", _allow_admin)
-    monkeypatch.setattr(main, "app_state", state)
+    monkeypatch.setattr(main.rooms.default, "state", state)
     monkeypatch.setattr(main, "loaded_pack", None)
-    monkeypatch.setattr(main, "players_list", [])
+    monkeypatch.setattr(main.rooms.default, "players", _roster())
 
     async def run():
         return await asyncio.gather(
@@ -293,7 +313,7 @@ def test_intro_skip_requires_admin(monkeypatch):
     main.transition_start_game(state)
     monkeypatch.setattr(main, "sio", fake_sio)
     monkeypatch.setattr(main, "require_admin", _deny_admin)
-    monkeypatch.setattr(main, "app_state", state)
+    monkeypatch.setattr(main.rooms.default, "state", state)
 
     response = asyncio.run(
         main.admin_skip_intro("player", {"expected_slide": 0})
@@ -316,13 +336,21 @@ def test_intro_author_photo_is_pack_backed_and_current_slide_only(tmp_path, monk
         "duration_ms": 87_757,
     }
     monkeypatch.setattr(main, "loaded_pack", pack)
-    monkeypatch.setattr(main, "app_state", state)
+    monkeypatch.setattr(main.rooms.default, "state", state)
 
     response = asyncio.run(main.get_intro_author_photo(4, 1))
 
     assert Path(response.path) == photo_path.resolve()
     assert response.headers["cache-control"] == "no-store"
 
+    display = tmp_path / "author-display1600.jpg"
+    display.write_bytes(b"smaller")
+    pack.image_variants = {"04/01/author.jpg": {"display": display}}
+    response = asyncio.run(main.get_intro_author_photo(4, 1, variant="display"))
+    assert Path(response.path) == display
+    response = asyncio.run(main.get_intro_author_photo(4, 1, variant="thumb"))
+    assert Path(response.path) == photo_path.resolve()
+
     with pytest.raises(main.HTTPException) as error:
         asyncio.run(main.get_intro_author_photo(4, 2))
     assert error.value.status_code == 404
@@ -342,6 +370,37 @@ def test_intro_author_photo_is_pack_backed_and_current_slide_only(tmp_path, monk
     assert error.value.status_code == 404
 
 
+def test_intro_asset_token_preloads_every_author_photo_until_intro_ends(monkeypatch):
+    fake_sio = FakeSio(yield_on_emit=False)
+    state = create_initial_app_state()
+    pack = parse_question_pack(SAMPLE_PACK)
+    main._apply_pack_to_state(state, pack)
+    monkeypatch.setattr(main, "sio", fake_sio)
+    monkeypatch.setattr(main, "require_admin", _allow_admin)
+    monkeypatch.setattr(main, "loaded_pack", pack)
+    monkeypatch.setattr(main.rooms.default, "state", state)
+
+    asyncio.run(main.start_game("admin"))
+    intro = public_game_state(state)["intro"]
+    token = intro["asset_token"]
+    assert token
+    assert {"sector": 4, "slot": 1} in intro["asset_photos"]
+    assert intro["authors"] == []
+
+    response = asyncio.run(main.get_intro_author_photo(4, 1, bundle=token))
+    assert Path(response.path) == (SAMPLE_PACK / "04" / "01" / "author.jpg").resolve()
+    assert response.headers["cache-control"] == (
+        f"private, max-age={main.INTRO_ASSET_MAX_AGE_SECONDS}"
+    )
+    with pytest.raises(main.HTTPException):
+        asyncio.run(main.get_intro_author_photo(4, 1, bundle="forged"))
+
+    state["game"]["phase"] = PHASE_PRE_ROUND
+    state["presentation"]["intro"] = None
+    with pytest.raises(main.HTTPException):
+        asyncio.run(main.get_intro_author_photo(4, 1, bundle=token))
+
+
 def test_pack_info_includes_intro_speech_for_admin_only(monkeypatch):
     fake_sio = FakeSio(yield_on_emit=False)
     fake_sio.sessions = {"player": {"role": "player"}}
@@ -372,10 +431,37 @@ def test_pack_info_includes_intro_speech_for_admin_only(monkeypatch):
     ]
 
 
-def test_startup_builds_public_intro_authors_from_pack(monkeypatch):
+@pytest.fixture(scope="module")
+def variants_cache_dir(tmp_path_factory):
+    """Holds the sample pack's image variants, which take seconds to render."""
+    return tmp_path_factory.mktemp("pack-cache")
+
+
+def test_startup_with_warm_pack_cache_skips_parsing(monkeypatch, tmp_path, variants_cache_dir):
+    monkeypatch.setenv("QUESTIONS_PACK_PATH", str(SAMPLE_PACK))
+    monkeypatch.setenv("CHGKA_PACK_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(main, "variants_dir", lambda _pack, _cache: variants_cache_dir)
+    monkeypatch.setattr(main, "loaded_pack", None)
+    monkeypatch.setattr(main, "pack_admin_info", {})
+
+    main._load_question_pack_on_startup()
+    cold_pack = main.loaded_pack
+
+    def parse_question_pack(_root):
+        raise AssertionError("warm start parsed the pack instead of loading the cache")
+
+    monkeypatch.setattr(pack_cache, "parse_question_pack", parse_question_pack)
+    main._load_question_pack_on_startup()
+
+    assert main.loaded_pack == cold_pack
+
+
+def test_startup_builds_public_intro_authors_from_pack(monkeypatch, tmp_path, variants_cache_dir):
     state = create_initial_app_state()
     monkeypatch.setenv("QUESTIONS_PACK_PATH", str(SAMPLE_PACK))
-    monkeypatch.setattr(main, "app_state", state)
+    monkeypatch.setenv("CHGKA_PACK_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(main, "variants_dir", lambda _pack, _cache: variants_cache_dir)
+    monkeypatch.setattr(main.rooms.default, "state", state)
     monkeypatch.setattr(main, "loaded_pack", None)
     monkeypatch.setattr(main, "pack_admin_info", {})
 
@@ -383,6 +469,7 @@ def test_startup_builds_public_intro_authors_from_pack(monkeypatch):
 
     authors = state["pack"]["intro_authors"]
     assert len(authors) == 12
+    assert set(main.loaded_pack.image_variants["01/author.jpg"]) == {"thumb", "display"}
     assert authors[0] == [
         {
             "sector": 1,
@@ -429,11 +516,9 @@ def test_blackbox_start_natural_end_and_dedicated_stop_are_generation_guarded(mo
     pack = parse_question_pack(SAMPLE_PACK)
     monkeypatch.setattr(main, "sio", fake_sio)
     monkeypatch.setattr(main, "require_admin", _allow_admin)
-    monkeypatch.setattr(main, "app_state", state)
+    monkeypatch.setattr(main.rooms.default, "state", state)
     monkeypatch.setattr(main, "loaded_pack", pack)
-    monkeypatch.setattr(
-        main,
-        "players_list",
+    monkeypatch.setattr(main.rooms.default, "players",
         [_authorized_admin(monkeypatch, fake_sio)],
     )
     monkeypatch.setattr(main, "_now_ms", lambda: 10_000)
@@ -493,9 +578,9 @@ def test_blackbox_rejects_unmarked_question_and_non_admin(monkeypatch):
     state = create_initial_app_state(phase=PHASE_QUESTION_READING)
     state["game"]["round"] = {"kind": "normal", "sector": 1}
     monkeypatch.setattr(main, "sio", fake_sio)
-    monkeypatch.setattr(main, "app_state", state)
+    monkeypatch.setattr(main.rooms.default, "state", state)
     monkeypatch.setattr(main, "loaded_pack", parse_question_pack(SAMPLE_PACK))
-    monkeypatch.setattr(main, "players_list", [])
+    monkeypatch.setattr(main.rooms.default, "players", _roster())
     monkeypatch.setattr(main, "_now_ms", lambda: 10_000)
 
     monkeypatch.setattr(main, "require_admin", _deny_admin)
@@ -545,9 +630,9 @@ def test_silence_and_completed_fade_end_blackbox(monkeypatch):
     state["game"]["round"] = {"kind": "normal", "sector": 9}
     monkeypatch.setattr(main, "sio", fake_sio)
     monkeypatch.setattr(main, "require_admin", _allow_admin)
-    monkeypatch.setattr(main, "app_state", state)
+    monkeypatch.setattr(main.rooms.default, "state", state)
     monkeypatch.setattr(main, "loaded_pack", parse_question_pack(SAMPLE_PACK))
-    monkeypatch.setattr(main, "players_list", [])
+    monkeypatch.setattr(main.rooms.default, "players", _roster())
     monkeypatch.setattr(main, "_now_ms", lambda: 10_000)
 
     async def no_wait(_duration):
@@ -561,14 +646,14 @@ def test_silence_and_completed_fade_end_blackbox(monkeypatch):
         assert state["presentation"]["blackbox"] is None
 
         await main.admin_start_blackbox("admin")
-        assert main.global_settings["sound_control"]["mode"] == "normal"
+        assert main.rooms.default.settings["sound_control"]["mode"] == "normal"
         response = await main.admin_fade_sounds("admin")
         assert response == {"ok": True, "completed": True}
 
     asyncio.run(run_flow())
 
     assert state["presentation"]["blackbox"] is None
-    assert main.global_settings["sound_control"]["mode"] == "stopped"
+    assert main.rooms.default.settings["sound_control"]["mode"] == "stopped"
     assert sum(event == "stop_sound" for event, _data, _kwargs in fake_sio.events) == 2
 
 
@@ -577,15 +662,13 @@ def test_end_round_at_six_broadcasts_final_state_and_sound(monkeypatch):
     state = create_initial_app_state(phase=PHASE_POST_ROUND)
     state["game"]["round"] = {"kind": "normal", "sector": 6}
     state["game"]["score"] = {"znatoki": 6, "tv": 4}
-    media_tokens = {"old": {"expires_at": 999.0}}
+    media_tokens = MediaTokenStore({"old": {"expires_at": 999.0}})
     monkeypatch.setattr(main, "sio", fake_sio)
     monkeypatch.setattr(main, "require_admin", _allow_admin)
-    monkeypatch.setattr(main, "app_state", state)
+    monkeypatch.setattr(main.rooms.default, "state", state)
     monkeypatch.setattr(main, "loaded_pack", None)
-    monkeypatch.setattr(main, "media_tokens", media_tokens)
-    monkeypatch.setattr(
-        main,
-        "players_list",
+    monkeypatch.setattr(main.rooms.default, "media_tokens", media_tokens)
+    monkeypatch.setattr(main.rooms.default, "players",
         [_authorized_admin(monkeypatch, fake_sio)],
     )
 
@@ -623,7 +706,7 @@ def test_reset_during_spin_keeps_reset_state(monkeypatch):
     )
     monkeypatch.setattr(main, "sio", fake_sio)
     monkeypatch.setattr(main, "require_admin", _allow_admin)
-    monkeypatch.setattr(main, "app_state", state)
+    monkeypatch.setattr(main.rooms.default, "state", state)
     monkeypatch.setattr(main, "calculate_spin_result", lambda *_args: (10.0, 2))
 
     async def reset_instead_of_wait(_duration):
@@ -641,22 +724,21 @@ def test_reset_during_spin_keeps_reset_state(monkeypatch):
 
 def test_pending_player_stays_pending_after_restore(monkeypatch):
     fake_sio = FakeSio()
-    player = {
-        "sid": "old",
-        "name": "Pending Player, Second Player",
-        "role": "player",
-        "token": "player-token",
-        "group_id": "group-1",
-        "participants": [
-            {"id": "participant-1", "name": "Pending Player"},
-            {"id": "participant-2", "name": "Second Player"},
+    player = GroupRecord(
+        sid="old",
+        name="Pending Player, Second Player",
+        token="player-token",
+        group_id="group-1",
+        participants=[
+            Participant("participant-1", "Pending Player"),
+            Participant("participant-2", "Second Player"),
         ],
-        "online": False,
-        "pending": True,
-    }
+        online=False,
+        pending=True,
+    )
     monkeypatch.setattr(main, "sio", fake_sio)
-    monkeypatch.setattr(main, "app_state", create_initial_app_state(phase=PHASE_PRE_ROUND))
-    monkeypatch.setattr(main, "players_list", [player])
+    monkeypatch.setattr(main.rooms.default, "state", create_initial_app_state(phase=PHASE_PRE_ROUND))
+    monkeypatch.setattr(main.rooms.default, "players", _roster(player))
 
     asyncio.run(main.restore_session("new", {"player_token": "player-token"}))
 
@@ -666,8 +748,9 @@ def test_pending_player_stays_pending_after_restore(monkeypatch):
         if event in ("join_pending", "join_success")
     ]
     assert restored_events == ["join_pending"]
-    assert player["sid"] == "new"
-    assert player["pending"] is True
+    restored = main.rooms.default.players.by_token("player-token")
+    assert restored.sid == "new"
+    assert restored.pending is True
     pending_payload = next(
         data for event, data, _kwargs in fake_sio.events if event == "join_pending"
     )
@@ -684,8 +767,8 @@ def test_participant_group_join_approval_roster_and_kick_are_atomic(monkeypatch)
     generated = iter(("player-token", "group-1", "participant-1", "participant-2"))
     monkeypatch.setattr(main, "sio", fake_sio)
     monkeypatch.setattr(main, "require_admin", _allow_admin)
-    monkeypatch.setattr(main, "app_state", create_initial_app_state(phase=PHASE_PRE_ROUND))
-    monkeypatch.setattr(main, "players_list", [admin])
+    monkeypatch.setattr(main.rooms.default, "state", create_initial_app_state(phase=PHASE_PRE_ROUND))
+    monkeypatch.setattr(main.rooms.default, "players", _roster(admin))
     monkeypatch.setattr(main.secrets, "token_urlsafe", lambda _length: next(generated))
 
     async def run():
@@ -693,10 +776,10 @@ def test_participant_group_join_approval_roster_and_kick_are_atomic(monkeypatch)
             "group-browser",
             {"participants": ["Иван", " Мария "]},
         )
-        group = main.players_list[1]
-        assert group["pending"] is True
-        assert group["group_id"] == "group-1"
-        assert group["participants"] == [
+        group = main.rooms.default.players.by_sid("group-browser")
+        assert group.pending is True
+        assert group.group_id == "group-1"
+        assert [item.as_dict() for item in group.participants] == [
             {"id": "participant-1", "name": "Иван"},
             {"id": "participant-2", "name": "Мария"},
         ]
@@ -704,9 +787,9 @@ def test_participant_group_join_approval_roster_and_kick_are_atomic(monkeypatch)
             "group-browser",
             {"participants": ["Иван", "Мария"]},
         )
-        assert len(main.players_list) == 2
+        assert len(main.rooms.default.players) == 2
         await main.admin_approve("admin", {"group_id": "group-1"})
-        assert group["pending"] is False
+        assert group.pending is False
         await main.admin_kick("admin", {"group_id": "group-1"})
 
     asyncio.run(run())
@@ -719,7 +802,7 @@ def test_participant_group_join_approval_roster_and_kick_are_atomic(monkeypatch)
     public_group = roster[1]
     assert public_group["group_id"] == "group-1"
     assert [item["name"] for item in public_group["participants"]] == ["Иван", "Мария"]
-    assert [record["role"] for record in main.players_list] == ["admin"]
+    assert [record.role for record in main.rooms.default.players] == ["admin"]
     assert any(event == "join_pending" for event, _data, _kwargs in fake_sio.events)
     assert any(event == "join_success" for event, _data, _kwargs in fake_sio.events)
     assert any(event == "kicked" for event, _data, _kwargs in fake_sio.events)
@@ -728,7 +811,7 @@ def test_participant_group_join_approval_roster_and_kick_are_atomic(monkeypatch)
 def test_participant_group_join_validates_the_complete_name_list(monkeypatch):
     fake_sio = FakeSio(yield_on_emit=False)
     monkeypatch.setattr(main, "sio", fake_sio)
-    monkeypatch.setattr(main, "players_list", [])
+    monkeypatch.setattr(main.rooms.default, "players", _roster())
 
     async def run():
         await main.join_game("empty", {"participants": ["Иван", " "]})
@@ -740,7 +823,7 @@ def test_participant_group_join_validates_the_complete_name_list(monkeypatch):
 
     asyncio.run(run())
 
-    assert main.players_list == []
+    assert len(main.rooms.default.players) == 0
     messages = [
         data["message"]
         for event, data, _kwargs in fake_sio.events
@@ -758,24 +841,22 @@ def test_select_respondent_broadcasts_and_enriches_question_history(monkeypatch)
     pack = parse_question_pack(SAMPLE_PACK)
     state = create_initial_app_state(phase=PHASE_TEAM_ANSWER)
     state["game"]["round"] = {"kind": "normal", "sector": 1}
-    group = {
-        "sid": "group-browser",
-        "name": "Иван, Мария",
-        "role": "player",
-        "token": "player-token",
-        "group_id": "group-1",
-        "participants": [
-            {"id": "participant-1", "name": "Иван"},
-            {"id": "participant-2", "name": "Мария"},
+    group = GroupRecord(
+        sid="group-browser",
+        name="Иван, Мария",
+        token="player-token",
+        group_id="group-1",
+        participants=[
+            Participant("participant-1", "Иван"),
+            Participant("participant-2", "Мария"),
         ],
-        "online": False,
-        "pending": False,
-    }
+        online=False,
+    )
     monkeypatch.setattr(main, "sio", fake_sio)
     monkeypatch.setattr(main, "require_admin", _allow_admin)
-    monkeypatch.setattr(main, "app_state", state)
+    monkeypatch.setattr(main.rooms.default, "state", state)
     monkeypatch.setattr(main, "loaded_pack", pack)
-    monkeypatch.setattr(main, "players_list", [group])
+    monkeypatch.setattr(main.rooms.default, "players", _roster(group))
     opened = game_event(
         "question_opened",
         "Открыт вопрос",
@@ -826,19 +907,16 @@ def test_captain_action_is_bound_to_current_group_socket_and_journal_context(mon
         started_at_ms=10_000,
         deadline_ms=70_000,
     )
-    group = {
-        "sid": "captain-browser",
-        "name": "Иван, Мария",
-        "role": "player",
-        "token": "player-token",
-        "group_id": "group-1",
-        "participants": [
-            {"id": "participant-1", "name": "Иван"},
-            {"id": "participant-2", "name": "Мария"},
+    group = GroupRecord(
+        sid="captain-browser",
+        name="Иван, Мария",
+        token="player-token",
+        group_id="group-1",
+        participants=[
+            Participant("participant-1", "Иван"),
+            Participant("participant-2", "Мария"),
         ],
-        "online": True,
-        "pending": False,
-    }
+    )
     fake_sio.sessions.update(
         {
             "captain-browser": {"role": "player", "player_group_id": "group-1"},
@@ -848,9 +926,9 @@ def test_captain_action_is_bound_to_current_group_socket_and_journal_context(mon
     )
     monkeypatch.setattr(main, "sio", fake_sio)
     monkeypatch.setattr(main, "require_admin", _allow_admin)
-    monkeypatch.setattr(main, "app_state", state)
+    monkeypatch.setattr(main.rooms.default, "state", state)
     monkeypatch.setattr(main, "loaded_pack", pack)
-    monkeypatch.setattr(main, "players_list", [group])
+    monkeypatch.setattr(main.rooms.default, "players", _roster(group))
     monkeypatch.setattr(main, "_now_ms", lambda: 12_000)
 
     async def run():
@@ -901,20 +979,17 @@ def test_captain_action_is_bound_to_current_group_socket_and_journal_context(mon
 def test_host_selects_captain_and_kick_clears_public_role(monkeypatch):
     fake_sio = FakeSio(yield_on_emit=False)
     state = create_initial_app_state(phase=PHASE_PRE_ROUND)
-    group = {
-        "sid": "group-browser",
-        "name": "Иван",
-        "role": "player",
-        "token": "player-token",
-        "group_id": "group-1",
-        "participants": [{"id": "participant-1", "name": "Иван"}],
-        "online": True,
-        "pending": False,
-    }
+    group = GroupRecord(
+        sid="group-browser",
+        name="Иван",
+        token="player-token",
+        group_id="group-1",
+        participants=[Participant("participant-1", "Иван")],
+    )
     monkeypatch.setattr(main, "sio", fake_sio)
     monkeypatch.setattr(main, "require_admin", _allow_admin)
-    monkeypatch.setattr(main, "app_state", state)
-    monkeypatch.setattr(main, "players_list", [group])
+    monkeypatch.setattr(main.rooms.default, "state", state)
+    monkeypatch.setattr(main.rooms.default, "players", _roster(group))
 
     async def run():
         selected = await main.admin_select_captain(
@@ -949,25 +1024,22 @@ def test_captain_credit_request_waits_for_host_and_can_be_rejected(monkeypatch):
     state["game"]["team"]["captain"] = _respondent()
     main.transition_start_discussion(state, started_at_ms=10_000, deadline_ms=70_000)
     main.transition_team_answer(state)
-    group = {
-        "sid": "captain-browser",
-        "name": "Иван",
-        "role": "player",
-        "token": "player-token",
-        "group_id": "group-1",
-        "participants": [{"id": "participant-1", "name": "Иван"}],
-        "online": True,
-        "pending": False,
-    }
+    group = GroupRecord(
+        sid="captain-browser",
+        name="Иван",
+        token="player-token",
+        group_id="group-1",
+        participants=[Participant("participant-1", "Иван")],
+    )
     fake_sio.sessions["captain-browser"] = {
         "role": "player",
         "player_group_id": "group-1",
     }
     monkeypatch.setattr(main, "sio", fake_sio)
     monkeypatch.setattr(main, "require_admin", _allow_admin)
-    monkeypatch.setattr(main, "app_state", state)
+    monkeypatch.setattr(main.rooms.default, "state", state)
     monkeypatch.setattr(main, "loaded_pack", pack)
-    monkeypatch.setattr(main, "players_list", [group])
+    monkeypatch.setattr(main.rooms.default, "players", _roster(group))
     monkeypatch.setattr(main, "_now_ms", lambda: 20_000)
 
     async def run():
@@ -1002,25 +1074,22 @@ def test_captain_repayment_request_waits_for_host_and_is_journaled(monkeypatch):
     state = create_initial_app_state(phase=PHASE_PRE_ROUND)
     state["game"]["team"]["captain"] = _respondent()
     state["game"]["team"]["credit"].update({"used": True, "debt": True})
-    group = {
-        "sid": "captain-browser",
-        "name": "Иван",
-        "role": "player",
-        "token": "player-token",
-        "group_id": "group-1",
-        "participants": [{"id": "participant-1", "name": "Иван"}],
-        "online": True,
-        "pending": False,
-    }
+    group = GroupRecord(
+        sid="captain-browser",
+        name="Иван",
+        token="player-token",
+        group_id="group-1",
+        participants=[Participant("participant-1", "Иван")],
+    )
     fake_sio.sessions["captain-browser"] = {
         "role": "player",
         "player_group_id": "group-1",
     }
     monkeypatch.setattr(main, "sio", fake_sio)
     monkeypatch.setattr(main, "require_admin", _allow_admin)
-    monkeypatch.setattr(main, "app_state", state)
+    monkeypatch.setattr(main.rooms.default, "state", state)
     monkeypatch.setattr(main, "loaded_pack", None)
-    monkeypatch.setattr(main, "players_list", [group])
+    monkeypatch.setattr(main.rooms.default, "players", _roster(group))
     monkeypatch.setattr(main, "_now_ms", lambda: 20_000)
 
     async def run():
@@ -1074,16 +1143,14 @@ def test_admin_login_replaces_previous_token_and_session(monkeypatch):
         "role": "admin",
         "admin_token": old_token,
     }
-    old_record = {
-        "sid": "old-admin",
-        "name": main.ADMIN_NAME,
-        "role": "admin",
-        "token": old_token,
-        "online": True,
-    }
+    old_record = AdminRecord(
+        sid="old-admin",
+        name=main.ADMIN_NAME,
+        token=old_token,
+    )
     monkeypatch.setattr(main, "sio", fake_sio)
-    monkeypatch.setattr(main, "admin_tokens", store)
-    monkeypatch.setattr(main, "players_list", [old_record])
+    monkeypatch.setattr(main.rooms.default, "admin_tokens", store)
+    monkeypatch.setattr(main.rooms.default, "players", _roster(old_record))
     monkeypatch.setattr(
         main,
         "APP_CONFIG",
@@ -1101,7 +1168,7 @@ def test_admin_login_replaces_previous_token_and_session(monkeypatch):
         "role": "admin",
         "admin_token": "new-admin-token",
     }
-    assert main.players_list == [
+    assert [record.as_dict() for record in main.rooms.default.players] == [
         {
             "sid": "new-admin",
             "name": main.ADMIN_NAME,
@@ -1131,8 +1198,8 @@ def test_history_login_is_authorized_without_creating_a_game_session(monkeypatch
     )
     fake_sio = FakeSio(yield_on_emit=False)
     monkeypatch.setattr(main, "sio", fake_sio)
-    monkeypatch.setattr(main, "admin_tokens", store)
-    monkeypatch.setattr(main, "players_list", [])
+    monkeypatch.setattr(main.rooms.default, "admin_tokens", store)
+    monkeypatch.setattr(main.rooms.default, "players", _roster())
     monkeypatch.setattr(
         main,
         "APP_CONFIG",
@@ -1154,7 +1221,7 @@ def test_history_login_is_authorized_without_creating_a_game_session(monkeypatch
         "admin_token": "history-admin-token",
         "client_kind": main.HISTORY_CLIENT_KIND,
     }
-    assert main.players_list == []
+    assert len(main.rooms.default.players) == 0
     assert main.game_journal.list_sessions() == []
     assert [event for event, _data, _kwargs in fake_sio.events] == [
         "auth_success",
@@ -1170,16 +1237,14 @@ def test_history_restore_does_not_take_over_the_game_admin_record(monkeypatch):
     )
     token = store.issue()
     fake_sio = FakeSio(yield_on_emit=False)
-    game_admin = {
-        "sid": "game-admin",
-        "name": main.ADMIN_NAME,
-        "role": "admin",
-        "token": token,
-        "online": True,
-    }
+    game_admin = AdminRecord(
+        sid="game-admin",
+        name=main.ADMIN_NAME,
+        token=token,
+    )
     monkeypatch.setattr(main, "sio", fake_sio)
-    monkeypatch.setattr(main, "admin_tokens", store)
-    monkeypatch.setattr(main, "players_list", [game_admin])
+    monkeypatch.setattr(main.rooms.default, "admin_tokens", store)
+    monkeypatch.setattr(main.rooms.default, "players", _roster(game_admin))
 
     asyncio.run(
         main.restore_session(
@@ -1193,7 +1258,7 @@ def test_history_restore_does_not_take_over_the_game_admin_record(monkeypatch):
         "admin_token": token,
         "client_kind": main.HISTORY_CLIENT_KIND,
     }
-    assert main.players_list == [game_admin]
+    assert list(main.rooms.default.players) == [game_admin]
     assert main.game_journal.list_sessions() == []
     assert [event for event, _data, _kwargs in fake_sio.events] == [
         "role_update",
@@ -1227,19 +1292,11 @@ def test_expired_admin_token_denies_action_and_downgrades_socket(monkeypatch):
         "admin_token": token,
     }
     monkeypatch.setattr(main, "sio", fake_sio)
-    monkeypatch.setattr(main, "admin_tokens", store)
+    monkeypatch.setattr(main.rooms.default, "admin_tokens", store)
     monkeypatch.setattr(
-        main,
-        "players_list",
-        [
-            {
-                "sid": "admin",
-                "name": main.ADMIN_NAME,
-                "role": "admin",
-                "token": token,
-                "online": True,
-            }
-        ],
+        main.rooms.default,
+        "players",
+        _roster(AdminRecord(sid="admin", name=main.ADMIN_NAME, token=token)),
     )
     now[0] = 160.0
 
@@ -1247,7 +1304,7 @@ def test_expired_admin_token_denies_action_and_downgrades_socket(monkeypatch):
 
     assert allowed is False
     assert fake_sio.sessions["admin"] == {"role": "player"}
-    assert main.players_list == []
+    assert len(main.rooms.default.players) == 0
     assert any(event == "auth_expired" for event, _data, _kwargs in fake_sio.events)
 
 
@@ -1255,8 +1312,8 @@ def test_restore_rejects_revoked_admin_token(monkeypatch):
     fake_sio = FakeSio(yield_on_emit=False)
     store = AdminTokenStore(60)
     monkeypatch.setattr(main, "sio", fake_sio)
-    monkeypatch.setattr(main, "admin_tokens", store)
-    monkeypatch.setattr(main, "players_list", [])
+    monkeypatch.setattr(main.rooms.default, "admin_tokens", store)
+    monkeypatch.setattr(main.rooms.default, "players", _roster())
 
     asyncio.run(main.restore_session("browser", {"token": "revoked-token"}))
 
@@ -1275,8 +1332,8 @@ def test_restore_reports_the_original_admin_expiry(monkeypatch):
     now[0] = 120.0
     fake_sio = FakeSio(yield_on_emit=False)
     monkeypatch.setattr(main, "sio", fake_sio)
-    monkeypatch.setattr(main, "admin_tokens", store)
-    monkeypatch.setattr(main, "players_list", [])
+    monkeypatch.setattr(main.rooms.default, "admin_tokens", store)
+    monkeypatch.setattr(main.rooms.default, "players", _roster())
 
     asyncio.run(main.restore_session("browser", {"token": token}))
 
@@ -1293,15 +1350,15 @@ def test_restore_reports_the_original_admin_expiry(monkeypatch):
 def test_admin_logout_revokes_token(monkeypatch):
     fake_sio = FakeSio(yield_on_emit=False)
     admin = _authorized_admin(monkeypatch, fake_sio)
-    store = main.admin_tokens
+    store = main.rooms.default.admin_tokens
     monkeypatch.setattr(main, "sio", fake_sio)
-    monkeypatch.setattr(main, "players_list", [admin])
+    monkeypatch.setattr(main.rooms.default, "players", _roster(admin))
 
     asyncio.run(main.leave_game("admin"))
 
-    assert store.validate(admin["token"]) is False
+    assert store.validate(admin.token) is False
     assert fake_sio.sessions["admin"] == {"role": "player"}
-    assert main.players_list == []
+    assert len(main.rooms.default.players) == 0
 
 
 def test_audio_resolve_share_play_pause_stop_and_http_context(monkeypatch):
@@ -1314,12 +1371,10 @@ def test_audio_resolve_share_play_pause_stop_and_http_context(monkeypatch):
 
     monkeypatch.setattr(main, "sio", fake_sio)
     monkeypatch.setattr(main, "require_admin", _allow_admin)
-    monkeypatch.setattr(main, "app_state", state)
+    monkeypatch.setattr(main.rooms.default, "state", state)
     monkeypatch.setattr(main, "loaded_pack", pack)
-    monkeypatch.setattr(main, "media_tokens", {})
-    monkeypatch.setattr(
-        main,
-        "players_list",
+    monkeypatch.setattr(main.rooms.default, "media_tokens", MediaTokenStore({}))
+    monkeypatch.setattr(main.rooms.default, "players",
         [_authorized_admin(monkeypatch, fake_sio)],
     )
     monkeypatch.setattr(main.time, "time", lambda: now[0])
@@ -1377,7 +1432,189 @@ def test_audio_resolve_share_play_pause_stop_and_http_context(monkeypatch):
             await main.get_media(media_id)
         assert error.value.status_code == 404
         assert error.value.detail == "Медиа не найдено"
-        assert media_id not in main.media_tokens
+        assert media_id not in main.rooms.default.media_tokens
+
+    asyncio.run(run_flow())
+
+
+def test_signed_media_tokens_need_no_store_and_end_with_the_media_epoch(monkeypatch):
+    fake_sio = FakeSio(yield_on_emit=False)
+    state = create_initial_app_state(phase=PHASE_QUESTION_READING)
+    state["game"]["round"] = {"kind": "normal", "sector": 3}
+    state["wheel"]["spin_id"] = 7
+    pack = parse_question_pack(SAMPLE_PACK)
+    now = [100.0]
+
+    monkeypatch.setattr(main, "sio", fake_sio)
+    monkeypatch.setattr(main, "require_admin", _allow_admin)
+    monkeypatch.setattr(main, "media_token_signer", MediaTokenSigner("s" * 32))
+    monkeypatch.setattr(main.rooms.default, "state", state)
+    monkeypatch.setattr(main, "loaded_pack", pack)
+    monkeypatch.setattr(main.rooms.default, "media_tokens", MediaTokenStore({}))
+    monkeypatch.setattr(main.rooms.default, "media_epoch", 0)
+    monkeypatch.setattr(main.rooms.default, "players", _roster())
+    monkeypatch.setattr(main.time, "time", lambda: now[0])
+
+    descriptor = next(iter(main._get_current_media_catalog().values()))
+
+    async def run_flow():
+        resolved = await main.admin_resolve_media(
+            "admin",
+            {"media_ref": descriptor.media_ref},
+        )
+        media_id = resolved["media_id"]
+        assert len(main.rooms.default.media_tokens) == 0
+        assert "melody" not in media_id
+
+        response = await main.get_media(media_id)
+        assert Path(response.path).name == "melody.mp3"
+        assert (await main.admin_share_media("admin", {"media_id": media_id}))["ok"]
+
+        with pytest.raises(main.HTTPException):
+            await main.get_media(media_id[:-2] + ("AA" if media_id[-2:] != "AA" else "BB"))
+        with pytest.raises(main.HTTPException):
+            await main.get_media(media_id, room="friday")
+
+        # Another worker cannot check the epoch, round and spin, so it refuses.
+        monkeypatch.setattr(main, "_room_is_local", lambda _room_id: False)
+        with pytest.raises(main.HTTPException) as error:
+            await main.get_media(media_id)
+        assert error.value.status_code == 404
+        monkeypatch.setattr(main, "_room_is_local", lambda _room_id: True)
+        now[0] = 100.0 + main.MEDIA_TOKEN_TTL_SECONDS
+
+        # The active shared token outlives its TTL in its own worker.
+        response = await main.get_media(media_id)
+        assert Path(response.path).name == "melody.mp3"
+
+        main._clear_all_media_tokens()
+        assert main.rooms.default.media_epoch == 1
+        with pytest.raises(main.HTTPException) as error:
+            await main.get_media(media_id)
+        assert error.value.status_code == 404
+
+    asyncio.run(run_flow())
+
+
+def test_media_images_are_sent_as_the_requested_variant(monkeypatch, tmp_path):
+    fake_sio = FakeSio(yield_on_emit=False)
+    state = create_initial_app_state(phase=PHASE_QUESTION_READING)
+    state["game"]["round"] = {"kind": "normal", "sector": 2}
+    pack = parse_question_pack(SAMPLE_PACK)
+    thumb = tmp_path / "painting1-thumb320.jpg"
+    thumb.write_bytes(b"small")
+    pack.image_variants = {"02/media/painting1.jpg": {"thumb": thumb}}
+
+    monkeypatch.setattr(main, "sio", fake_sio)
+    monkeypatch.setattr(main, "require_admin", _allow_admin)
+    monkeypatch.setattr(main.rooms.default, "state", state)
+    monkeypatch.setattr(main, "loaded_pack", pack)
+    monkeypatch.setattr(main.rooms.default, "media_tokens", MediaTokenStore({}))
+
+    painting = next(
+        media
+        for media in main._get_current_media_catalog().values()
+        if media.name == "painting1.jpg"
+    )
+
+    async def run_flow():
+        resolved = await main.admin_resolve_media("admin", {"media_ref": painting.media_ref})
+        media_id = resolved["media_id"]
+        assert Path((await main.get_media(media_id, variant="thumb")).path) == thumb
+        assert Path((await main.get_media(media_id, variant="display")).path) == painting.path
+        assert Path((await main.get_media(media_id)).path) == painting.path
+
+    asyncio.run(run_flow())
+
+
+def test_question_media_prefetch_is_opt_in_per_player_and_limited(monkeypatch):
+    fake_sio = FakeSio(yield_on_emit=False)
+    state = create_initial_app_state(phase=PHASE_QUESTION_READING)
+    state["game"]["round"] = {"kind": "normal", "sector": 3}
+    state["wheel"]["spin_id"] = 7
+    pack = parse_question_pack(SAMPLE_PACK)
+    room = main.rooms.default
+
+    monkeypatch.setattr(main, "sio", fake_sio)
+    monkeypatch.setattr(main, "require_admin", _allow_admin)
+    monkeypatch.setattr(room, "state", state)
+    monkeypatch.setattr(main, "loaded_pack", pack)
+    monkeypatch.setattr(room, "media_tokens", MediaTokenStore({}))
+    monkeypatch.setattr(room, "prefetch_keys", {})
+    monkeypatch.setattr(room, "prefetch_downloads", {})
+    monkeypatch.setattr(room, "players", _roster(*(
+        GroupRecord(
+            sid=sid,
+            name=sid,
+            token=f"{sid}-token",
+            group_id=f"{sid}-group",
+            online=online,
+            pending=pending,
+        )
+        for sid, online, pending in (("p1", True, False), ("p2", True, True), ("p3", False, False))
+    )))
+
+    def prefetch_events():
+        return [
+            (data, kwargs.get("to") or kwargs["room"])
+            for event, data, kwargs in fake_sio.events
+            if event == "media_prefetch"
+        ]
+
+    async def run_flow():
+        await main._emit_media_prefetch()
+        assert prefetch_events() == []
+
+        monkeypatch.setattr(
+            main,
+            "APP_CONFIG",
+            replace(main.APP_CONFIG, media_prefetch=main.MEDIA_PREFETCH_QUESTION),
+        )
+        await main._emit_media_prefetch()
+        [(payload, to)] = prefetch_events()
+        assert to == "p1"
+        assert payload["concurrency"] == main.MEDIA_PREFETCH_CONCURRENCY
+        [item] = payload["items"]
+        assert item["type"] == "audio"
+        assert item["bytes"] == (SAMPLE_PACK / "03" / "media" / "melody.mp3").stat().st_size
+        assert "melody" not in item["media_id"]
+        assert room.media_tokens[item["media_id"]]["prefetch_sid"] == "p1"
+
+        response = await main.get_media(item["media_id"])
+        assert room.prefetch_downloads == {"p1": 1}
+        with pytest.raises(main.HTTPException) as error:
+            await main.get_media(item["media_id"])
+        assert error.value.status_code == 429
+        async def receive():
+            return {"type": "http.disconnect"}
+
+        async def send(_message):
+            pass
+
+        await response({"type": "http", "method": "GET", "headers": []}, receive, send)
+        assert room.prefetch_downloads == {}
+
+        assert await main.admin_share_media("admin", {"media_id": item["media_id"]}) == {
+            "ok": False,
+            "error": "media_not_allowed",
+        }
+        resolved = await main.admin_resolve_media(
+            "admin",
+            {"media_ref": room.media_tokens[item["media_id"]]["media_ref"]},
+        )
+        assert (await main.admin_share_media("admin", {"media_id": resolved["media_id"]}))["ok"]
+        shared = state["presentation"]["shared_media"]
+        assert shared["prefetch_key"] == item["prefetch_key"]
+        public = public_game_state(state)["shared_media"]
+        assert public["prefetch_key"] == item["prefetch_key"]
+
+        fake_sio.events.clear()
+        state["game"]["phase"] = PHASE_DISCUSSION
+        await main._apply_transition_effects(main.TransitionEffects(clear_media_tokens=True))
+        assert prefetch_events() == [
+            ({"concurrency": 1, "items": []}, room.audience_channel(main.PLAYERS_AUDIENCE))
+        ]
+        assert room.prefetch_keys == {}
 
     asyncio.run(run_flow())
 
@@ -1391,12 +1628,10 @@ def test_author_is_pre_resolved_shared_reconnect_safe_and_reusable_after_hide(mo
 
     monkeypatch.setattr(main, "sio", fake_sio)
     monkeypatch.setattr(main, "require_admin", _allow_admin)
-    monkeypatch.setattr(main, "app_state", state)
+    monkeypatch.setattr(main.rooms.default, "state", state)
     monkeypatch.setattr(main, "loaded_pack", pack)
-    monkeypatch.setattr(main, "media_tokens", {})
-    monkeypatch.setattr(
-        main,
-        "players_list",
+    monkeypatch.setattr(main.rooms.default, "media_tokens", MediaTokenStore({}))
+    monkeypatch.setattr(main.rooms.default, "players",
         [_authorized_admin(monkeypatch, fake_sio)],
     )
 
@@ -1423,7 +1658,7 @@ def test_author_is_pre_resolved_shared_reconnect_safe_and_reusable_after_hide(mo
             "has_photo": True,
         }
         assert "path" not in author
-        assert set(main.media_tokens) == {author_id}
+        assert set(main.rooms.default.media_tokens) == {author_id}
 
         response = await main.get_media(author_id)
         assert Path(response.path).name == "author.jpg"
@@ -1461,7 +1696,7 @@ def test_author_is_pre_resolved_shared_reconnect_safe_and_reusable_after_hide(mo
 
         assert await main.admin_hide_media("admin") == {"ok": True}
         assert state["presentation"]["shared_media"] is None
-        assert author_id in main.media_tokens
+        assert author_id in main.rooms.default.media_tokens
         assert Path((await main.get_media(author_id)).path).name == "author.jpg"
 
         assert await main.admin_share_media(
@@ -1504,12 +1739,10 @@ def test_author_token_from_previous_blitz_part_cannot_be_shared(monkeypatch):
 
     monkeypatch.setattr(main, "sio", fake_sio)
     monkeypatch.setattr(main, "require_admin", _allow_admin)
-    monkeypatch.setattr(main, "app_state", state)
+    monkeypatch.setattr(main.rooms.default, "state", state)
     monkeypatch.setattr(main, "loaded_pack", pack)
-    monkeypatch.setattr(main, "media_tokens", {})
-    monkeypatch.setattr(
-        main,
-        "players_list",
+    monkeypatch.setattr(main.rooms.default, "media_tokens", MediaTokenStore({}))
+    monkeypatch.setattr(main.rooms.default, "players",
         [_authorized_admin(monkeypatch, fake_sio)],
     )
 
@@ -1528,7 +1761,7 @@ def test_author_token_from_previous_blitz_part_cannot_be_shared(monkeypatch):
         )
 
         assert response == {"ok": False, "error": "media_not_current"}
-        assert old_author_id not in main.media_tokens
+        assert old_author_id not in main.rooms.default.media_tokens
         assert state["presentation"]["shared_media"] is None
 
     asyncio.run(run_flow())
@@ -1544,10 +1777,10 @@ def test_video_resolve_share_play_and_natural_end(monkeypatch):
 
     monkeypatch.setattr(main, "sio", fake_sio)
     monkeypatch.setattr(main, "require_admin", _allow_admin)
-    monkeypatch.setattr(main, "app_state", state)
+    monkeypatch.setattr(main.rooms.default, "state", state)
     monkeypatch.setattr(main, "loaded_pack", pack)
-    monkeypatch.setattr(main, "media_tokens", {})
-    monkeypatch.setattr(main, "players_list", [])
+    monkeypatch.setattr(main.rooms.default, "media_tokens", MediaTokenStore({}))
+    monkeypatch.setattr(main.rooms.default, "players", _roster())
     monkeypatch.setattr(main.time, "time", lambda: now[0])
 
     descriptor = next(iter(main._get_current_media_catalog().values()))
@@ -1596,6 +1829,64 @@ def test_video_resolve_share_play_and_natural_end(monkeypatch):
     asyncio.run(run_flow())
 
 
+def test_known_duration_ends_playback_on_the_server(monkeypatch):
+    fake_sio = FakeSio(yield_on_emit=False)
+    state = create_initial_app_state(phase=PHASE_QUESTION_READING)
+    state["game"]["round"] = {"kind": "normal", "sector": 6}
+    state["wheel"]["spin_id"] = 11
+    pack = parse_question_pack(SAMPLE_PACK)
+    pack.media_manifest = {"06/media/clip.mp4": {"type": "video", "duration_ms": 20}}
+
+    monkeypatch.setattr(main, "sio", fake_sio)
+    monkeypatch.setattr(main, "require_admin", _allow_admin)
+    monkeypatch.setattr(main.rooms.default, "state", state)
+    monkeypatch.setattr(main, "loaded_pack", pack)
+    monkeypatch.setattr(main.rooms.default, "media_tokens", MediaTokenStore({}))
+    monkeypatch.setattr(main.rooms.default, "players", _roster())
+    monkeypatch.setattr(main.rooms.default, "media_end_task", None)
+    monkeypatch.setattr(main, "MEDIA_END_GRACE_MS", 0)
+
+    descriptor = next(iter(main._get_current_media_catalog().values()))
+    assert descriptor.public_descriptor()["duration_ms"] == 20
+
+    async def run_flow():
+        resolved = await main.admin_resolve_media(
+            "admin",
+            {"media_ref": descriptor.media_ref},
+        )
+        await main.admin_share_media("admin", {"media_id": resolved["media_id"]})
+        shared = state["presentation"]["shared_media"]
+
+        # A pause before the end leaves the superseded task nothing to do.
+        await main.admin_play_media("admin")
+        paused_task = main.rooms.default.media_end_task
+        await main.admin_pause_media("admin")
+        await paused_task
+        assert shared["playback_state"] == "paused"
+
+        await main.admin_play_media("admin")
+        await main.rooms.default.media_end_task
+        assert shared["playback_state"] == "stopped"
+        assert shared["position_ms"] == 0
+
+        late = await main.admin_media_ended(
+            "admin",
+            {
+                "media_id": resolved["media_id"],
+                "playback_generation": shared["playback_generation"] - 1,
+            },
+        )
+        assert late == {"ok": False, "error": "stale_playback"}
+
+    asyncio.run(run_flow())
+
+    events = main.game_journal.get_session(
+        main.game_journal.list_sessions()[0]["id"]
+    )["events"]
+    completed = [event for event in events if event["event_type"] == "media_completed"]
+    assert [event["payload"]["source"] for event in completed] == ["duration"]
+
+
 def test_next_media_replaces_shared_item_inside_question_section(monkeypatch):
     fake_sio = FakeSio(yield_on_emit=False)
     state = create_initial_app_state(phase=PHASE_QUESTION_READING)
@@ -1605,10 +1896,10 @@ def test_next_media_replaces_shared_item_inside_question_section(monkeypatch):
 
     monkeypatch.setattr(main, "sio", fake_sio)
     monkeypatch.setattr(main, "require_admin", _allow_admin)
-    monkeypatch.setattr(main, "app_state", state)
+    monkeypatch.setattr(main.rooms.default, "state", state)
     monkeypatch.setattr(main, "loaded_pack", pack)
-    monkeypatch.setattr(main, "media_tokens", {})
-    monkeypatch.setattr(main, "players_list", [])
+    monkeypatch.setattr(main.rooms.default, "media_tokens", MediaTokenStore({}))
+    monkeypatch.setattr(main.rooms.default, "players", _roster())
 
     catalog = main._get_current_media_catalog()
     question_media = sorted(
@@ -1634,7 +1925,7 @@ def test_next_media_replaces_shared_item_inside_question_section(monkeypatch):
         assert state["presentation"]["shared_media"]["media_ref"] == question_media[1].media_ref
         assert state["presentation"]["shared_media"]["playback_state"] == "stopped"
         assert state["presentation"]["shared_media"]["has_next"] is False
-        assert first["media_id"] not in main.media_tokens
+        assert first["media_id"] not in main.rooms.default.media_tokens
 
         no_next = await main.admin_share_next_media(
             "admin",
@@ -1660,10 +1951,10 @@ def test_shared_token_outlives_private_ttl_until_hide(monkeypatch):
 
     monkeypatch.setattr(main, "sio", fake_sio)
     monkeypatch.setattr(main, "require_admin", _allow_admin)
-    monkeypatch.setattr(main, "app_state", state)
+    monkeypatch.setattr(main.rooms.default, "state", state)
     monkeypatch.setattr(main, "loaded_pack", pack)
-    monkeypatch.setattr(main, "media_tokens", {})
-    monkeypatch.setattr(main, "players_list", [])
+    monkeypatch.setattr(main.rooms.default, "media_tokens", MediaTokenStore({}))
+    monkeypatch.setattr(main.rooms.default, "players", _roster())
     monkeypatch.setattr(main.time, "time", lambda: now[0])
 
     descriptor = next(iter(main._get_current_media_catalog().values()))
@@ -1679,10 +1970,10 @@ def test_shared_token_outlives_private_ttl_until_hide(monkeypatch):
         now[0] += main.MEDIA_TOKEN_TTL_SECONDS + 1
         response = await main.get_media(media_id)
         assert Path(response.path).name == "melody.mp3"
-        assert media_id in main.media_tokens
+        assert media_id in main.rooms.default.media_tokens
 
         assert await main.admin_hide_media("admin") == {"ok": True}
-        assert media_id not in main.media_tokens
+        assert media_id not in main.rooms.default.media_tokens
         with pytest.raises(main.HTTPException) as error:
             await main.get_media(media_id)
         assert error.value.status_code == 404
@@ -1699,10 +1990,10 @@ def test_image_resolves_by_ref_and_preserves_share_behavior(monkeypatch):
 
     monkeypatch.setattr(main, "sio", fake_sio)
     monkeypatch.setattr(main, "require_admin", _allow_admin)
-    monkeypatch.setattr(main, "app_state", state)
+    monkeypatch.setattr(main.rooms.default, "state", state)
     monkeypatch.setattr(main, "loaded_pack", pack)
-    monkeypatch.setattr(main, "media_tokens", {})
-    monkeypatch.setattr(main, "players_list", [])
+    monkeypatch.setattr(main.rooms.default, "media_tokens", MediaTokenStore({}))
+    monkeypatch.setattr(main.rooms.default, "players", _roster())
 
     descriptor = next(iter(main._get_current_media_catalog().values()))
 
@@ -1726,8 +2017,8 @@ def test_live_ops_handlers_apply_authoritative_state_and_reject_invalid_input(mo
     state = create_initial_app_state(phase=PHASE_PRE_ROUND)
     monkeypatch.setattr(main, "sio", fake_sio)
     monkeypatch.setattr(main, "require_admin", _allow_admin)
-    monkeypatch.setattr(main, "app_state", state)
-    monkeypatch.setattr(main, "players_list", [])
+    monkeypatch.setattr(main.rooms.default, "state", state)
+    monkeypatch.setattr(main.rooms.default, "players", _roster())
 
     async def run_flow():
         score_response = await main.admin_set_score(
@@ -1777,12 +2068,10 @@ def test_live_ops_open_round_force_phase_timer_and_clear_question(monkeypatch):
 
     monkeypatch.setattr(main, "sio", fake_sio)
     monkeypatch.setattr(main, "require_admin", _allow_admin)
-    monkeypatch.setattr(main, "app_state", state)
+    monkeypatch.setattr(main.rooms.default, "state", state)
     monkeypatch.setattr(main, "loaded_pack", pack)
-    monkeypatch.setattr(main, "media_tokens", {"old-media": {"expires_at": 999.0}})
-    monkeypatch.setattr(
-        main,
-        "players_list",
+    monkeypatch.setattr(main.rooms.default, "media_tokens", MediaTokenStore({"old-media": {"expires_at": 999.0}}))
+    monkeypatch.setattr(main.rooms.default, "players",
         [_authorized_admin(monkeypatch, fake_sio)],
     )
     monkeypatch.setattr(main.time, "time", lambda: now[0])
@@ -1792,8 +2081,8 @@ def test_live_ops_open_round_force_phase_timer_and_clear_question(monkeypatch):
         assert opened == {"ok": True}
         assert state["game"]["phase"] == PHASE_QUESTION_READING
         assert state["game"]["round"] == {"kind": "normal", "sector": 3}
-        assert len(main.media_tokens) == 1
-        author_token = next(iter(main.media_tokens.values()))
+        assert len(main.rooms.default.media_tokens) == 1
+        author_token = next(iter(main.rooms.default.media_tokens.values()))
         assert author_token["presentation_kind"] == "author"
         assert author_token["round_key"] == (3, "normal", 0)
 
@@ -1852,11 +2141,9 @@ def test_resending_current_question_does_not_journal_another_open(monkeypatch):
     state["game"]["round"] = {"kind": "blitz", "sector": 4, "part_index": 1}
     state["pack"]["question_types"] = [q.type.value for q in pack.questions]
     monkeypatch.setattr(main, "sio", fake_sio)
-    monkeypatch.setattr(main, "app_state", state)
+    monkeypatch.setattr(main.rooms.default, "state", state)
     monkeypatch.setattr(main, "loaded_pack", pack)
-    monkeypatch.setattr(
-        main,
-        "players_list",
+    monkeypatch.setattr(main.rooms.default, "players",
         [_authorized_admin(monkeypatch, fake_sio)],
     )
     main.game_journal.mark_started()
@@ -1883,9 +2170,7 @@ def test_game_history_handlers_are_admin_only_and_can_reclassify(monkeypatch):
     fake_sio = FakeSio(yield_on_emit=False)
     monkeypatch.setattr(main, "sio", fake_sio)
     monkeypatch.setattr(main, "require_admin", _allow_admin)
-    monkeypatch.setattr(
-        main,
-        "players_list",
+    monkeypatch.setattr(main.rooms.default, "players",
         [_authorized_admin(monkeypatch, fake_sio)],
     )
     main.game_journal.record_event("player_joined", "Игрок присоединился", {})
@@ -1903,7 +2188,7 @@ def test_game_history_handlers_are_admin_only_and_can_reclassify(monkeypatch):
         assert any(
             event == "admin_game_mode_update"
             and data == {"mode": MODE_REGULAR}
-            and kwargs == {"to": "admin"}
+            and kwargs == {"room": "game:main:admins"}
             for event, data, kwargs in fake_sio.events
         )
 
@@ -1967,21 +2252,61 @@ def test_game_history_handlers_are_admin_only_and_can_reclassify(monkeypatch):
     asyncio.run(run())
 
 
+def test_paged_game_history_handlers_return_cursors(monkeypatch):
+    monkeypatch.setattr(main, "require_admin", _allow_admin)
+    for index in range(3):
+        main.game_journal.record_event("admin_note", f"Заметка {index}", {})
+    session_id = main.game_journal.current_session_id()
+
+    async def run():
+        sessions = await main.admin_list_game_sessions("admin", {"mode": "all", "limit": 1})
+        assert sessions["ok"] is True
+        assert [session["id"] for session in sessions["sessions"]] == [session_id]
+        assert sessions["next_cursor"] is None
+        assert sessions["current_session_id"] == session_id
+
+        events = await main.admin_list_game_events(
+            "admin",
+            {"session_id": session_id, "limit": 2},
+        )
+        assert [event["sequence_number"] for event in events["events"]] == [1, 2]
+        more = await main.admin_list_game_events(
+            "admin",
+            {"session_id": session_id, "cursor": events["next_cursor"]},
+        )
+        assert [event["sequence_number"] for event in more["events"]] == [3]
+
+        used = await main.admin_list_used_questions("admin")
+        assert used == {"ok": True, "questions": [], "total": 0, "next_cursor": None}
+
+        invalid = await main.admin_list_game_sessions("admin", {"cursor": 5})
+        assert invalid["ok"] is False
+        assert invalid["error"] == "invalid_journal_action"
+
+        monkeypatch.setattr(main, "require_admin", _deny_admin)
+        for handler in (
+            main.admin_list_game_sessions,
+            main.admin_list_game_events,
+            main.admin_list_used_questions,
+        ):
+            assert await handler("player", {}) == {"ok": False, "error": "not_admin"}
+
+    asyncio.run(run())
+
+
 def test_live_ops_reset_to_intro_stops_audio_and_waits_for_manual_music(monkeypatch):
     fake_sio = FakeSio(yield_on_emit=False)
     state = create_initial_app_state(phase=PHASE_POST_ROUND)
     state["game"]["score"] = {"znatoki": 5, "tv": 4}
     state["game"]["used_questions"] = [1, 3, 5]
     state["game"]["round"] = {"kind": "normal", "sector": 5}
-    media_tokens = {"old": {"expires_at": 999.0}}
+    media_tokens = MediaTokenStore({"old": {"expires_at": 999.0}})
     monkeypatch.setattr(main, "sio", fake_sio)
     monkeypatch.setattr(main, "require_admin", _allow_admin)
-    monkeypatch.setattr(main, "app_state", state)
-    monkeypatch.setattr(main, "media_tokens", media_tokens)
+    monkeypatch.setattr(main.rooms.default, "state", state)
+    monkeypatch.setattr(main.rooms.default, "media_tokens", media_tokens)
     monkeypatch.setattr(main, "_now_ms", lambda: 50_000)
-    monkeypatch.setattr(
-        main,
-        "players_list",
+    monkeypatch.setattr(main.rooms.default, "players",
         [_authorized_admin(monkeypatch, fake_sio)],
     )
     main.game_journal.set_current_mode(MODE_REGULAR)
@@ -2006,7 +2331,7 @@ def test_live_ops_reset_to_intro_stops_audio_and_waits_for_manual_music(monkeypa
     assert any(
         event == "admin_game_mode_update"
         and data == {"mode": MODE_DEBUG}
-        and kwargs == {"to": "admin"}
+        and kwargs == {"room": "game:main:admins"}
         for event, data, kwargs in fake_sio.events
     )
     assert not any(
@@ -2027,9 +2352,9 @@ def test_live_ops_cancel_spin_prevents_sleeping_handler_completion(monkeypatch):
     )
     monkeypatch.setattr(main, "sio", fake_sio)
     monkeypatch.setattr(main, "require_admin", _allow_admin)
-    monkeypatch.setattr(main, "app_state", state)
-    monkeypatch.setattr(main, "players_list", [])
-    monkeypatch.setattr(main, "media_tokens", {"old": {"expires_at": 999.0}})
+    monkeypatch.setattr(main.rooms.default, "state", state)
+    monkeypatch.setattr(main.rooms.default, "players", _roster())
+    monkeypatch.setattr(main.rooms.default, "media_tokens", MediaTokenStore({"old": {"expires_at": 999.0}}))
     monkeypatch.setattr(main, "calculate_spin_result", lambda *_args: (10.0, 2))
 
     async def cancel_instead_of_wait(_duration):
@@ -2043,7 +2368,7 @@ def test_live_ops_cancel_spin_prevents_sleeping_handler_completion(monkeypatch):
     assert state["game"]["phase"] == PHASE_PRE_ROUND
     assert state["game"]["used_questions"] == []
     assert state["wheel"]["is_spinning"] is False
-    assert main.media_tokens == {}
+    assert main.rooms.default.media_tokens == {}
     assert any(event == "stop_sound" for event, _, _ in fake_sio.events)
 
 
@@ -2052,7 +2377,7 @@ def test_live_ops_handlers_require_admin(monkeypatch):
     state = create_initial_app_state(phase=PHASE_PRE_ROUND)
     monkeypatch.setattr(main, "sio", fake_sio)
     monkeypatch.setattr(main, "require_admin", _deny_admin)
-    monkeypatch.setattr(main, "app_state", state)
+    monkeypatch.setattr(main.rooms.default, "state", state)
 
     response = asyncio.run(
         main.admin_set_score("player", {"znatoki": 1, "tv": 0})
@@ -2078,7 +2403,7 @@ def test_sound_fade_stops_shared_audio_and_publishes_stopped_mode(monkeypatch):
     }
     monkeypatch.setattr(main, "sio", fake_sio)
     monkeypatch.setattr(main, "require_admin", _allow_admin)
-    monkeypatch.setattr(main, "app_state", state)
+    monkeypatch.setattr(main.rooms.default, "state", state)
     monkeypatch.setattr(main.time, "time", lambda: 1.0)
 
     async def finish_immediately(_duration):
@@ -2091,7 +2416,7 @@ def test_sound_fade_stops_shared_audio_and_publishes_stopped_mode(monkeypatch):
     assert response == {"ok": True, "completed": True}
     assert state["presentation"]["shared_media"]["playback_state"] == "stopped"
     assert state["presentation"]["shared_media"]["position_ms"] == 0
-    assert main.global_settings["sound_control"]["mode"] == "stopped"
+    assert main.rooms.default.settings["sound_control"]["mode"] == "stopped"
     settings = [
         data for event, data, _kwargs in fake_sio.events if event == "settings_update"
     ]
@@ -2108,7 +2433,7 @@ def test_later_effect_supersedes_sleeping_fade_completion(monkeypatch):
     state = create_initial_app_state(phase=PHASE_PRE_ROUND)
     monkeypatch.setattr(main, "sio", fake_sio)
     monkeypatch.setattr(main, "require_admin", _allow_admin)
-    monkeypatch.setattr(main, "app_state", state)
+    monkeypatch.setattr(main.rooms.default, "state", state)
 
     async def play_effect_instead_of_wait(_duration):
         await main.admin_sound("admin", {"sound": "gong1"})
@@ -2118,7 +2443,7 @@ def test_later_effect_supersedes_sleeping_fade_completion(monkeypatch):
     response = asyncio.run(main.admin_fade_sounds("admin"))
 
     assert response == {"ok": True, "completed": False}
-    assert main.global_settings["sound_control"]["mode"] == "normal"
+    assert main.rooms.default.settings["sound_control"]["mode"] == "normal"
     assert any(event == "play_sound" for event, _, _ in fake_sio.events)
     assert not any(event == "stop_sound" for event, _, _ in fake_sio.events)
 
@@ -2136,10 +2461,10 @@ def test_explicit_media_stop_supersedes_fade_when_media_is_already_stopped(monke
         "position_ms": 0,
         "started_at_ms": None,
     }
-    generation = begin_fade(main.global_settings["sound_control"], now_ms=1_000)
+    generation = begin_fade(main.rooms.default.settings["sound_control"], now_ms=1_000)
     monkeypatch.setattr(main, "sio", fake_sio)
     monkeypatch.setattr(main, "require_admin", _allow_admin)
-    monkeypatch.setattr(main, "app_state", state)
+    monkeypatch.setattr(main.rooms.default, "state", state)
     monkeypatch.setattr(
         main,
         "_get_current_shared_media_token_info",
@@ -2148,9 +2473,9 @@ def test_explicit_media_stop_supersedes_fade_when_media_is_already_stopped(monke
 
     asyncio.run(main.admin_stop_media("admin"))
 
-    assert main.global_settings["sound_control"]["mode"] == "normal"
+    assert main.rooms.default.settings["sound_control"]["mode"] == "normal"
     assert main.complete_fade(
-        main.global_settings["sound_control"],
+        main.rooms.default.settings["sound_control"],
         generation=generation,
     ) is False
     settings = [
@@ -2164,7 +2489,7 @@ def test_later_silence_supersedes_fade_without_duplicate_stop(monkeypatch):
     state = create_initial_app_state(phase=PHASE_PRE_ROUND)
     monkeypatch.setattr(main, "sio", fake_sio)
     monkeypatch.setattr(main, "require_admin", _allow_admin)
-    monkeypatch.setattr(main, "app_state", state)
+    monkeypatch.setattr(main.rooms.default, "state", state)
 
     async def silence_instead_of_wait(_duration):
         await main.admin_stop_sounds("admin")
@@ -2174,7 +2499,7 @@ def test_later_silence_supersedes_fade_without_duplicate_stop(monkeypatch):
     response = asyncio.run(main.admin_fade_sounds("admin"))
 
     assert response == {"ok": True, "completed": False}
-    assert main.global_settings["sound_control"]["mode"] == "stopped"
+    assert main.rooms.default.settings["sound_control"]["mode"] == "stopped"
     assert sum(event == "stop_sound" for event, _, _ in fake_sio.events) == 1
 
 
@@ -2186,7 +2511,7 @@ def test_later_spin_supersedes_fade_and_keeps_wheel_sound_enabled(monkeypatch):
     )
     monkeypatch.setattr(main, "sio", fake_sio)
     monkeypatch.setattr(main, "require_admin", _allow_admin)
-    monkeypatch.setattr(main, "app_state", state)
+    monkeypatch.setattr(main.rooms.default, "state", state)
 
     async def start_spin_instead_of_wait(_duration):
         effects = main.transition_start_spin(
@@ -2203,16 +2528,16 @@ def test_later_spin_supersedes_fade_and_keeps_wheel_sound_enabled(monkeypatch):
 
     assert response == {"ok": True, "completed": False}
     assert state["wheel"]["is_spinning"] is True
-    assert main.global_settings["sound_control"]["mode"] == "normal"
+    assert main.rooms.default.settings["sound_control"]["mode"] == "normal"
     assert not any(event == "stop_sound" for event, _, _ in fake_sio.events)
 
 
 def test_connect_receives_current_fade_snapshot_before_game_state(monkeypatch):
     fake_sio = FakeSio(yield_on_emit=False)
     state = create_initial_app_state(phase=PHASE_PRE_ROUND)
-    begin_fade(main.global_settings["sound_control"], now_ms=1_000)
+    begin_fade(main.rooms.default.settings["sound_control"], now_ms=1_000)
     monkeypatch.setattr(main, "sio", fake_sio)
-    monkeypatch.setattr(main, "app_state", state)
+    monkeypatch.setattr(main.rooms.default, "state", state)
     monkeypatch.setattr(main.time, "time", lambda: 2.5)
 
     asyncio.run(main.connect("player", {}))
@@ -2235,5 +2560,685 @@ def test_sound_fade_requires_admin(monkeypatch):
     response = asyncio.run(main.admin_fade_sounds("player"))
 
     assert response == {"ok": False, "error": "not_admin"}
-    assert main.global_settings["sound_control"] == create_sound_control_state()
+    assert main.rooms.default.settings["sound_control"] == create_sound_control_state()
     assert fake_sio.events == []
+
+
+def test_delta_subscribers_receive_patches_while_legacy_clients_get_snapshots(monkeypatch):
+    fake_sio = FakeSio(yield_on_emit=False)
+    state = create_initial_app_state(phase=PHASE_PRE_ROUND)
+    monkeypatch.setattr(main, "sio", fake_sio)
+    monkeypatch.setattr(main.rooms.default, "state", state)
+    monkeypatch.setattr(main.rooms.default, "players", _roster())
+    monkeypatch.setattr(main.rooms.default, "state_stream", StateStream())
+    monkeypatch.setattr(main.rooms.default, "state_delta_sids", set())
+    monkeypatch.setattr(main.rooms.default, "state_snapshots", StateSnapshotCache())
+
+    ack = asyncio.run(main.state_subscribe("viewer", {"protocol": "delta"}))
+    assert ack["ok"] is True
+    assert fake_sio.rooms[main.rooms.default.delta_channel] == {"viewer"}
+    assert ack["state"]["revision"] == ack["revision"]
+
+    fake_sio.events.clear()
+    asyncio.run(
+        main._apply_transition_effects(
+            main.live_ops_set_score(state, znatoki=3, tv=1)
+        )
+    )
+
+    full = [
+        (data, kwargs) for event, data, kwargs in fake_sio.events
+        if event == "state_update"
+    ]
+    patches = [
+        (data, kwargs) for event, data, kwargs in fake_sio.events
+        if event == "state_patch"
+    ]
+    assert len(full) == 1 and len(patches) == 1
+    assert full[0][1] == {"room": "game:main", "skip_sid": ["viewer"]}
+    patch, patch_kwargs = patches[0]
+    assert patch_kwargs == {"room": main.rooms.default.delta_channel}
+    assert patch["base_revision"] == ack["revision"]
+    assert patch["revision"] == full[0][0]["revision"]
+    patched = apply_state_patch(ack["state"], patch["ops"])
+    patched["revision"] = patch["revision"]
+    assert patched == full[0][0]
+    assert patched["score"] == {"znatoki": 3, "tv": 1}
+
+
+def test_delta_subscribers_get_server_time_when_only_time_changed(monkeypatch):
+    fake_sio = FakeSio(yield_on_emit=False)
+    state = create_initial_app_state(phase=PHASE_PRE_ROUND)
+    now = [100.0]
+    monkeypatch.setattr(main, "sio", fake_sio)
+    monkeypatch.setattr(main.time, "time", lambda: now[0])
+    monkeypatch.setattr(main.rooms.default, "state", state)
+    monkeypatch.setattr(main.rooms.default, "players", _roster())
+    monkeypatch.setattr(main.rooms.default, "state_stream", StateStream())
+    monkeypatch.setattr(main.rooms.default, "state_delta_sids", set())
+    monkeypatch.setattr(main.rooms.default, "state_snapshots", StateSnapshotCache())
+
+    ack = asyncio.run(main.state_subscribe("viewer", {"protocol": "delta"}))
+    fake_sio.events.clear()
+    now[0] = 160.0
+    asyncio.run(main.emit_state_update())
+
+    patch, full = [data for _event, data, _kwargs in fake_sio.events]
+    assert [event for event, _data, _kwargs in fake_sio.events] == ["state_patch", "state_update"]
+    assert patch["base_revision"] == patch["revision"] == ack["revision"]
+    assert full["revision"] == ack["revision"]
+    refreshed = apply_state_patch(ack["state"], patch["ops"])
+    assert refreshed == full
+    assert refreshed["timer"]["server_now_ms"] == 160_000
+
+
+def test_batched_sockets_get_one_effects_packet_per_transition(monkeypatch):
+    fake_sio = FakeSio(yield_on_emit=False)
+    state = create_initial_app_state(phase=PHASE_PRE_ROUND)
+    monkeypatch.setattr(main, "sio", fake_sio)
+    monkeypatch.setattr(main.rooms.default, "state", state)
+    monkeypatch.setattr(main.rooms.default, "players", _roster(_authorized_admin(monkeypatch, fake_sio)))
+    monkeypatch.setattr(main.rooms.default, "state_stream", StateStream())
+    monkeypatch.setattr(main.rooms.default, "state_delta_sids", set())
+    monkeypatch.setattr(main.rooms.default, "effect_batch_sids", set())
+    monkeypatch.setattr(main.rooms.default, "state_snapshots", StateSnapshotCache())
+
+    async def subscribe():
+        ack = await main.state_subscribe("admin", {"protocol": "delta", "batch": True})
+        await main.state_subscribe("phone", {"protocol": "full", "batch": True})
+        await main.state_subscribe("legacy", {"protocol": "delta"})
+        return ack
+
+    ack = asyncio.run(subscribe())
+    assert ack["batch"] is True
+    assert fake_sio.rooms[main.rooms.default.batch_channel] == {"admin", "phone"}
+
+    fake_sio.events.clear()
+    asyncio.run(
+        main._apply_transition_effects(
+            main.live_ops_reset_to_intro(state, asset_token="intro-assets")
+        )
+    )
+
+    legacy = [(event, kwargs) for event, _data, kwargs in fake_sio.events if event != "effects"]
+    assert legacy == [
+        ("settings_update", {"room": "game:main", "skip_sid": ["admin", "phone"]}),
+        ("stop_sound", {"room": "game:main", "skip_sid": ["admin", "phone"]}),
+        ("state_patch", {"room": main.rooms.default.delta_channel, "skip_sid": ["admin", "phone"]}),
+        ("state_update", {"room": "game:main", "skip_sid": ["admin", "legacy", "phone"]}),
+    ]
+    packets = {
+        (kwargs["room"], tuple(kwargs.get("skip_sid", ()))): [
+            event for event, _data in data["events"]
+        ]
+        for event, data, kwargs in fake_sio.events
+        if event == "effects"
+    }
+    assert packets == {
+        ("game:main:admins", ()): [
+            "settings_update",
+            "stop_sound",
+            "state_patch",
+            "admin_game_mode_update",
+            "admin_question",
+        ],
+        (main.rooms.default.batch_channel, ("admin",)): [
+            "settings_update",
+            "stop_sound",
+            "state_update",
+        ],
+    }
+    admin_packet = next(
+        data for event, data, kwargs in fake_sio.events
+        if event == "effects" and kwargs["room"] == "game:main:admins"
+    )
+    patch = admin_packet["events"][2][1]
+    assert patch["base_revision"] == ack["revision"]
+    assert admin_packet["events"][4] == ["admin_question", None]
+
+    asyncio.run(main.state_subscribe("phone", {"protocol": "full"}))
+    assert main.rooms.default.effect_batch_sids == {"admin"}
+
+
+def test_state_subscribe_can_return_to_full_snapshots(monkeypatch):
+    fake_sio = FakeSio(yield_on_emit=False)
+    monkeypatch.setattr(main, "sio", fake_sio)
+    monkeypatch.setattr(main.rooms.default, "state", create_initial_app_state())
+    monkeypatch.setattr(main.rooms.default, "state_stream", StateStream())
+    monkeypatch.setattr(main.rooms.default, "state_delta_sids", set())
+    monkeypatch.setattr(main.rooms.default, "state_snapshots", StateSnapshotCache())
+
+    asyncio.run(main.state_subscribe("viewer", {"protocol": "delta"}))
+    response = asyncio.run(main.state_subscribe("viewer", {"protocol": "full"}))
+    asyncio.run(main.emit_state_update())
+
+    assert response["protocol"] == "full"
+    assert main.rooms.default.state_delta_sids == set()
+    assert fake_sio.rooms[main.rooms.default.delta_channel] == set()
+    assert fake_sio.events[-1][0] == "state_update"
+    assert fake_sio.events[-1][2] == {"room": "game:main"}
+    assert asyncio.run(main.state_subscribe("viewer", {"protocol": "xml"})) == {
+        "ok": False,
+        "error": "unsupported_protocol",
+    }
+
+
+def test_reconnecting_clients_reuse_one_encoded_snapshot(monkeypatch):
+    fake_sio = FakeSio(yield_on_emit=False)
+    state = create_initial_app_state(phase=PHASE_PRE_ROUND)
+    now = {"ms": 10_000}
+    cache = StateSnapshotCache()
+    monkeypatch.setattr(main, "sio", fake_sio)
+    monkeypatch.setattr(main.rooms.default, "state", state)
+    monkeypatch.setattr(main.rooms.default, "state_stream", StateStream())
+    monkeypatch.setattr(main.rooms.default, "state_delta_sids", set())
+    monkeypatch.setattr(main.rooms.default, "state_snapshots", cache)
+    monkeypatch.setattr(main, "_now_ms", lambda: now["ms"])
+
+    asyncio.run(main.emit_state_update())
+    for index in range(5):
+        now["ms"] += 1
+        asyncio.run(main.connect(f"player-{index}", {}))
+
+    snapshots = [data for event, data, _ in fake_sio.events if event == "state_update"]
+    assert cache.stats() == {"generation": 1, "hits": 5, "misses": 1}
+    assert snapshots[-1]["timer"]["server_now_ms"] == 10_005
+    assert PacketJson.dumps(
+        ["state_update", snapshots[-1]],
+        separators=(",", ":"),
+    ) == json.dumps(["state_update", dict(snapshots[-1])], separators=(",", ":"))
+
+    asyncio.run(
+        main._apply_transition_effects(main.live_ops_set_score(state, znatoki=1, tv=0))
+    )
+    asyncio.run(main.connect("late", {}))
+
+    assert fake_sio.events[-2][1]["score"] == {"znatoki": 1, "tv": 0}
+    assert (cache.hits, cache.misses) == (6, 2)
+    assert asyncio.run(main.metrics())["state_snapshots"]["hits"] == 6
+
+
+def test_rooms_keep_state_roster_and_journal_sessions_apart(monkeypatch):
+    fake_sio = FakeSio(yield_on_emit=False)
+    monkeypatch.setattr(main, "sio", fake_sio)
+    monkeypatch.setattr(main, "require_admin", _allow_admin)
+
+    host = {"admin_password": main.APP_CONFIG.admin_password}
+
+    async def run():
+        await main.connect("a-admin", {}, {"room": "a", **host})
+        main.rooms.open("b")
+        await main.connect("b-viewer", {"QUERY_STRING": "room=b"})
+        await main.connect("main-viewer", {})
+        assert await main.admin_set_score("a-admin", {"znatoki": 3, "tv": 1}) == {"ok": True}
+        await main.join_game("b-viewer", {"participants": ["Иван"]})
+
+    asyncio.run(run())
+
+    room_a = main.rooms.get("a")
+    room_b = main.rooms.get("b")
+    assert len(main.rooms) == 3
+    assert room_a.state["game"]["score"] == {"znatoki": 3, "tv": 1}
+    assert room_b.state["game"]["score"] == {"znatoki": 0, "tv": 0}
+    assert main.rooms.default.state["game"]["score"] == {"znatoki": 0, "tv": 0}
+    assert [record.sid for record in room_b.players] == ["b-viewer"]
+    assert len(room_a.players) == 0 and len(main.rooms.default.players) == 0
+    session_a = room_a.journal.snapshot()["current_session"]
+    session_b = room_b.journal.snapshot()["current_session"]
+    assert session_a["id"] != session_b["id"]
+    assert main.rooms.default.journal.snapshot()["current_session"] is None
+    assert fake_sio.rooms["game:a"] == {"a-admin"}
+    assert fake_sio.rooms["game:main"] == {"main-viewer"}
+
+    score_updates = [
+        kwargs for event, data, kwargs in fake_sio.events
+        if event == "state_update" and data["score"]["znatoki"] == 3
+    ]
+    assert score_updates == [{"room": "game:a"}]
+
+    asyncio.run(main.disconnect("b-viewer", "client disconnect"))
+    assert room_b.players.by_sid("b-viewer").online is False
+    assert main.rooms.for_socket("b-viewer") is main.rooms.default
+    # Nobody is left in the lobby of `b`, so the room and its session end.
+    assert main.rooms.get("b") is None
+    assert main.rooms.get("a") is room_a
+    assert room_b.journal.current_session_id() is None
+    sessions = {
+        session["id"]: session["status"]
+        for session in main.game_journal.snapshot()["sessions"]
+    }
+    assert sessions[session_b["id"]] == "interrupted"
+
+
+def test_concurrent_games_do_not_see_each_others_updates(monkeypatch):
+    fake_sio = FakeSio(yield_on_emit=True)
+    room_count = 300
+    monkeypatch.setattr(main, "sio", fake_sio)
+    monkeypatch.setattr(main, "require_admin", _allow_admin)
+    monkeypatch.setattr(
+        main,
+        "rooms",
+        main.GameRooms(main._create_room, max_rooms=room_count + 1),
+    )
+
+    def score(index):
+        return {"znatoki": index % 7, "tv": index // 7 % 7}
+
+    async def play(index):
+        sid = f"admin-{index}"
+        await main.connect(
+            sid,
+            {},
+            {"room": f"game-{index}", "admin_password": main.APP_CONFIG.admin_password},
+        )
+        return await main.admin_set_score(sid, score(index))
+
+    async def run():
+        return await asyncio.gather(*(play(index) for index in range(room_count)))
+
+    assert asyncio.run(run()) == [{"ok": True}] * room_count
+
+    broadcasts = {}
+    for event, data, kwargs in fake_sio.events:
+        if event == "state_update" and "room" in kwargs:
+            broadcasts.setdefault(kwargs["room"], []).append(data["score"])
+    for index in range(room_count):
+        room = main.rooms.get(f"game-{index}")
+        assert room.state["game"]["score"] == score(index)
+        assert broadcasts[room.channel] == [score(index)]
+
+
+def test_connect_rejects_invalid_rooms_and_http_routes_check_the_room(monkeypatch):
+    monkeypatch.setattr(main, "sio", FakeSio(yield_on_emit=False))
+
+    with pytest.raises(main.socketio.exceptions.ConnectionRefusedError):
+        asyncio.run(main.connect("bad", {}, {"room": "Не/игра"}))
+    assert main.rooms.for_socket("bad") is main.rooms.default
+    with pytest.raises(main.HTTPException) as error:
+        asyncio.run(main.get_media("missing", room="unknown"))
+    assert error.value.status_code == 404
+
+
+def test_only_the_host_password_creates_a_room_on_connect(monkeypatch):
+    fake_sio = FakeSio(yield_on_emit=False)
+    monkeypatch.setattr(main, "sio", fake_sio)
+    password = main.APP_CONFIG.admin_password
+
+    for sid, auth in (
+        ("anonymous", {"room": "friday"}),
+        ("guess", {"room": "friday", "admin_password": "not-the-password"}),
+    ):
+        with pytest.raises(main.socketio.exceptions.ConnectionRefusedError) as error:
+            asyncio.run(main.connect(sid, {}, auth))
+        assert error.value.error_args == {
+            "message": "room_not_found",
+            "data": {"message": "Ведущий ещё не открыл эту игру"},
+        }
+    assert main.rooms.get("friday") is None
+
+    async def run():
+        await main.connect("host", {}, {"room": "friday", "admin_password": password})
+        await main.connect("phone", {"QUERY_STRING": "room=friday"})
+        await main.disconnect("host", "client disconnect")
+        kept = main.rooms.get("friday") is not None
+        await main.disconnect("phone", "client disconnect")
+        return kept
+
+    assert asyncio.run(run()) is True
+    assert main.rooms.get("friday") is None
+    assert asyncio.run(main.metrics())["rooms_closed"] == 1
+
+
+def test_audience_rooms_follow_login_approval_kick_and_token_expiry(monkeypatch):
+    now = [100.0]
+    store = AdminTokenStore(60, clock=lambda: now[0])
+    fake_sio = FakeSio(yield_on_emit=False)
+    room = main.rooms.default
+    monkeypatch.setattr(main, "sio", fake_sio)
+    monkeypatch.setattr(room, "admin_tokens", store)
+    monkeypatch.setattr(room, "state", create_initial_app_state(phase=PHASE_PRE_ROUND))
+    monkeypatch.setattr(room, "players", _roster())
+    monkeypatch.setattr(
+        main,
+        "APP_CONFIG",
+        replace(main.APP_CONFIG, admin_password="correct-password"),
+    )
+
+    def members(audience):
+        return fake_sio.rooms.get(room.audience_channel(audience), set())
+
+    async def run():
+        await main.authenticate_admin(
+            "journal",
+            {"password": "correct-password", "client_kind": main.HISTORY_CLIENT_KIND},
+        )
+        await main.authenticate_admin("host", {"password": "correct-password"})
+        assert members(main.HISTORY_AUDIENCE) == {"journal"}
+        assert members(main.ADMINS_AUDIENCE) == {"host"}
+
+        fake_sio.events.clear()
+        await main.join_game("team", {"participants": ["Иван"]})
+        assert members(main.PENDING_AUDIENCE) == {"team"}
+        admin_emits = [
+            (event, kwargs)
+            for event, _data, kwargs in fake_sio.events
+            if event in ("players_update", "admin_notification")
+        ]
+        assert admin_emits == [
+            ("players_update", {"room": "game:main:admins"}),
+            ("admin_notification", {"room": "game:main:admins"}),
+        ]
+
+        group = room.players.by_sid("team")
+        await main.admin_approve("host", {"group_id": group.group_id})
+        assert members(main.PENDING_AUDIENCE) == set()
+        assert members(main.PLAYERS_AUDIENCE) == {"team"}
+
+        await main.restore_session("team-phone", {"player_token": group.token})
+        assert members(main.PLAYERS_AUDIENCE) == {"team-phone"}
+        await main.admin_kick("host", {"group_id": group.group_id})
+        assert members(main.PLAYERS_AUDIENCE) == set()
+        assert room.audiences == {"journal": "history", "host": "admins"}
+
+        now[0] = 170.0
+        fake_sio.events.clear()
+        await main.broadcast_players()
+        assert fake_sio.events == []
+        assert members(main.ADMINS_AUDIENCE) == set()
+        assert room.admin_audience_token is None
+
+    asyncio.run(run())
+
+
+def test_group_eviction_keeps_roster_and_players_update_bounded(monkeypatch):
+    now = [1_000.0]
+    fake_sio = FakeSio(yield_on_emit=False)
+    room = main.rooms.default
+    state = create_initial_app_state(phase=PHASE_PRE_ROUND)
+    monkeypatch.setattr(main, "sio", fake_sio)
+    monkeypatch.setattr(room, "state", state)
+    monkeypatch.setattr(room, "players", Roster(clock=lambda: now[0]))
+    monkeypatch.setattr(
+        main,
+        "APP_CONFIG",
+        replace(main.APP_CONFIG, group_offline_ttl_seconds=300, max_groups=10),
+    )
+    room.players.add(_authorized_admin(monkeypatch, fake_sio))
+
+    async def run():
+        await main.join_game("captain-tab", {"participants": ["Капитан"]})
+        captain_group = room.players.group_by_sid("captain-tab")
+        state["game"]["team"]["captain"] = {
+            "participant_id": captain_group.participants[0].id,
+            "group_id": captain_group.group_id,
+            "name": "Капитан",
+        }
+        await main.disconnect("captain-tab")
+
+        largest_update = 0
+        for tab in range(200):
+            now[0] += 10
+            await main.join_game(f"tab-{tab}", {"participants": [f"Игрок {tab}"]})
+            await main.disconnect(f"tab-{tab}")
+            assert room.players.group_count() <= 10
+            update = next(
+                data for event, data, _kwargs in reversed(fake_sio.events)
+                if event == "players_update"
+            )
+            largest_update = max(largest_update, len(json.dumps(update)))
+            fake_sio.events.clear()
+        return captain_group, largest_update
+
+    captain_group, largest_update = asyncio.run(run())
+
+    assert room.players.by_group(captain_group.group_id) is captain_group
+    assert room.players.evicted_count == 191
+    summary = room.players.eviction_summary()
+    assert len(summary["recent"]) == 5
+    assert {item["reason"] for item in summary["recent"]} == {"over_limit"}
+    assert largest_update < 3_000
+    session_id = room.journal.current_session_id()
+    evicted_events = [
+        event for event in room.journal.get_session(session_id)["events"]
+        if event["event_type"] == "group_evicted"
+    ]
+    assert len(evicted_events) == 191
+
+    # Offline longer than the TTL: every group but the captain's goes.
+    now[0] += 301
+    asyncio.run(main.disconnect("nobody"))
+    asyncio.run(main.join_game("late", {"participants": ["Опоздавший"]}))
+    assert [group.sid for group in room.players.groups()] == ["captain-tab", "late"]
+    assert room.players.recent_evictions[-1]["reason"] == "offline"
+
+
+def test_join_is_refused_when_every_group_is_online(monkeypatch):
+    fake_sio = FakeSio(yield_on_emit=False)
+    room = main.rooms.default
+    monkeypatch.setattr(main, "sio", fake_sio)
+    monkeypatch.setattr(room, "state", create_initial_app_state())
+    monkeypatch.setattr(room, "players", _roster())
+    monkeypatch.setattr(main, "APP_CONFIG", replace(main.APP_CONFIG, max_groups=10))
+
+    async def run():
+        for tab in range(11):
+            await main.join_game(f"tab-{tab}", {"participants": [f"Игрок {tab}"]})
+
+    asyncio.run(run())
+
+    assert room.players.group_count() == 10
+    assert room.players.group_by_sid("tab-10") is None
+    assert any(
+        event == "join_failed" and kwargs == {"to": "tab-10"}
+        for event, _data, kwargs in fake_sio.events
+    )
+
+
+def test_spectate_streams_state_and_sounds_and_resumes_by_revision(monkeypatch):
+    from starlette.requests import Request
+
+    fake_sio = FakeSio(yield_on_emit=False)
+    monkeypatch.setattr(main, "sio", fake_sio)
+
+    def request(last_event_id=None):
+        headers = [] if last_event_id is None else [(b"last-event-id", str(last_event_id).encode())]
+        return Request({"type": "http", "method": "GET", "headers": headers, "query_string": b""})
+
+    def events(chunk):
+        frames = chunk.decode("utf-8").split("\n\n")
+        return [frame.split("\n")[-2:] for frame in frames if "event: " in frame]
+
+    async def run():
+        with pytest.raises(main.HTTPException) as unknown:
+            await main.spectate(request(), room="friday")
+        assert unknown.value.status_code == 404
+        assert main.rooms.get("friday") is None
+
+        main.rooms.open("friday")
+        response = await main.spectate(request(), room="friday")
+        stream = response.body_iterator
+        first = await anext(stream)
+        room = main.rooms.get("friday")
+        with main._entered_room(room):
+            room.state["game"]["score"]["znatoki"] = 3
+            await main._apply_transition_effects(
+                main.TransitionEffects(sounds=("gong",), stop_sounds=True)
+            )
+        update = await anext(stream)
+        resumed = await main.spectate(request(room.state_stream.revision), room="friday")
+        resumed_first = await anext(resumed.body_iterator)
+        subscribers = room.spectators.subscribers
+        await stream.aclose()
+        await resumed.body_iterator.aclose()
+        return response, first, update, resumed_first, subscribers, room
+
+    response, first, update, resumed_first, subscribers, room = asyncio.run(run())
+
+    assert response.media_type == "text/event-stream"
+    assert response.headers["x-accel-buffering"] == "no"
+    assert [name for name, _data in events(first)] == [
+        "event: settings_update",
+        "event: state_update",
+    ]
+    assert first.startswith(b"retry: ")
+    assert [name for name, _data in events(update)] == [
+        "event: settings_update",
+        "event: stop_sound",
+        "event: settings_update",
+        "event: play_sound",
+        "event: state_update",
+    ]
+    state = json.loads(events(update)[-1][1].removeprefix("data: "))
+    assert state["score"]["znatoki"] == 3
+    assert f"id: {room.state_stream.revision}\n".encode() in update
+    # Resuming at the current revision skips the snapshot.
+    assert [name for name, _data in events(resumed_first)] == ["event: settings_update"]
+    assert subscribers == 2
+    assert room.spectators.subscribers == 0
+    # Spectators hold no Socket.IO session.
+    assert fake_sio.sessions == {}
+
+
+def test_spectator_limit_counts_requests_before_their_stream_starts(monkeypatch):
+    import gc
+
+    from starlette.requests import Request
+
+    monkeypatch.setattr(main, "sio", FakeSio())
+    monkeypatch.setattr(main, "MAX_SPECTATORS", 2)
+    request = Request({"type": "http", "method": "GET", "headers": [], "query_string": b""})
+
+    async def run():
+        results = await asyncio.gather(
+            *(main.spectate(request) for _ in range(3)),
+            return_exceptions=True,
+        )
+        return [getattr(result, "status_code", None) for result in results]
+
+    statuses = asyncio.run(run())
+
+    # The third request arrived while the others were still building.
+    assert statuses == [200, 200, 503]
+    # Responses that were never sent give their slots back.
+    gc.collect()
+    assert main.rooms.default.spectators.subscribers == 0
+
+
+def test_http_routes_refuse_rooms_hosted_by_another_worker(monkeypatch):
+    monkeypatch.setattr(main, "sio", FakeSio(yield_on_emit=False))
+    monkeypatch.setattr(main, "loaded_pack", parse_question_pack(SAMPLE_PACK))
+    monkeypatch.setattr(main, "_room_is_local", lambda room_id: room_id != main.DEFAULT_ROOM_ID)
+
+    async def run():
+        statuses = []
+        for call in (
+            main.get_intro_author_photo(1, 1),
+            main.get_media("token"),
+        ):
+            with pytest.raises(main.HTTPException) as error:
+                await call
+            statuses.append(error.value.status_code)
+        return statuses
+
+    # This worker's own `main` room is a placeholder, not the live game.
+    assert asyncio.run(run()) == [404, 404]
+
+
+def test_spectate_refuses_a_main_room_hosted_by_another_worker(monkeypatch):
+    from starlette.requests import Request
+
+    monkeypatch.setattr(main, "sio", FakeSio(yield_on_emit=False))
+    monkeypatch.setattr(main, "_room_is_local", lambda _room_id: False)
+    request = Request({"type": "http", "method": "GET", "headers": [], "query_string": b""})
+
+    with pytest.raises(main.HTTPException) as error:
+        asyncio.run(main.spectate(request))
+
+    # The local `main` is a lobby that never changes, so it is not streamed.
+    assert error.value.status_code == 404
+    assert main.rooms.default.spectators.subscribers == 0
+
+
+def test_spectators_hear_the_sounds_the_host_plays_and_stops(monkeypatch):
+    from starlette.requests import Request
+
+    fake_sio = FakeSio(yield_on_emit=False)
+    monkeypatch.setattr(main, "sio", fake_sio)
+    monkeypatch.setattr(main, "require_admin", _allow_admin)
+    request = Request({"type": "http", "method": "GET", "headers": [], "query_string": b""})
+
+    def events(chunk):
+        return [
+            line.removeprefix("event: ")
+            for line in chunk.decode("utf-8").split("\n")
+            if line.startswith("event: ")
+        ]
+
+    async def run():
+        response = await main.spectate(request)
+        stream = response.body_iterator
+        await anext(stream)
+        await main.admin_sound("admin", {"sound": "gong"})
+        played = await anext(stream)
+        await main.admin_stop_sounds("admin")
+        stopped = await anext(stream)
+        await stream.aclose()
+        return played, stopped
+
+    played, stopped = asyncio.run(run())
+
+    assert events(played) == ["settings_update", "play_sound"]
+    assert b'"sound":"gong"' in played.replace(b" ", b"")
+    assert events(stopped) == ["settings_update", "stop_sound"]
+    # Sockets still get the same sounds.
+    assert ("play_sound", {"sound": "gong"}, {"room": main.rooms.default.channel}) in fake_sio.events
+    assert ("stop_sound", None, {"room": main.rooms.default.channel}) in fake_sio.events
+
+
+def test_history_reads_wait_for_batched_writes_off_the_event_loop(monkeypatch, tmp_path):
+    journal = GameJournal(tmp_path / "journal.sqlite3", default_mode=MODE_DEBUG, writes=WRITES_BATCHED)
+    journal.initialize()
+    journal.configure_pack(fingerprint="pack", name="pack", path=tmp_path)
+    monkeypatch.setattr(main, "game_journal", journal)
+    monkeypatch.setattr(main, "rooms", main.GameRooms(main._create_room, max_rooms=8))
+    monkeypatch.setattr(main, "sio", FakeSio(yield_on_emit=False))
+    monkeypatch.setattr(main, "require_admin", _allow_admin)
+    flushes = []
+    flush = journal.flush
+
+    def recording_flush():
+        flushes.append((threading.current_thread() is threading.main_thread(), journal.has_pending_writes()))
+        flush()
+
+    monkeypatch.setattr(journal, "flush", recording_flush)
+    main.add_log("Группа вошла", event_type="group_joined", payload={})
+
+    try:
+        page = asyncio.run(main.admin_list_game_sessions("admin", {"mode": "all"}))
+    finally:
+        journal.close()
+
+    assert page["ok"] is True and len(page["sessions"]) == 1
+    # The loop thread only ever flushes once nothing is queued.
+    assert flushes[0] == (False, True)
+    assert all(not pending for on_loop, pending in flushes if on_loop)
+
+
+def test_shutdown_closes_the_journal_when_the_last_flush_fails(monkeypatch, caplog):
+    closed = []
+
+    def fail_flush():
+        raise main.JournalError("disk full")
+
+    monkeypatch.setattr(main.game_journal, "flush", fail_flush)
+    monkeypatch.setattr(main.game_journal, "close", lambda: closed.append(True))
+    monkeypatch.setattr(main, "_load_question_pack_on_startup", lambda: None)
+
+    async def run():
+        async with main.lifespan(main.fastapi_app):
+            pass
+
+    asyncio.run(run())
+
+    assert closed == [True]
+    assert "Could not write the queued journal events on shutdown" in caplog.text
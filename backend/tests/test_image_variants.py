@@ -0,0 +1,106 @@
+from pathlib import Path
+
+from PIL import Image
+
+from image_variants import (
+    IMAGE_VARIANTS,
+    VARIANTS_DIR_NAME,
+    build_image_variants,
+    image_variant_path,
+    variants_dir,
+)
+from pack_cache import pack_manifest
+from questions import Media, MediaType, Question, QuestionPack, QuestionType
+
+
+def _pack(root: Path, *images: str) -> QuestionPack:
+    question = Question(
+        id="q1",
+        title="Картины",
+        question_html="",
+        author_photo=root / "01" / "author.jpg",
+        media=[
+            Media(type=MediaType.IMAGE, path=root / name, section="question", order=index, ref=f"m{index}")
+            for index, name in enumerate(images)
+        ],
+        type=QuestionType.NORMAL,
+    )
+    return QuestionPack(questions=[question], path=root)
+
+
+def _photo(path: Path, size: tuple[int, int], *, mode: str = "RGB") -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    image = Image.effect_noise(size, 64).convert(mode)
+    image.save(path, "PNG" if mode == "RGBA" else "JPEG", quality=95)
+
+
+def test_variants_are_downscaled_content_named_and_reused(tmp_path):
+    root = tmp_path / "pack"
+    _photo(root / "01" / "author.jpg", (2400, 1800))
+    _photo(root / "01" / "media" / "small.jpg", (200, 150))
+    pack = _pack(root, "01/media/small.jpg")
+    directory = tmp_path / "variants"
+
+    variants, report = build_image_variants(pack, directory)
+
+    author = variants["01/author.jpg"]
+    assert set(author) == set(IMAGE_VARIANTS)
+    with Image.open(author["display"]) as display, Image.open(author["thumb"]) as thumb:
+        assert display.size == (1600, 1200)
+        assert thumb.size == (320, 240)
+    assert "01/media/small.jpg" not in variants
+    assert (report.images, report.generated, report.failed) == (2, 2, 0)
+    assert report.variant_bytes["thumb"] < report.variant_bytes["display"] < report.source_bytes
+    assert "thumb" in report.summary() and "saves" in report.summary()
+
+    stamps = {path: path.stat().st_mtime_ns for path in author.values()}
+    again, report = build_image_variants(pack, directory)
+    assert again == variants and report.generated == 0
+    assert {path: path.stat().st_mtime_ns for path in author.values()} == stamps
+
+    _photo(root / "01" / "author.jpg", (2000, 2000))
+    changed, report = build_image_variants(pack, directory)
+    assert changed["01/author.jpg"]["display"] != author["display"]
+    assert report.generated == 2
+
+
+def test_transparent_images_stay_png_and_broken_images_are_skipped(tmp_path):
+    root = tmp_path / "pack"
+    _photo(root / "01" / "author.jpg", (300, 300))
+    _photo(root / "01" / "media" / "logo.png", (1000, 1000), mode="RGBA")
+    (root / "01" / "media" / "broken.jpg").write_bytes(b"not an image")
+    pack = _pack(root, "01/media/logo.png", "01/media/broken.jpg")
+
+    variants, report = build_image_variants(pack, tmp_path / "variants")
+
+    assert variants["01/media/logo.png"]["thumb"].suffix == ".png"
+    assert "01/media/broken.jpg" not in variants
+    assert report.failed == 1
+
+
+def test_variant_lookup_falls_back_to_the_source(tmp_path):
+    root = tmp_path / "pack"
+    pack = QuestionPack(questions=[], path=root)
+    pack.image_variants = {"01/author.jpg": {"thumb": tmp_path / "thumb.jpg"}}
+    source = root / "01" / "author.jpg"
+
+    assert image_variant_path(pack, str(source), "thumb") == tmp_path / "thumb.jpg"
+    assert image_variant_path(pack, str(source), "display") == str(source)
+    assert image_variant_path(pack, str(source), "original") == str(source)
+    assert image_variant_path(pack, str(source), None) == str(source)
+    assert image_variant_path(None, str(source), "thumb") == str(source)
+    assert image_variant_path(pack, "/elsewhere/author.jpg", "thumb") == "/elsewhere/author.jpg"
+
+
+def test_variants_inside_the_pack_do_not_invalidate_its_manifest(tmp_path):
+    root = tmp_path / "pack"
+    _photo(root / "01" / "author.jpg", (800, 600))
+    before = pack_manifest(root)
+
+    directory = variants_dir(root)
+    build_image_variants(_pack(root), directory)
+
+    assert directory == root.resolve() / VARIANTS_DIR_NAME
+    assert any(directory.iterdir())
+    assert pack_manifest(root) == before
+    assert variants_dir(root, tmp_path / "cache").parent == tmp_path / "cache"
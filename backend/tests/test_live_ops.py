@@ -319,7 +319,7 @@ def test_reset_to_intro_clears_progress_and_restarts_timeline():
     state["timer"]["discussion_deadline_ms"] = 99_000
     state["presentation"]["shared_media"] = _shared_image()
 
-    effects = live_ops_reset_to_intro(state)
+    effects = live_ops_reset_to_intro(state, asset_token="intro-assets")
 
     assert state["game"] == {
         "phase": PHASE_INTRO,
@@ -345,6 +345,7 @@ def test_reset_to_intro_clears_progress_and_restarts_timeline():
             "slide_index": 0,
             "started_at_ms": None,
             "duration_ms": 87_757,
+            "asset_token": "intro-assets",
         },
         "shared_media": None,
         "blackbox": None,
@@ -4,6 +4,9 @@ import pytest
 
 from media import (
     MediaPlaybackError,
+    MediaTokenSigner,
+    MediaTokenStore,
+    RoundMediaCache,
     complete_shared_media,
     create_author_media_token_info,
     create_media_token_info,
@@ -14,6 +17,9 @@ from media import (
     next_media_in_section,
     pause_shared_media,
     play_shared_media,
+    prefetch_candidates,
+    round_media,
+    signed_media_token_info,
     stop_shared_media,
 )
 from questions import Media, MediaType, Question, QuestionPack, QuestionType, parse_question_pack
@@ -303,6 +309,52 @@ def test_next_media_stays_in_the_same_section_and_does_not_wrap():
     assert next_media_in_section(catalog, "unknown") is None
 
 
+def test_round_media_precomputes_next_media_in_section(tmp_path):
+    question = _question("Q1", media=[
+        _media(tmp_path / "c.mp3", ref="c", order=2),
+        _media(tmp_path / "a.mp3", ref="a", order=0),
+        _media(tmp_path / "b1.mp3", ref="b1", order=1),
+        _media(tmp_path / "b2.mp3", ref="b2", order=1),
+        _media(tmp_path / "z.mp3", ref="z", section="answer", order=0),
+    ])
+    pack = QuestionPack(
+        questions=[_question(f"Q{i}") for i in range(2, 15)],
+        path=tmp_path,
+    )
+    pack.questions[2] = question
+    state = _active_state(sector=3)
+
+    media = round_media(pack, state)
+
+    assert media.author == current_author_media(pack, state)
+    for ref in [*media.catalog, "unknown"]:
+        assert media.next_in_section(ref) == next_media_in_section(media.catalog, ref)
+    assert media.next_in_section("a").media_ref == "b1"
+    assert media.next_in_section("b2").media_ref == "c"
+
+
+def test_round_media_cache_rebuilds_on_round_spin_and_pack_change():
+    pack = parse_question_pack(SAMPLE_PACK)
+    state = _active_state(sector=3, spin_id=4)
+    cache = RoundMediaCache()
+
+    first = cache.get(pack, state)
+    assert cache.get(pack, state) is first
+    assert first.catalog == current_media_catalog(pack, state)
+
+    state["wheel"]["spin_id"] = 5
+    second = cache.get(pack, state)
+    assert second is not first
+
+    state["game"]["round"]["sector"] = 2
+    third = cache.get(pack, state)
+    assert third.catalog == current_media_catalog(pack, state)
+
+    assert cache.get(parse_question_pack(SAMPLE_PACK), state) is not third
+    cache.invalidate()
+    assert cache.get(None, state).catalog == {}
+
+
 def test_image_cannot_use_playback_actions():
     shared = create_shared_media(
         "token",
@@ -318,3 +370,97 @@ def test_image_cannot_use_playback_actions():
         play_shared_media(shared, now_ms=1_000)
 
     assert error.value.code == "unsupported_media_type"
+
+
+def test_media_token_store_expires_in_order_and_keeps_the_shared_token():
+    tokens = MediaTokenStore({
+        "late": {"expires_at": 30.0},
+        "shared": {"expires_at": 5.0},
+        "early": {"expires_at": 10.0},
+    })
+    tokens["replaced"] = {"expires_at": 1.0}
+    tokens["replaced"] = {"expires_at": 40.0}
+    tokens["extended"] = {"expires_at": 2.0}
+    tokens["extended"]["expires_at"] = 50.0
+    tokens["removed"] = {"expires_at": 3.0}
+    del tokens["removed"]
+
+    assert tokens.expire(20.0, keep="shared") == ["early"]
+    assert set(tokens) == {"late", "shared", "replaced", "extended"}
+    assert tokens.expire(45.0) == ["shared", "late", "replaced"]
+    assert tokens == {"extended": {"expires_at": 50.0}}
+
+
+def test_media_token_store_indexes_tokens_by_kind_round_and_spin():
+    state = _active_state(sector=4, kind="blitz", part_index=1, spin_id=7)
+    author = {"presentation_kind": "author", "round_key": (4, "blitz", 1), "spin_id": 7}
+    tokens = MediaTokenStore()
+    tokens["author"] = author
+    tokens["other-part"] = {**author, "round_key": (4, "blitz", 0)}
+    tokens["media"] = {"round_key": (4, "blitz", 1), "spin_id": 7}
+
+    assert tokens.find("author", (4, "blitz", 1), 7) == ["author"]
+    assert tokens.find(None, (4, "blitz", 1), state["wheel"]["spin_id"]) == ["media"]
+    tokens.pop("author")
+    assert tokens.find("author", (4, "blitz", 1), 7) == []
+    tokens.clear()
+    assert tokens.find("author", (4, "blitz", 0), 7) == [] and len(tokens) == 0
+
+
+def test_signed_media_token_round_trips_the_round_context_only():
+    pack = parse_question_pack(SAMPLE_PACK)
+    state = _active_state(sector=3, spin_id=4)
+    descriptor = next(iter(current_media_catalog(pack, state).values()))
+    info = create_media_token_info(descriptor, state, expires_at=200.0)
+    signer = MediaTokenSigner("s" * 32)
+
+    token = signer.sign(info, room_id="main", epoch=2)
+    claims = signer.verify(token)
+
+    assert str(descriptor.path) not in token and "path" not in claims
+    assert (claims["room"], claims["epoch"]) == ("main", 2)
+    assert signed_media_token_info(claims, pack) == info
+    assert signed_media_token_info(claims, pack, media=round_media(pack, state)) == info
+    assert MediaTokenSigner("t" * 32).verify(token) is None
+    payload, signature = token.split(".")
+    assert signer.verify(payload[:-1] + "." + signature) is None
+    assert signer.verify("not-a-token") is None
+
+    other_round = _active_state(sector=2, spin_id=4)
+    rebuilt = signed_media_token_info(claims, pack, media=round_media(pack, other_round))
+    assert rebuilt is None or not media_token_is_current(rebuilt, pack, other_round, now_ts=100.0)
+
+
+def test_signed_author_token_is_rebuilt_from_the_pack():
+    pack = parse_question_pack(SAMPLE_PACK)
+    state = _active_state(sector=3, spin_id=4)
+    author = current_author_media(pack, state)
+    info = create_author_media_token_info(author, state, expires_at=200.0)
+    signer = MediaTokenSigner("s" * 32)
+
+    claims = signer.verify(signer.sign(info, room_id="main", epoch=0))
+
+    assert signed_media_token_info(claims, pack) == info
+    assert signed_media_token_info({**claims, "kind": None}, pack) is None
+    assert signed_media_token_info({**claims, "scope": "part"}, pack) is None
+
+
+def test_prefetch_offers_question_audio_and_video_only():
+    pack = parse_question_pack(SAMPLE_PACK)
+
+    melody = prefetch_candidates(round_media(pack, _active_state(sector=3, spin_id=1)))
+    assert [(item.name, item.source_section) for item in melody] == [("melody.mp3", "question")]
+    assert prefetch_candidates(round_media(pack, _active_state(sector=2, spin_id=1))) == []
+
+
+def test_signed_prefetch_token_keeps_its_client():
+    pack = parse_question_pack(SAMPLE_PACK)
+    state = _active_state(sector=3, spin_id=4)
+    descriptor = next(iter(current_media_catalog(pack, state).values()))
+    info = {**create_media_token_info(descriptor, state, expires_at=200.0), "prefetch_sid": "p1"}
+    signer = MediaTokenSigner("s" * 32)
+
+    claims = signer.verify(signer.sign(info, room_id="main", epoch=0))
+
+    assert claims["client"] == "p1"
+    assert signed_media_token_info(claims, pack) == info
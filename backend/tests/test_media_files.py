@@ -0,0 +1,118 @@
+import asyncio
+
+import pytest
+
+from media_files import MediaFileResponse, MediaFiles, etag_matches
+
+
+def _serve(response, headers=None, *, method="GET"):
+    messages = []
+    scope = {
+        "type": "http",
+        "method": method,
+        "headers": [
+            (name.lower().encode("latin-1"), value.encode("latin-1"))
+            for name, value in (headers or {}).items()
+        ],
+        "asgi": {"spec_version": "2.4"},
+    }
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(response(scope, receive, send))
+    start = messages[0]
+    body = b"".join(message.get("body", b"") for message in messages[1:])
+    return start["status"], {
+        name.decode("latin-1"): value.decode("latin-1")
+        for name, value in start["headers"]
+    }, body
+
+
+@pytest.fixture
+def pack_root(tmp_path):
+    (tmp_path / "03" / "media").mkdir(parents=True)
+    (tmp_path / "03" / "media" / "melody.mp3").write_bytes(bytes(range(100)))
+    return tmp_path
+
+
+def test_media_files_cache_stat_and_use_manifest_hashes(pack_root):
+    files = MediaFiles()
+    files.configure(pack_root, {"03/media/melody.mp3": "ab" * 32})
+    path = pack_root / "03" / "media" / "melody.mp3"
+
+    media_file = files.get(path)
+
+    assert media_file.etag == f'"{"ab" * 16}"'
+    assert media_file.relative_path == "03/media/melody.mp3"
+    assert files.get(str(path)) is media_file
+    assert files.get(pack_root / "missing.mp3") is None
+    assert files.get(pack_root / "03") is None
+
+    files.configure(pack_root, {})
+    fallback = files.get(path)
+    assert fallback is not media_file
+    assert fallback.etag == f'"{fallback.stat.st_size:x}-{fallback.stat.st_mtime_ns:x}"'
+
+
+def test_media_file_response_answers_ranges_and_validators(pack_root):
+    files = MediaFiles()
+    files.configure(pack_root, {"03/media/melody.mp3": "ab" * 32})
+    media_file = files.get(pack_root / "03" / "media" / "melody.mp3")
+    etag = media_file.etag
+
+    status, headers, body = _serve(MediaFileResponse(media_file))
+    assert (status, headers["etag"], headers["accept-ranges"], body) == (200, etag, "bytes", bytes(range(100)))
+
+    status, headers, body = _serve(MediaFileResponse(media_file), {"Range": "bytes=10-19"})
+    assert (status, headers["content-range"], body) == (206, "bytes 10-19/100", bytes(range(10, 20)))
+
+    status, _headers, body = _serve(
+        MediaFileResponse(media_file),
+        {"Range": "bytes=10-19", "If-Range": etag},
+    )
+    assert (status, len(body)) == (206, 10)
+    status, _headers, body = _serve(
+        MediaFileResponse(media_file),
+        {"Range": "bytes=10-19", "If-Range": '"stale"'},
+    )
+    assert (status, len(body)) == (200, 100)
+
+    status, headers, body = _serve(
+        MediaFileResponse(media_file, headers={"Cache-Control": "private, no-cache"}),
+        {"If-None-Match": f'"other", W/{etag}'},
+    )
+    assert (status, headers["etag"], headers["cache-control"], body) == (
+        304,
+        etag,
+        "private, no-cache",
+        b"",
+    )
+
+
+def test_media_file_response_hands_the_file_to_nginx(pack_root, tmp_path_factory):
+    files = MediaFiles()
+    files.configure(pack_root, {})
+    media_file = files.get(pack_root / "03" / "media" / "melody.mp3")
+
+    status, headers, body = _serve(MediaFileResponse(media_file, accel_prefix="/chgka-pack/"))
+
+    assert (status, body) == (200, b"")
+    assert headers["x-accel-redirect"] == "/chgka-pack/03/media/melody.mp3"
+    assert headers["content-type"] == "audio/mpeg"
+    assert headers["etag"] == media_file.etag
+
+    outside = tmp_path_factory.mktemp("outside") / "photo.jpg"
+    outside.write_bytes(b"jpeg")
+    status, headers, body = _serve(MediaFileResponse(files.get(outside), accel_prefix="/chgka-pack/"))
+    assert (status, body) == (200, b"jpeg") and "x-accel-redirect" not in headers
+
+
+def test_etag_matching_is_weak():
+    assert etag_matches('W/"a", "b"', '"a"')
+    assert etag_matches("*", '"a"')
+    assert not etag_matches(None, '"a"')
+    assert not etag_matches('"ab"', '"a"')
@@ -0,0 +1,84 @@
+from pathlib import Path
+import struct
+
+import pytest
+
+from media_probe import probe_duration_ms
+
+
+SAMPLE_DIR = Path(__file__).parent.parent.parent / "fixtures" / "sample_questions"
+
+
+def _box(kind: bytes, payload: bytes) -> bytes:
+    return struct.pack(">I4s", 8 + len(payload), kind) + payload
+
+
+def _ebml(element_id: int, payload: bytes) -> bytes:
+    id_bytes = element_id.to_bytes((element_id.bit_length() + 7) // 8, "big")
+    return id_bytes + bytes([0x80 | len(payload)]) + payload
+
+
+def _ogg_page(granule: int, packet: bytes) -> bytes:
+    return b"OggS" + bytes([0, 0]) + struct.pack("<q", granule) + bytes(12) + bytes([1, len(packet)]) + packet
+
+
+@pytest.mark.parametrize(
+    ("name", "duration_ms"),
+    [
+        ("03/media/melody.mp3", 3030),
+        ("05/media/levitan.mp3", 2037),
+        ("06/media/clip.mp4", 3000),
+        ("08/media/concert.mp4", 3000),
+    ],
+)
+def test_sample_pack_durations(name, duration_ms):
+    assert probe_duration_ms(SAMPLE_DIR / name) == duration_ms
+
+
+def test_mp4_moov_after_mdat_and_version_1_header(tmp_path):
+    path = tmp_path / "late.mp4"
+    mvhd = _box(b"mvhd", bytes([1, 0, 0, 0]) + struct.pack(">QQIQ", 0, 0, 600, 90_000))
+    path.write_bytes(_box(b"ftyp", b"isom") + _box(b"mdat", bytes(1000)) + _box(b"moov", mvhd))
+
+    assert probe_duration_ms(path) == 150_000
+
+
+def test_webm_duration_uses_the_timecode_scale(tmp_path):
+    path = tmp_path / "clip.webm"
+    info = _ebml(0x1549A966, _ebml(0x2AD7B1, (1_000_000).to_bytes(3, "big")) + _ebml(0x4489, struct.pack(">d", 4500.0)))
+    segment = _ebml(0x18538067, _ebml(0x114D9B74, bytes(4)) + info)
+    path.write_bytes(_ebml(0x1A45DFA3, _ebml(0x4282, b"webm")) + segment)
+
+    assert probe_duration_ms(path) == 4500
+
+
+def test_wav_and_ogg_durations(tmp_path):
+    wav = tmp_path / "tone.wav"
+    fmt = struct.pack("<HHIIHH", 1, 1, 8000, 16000, 2, 16)
+    wav.write_bytes(
+        b"RIFF" + struct.pack("<I", 36 + 32000) + b"WAVE"
+        + b"fmt " + struct.pack("<I", len(fmt)) + fmt
+        + b"data" + struct.pack("<I", 32000) + bytes(32000)
+    )
+    vorbis = tmp_path / "tone.ogg"
+    header = b"\x01vorbis" + struct.pack("<IBI", 0, 2, 44_100) + bytes(16)
+    vorbis.write_bytes(_ogg_page(0, header) + _ogg_page(88_200, b"audio"))
+    opus = tmp_path / "voice.ogg"
+    head = b"OpusHead" + struct.pack("<BBHI", 1, 2, 312, 48_000)
+    opus.write_bytes(_ogg_page(0, head) + _ogg_page(48_312, b"audio"))
+
+    assert probe_duration_ms(wav) == 2000
+    assert probe_duration_ms(vorbis) == 2000
+    assert probe_duration_ms(opus) == 1000
+
+
+def test_unknown_or_damaged_files_have_no_duration(tmp_path):
+    broken = tmp_path / "broken.mp4"
+    broken.write_bytes(b"\x00\x00\x00\x04junk")
+    empty = tmp_path / "empty.mp3"
+    empty.write_bytes(b"")
+
+    assert probe_duration_ms(broken) is None
+    assert probe_duration_ms(empty) is None
+    assert probe_duration_ms(tmp_path / "missing.webm") is None
+    assert probe_duration_ms(SAMPLE_DIR / "02" / "media" / "picasso.jpg") is None
@@ -0,0 +1,166 @@
+import asyncio
+import json
+
+from engineio import packet as eio_packet
+import pytest
+import socketio
+
+from outbound import CoalescingServer, OutboundQueues, check_server_hooks, packet_event
+from state_sync import PacketJson
+
+
+class FakeEioSocket:
+    """An Engine.IO socket whose writer never runs until the test drains it."""
+
+    def __init__(self):
+        self.queue = asyncio.Queue()
+        self.closed = False
+
+    async def send(self, pkt):
+        await self.queue.put(pkt)
+
+    async def close(self, **_kwargs):
+        self.closed = True
+
+    def take(self):
+        packets = []
+        while not self.queue.empty():
+            packets.append(self.queue.get_nowait())
+        return [json.loads(pkt.data[1:]) for pkt in packets]
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+async def _server_with_socket(**queue_options):
+    server = CoalescingServer(async_mode="asgi", json=PacketJson, slow_client_timeout=30)
+    server.outbound = OutboundQueues(server.eio, slow_client_timeout=30, **queue_options)
+    sid = await server.manager.connect("eio-1", "/")
+    socket = server.eio.sockets["eio-1"] = FakeEioSocket()
+    return server, sid, socket
+
+
+def test_packet_event_reads_the_event_name_of_message_packets():
+    assert packet_event(eio_packet.Packet(eio_packet.MESSAGE, data='2["state_update",{}]')) == (
+        "state_update"
+    )
+    assert packet_event(eio_packet.Packet(eio_packet.MESSAGE, data='2/admin,7["ping"]')) == "ping"
+    assert packet_event(eio_packet.Packet(eio_packet.MESSAGE, data='0{"sid":"a"}')) is None
+    assert packet_event(eio_packet.Packet(eio_packet.PING)) is None
+
+
+def test_packets_pass_straight_through_while_the_transport_keeps_up():
+    async def run():
+        server, sid, socket = await _server_with_socket(high_water=4)
+        for revision in range(3):
+            await server.emit("state_update", {"revision": revision}, to=sid)
+        await server.emit("play_sound", {"sound": "gong"})
+        assert server.outbound.backlogged() == 0
+        return socket.take()
+
+    assert asyncio.run(run()) == [
+        ["state_update", {"revision": 0}],
+        ["state_update", {"revision": 1}],
+        ["state_update", {"revision": 2}],
+        ["play_sound", {"sound": "gong"}],
+    ]
+
+
+def test_stalled_socket_keeps_only_the_newest_state_and_every_sound_in_order():
+    async def run():
+        server, sid, socket = await _server_with_socket(high_water=2, drain_interval=0.001)
+        await server.emit("state_update", {"revision": 0}, to=sid)
+        await server.emit("chat", {"n": 0}, to=sid)
+        # The transport is full from here on.
+        await server.emit("state_update", {"revision": 1}, to=sid)
+        await server.emit("state_patch", {"base": 1, "revision": 2}, to=sid)
+        await server.emit("stop_sound", to=sid)
+        await server.emit("settings_update", {"volume": 10}, to=sid)
+        await server.emit("play_sound", {"sound": "gong"}, to=sid)
+        await server.emit("state_update", {"revision": 3}, to=sid)
+        await server.emit("players_update", {"players": []}, to=sid)
+        await server.emit("settings_update", {"volume": 20}, to=sid)
+        await server.emit("play_sound", {"sound": "whistle"}, to=sid)
+        await server.emit("state_update", {"revision": 4}, to=sid)
+        stats = server.outbound_stats()
+
+        delivered = socket.take()
+        while server.outbound.backlogged():
+            await asyncio.sleep(0.002)
+            delivered += socket.take()
+        return sid, stats, delivered
+
+    sid, stats, delivered = asyncio.run(run())
+    assert stats["depths"] == {sid: 8}
+    assert stats["max_depth"] == 8
+    assert stats["coalesced"] == 4
+    assert delivered == [
+        ["state_update", {"revision": 0}],
+        ["chat", {"n": 0}],
+        ["stop_sound"],
+        ["play_sound", {"sound": "gong"}],
+        ["players_update", {"players": []}],
+        ["settings_update", {"volume": 20}],
+        ["play_sound", {"sound": "whistle"}],
+        ["state_update", {"revision": 4}],
+    ]
+
+
+def test_socket_that_stays_behind_is_disconnected():
+    async def run():
+        clock = Clock()
+        server, sid, socket = await _server_with_socket(
+            high_water=1,
+            drain_interval=0.001,
+            clock=clock,
+        )
+        await server.emit("play_sound", {"sound": "gong"}, to=sid)
+        await server.emit("play_sound", {"sound": "gong"}, to=sid)
+        await asyncio.sleep(0.005)
+        connected_before_timeout = not socket.closed
+        clock.now += 31
+        await asyncio.sleep(0.005)
+        return connected_before_timeout, socket.closed, server.outbound_stats()
+
+    connected_before_timeout, closed, stats = asyncio.run(run())
+    assert connected_before_timeout
+    assert closed
+    assert stats["slow_disconnects"] == 1
+    assert stats["backlogged_sockets"] == 0
+
+
+def test_backlog_over_the_limit_disconnects_even_before_the_timeout():
+    async def run():
+        server, sid, socket = await _server_with_socket(high_water=1, max_backlog=3)
+        await server.emit("play_sound", {"sound": "gong"}, to=sid)
+        for _ in range(3):
+            await server.emit("state_update", {"revision": 1}, to=sid)
+        coalesced_open = not socket.closed
+        for _ in range(4):
+            await server.emit("play_sound", {"sound": "gong"}, to=sid)
+        return coalesced_open, socket.closed, server.outbound.slow_disconnects
+
+    assert asyncio.run(run()) == (True, True, 1)
+
+
+def test_installed_python_socketio_still_has_the_overridden_hooks():
+    # Fails after a python-socketio upgrade that renames or reshapes them.
+    check_server_hooks()
+
+    class ChangedServer(socketio.AsyncServer):
+        async def _send_packet(self, eio_sid, pkt, namespace):
+            pass
+
+    with pytest.raises(RuntimeError, match="_send_packet"):
+        check_server_hooks(ChangedServer)
+
+    class MissingHook(socketio.AsyncServer):
+        _handle_ack = None
+
+    with pytest.raises(RuntimeError, match="_handle_ack"):
+        check_server_hooks(MissingHook)
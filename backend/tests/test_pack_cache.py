@@ -0,0 +1,103 @@
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+import pack_cache
+from pack_cache import (
+    ARTIFACT_NAME,
+    artifact_path,
+    load_compiled_pack,
+    load_question_pack,
+    write_compiled_pack,
+)
+from questions import QuestionParseError, parse_question_pack
+
+
+SAMPLE_DIR = Path(__file__).parent.parent.parent / "fixtures" / "sample_questions"
+
+
+@pytest.fixture
+def pack_path(tmp_path):
+    path = tmp_path / "pack"
+    shutil.copytree(SAMPLE_DIR, path)
+    return path
+
+
+def test_compiled_pack_round_trips_the_parsed_pack(pack_path):
+    pack, from_cache, error = load_question_pack(pack_path)
+    assert (from_cache, error) == (False, None)
+    assert (pack_path / ARTIFACT_NAME).is_file()
+
+    cached, from_cache, error = load_question_pack(pack_path)
+
+    assert (from_cache, error) == (True, None)
+    assert cached == pack == parse_question_pack(pack_path)
+    assert cached.fingerprint == pack.fingerprint
+    assert all(item.path.is_file() for question in cached.questions for item in question.media)
+    assert cached.content_hashes == pack.content_hashes
+    assert pack.content_hashes["02/author.jpg"] == pack_cache.pack_manifest(pack_path)["02/author.jpg"]["sha256"]
+    assert cached.media_manifest == pack.media_manifest
+    assert pack.media_manifest["03/media/melody.mp3"] == {
+        "type": "audio",
+        "size": (pack_path / "03" / "media" / "melody.mp3").stat().st_size,
+        "sha256": pack.content_hashes["03/media/melody.mp3"],
+        "duration_ms": 3030,
+    }
+    assert pack.media_manifest["06/media/clip.mp4"]["duration_ms"] == 3000
+    assert pack.media_manifest["02/media/picasso.jpg"]["duration_ms"] is None
+
+
+def test_changed_pack_file_invalidates_the_artifact(pack_path):
+    load_question_pack(pack_path)
+    question = pack_path / "01" / "question.md"
+    question.write_text(
+        question.read_text(encoding="utf-8").replace("title:", "title: Новое —", 1),
+        encoding="utf-8",
+    )
+    stat = question.stat()
+    os.utime(question, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    pack, from_cache, _error = load_question_pack(pack_path)
+
+    assert from_cache is False
+    assert pack.get_by_sector(1).title.startswith("Новое —")
+    assert load_question_pack(pack_path)[1] is True
+
+
+def test_damaged_or_foreign_artifacts_fall_back_to_parsing(pack_path, tmp_path, monkeypatch):
+    destination = artifact_path(pack_path, tmp_path / "cache")
+    write_compiled_pack(parse_question_pack(pack_path), destination)
+    assert load_compiled_pack(pack_path, destination) is not None
+
+    monkeypatch.setattr(pack_cache, "compiler_identity", lambda: "other-parser")
+    assert load_compiled_pack(pack_path, destination) is None
+    monkeypatch.undo()
+
+    moved = tmp_path / "moved"
+    shutil.copytree(pack_path, moved)
+    assert load_compiled_pack(moved, destination) is None
+
+    destination.write_bytes(destination.read_bytes()[:40])
+    assert load_compiled_pack(pack_path, destination) is None
+    assert load_question_pack(pack_path, cache_dir=tmp_path / "cache")[1] is False
+
+
+def test_unwritable_cache_does_not_stop_loading(pack_path, tmp_path):
+    blocker = tmp_path / "not-a-directory"
+    blocker.write_text("", encoding="utf-8")
+
+    pack, from_cache, error = load_question_pack(pack_path, cache_dir=blocker)
+
+    assert from_cache is False
+    assert isinstance(error, OSError)
+    assert len(pack) == 13
+
+
+def test_invalid_pack_is_not_compiled(pack_path):
+    (pack_path / "01" / "question.md").write_text("", encoding="utf-8")
+
+    with pytest.raises(QuestionParseError):
+        load_question_pack(pack_path)
+    assert not (pack_path / ARTIFACT_NAME).exists()
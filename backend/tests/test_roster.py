@@ -0,0 +1,118 @@
+from roster import EVICTED_OFFLINE, EVICTED_OVER_LIMIT, AdminRecord, GroupRecord, Participant, Roster
+
+
+def _group(index, *, sid=None, pending=False):
+    return GroupRecord(
+        sid=sid or f"sid-{index}",
+        name=f"Группа {index}",
+        token=f"token-{index}",
+        group_id=f"group-{index}",
+        participants=[Participant(f"participant-{index}", f"Игрок {index}")],
+        pending=pending,
+    )
+
+
+def _roster(*records):
+    roster = Roster()
+    for record in records:
+        roster.add(record)
+    return roster
+
+
+def test_roster_indexes_every_lookup_key_and_keeps_join_order():
+    first, second = _group(1), _group(2, pending=True)
+    admin = AdminRecord(sid="admin", name="Ведущий", token="t")
+    roster = _roster(first, admin, second)
+
+    assert [record.role for record in roster] == ["player", "admin", "player"]
+    assert list(roster) == [first, admin, second]
+    assert roster.admin() is admin
+    assert roster.by_token("token-2") is second
+    assert roster.by_group("group-1") is first
+    group, participant = roster.by_participant("participant-2")
+    assert group is second and participant.as_dict() == {"id": "participant-2", "name": "Игрок 2"}
+    assert roster.by_sid("admin") is admin
+    assert roster.by_token(None) is None and roster.by_participant(7) is None
+
+
+def test_rebind_and_remove_keep_the_indexes_consistent():
+    roster = _roster(_group(1))
+    group = roster.by_token("token-1")
+
+    roster.rebind(group, "new-sid")
+    assert roster.by_sid("sid-1") is None
+    assert roster.by_sid("new-sid") is group
+    assert group.sid == "new-sid"
+
+    roster.remove(group)
+    roster.remove(group)
+    assert len(roster) == 0
+    assert roster.by_group("group-1") is None
+    assert roster.by_participant("participant-1") is None
+    assert roster.by_sid("new-sid") is None
+
+
+def test_admin_socket_that_also_joined_as_a_group_keeps_both_records():
+    roster = Roster()
+    admin = roster.add(AdminRecord(sid="browser", name="Ведущий", token="t"))
+    group = roster.add(
+        GroupRecord(
+            sid="browser",
+            name="Иван",
+            token="player-token",
+            group_id="group-1",
+            participants=[Participant("participant-1", "Иван")],
+        )
+    )
+
+    assert roster.with_sid("browser") == [admin, group]
+    assert roster.group_by_sid("browser") is group
+    roster.remove(admin)
+    assert roster.by_sid("browser") is group
+    assert roster.admin() is None
+
+
+def test_records_are_compact_and_export_their_fields_as_dicts():
+    group = _group(1)
+
+    assert not hasattr(group, "__dict__")
+    assert group.as_dict() == {
+        "sid": "sid-1",
+        "name": "Группа 1",
+        "role": "player",
+        "token": "token-1",
+        "group_id": "group-1",
+        "participants": [{"id": "participant-1", "name": "Игрок 1"}],
+        "online": True,
+        "pending": False,
+    }
+    assert AdminRecord(sid="admin", name="Ведущий", token="t").as_dict()["role"] == "admin"
+
+
+def test_evict_drops_expired_then_longest_offline_groups_but_never_protected_ones():
+    now = [0.0]
+    roster = Roster(clock=lambda: now[0])
+    for index in range(5):
+        roster.add(_group(index))
+    for index in (3, 0, 1):
+        now[0] += 10
+        roster.set_online(roster.by_group(f"group-{index}"), False)
+
+    now[0] = 125
+    evicted = roster.evict(offline_ttl=100, max_groups=10, protected=["group-3"])
+    assert [(group.group_id, reason) for group, reason in evicted] == [("group-0", EVICTED_OFFLINE)]
+
+    evicted = roster.evict(offline_ttl=100, max_groups=3, reserve=1, protected=["group-3"])
+    assert [(group.group_id, reason) for group, reason in evicted] == [("group-1", EVICTED_OVER_LIMIT)]
+    assert [group.group_id for group in roster.groups()] == ["group-2", "group-3", "group-4"]
+
+    roster.set_online(roster.by_group("group-3"), True)
+    assert roster.by_group("group-3").offline_since is None
+    assert roster.evict(offline_ttl=1, max_groups=1) == []
+    assert roster.eviction_summary() == {
+        "count": 2,
+        "recent": [
+            {"name": "Группа 0", "reason": "offline"},
+            {"name": "Группа 1", "reason": "over_limit"},
+        ],
+    }
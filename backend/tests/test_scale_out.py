@@ -0,0 +1,71 @@
+import asyncio
+from collections import Counter
+
+import pytest
+import socketio
+
+from scale_out import InProcessBus, InProcessManager, create_client_manager, room_worker
+from state_sync import EncodedState, PacketJson
+
+
+def test_room_worker_is_stable_and_spreads_rooms():
+    assert room_worker("friday", 1) == 0
+    assert room_worker("friday", 4) == room_worker("friday", 4)
+    # ((crc32("main") >> 16) & 0x7fff) % 4, the server Nginx `hash` picks.
+    assert room_worker("main", 4) == 0
+
+    counts = Counter(room_worker(f"game-{index}", 4) for index in range(4_000))
+    assert set(counts) == {0, 1, 2, 3}
+    assert min(counts.values()) > 800
+
+
+def test_client_manager_is_chosen_by_url_scheme():
+    assert create_client_manager(None) is None
+    assert isinstance(create_client_manager("memory://"), InProcessManager)
+    assert isinstance(
+        create_client_manager("redis://pubsub:6379/0"),
+        socketio.AsyncRedisManager,
+    )
+    with pytest.raises(ValueError):
+        create_client_manager("amqp://queue")
+
+
+def test_room_emits_reach_sockets_held_by_another_worker():
+    async def run():
+        bus = InProcessBus()
+        owner = socketio.AsyncServer(
+            async_mode="asgi",
+            json=PacketJson,
+            client_manager=InProcessManager(bus),
+        )
+        other = socketio.AsyncServer(
+            async_mode="asgi",
+            json=PacketJson,
+            client_manager=InProcessManager(bus),
+        )
+        delivered = []
+
+        async def record(eio_sid, packet):
+            delivered.append((eio_sid, packet.data))
+
+        other._send_eio_packet = record
+        for server in (owner, other):
+            server.manager.initialize()
+        sid = await other.manager.connect("eio-remote", "/")
+        await other.manager.enter_room(sid, "/", "game:a")
+
+        snapshot = EncodedState({"phase": "PRE_ROUND", "score": {"znatoki": 1}})
+        await owner.emit("state_update", snapshot, room="game:a")
+        await owner.emit("state_update", {"phase": "other"}, room="game:b")
+        for _ in range(10):
+            await asyncio.sleep(0)
+
+        for server in (owner, other):
+            server.manager.thread.cancel()
+        return delivered
+
+    delivered = asyncio.run(run())
+
+    assert delivered == [
+        ("eio-remote", '2["state_update",{"phase":"PRE_ROUND","score":{"znatoki":1}}]'),
+    ]
@@ -0,0 +1,93 @@
+import asyncio
+
+from spectators import HEARTBEAT_FRAME, SpectatorFeed, parse_last_event_id, sse_frame
+
+
+def _events(chunk):
+    return [
+        frame.split("\n")
+        for frame in chunk.decode("utf-8").split("\n\n")
+        if frame
+    ]
+
+
+def test_sse_frame_carries_the_revision_as_event_id():
+    assert sse_frame("state_update", '{"a":1}', 7) == (
+        b'id: 7\nevent: state_update\ndata: {"a":1}\n\n'
+    )
+    assert sse_frame("stop_sound", "null") == b"event: stop_sound\ndata: null\n\n"
+    assert parse_last_event_id("12") == 12
+    assert parse_last_event_id("12.5") is None
+    assert parse_last_event_id(None) is None
+
+
+def test_subscribers_at_one_cursor_share_one_encoded_chunk():
+    feed = SpectatorFeed()
+    feed.publish_state('{"r":1}', 1)
+    cursor = feed.cursor
+    feed.publish("stop_sound")
+    feed.publish("play_sound", {"sound": "gong"})
+    feed.publish_state('{"r":2}', 2)
+    # A rebroadcast of the same revision is not sent again.
+    feed.publish_state('{"r":2,"server_now_ms":5}', 2)
+
+    first = feed.since(cursor)
+    assert feed.since(cursor) is first
+    assert _events(first) == [
+        ["event: stop_sound", "data: null"],
+        ["event: play_sound", 'data: {"sound":"gong"}'],
+        ["id: 2", "event: state_update", 'data: {"r":2}'],
+    ]
+
+
+def test_lagging_subscriber_gets_only_the_newest_state_and_later_sounds():
+    feed = SpectatorFeed(log_size=4)
+    feed.publish_state('{"r":1}', 1)
+    for revision in range(2, 6):
+        feed.publish("play_sound", {"sound": f"s{revision}"})
+        feed.publish_state(f'{{"r":{revision}}}', revision)
+
+    assert _events(feed.since(0)) == [
+        ["event: play_sound", 'data: {"sound":"s4"}'],
+        ["event: play_sound", 'data: {"sound":"s5"}'],
+        ["id: 5", "event: state_update", 'data: {"r":5}'],
+    ]
+
+    feed.publish("stop_sound")
+    for _ in range(4):
+        feed.publish("play_sound", {"sound": "gong"})
+    # The newest state has left the log, so it is sent before the sounds.
+    assert _events(feed.since(9))[0] == ["id: 5", "event: state_update", 'data: {"r":5}']
+
+
+def test_stream_sends_first_frames_new_events_and_heartbeats():
+    async def run():
+        feed = SpectatorFeed(heartbeat=0.01)
+        stream = feed.stream(feed.cursor, b"retry: 1\n\n")
+        received = [await anext(stream)]
+        assert feed.subscribers == 1
+        received.append(await anext(stream))
+        feed.publish("stop_sound")
+        received.append(await anext(stream))
+        await stream.aclose()
+        return received, feed.subscribers, feed._heartbeat_timer
+
+    received, subscribers, heartbeat_timer = asyncio.run(run())
+    assert received == [b"retry: 1\n\n", HEARTBEAT_FRAME, b"event: stop_sound\ndata: null\n\n"]
+    assert subscribers == 0
+    assert heartbeat_timer is None
+
+
+def test_reserved_slots_count_before_the_stream_and_release_once():
+    async def run():
+        feed = SpectatorFeed(heartbeat=0.01)
+        slot = feed.reserve()
+        reserved = feed.subscribers
+        stream = feed.stream(feed.cursor, b"", slot)
+        await anext(stream)
+        streaming = feed.subscribers
+        await stream.aclose()
+        slot.release()
+        return reserved, streaming, feed.subscribers, feed._heartbeat_timer
+
+    assert asyncio.run(run()) == (1, 1, 0, None)
@@ -312,6 +312,7 @@ def test_public_game_state_serializes_intro_timing_for_reconnect():
             }
             for slot in range(1, 4)
         ],
+        "asset_photos": [],
     }
     assert "server_now_ms" not in state["presentation"]["intro"]
 
@@ -319,6 +320,24 @@ def test_public_game_state_serializes_intro_timing_for_reconnect():
     assert public_game_state(state, now_ms=14_000)["intro"]["authors"] == []
 
 
+def test_public_intro_lists_preloadable_photos_without_author_names():
+    state = create_initial_app_state(intro_authors=_intro_authors())
+    state["presentation"]["intro"] = {
+        "slide_index": 0,
+        "started_at_ms": None,
+        "duration_ms": 87_757,
+        "asset_token": "intro-assets",
+    }
+
+    intro = public_game_state(state, now_ms=1_000)["intro"]
+
+    assert intro["asset_token"] == "intro-assets"
+    assert intro["authors"] == []
+    assert intro["asset_photos"] == [
+        {"sector": sector, "slot": 1} for sector in range(1, 13)
+    ]
+
+
 def test_public_game_state_serializes_server_time_for_audio_reconnect():
     state = create_initial_app_state()
     state["presentation"]["shared_media"] = {
@@ -0,0 +1,135 @@
+import json
+from copy import deepcopy
+
+import pytest
+
+from state import (
+    PHASE_DISCUSSION,
+    PHASE_PRE_ROUND,
+    create_initial_app_state,
+    public_game_state,
+)
+from state_sync import (
+    EncodedState,
+    PacketJson,
+    StatePatchError,
+    StateSnapshotCache,
+    StateStream,
+    apply_state_patch,
+    diff_state,
+)
+
+
+def _snapshot(state, now_ms=1_000):
+    return public_game_state(state, now_ms=now_ms)
+
+
+def test_diff_round_trips_nested_changes_and_removed_keys():
+    state = create_initial_app_state(phase=PHASE_PRE_ROUND)
+    previous = _snapshot(state)
+    state["game"]["phase"] = PHASE_DISCUSSION
+    state["game"]["score"]["znatoki"] = 2
+    state["game"]["round"] = {"kind": "normal", "sector": 5}
+    state["timer"]["discussion_deadline_ms"] = 61_000
+    current = _snapshot(state, now_ms=2_000)
+
+    ops = diff_state(previous, current)
+
+    assert {"op": "replace", "path": "/phase", "value": PHASE_DISCUSSION} in ops
+    assert {"op": "replace", "path": "/score/znatoki", "value": 2} in ops
+    assert apply_state_patch(previous, ops) == current
+    assert diff_state(current, previous)
+    assert apply_state_patch(current, diff_state(current, previous)) == previous
+
+
+def test_capped_newest_first_logs_are_sent_as_head_inserts():
+    previous = {"logs": [f"entry {index}" for index in range(50, 0, -1)]}
+    current = {"logs": ["entry 52", "entry 51", *previous["logs"][:48]]}
+
+    ops = diff_state(previous, current)
+
+    assert [op["op"] for op in ops] == ["add", "add", "remove", "remove"]
+    assert ops[0] == {"op": "add", "path": "/logs/0", "value": "entry 52"}
+    assert apply_state_patch(previous, ops) == current
+
+
+def test_appended_list_items_use_end_pointer():
+    ops = diff_state({"used_questions": [3]}, {"used_questions": [3, 7]})
+
+    assert ops == [{"op": "add", "path": "/used_questions/-", "value": 7}]
+
+
+def test_patch_keys_are_json_pointer_escaped():
+    previous = {"a/b": {"c~d": 1}}
+    current = {"a/b": {"c~d": 2}}
+
+    ops = diff_state(previous, current)
+
+    assert ops == [{"op": "replace", "path": "/a~1b/c~0d", "value": 2}]
+    assert apply_state_patch(previous, ops) == current
+
+
+def test_apply_rejects_unknown_paths_without_mutating_input():
+    document = {"score": {"znatoki": 0}}
+    original = deepcopy(document)
+
+    with pytest.raises(StatePatchError):
+        apply_state_patch(document, [{"op": "replace", "path": "/round/sector", "value": 1}])
+    assert document == original
+
+
+def test_stream_revisions_ignore_timestamp_only_changes():
+    stream = StateStream()
+    state = create_initial_app_state(phase=PHASE_PRE_ROUND)
+
+    assert stream.publish(_snapshot(state, now_ms=1_000)) is None
+    assert stream.revision == 1
+    assert stream.publish(_snapshot(state, now_ms=1_000)) is None
+    # Server time alone is refreshed for delta clients at the same revision.
+    clock = stream.publish(_snapshot(state, now_ms=2_000))
+    assert stream.revision == 1
+    assert clock["base_revision"] == clock["revision"] == 1
+    assert clock["ops"]
+    assert all(operation["path"].endswith("/server_now_ms") for operation in clock["ops"])
+    assert {"op": "replace", "path": "/timer/server_now_ms", "value": 2_000} in clock["ops"]
+
+    state["game"]["score"]["tv"] = 1
+    patch = stream.publish(_snapshot(state, now_ms=3_000))
+
+    assert patch["base_revision"] == 1
+    assert patch["revision"] == 2
+    assert {"op": "replace", "path": "/score/tv", "value": 1} in patch["ops"]
+    assert {"op": "replace", "path": "/timer/server_now_ms", "value": 3_000} in patch["ops"]
+
+
+def test_snapshot_cache_refreshes_timestamps_until_invalidated():
+    cache = StateSnapshotCache()
+    state = create_initial_app_state(phase=PHASE_PRE_ROUND)
+    state["presentation"]["blackbox"] = {"generation": 1, "started_at_ms": 900}
+
+    assert cache.lookup(state, 1_000) is None
+    stored = cache.store(state, _snapshot(state, now_ms=1_000), 1_000)
+    assert cache.lookup(state, 1_000) is stored
+
+    later = cache.lookup(state, 4_000)
+    assert later["timer"]["server_now_ms"] == 4_000
+    assert later["blackbox"]["server_now_ms"] == 4_000
+    assert stored["timer"]["server_now_ms"] == 1_000
+    assert json.loads(later.encoded) == _snapshot(state, now_ms=4_000)
+    assert cache.lookup(create_initial_app_state(), 4_000) is None
+
+    cache.invalidate()
+    assert cache.lookup(state, 4_000) is None
+    assert cache.stats() == {"generation": 1, "hits": 2, "misses": 3}
+
+
+def test_packet_json_splices_encoded_snapshots_only_for_packet_encoding():
+    snapshot = EncodedState({"phase": "PRE_ROUND", "logs": ["«ход»"]})
+    packet = ["state_update", snapshot]
+
+    assert PacketJson.dumps(packet, separators=(",", ":")) == json.dumps(
+        packet,
+        separators=(",", ":"),
+    )
+    assert PacketJson.loads(PacketJson.dumps(packet, separators=(",", ":"))) == packet
+    assert PacketJson.dumps({"sid": "x"}) == json.dumps({"sid": "x"})
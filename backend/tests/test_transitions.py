@@ -77,6 +77,7 @@ def test_start_game_enters_silent_intro_and_music_starts_once_on_command():
         "slide_index": 0,
         "started_at_ms": None,
         "duration_ms": 87_757,
+        "asset_token": None,
     }
     assert effects.logs == ("Интро началось",)
     assert effects.sounds == ()
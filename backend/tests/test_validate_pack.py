@@ -5,6 +5,7 @@ import uuid
 import pytest
 
 from assign_question_ids import assign_question_ids
+from pack_cache import artifact_path, load_question_pack
 from questions import QuestionParseError, parse_question, parse_question_pack
 from validate_pack import main
 
@@ -63,6 +64,48 @@ def test_cli_prints_sample_pack_summary(capsys):
     )
 
 
+def test_cli_compile_writes_the_artifact_loaded_at_startup(tmp_path, capsys):
+    pack_path = _copy_sample_pack(tmp_path)
+    cache_dir = tmp_path / "cache"
+
+    assert main([str(pack_path), "--compile", "--cache-dir", str(cache_dir)]) == 0
+
+    destination = artifact_path(pack_path, cache_dir)
+    compiled, variants = capsys.readouterr().out.splitlines()[-2:]
+    assert compiled == f"COMPILED: {destination}"
+    assert variants.startswith("Image variants: 17 images, ")
+    assert "26 files generated" in variants
+    assert load_question_pack(pack_path, cache_dir=cache_dir)[1] is True
+
+
+def test_parallel_parse_matches_sequential_result_and_first_error(tmp_path):
+    assert parse_question_pack(SAMPLE_DIR, workers=3) == parse_question_pack(SAMPLE_DIR)
+
+    pack_path = _copy_sample_pack(tmp_path)
+    (pack_path / "11" / "question.md").write_text("", encoding="utf-8")
+    blitz_part = pack_path / "04" / "02" / "question.md"
+    blitz_part.write_text(
+        blitz_part.read_text(encoding="utf-8").replace("# Ответ", "# Ответы"),
+        encoding="utf-8",
+    )
+    errors = []
+    for workers in (1, 4):
+        with pytest.raises(QuestionParseError) as raised:
+            parse_question_pack(pack_path, workers=workers)
+        errors.append(str(raised.value))
+
+    assert errors[0] == errors[1]
+    assert errors[0].startswith("Failed to parse sector 4 ")
+
+
+def test_cli_rejects_non_positive_workers(capsys):
+    with pytest.raises(SystemExit) as raised:
+        main([str(SAMPLE_DIR), "--workers", "0"])
+
+    assert raised.value.code == 2
+    assert "--workers must be at least 1" in capsys.readouterr().err
+
+
 def test_pack_requires_canonical_unique_question_ids(tmp_path):
     pack_path = _copy_sample_pack(tmp_path)
     first = pack_path / "01" / "question.md"
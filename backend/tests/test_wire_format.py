@@ -0,0 +1,127 @@
+import asyncio
+
+from socketio import packet as sio_packet
+from socketio.msgpack_packet import MsgPackPacket
+
+from outbound import CoalescingServer
+from state_sync import EncodedState, PacketJson
+from wire_format import WIRE_JSON, WIRE_MSGPACK, requested_wire_format
+
+
+class RecordingSocket:
+    def __init__(self):
+        self.queue = asyncio.Queue()
+        self.closed = False
+
+    async def send(self, pkt):
+        await self.queue.put(pkt)
+
+    async def close(self, **_kwargs):
+        self.closed = True
+
+    def take(self):
+        packets = []
+        while not self.queue.empty():
+            packets.append(self.queue.get_nowait().data)
+        return packets
+
+
+def _decoded(data):
+    pkt = MsgPackPacket(encoded_packet=data)
+    return pkt.packet_type, pkt.namespace, pkt.id, pkt.data
+
+
+async def _connect(server, eio_sid, query):
+    socket = server.eio.sockets[eio_sid] = RecordingSocket()
+    await server._handle_eio_connect(eio_sid, {"QUERY_STRING": query})
+    if "wire=msgpack" in query:
+        message = MsgPackPacket(sio_packet.CONNECT, namespace="/").encode()
+    else:
+        message = "0"
+    await server._handle_eio_message(eio_sid, message)
+    return socket
+
+
+def test_wire_format_comes_from_the_handshake_query():
+    assert requested_wire_format({"QUERY_STRING": "room=friday&wire=msgpack&EIO=4"}) == WIRE_MSGPACK
+    assert requested_wire_format({"QUERY_STRING": "room=friday&EIO=4"}) == WIRE_JSON
+    assert requested_wire_format({"QUERY_STRING": "wire=xml"}) == WIRE_JSON
+    assert requested_wire_format({}) == WIRE_JSON
+
+
+def test_msgpack_and_json_clients_share_one_room_emit():
+    async def run():
+        server = CoalescingServer(async_mode="asgi", json=PacketJson, slow_client_timeout=30)
+        calls = []
+
+        @server.on("connect")
+        async def connect(sid, _environ, _auth=None):
+            await server.enter_room(sid, "game:main")
+
+        @server.on("state_subscribe")
+        async def state_subscribe(sid, data):
+            calls.append((sid, data))
+            return {"ok": True, "revision": 7}
+
+        packed = await _connect(server, "eio-packed", "room=main&wire=msgpack")
+        text = await _connect(server, "eio-text", "room=main")
+        connected = (packed.take(), text.take())
+
+        state = EncodedState({"score": {"znatoki": 2, "tv": 1}, "revision": 7})
+        await server.emit("state_update", state, room="game:main")
+        await server.emit("stop_sound", room="game:main")
+        await server._handle_eio_message(
+            "eio-packed",
+            MsgPackPacket(
+                sio_packet.EVENT,
+                ["state_subscribe", {"protocol": "delta"}],
+                namespace="/",
+                id=3,
+            ).encode(),
+        )
+        await asyncio.sleep(0)
+        packed_sid = server.manager.sid_from_eio_sid("eio-packed", "/")
+        return connected, packed.take(), text.take(), calls, packed_sid, server
+
+    connected, packed, text, calls, packed_sid, server = asyncio.run(run())
+
+    packed_connect, text_connect = connected
+    assert _decoded(packed_connect[0])[:2] == (sio_packet.CONNECT, "/")
+    assert text_connect[0].startswith("0{")
+    assert [_decoded(data) for data in packed] == [
+        (
+            sio_packet.EVENT,
+            "/",
+            None,
+            ["state_update", {"score": {"znatoki": 2, "tv": 1}, "revision": 7}],
+        ),
+        (sio_packet.EVENT, "/", None, ["stop_sound"]),
+        (sio_packet.ACK, "/", 3, [{"ok": True, "revision": 7}]),
+    ]
+    assert text == [
+        '2["state_update",{"score":{"znatoki":2,"tv":1},"revision":7}]',
+        '2["stop_sound"]',
+    ]
+    assert calls == [(packed_sid, {"protocol": "delta"})]
+    assert server.msgpack_sids == {"eio-packed"}
+    assert server.outbound_stats()["msgpack_sockets"] == 1
+
+    asyncio.run(server._handle_eio_disconnect("eio-packed", server.reason.CLIENT_DISCONNECT))
+    assert server.msgpack_sids == set()
+
+
+def test_msgpack_state_updates_coalesce_for_a_stalled_client():
+    async def run():
+        server = CoalescingServer(async_mode="asgi", json=PacketJson, slow_client_timeout=30)
+        server.outbound.high_water = 1
+        socket = await _connect(server, "eio-packed", "wire=msgpack")
+        sid = server.manager.sid_from_eio_sid("eio-packed", "/")
+        for revision in range(4):
+            await server.emit("state_update", {"revision": revision}, to=sid)
+        return server.outbound.depth("eio-packed"), server.outbound.coalesced, socket
+
+    depth, coalesced, socket = asyncio.run(run())
+    # The CONNECT reply fills the transport; only the newest state waits.
+    assert (depth, coalesced) == (2, 3)
+    assert isinstance(socket.take()[0], bytes)
+
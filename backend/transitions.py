@@ -159,7 +159,11 @@ def _game_winner(state: AppState) -> Optional[str]:
     return None
 
 
-def transition_start_game(state: AppState) -> TransitionEffects:
+def transition_start_game(
+    state: AppState,
+    *,
+    asset_token: Optional[str] = None,
+) -> TransitionEffects:
     _require_phase(state, PHASE_LOGIN)
 
     state["game"]["phase"] = PHASE_INTRO
@@ -167,6 +171,7 @@ def transition_start_game(state: AppState) -> TransitionEffects:
         "slide_index": 0,
         "started_at_ms": None,
         "duration_ms": INTRO_DURATION_MS,
+        "asset_token": asset_token,
     }
     return TransitionEffects(events=(game_event("game_started", "Интро началось"),))
 
@@ -7,6 +7,8 @@ from collections import Counter
 from pathlib import Path
 import sys
 
+from image_variants import build_image_variants, variants_dir
+from pack_cache import artifact_path, media_manifest, pack_manifest, write_compiled_pack
 from questions import (
     MediaType,
     QuestionPack,
@@ -22,6 +24,25 @@ def _build_parser() -> argparse.ArgumentParser:
         description="Validate a CHGKA question pack before starting the backend.",
     )
     parser.add_argument("pack_path", type=Path, help="path to the pack directory")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="processes that parse sectors in parallel (default: 1)",
+    )
+    parser.add_argument(
+        "--compile",
+        action="store_true",
+        help=(
+            "also write the compiled pack and the image variants that the "
+            "backend loads at startup"
+        ),
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        help="the backend's CHGKA_PACK_CACHE_DIR (default: inside the pack directory)",
+    )
     return parser
 
 
@@ -64,18 +85,47 @@ def _format_summary(pack: QuestionPack) -> str:
 
 
 def main(argv: list[str] | None = None) -> int:
-    args = _build_parser().parse_args(argv)
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
     pack_path = args.pack_path
 
     try:
         pack_path = pack_path.expanduser().resolve()
-        pack = parse_question_pack(pack_path)
+        manifest = pack_manifest(pack_path) if args.compile else None
+        pack = parse_question_pack(pack_path, workers=args.workers)
     except (QuestionParseError, OSError, RuntimeError) as error:
         print(f"INVALID: {pack_path}", file=sys.stderr)
         print(error, file=sys.stderr)
         return 1
 
     print(_format_summary(pack))
+    if args.compile:
+        pack.media_manifest = media_manifest(pack, manifest)
+        playable = [
+            entry for entry in pack.media_manifest.values() if entry["type"] != "image"
+        ]
+        known = sum(entry["duration_ms"] is not None for entry in playable)
+        print(f"Media durations: {known} of {len(playable)} audio/video files")
+        destination = artifact_path(pack_path, args.cache_dir)
+        try:
+            write_compiled_pack(pack, destination, manifest=manifest)
+        except OSError as error:
+            print(f"NOT COMPILED: {destination}", file=sys.stderr)
+            print(error, file=sys.stderr)
+            return 1
+        print(f"COMPILED: {destination}")
+
+        pack.content_hashes = {name: entry["sha256"] for name, entry in manifest.items()}
+        directory = variants_dir(pack_path, args.cache_dir)
+        try:
+            _variants, report = build_image_variants(pack, directory)
+        except OSError as error:
+            print(f"NO IMAGE VARIANTS: {directory}", file=sys.stderr)
+            print(error, file=sys.stderr)
+            return 1
+        print(f"Image variants: {report.summary()}")
     return 0
 
 
@@ -0,0 +1,73 @@
+"""Per-client Socket.IO wire format: JSON text or MessagePack frames.
+
+python-socketio picks one packet class per server. Here each client chooses
+its format in the Engine.IO handshake with `?wire=msgpack`. The query is read
+before the first Socket.IO packet, which is already encoded in that format.
+Clients that do not ask keep JSON text.
+
+Room emits are encoded once, as JSON, before python-socketio hands them to
+each recipient. `MsgPackVariants` converts such an Engine.IO packet to
+MessagePack the first time a MessagePack client receives it, and every other
+MessagePack recipient of the same emit reuses that copy.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Mapping, Optional
+from urllib.parse import parse_qs
+import weakref
+
+from engineio import packet as eio_packet
+from socketio import packet as sio_packet
+from socketio.msgpack_packet import MsgPackPacket
+
+
+WIRE_JSON = "json"
+WIRE_MSGPACK = "msgpack"
+WIRE_FORMATS = (WIRE_JSON, WIRE_MSGPACK)
+WIRE_QUERY_PARAMETER = "wire"
+
+
+def requested_wire_format(environ: Mapping[str, Any]) -> str:
+    """The format a client asked for in its handshake query, JSON by default."""
+    query = parse_qs(environ.get("QUERY_STRING", ""))
+    value = query.get(WIRE_QUERY_PARAMETER, [WIRE_JSON])[0]
+    return value if value in WIRE_FORMATS else WIRE_JSON
+
+
+def packet_event_name(pkt: sio_packet.Packet) -> Optional[str]:
+    if pkt.packet_type != sio_packet.EVENT or not pkt.data:
+        return None
+    name = pkt.data[0]
+    return name if isinstance(name, str) else None
+
+
+def msgpack_message(pkt: sio_packet.Packet) -> eio_packet.Packet:
+    """`pkt` as one binary Engine.IO message for a MessagePack client."""
+    encoded = MsgPackPacket(
+        pkt.packet_type,
+        pkt.data,
+        namespace=pkt.namespace or "/",
+        id=pkt.id,
+    ).encode()
+    return eio_packet.Packet(eio_packet.MESSAGE, data=encoded)
+
+
+class MsgPackVariants:
+    """MessagePack copies of JSON Engine.IO messages, made once per emit."""
+
+    def __init__(self, packet_class: type[sio_packet.Packet]) -> None:
+        self._packet_class = packet_class
+        # Keyed by the emitted packet; an entry lives as long as the emit.
+        self._variants: weakref.WeakKeyDictionary[
+            eio_packet.Packet,
+            tuple[Optional[str], eio_packet.Packet],
+        ] = weakref.WeakKeyDictionary()
+
+    def get(self, message: eio_packet.Packet) -> tuple[Optional[str], eio_packet.Packet]:
+        """The event name and MessagePack copy of a JSON text message."""
+        variant = self._variants.get(message)
+        if variant is None:
+            pkt = self._packet_class(encoded_packet=message.data)
+            variant = self._variants[message] = (packet_event_name(pkt), msgpack_message(pkt))
+        return variant
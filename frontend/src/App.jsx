@@ -17,6 +17,7 @@ import { TeamResources } from './components/TeamResources';
 import { useDiscussionTimer } from './hooks/useDiscussionTimer';
 import { useGameSession } from './hooks/useGameSession';
 import { useGameSound } from './hooks/useGameSound';
+import { useMediaPrefetch } from './hooks/useMediaPrefetch';
 import { useSocketSoundEvents } from './hooks/useSocketSoundEvents';
 import { useSoundFade } from './hooks/useSoundFade';
 import { socket } from './socket';
@@ -28,6 +29,7 @@ function GameApp({ entrypoint }) {
     gameState,
     gameSettings,
     players,
+    evictedGroups,
     myRole,
     myName,
     myGroupId,
@@ -54,6 +56,7 @@ function GameApp({ entrypoint }) {
     soundFadeMultiplier,
   );
   useSocketSoundEvents(playSound, stopAllSounds);
+  useMediaPrefetch();
 
   const phase = gameState?.phase || 'LOGIN';
   const isAdmin = myRole === 'admin';
@@ -113,6 +116,7 @@ function GameApp({ entrypoint }) {
           <WaitingRoom
             socket={socket}
             players={players}
+            evictedGroups={evictedGroups}
             captain={gameState?.team?.captain}
             currentGameMode={currentGameMode}
             gameModeLoading={gameModeLoading}
@@ -254,6 +258,7 @@ function GameApp({ entrypoint }) {
           gameState={gameState}
           gameSettings={gameSettings}
           players={players}
+          evictedGroups={evictedGroups}
           discussionRemaining={discussionRemaining}
           onTenSeconds={markTenSecondsNotified}
           stopAllSounds={stopAllSounds}
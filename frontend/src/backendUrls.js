@@ -19,3 +19,36 @@ export function backendHttpUrl(
 export function backendSocketPath({ isDevelopment = false, basePath = APP_BASE_PATH } = {}) {
   return appPath('socket.io', isDevelopment ? '/' : basePath);
 }
+
+
+export const DEFAULT_GAME_ROOM = 'main';
+
+// `?room=friday` on the page URL selects one of the games served by the backend.
+export function gameRoomFromSearch(search) {
+  const room = new URLSearchParams(search || '').get('room');
+  return room && room.trim() ? room.trim() : DEFAULT_GAME_ROOM;
+}
+
+
+// `thumb` and `display` ask for a downscaled copy of an image; the backend
+// sends the original when there is none or the media is not an image.
+export function withImageVariant(url, variant) {
+  if (!variant) return url;
+  const separator = url.includes('?') ? '&' : '?';
+  return `${url}${separator}variant=${encodeURIComponent(variant)}`;
+}
+
+
+// The intro's `asset_token` lets a client fetch author photos before their slide.
+export function withIntroBundle(url, token) {
+  if (!token) return url;
+  const separator = url.includes('?') ? '&' : '?';
+  return `${url}${separator}bundle=${encodeURIComponent(token)}`;
+}
+
+
+export function withGameRoom(url, room) {
+  if (!room || room === DEFAULT_GAME_ROOM) return url;
+  const separator = url.includes('?') ? '&' : '?';
+  return `${url}${separator}room=${encodeURIComponent(room)}`;
+}
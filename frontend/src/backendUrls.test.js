@@ -2,8 +2,13 @@ import test from 'node:test';
 import assert from 'node:assert/strict';
 
 import {
+  DEFAULT_GAME_ROOM,
   backendHttpUrl,
   backendSocketPath,
+  gameRoomFromSearch,
+  withGameRoom,
+  withImageVariant,
+  withIntroBundle,
 } from './backendUrls.js';
 
 
@@ -39,3 +44,35 @@ test('production backend URLs share the configured application prefix', () => {
   assert.equal(backendSocketPath({ basePath: '/' }), '/socket.io');
   assert.equal(backendSocketPath({ basePath: '/chgka/' }), '/chgka/socket.io');
 });
+
+
+test('game room comes from the page query and scopes HTTP media URLs', () => {
+  assert.equal(gameRoomFromSearch(''), DEFAULT_GAME_ROOM);
+  assert.equal(gameRoomFromSearch('?room=friday-game'), 'friday-game');
+  assert.equal(gameRoomFromSearch('?entry=player&room=%20'), DEFAULT_GAME_ROOM);
+  assert.equal(withGameRoom('/chgka/media/token', DEFAULT_GAME_ROOM), '/chgka/media/token');
+  assert.equal(
+    withGameRoom('/chgka/media/token', 'friday-game'),
+    '/chgka/media/token?room=friday-game',
+  );
+  assert.equal(withGameRoom('/media/token?x=1', 'b'), '/media/token?x=1&room=b');
+});
+
+
+test('image variants are an optional query parameter', () => {
+  assert.equal(withImageVariant('/chgka/media/token', null), '/chgka/media/token');
+  assert.equal(withImageVariant('/chgka/media/token', 'thumb'), '/chgka/media/token?variant=thumb');
+  assert.equal(
+    withGameRoom(withImageVariant('/media/token', 'display'), 'b'),
+    '/media/token?variant=display&room=b',
+  );
+});
+
+
+test('the intro asset token is an optional query parameter', () => {
+  assert.equal(withIntroBundle('/intro/author-photo/4/1', null), '/intro/author-photo/4/1');
+  assert.equal(
+    withIntroBundle(withImageVariant('/intro/author-photo/4/1', 'display'), 'a b'),
+    '/intro/author-photo/4/1?variant=display&bundle=a%20b',
+  );
+});
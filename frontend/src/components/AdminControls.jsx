@@ -22,6 +22,7 @@ export function AdminControls({
   gameState,
   gameSettings,
   players,
+  evictedGroups = null,
   discussionRemaining,
   onTenSeconds,
   stopAllSounds,
@@ -541,6 +542,7 @@ export function AdminControls({
           <div className="space-y-1 max-h-40 overflow-y-auto">
             <ParticipantRoster
               groups={groups}
+              evicted={evictedGroups}
               captain={captain}
               compact
               onSelectCaptain={selectCaptain}
@@ -3,6 +3,7 @@ import { BLACKBOX_IMAGE_SOURCE } from '../blackbox';
 import { authorMediaCaption, authorMediaSource, isAuthorMedia } from '../authorMedia';
 import { inlineImagePreviews } from '../inlineMedia';
 import { requiresAnswerMediaConfirmation } from '../interactionGuards';
+import { formatMediaDuration } from '../mediaPlayback';
 import { mediaUrl, socket } from '../socket';
 import {
   mediaSectionLabel,
@@ -27,13 +28,19 @@ function QuestionSection({ title, children, highlight = false, accentClass = ''
   );
 }
 
+function imageVariant(type, variant) {
+  return type === 'image' ? variant : null;
+}
+
 function previewFromResponse(response, fallbackSection) {
   return {
     media_id: response.media_id,
     type: response.type,
-    url: mediaUrl(response.media_id),
+    url: mediaUrl(response.media_id, { variant: imageVariant(response.type, 'display') }),
+    thumbnail_url: mediaUrl(response.media_id, { variant: imageVariant(response.type, 'thumb') }),
     section: response.section || fallbackSection,
     name: response.name,
+    duration_ms: response.duration_ms,
     media_ref: response.media_ref,
     presentation_kind: response.presentation_kind,
     author_name: response.author_name,
@@ -52,7 +59,8 @@ function previewFromSharedMedia(media) {
   return {
     media_id: media.media_id,
     type: media.type,
-    url: mediaUrl(media.media_id),
+    url: mediaUrl(media.media_id, { variant: imageVariant(media.type, 'display') }),
+    thumbnail_url: mediaUrl(media.media_id, { variant: imageVariant(media.type, 'thumb') }),
     section: isAuthorMedia(media) ? 'author' : 'current',
     name: isAuthorMedia(media)
       ? media.author_name || 'Автор вопроса'
@@ -458,6 +466,13 @@ export function AdminQuestionPanel({
               <span className="text-slate-600"> • </span>
               <span className="text-slate-500">секция:</span>{' '}
               <span className="text-slate-200">{mediaSectionLabel(mediaPreview.section)}</span>
+              {formatMediaDuration(mediaPreview.duration_ms) && (
+                <>
+                  <span className="text-slate-600"> • </span>
+                  <span className="text-slate-500">длительность:</span>{' '}
+                  <span className="text-slate-200">{formatMediaDuration(mediaPreview.duration_ms)}</span>
+                </>
+              )}
             </div>
             {mediaPreview.type === 'image' && (
               <figure className="rounded border border-slate-700 bg-slate-900/40 p-2 text-center">
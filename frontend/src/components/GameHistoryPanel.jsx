@@ -3,6 +3,7 @@ import { useEffect, useState } from 'react';
 import {
   DEFAULT_GAME_SESSION_FILTER,
   GAME_SESSION_FILTERS,
+  appendHistoryPage,
   formatJournalTimestamp,
   gameModeLabel,
   gameScoreLabel,
@@ -13,7 +14,8 @@ import { responseMessage } from '../uiText';
 
 export function GameHistoryPanel({ socket, addNotification, initiallyOpen = false }) {
   const [isOpen, setIsOpen] = useState(initiallyOpen);
-  const [history, setHistory] = useState(null);
+  const [sessions, setSessions] = useState({ items: [], nextCursor: null, currentSessionId: null });
+  const [usedQuestions, setUsedQuestions] = useState({ items: [], total: 0, nextCursor: null });
   const [detail, setDetail] = useState(null);
   const [loading, setLoading] = useState(true);
   const [sessionFilter, setSessionFilter] = useState(DEFAULT_GAME_SESSION_FILTER);
@@ -25,36 +27,74 @@ export function GameHistoryPanel({ socket, addNotification, initiallyOpen = fals
     });
   };
 
-  const loadHistory = (filter = sessionFilter) => {
+  const loadSessions = (filter = sessionFilter, cursor = null) => {
     setLoading(true);
-    socket.emit('admin_get_game_history', { mode: filter }, (response) => {
+    socket.emit('admin_list_game_sessions', { mode: filter, cursor }, (response) => {
       setLoading(false);
       if (!response?.ok) {
         warn(response, 'Не удалось загрузить историю игр');
         return;
       }
-      setHistory(response.history);
-      setDetail((current) => (
-        current && !response.history.sessions.some(
-          (session) => session.id === current.session.id,
-        )
-          ? null
-          : current
-      ));
+      setSessions((current) => ({
+        items: cursor ? appendHistoryPage(current.items, response.sessions, 'id') : response.sessions,
+        nextCursor: response.next_cursor,
+        currentSessionId: response.current_session_id,
+      }));
+      if (!cursor) {
+        setDetail((current) => (
+          current && !response.sessions.some((session) => session.id === current.session.id)
+            ? null
+            : current
+        ));
+      }
+    });
+  };
+
+  const loadUsedQuestions = (cursor = null) => {
+    socket.emit('admin_list_used_questions', { cursor }, (response) => {
+      if (!response?.ok) {
+        warn(response, 'Не удалось загрузить сыгранные вопросы');
+        return;
+      }
+      setUsedQuestions((current) => ({
+        items: cursor
+          ? appendHistoryPage(current.items, response.questions, 'question_id')
+          : response.questions,
+        total: response.total,
+        nextCursor: response.next_cursor,
+      }));
     });
   };
 
+  const loadHistory = (filter = sessionFilter) => {
+    loadSessions(filter);
+    loadUsedQuestions();
+  };
+
   useEffect(() => {
     loadHistory();
   }, []);
 
-  const selectSession = (sessionId) => {
-    socket.emit('admin_get_game_session', { session_id: sessionId }, (response) => {
+  const loadEvents = (sessionId, cursor = null) => {
+    socket.emit('admin_list_game_events', { session_id: sessionId, cursor }, (response) => {
       if (!response?.ok) {
         warn(response, 'Не удалось загрузить журнал игры');
         return;
       }
-      setDetail(response.detail);
+      setDetail((current) => (
+        cursor && current?.session.id === sessionId
+          ? {
+            ...current,
+            events: appendHistoryPage(current.events, response.events, 'sequence_number'),
+            nextCursor: response.next_cursor,
+          }
+          : {
+            session: response.session,
+            opened_questions: response.opened_questions || [],
+            events: response.events,
+            nextCursor: response.next_cursor,
+          }
+      ));
     });
   };
 
@@ -73,8 +113,7 @@ export function GameHistoryPanel({ socket, addNotification, initiallyOpen = fals
     );
   };
 
-  const sessions = history?.sessions || [];
-  const usedQuestions = history?.used_questions || [];
+  const loadMoreClass = 'w-full rounded bg-slate-800 px-2 py-1 text-[9px] font-bold uppercase tracking-wider text-slate-400 hover:bg-slate-700 hover:text-slate-200';
 
   return (
     <div className="rounded-lg border border-indigo-700/70 bg-indigo-950/20">
@@ -90,24 +129,29 @@ export function GameHistoryPanel({ socket, addNotification, initiallyOpen = fals
       {isOpen && (
         <div className="flex flex-col gap-4 border-t border-indigo-800/60 p-3">
           <div className="flex items-center justify-between text-[10px] text-slate-500">
-            <span>В обычных играх сыграно уникальных вопросов: {usedQuestions.length}</span>
+            <span>В обычных играх сыграно уникальных вопросов: {usedQuestions.total}</span>
             <button type="button" onClick={() => loadHistory()} className="font-bold uppercase text-indigo-300 hover:text-indigo-200">
               Обновить
             </button>
           </div>
 
-          {usedQuestions.length > 0 && (
+          {usedQuestions.items.length > 0 && (
             <details className="rounded border border-slate-700 bg-slate-950/30 p-2">
               <summary className="cursor-pointer text-[10px] font-bold uppercase tracking-wider text-slate-400">
                 Сыгранные вопросы обычных игр
               </summary>
               <div className="mt-2 max-h-40 space-y-1 overflow-y-auto text-xs text-slate-300">
-                {usedQuestions.map((question) => (
+                {usedQuestions.items.map((question) => (
                   <div key={question.question_id} className="border-b border-slate-800 pb-1 last:border-0">
                     {questionHistoryLabel(question)}
                     {question.open_count > 1 && <span className="ml-1 text-slate-500">×{question.open_count}</span>}
                   </div>
                 ))}
+                {usedQuestions.nextCursor && (
+                  <button type="button" onClick={() => loadUsedQuestions(usedQuestions.nextCursor)} className={loadMoreClass}>
+                    Показать ещё
+                  </button>
+                )}
               </div>
             </details>
           )}
@@ -124,7 +168,7 @@ export function GameHistoryPanel({ socket, addNotification, initiallyOpen = fals
                   disabled={loading}
                   onClick={() => {
                     setSessionFilter(filter.value);
-                    loadHistory(filter.value);
+                    loadSessions(filter.value);
                   }}
                   className={`rounded px-2 py-1.5 text-[9px] font-bold uppercase tracking-wider transition-colors disabled:opacity-40 ${
                     sessionFilter === filter.value
@@ -137,13 +181,13 @@ export function GameHistoryPanel({ socket, addNotification, initiallyOpen = fals
               ))}
             </div>
             <div className="max-h-48 space-y-2 overflow-y-auto">
-              {sessions.length === 0 && <div className="text-xs italic text-slate-600">В этом фильтре игр пока нет</div>}
-              {sessions.map((session) => (
+              {sessions.items.length === 0 && <div className="text-xs italic text-slate-600">В этом фильтре игр пока нет</div>}
+              {sessions.items.map((session) => (
                 <div
                   key={session.id}
-                  className={`rounded border p-2 ${session.id === history?.current_session?.id ? 'border-indigo-500 bg-indigo-950/30' : 'border-slate-700 bg-slate-900/40'}`}
+                  className={`rounded border p-2 ${session.id === sessions.currentSessionId ? 'border-indigo-500 bg-indigo-950/30' : 'border-slate-700 bg-slate-900/40'}`}
                 >
-                  <button type="button" onClick={() => selectSession(session.id)} className="w-full text-left">
+                  <button type="button" onClick={() => loadEvents(session.id)} className="w-full text-left">
                     <div className="flex items-start justify-between gap-2">
                       <span className="text-xs font-bold text-white">{formatJournalTimestamp(session.created_at)}</span>
                       <span className={session.mode === 'regular' ? 'text-[10px] font-bold text-emerald-400' : 'text-[10px] font-bold text-amber-400'}>
@@ -163,6 +207,16 @@ export function GameHistoryPanel({ socket, addNotification, initiallyOpen = fals
                   </button>
                 </div>
               ))}
+              {sessions.nextCursor && (
+                <button
+                  type="button"
+                  disabled={loading}
+                  onClick={() => loadSessions(sessionFilter, sessions.nextCursor)}
+                  className={`${loadMoreClass} disabled:opacity-40`}
+                >
+                  Показать ещё
+                </button>
+              )}
             </div>
           </div>
 
@@ -191,6 +245,11 @@ export function GameHistoryPanel({ socket, addNotification, initiallyOpen = fals
                     {event.display_message}
                   </div>
                 ))}
+                {detail.nextCursor && (
+                  <button type="button" onClick={() => loadEvents(detail.session.id, detail.nextCursor)} className={loadMoreClass}>
+                    Показать ещё
+                  </button>
+                )}
               </div>
             </div>
           )}
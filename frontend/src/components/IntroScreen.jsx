@@ -1,12 +1,22 @@
 import { useEffect, useState } from 'react';
 import {
   INTRO_FALLBACK_AUTHOR_SOURCE,
+  createIntroPhotoPreloader,
   introAuthorCaption,
   introSlideLabel,
   introSlideSource,
 } from '../intro';
 import { introAuthorPhotoUrl } from '../socket';
 
+const photoPreloader = createIntroPhotoPreloader({
+  loadPhoto: (sector, slot, token) => {
+    const image = new Image();
+    image.src = introAuthorPhotoUrl(sector, slot, { bundle: token });
+    image.decode().catch(() => {});
+    return image;
+  },
+});
+
 export function IntroScreen({ intro, isAdmin = false, introHtml = null }) {
   const [failedPhotoKeys, setFailedPhotoKeys] = useState([]);
   const slideIndex = intro?.slide_index;
@@ -19,6 +29,12 @@ export function IntroScreen({ intro, isAdmin = false, introHtml = null }) {
     setFailedPhotoKeys([]);
   }, [slideIndex]);
 
+  useEffect(() => {
+    photoPreloader.update(intro);
+  }, [intro?.asset_token]);
+
+  useEffect(() => () => photoPreloader.clear(), []);
+
   const markPhotoFailed = (photoKey) => {
     setFailedPhotoKeys((current) => (
       current.includes(photoKey) ? current : [...current, photoKey]
@@ -40,7 +56,7 @@ export function IntroScreen({ intro, isAdmin = false, introHtml = null }) {
             {authors.map((author) => {
               const photoKey = `${author.sector}:${author.slot}`;
               const source = author.has_photo && !failedPhotoKeys.includes(photoKey)
-                ? introAuthorPhotoUrl(author.sector, author.slot)
+                ? introAuthorPhotoUrl(author.sector, author.slot, { bundle: intro?.asset_token })
                 : INTRO_FALLBACK_AUTHOR_SOURCE;
               const caption = introAuthorCaption(author);
 
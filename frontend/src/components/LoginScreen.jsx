@@ -5,6 +5,7 @@ import {
   isAdminEntrypoint,
 } from '../entrypoint';
 import { MAX_PARTICIPANTS_PER_GROUP } from '../participants';
+import { getAdminConnectError, withAdminPassword, withoutAdminPassword } from '../session';
 
 
 function PlayerLoginForm({ socket }) {
@@ -128,11 +129,21 @@ function AdminLoginForm({ socket, historyOnly = false }) {
       setError(data?.message || 'Неверный пароль');
     }
 
+    function onConnectError(connectError) {
+      // Only `room_not_found` means the password did not open the room.
+      if (!socket.auth?.admin_password) return;
+      socket.auth = withoutAdminPassword(socket.auth);
+      setIsSubmitting(false);
+      setError(getAdminConnectError(connectError));
+    }
+
     socket.on('auth_success', onAuthSuccess);
     socket.on('auth_failed', onAuthFailed);
+    socket.on('connect_error', onConnectError);
     return () => {
       socket.off('auth_success', onAuthSuccess);
       socket.off('auth_failed', onAuthFailed);
+      socket.off('connect_error', onConnectError);
     };
   }, [socket]);
 
@@ -146,6 +157,11 @@ function AdminLoginForm({ socket, historyOnly = false }) {
 
     setIsSubmitting(true);
     setError('');
+    if (!socket.connected) {
+      // The room may not exist yet: connecting with the password opens it.
+      socket.auth = withAdminPassword(socket.auth, normalizedPassword);
+      socket.connect();
+    }
     socket.emit('authenticate_admin', {
       password: normalizedPassword,
       ...(historyOnly ? { client_kind: 'history' } : {}),
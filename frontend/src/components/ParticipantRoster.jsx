@@ -1,4 +1,10 @@
-import { groupDisplayName } from '../participants';
+import { evictedGroupsSummary, groupDisplayName } from '../participants';
+
+function EvictedGroupsNote({ evicted }) {
+  const summary = evictedGroupsSummary(evicted);
+  if (!summary) return null;
+  return <div className="text-[10px] text-slate-500">{summary}</div>;
+}
 
 export function ParticipantRoster({
   groups,
@@ -7,9 +13,15 @@ export function ParticipantRoster({
   captain = null,
   onSelectCaptain,
   compact = false,
+  evicted = null,
 }) {
   if (groups.length === 0) {
-    return <div className="text-xs italic text-slate-600">Нет участников</div>;
+    return (
+      <div className="space-y-1">
+        <div className="text-xs italic text-slate-600">Нет участников</div>
+        <EvictedGroupsNote evicted={evicted} />
+      </div>
+    );
   }
 
   return (
@@ -105,6 +117,7 @@ export function ParticipantRoster({
           </div>
         );
       })}
+      <EvictedGroupsNote evicted={evicted} />
     </div>
   );
 }
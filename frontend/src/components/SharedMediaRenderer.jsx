@@ -11,7 +11,7 @@ export function SharedMediaRenderer({ media, volume, children }) {
     return (
       <figure className="w-full rounded-xl border border-slate-700 bg-slate-800/40 p-4 text-center">
         <img
-          src={authorMediaSource(media, mediaUrl(media.media_id))}
+          src={authorMediaSource(media, mediaUrl(media.media_id, { variant: 'display' }))}
           alt={caption || '13-й сектор'}
           className="mx-auto max-h-[520px] w-auto rounded-lg object-contain"
         />
@@ -55,7 +55,7 @@ export function SharedMediaRenderer({ media, volume, children }) {
   return (
     <div className="w-full bg-slate-800/40 border border-slate-700 rounded-xl p-4 flex justify-center">
       <img
-        src={mediaUrl(media.media_id)}
+        src={mediaUrl(media.media_id, { variant: 'display' })}
         alt="Медиа вопроса"
         className="max-h-[520px] w-auto object-contain"
       />
@@ -1,5 +1,6 @@
-import { useCallback, useEffect, useRef, useState } from 'react';
+import { useCallback, useEffect, useMemo, useRef, useState } from 'react';
 
+import { prefetchedMediaSource } from '../hooks/useMediaPrefetch';
 import { mediaUrl } from '../socket';
 import {
   normalizedVolume,
@@ -13,6 +14,12 @@ export function SynchronizedMedia({ media, volume = 1, onEnded, source = null })
   const elementRef = useRef(null);
   const snapshotReceivedAtRef = useRef(Date.now());
   const [playbackBlocked, setPlaybackBlocked] = useState(false);
+  // Chosen once per media_id so a download that finishes mid-playback does
+  // not swap the element's source.
+  const prefetched = useMemo(
+    () => prefetchedMediaSource(media.prefetch_key),
+    [media.media_id],
+  );
 
   const synchronize = useCallback(() => {
     const element = elementRef.current;
@@ -65,7 +72,7 @@ export function SynchronizedMedia({ media, volume = 1, onEnded, source = null })
 
   const commonProps = {
     ref: elementRef,
-    src: source || mediaUrl(media.media_id),
+    src: source || prefetched || mediaUrl(media.media_id),
     preload: 'auto',
     onLoadedMetadata: synchronize,
     onEnded: reportEnded,
@@ -6,6 +6,7 @@ import { participantCount, participantGroups } from '../participants';
 export function WaitingRoom({
   socket,
   players = [],
+  evictedGroups = null,
   captain,
   currentGameMode,
   gameModeLoading,
@@ -47,6 +48,7 @@ export function WaitingRoom({
         <div className="mb-8">
           <ParticipantRoster
             groups={groups}
+            evicted={evictedGroups}
             captain={captain}
             onSelectCaptain={(participant) => socket.emit(
               'admin_select_captain',
@@ -53,3 +53,8 @@ export function formatJournalTimestamp(value, { withDate = true } = {}) {
     : { hour: '2-digit', minute: '2-digit', second: '2-digit' };
   return new Intl.DateTimeFormat('ru-RU', options).format(new Date(timestamp));
 }
+
+export function appendHistoryPage(items, pageItems, key) {
+  const seen = new Set(items.map((item) => item[key]));
+  return [...items, ...pageItems.filter((item) => !seen.has(item[key]))];
+}
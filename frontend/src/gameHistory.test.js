@@ -4,6 +4,7 @@ import assert from 'node:assert/strict';
 import {
   DEFAULT_GAME_SESSION_FILTER,
   GAME_SESSION_FILTERS,
+  appendHistoryPage,
   formatJournalTimestamp,
   gameModeLabel,
   gameScoreLabel,
@@ -51,3 +52,13 @@ test('blitz question history is labeled by its individual part', () => {
 test('invalid journal timestamp uses a stable placeholder', () => {
   assert.equal(formatJournalTimestamp('not-a-date'), '—');
 });
+
+test('history pages append without repeating items already shown', () => {
+  const shown = [{ id: 'a' }, { id: 'b' }];
+
+  assert.deepEqual(
+    appendHistoryPage(shown, [{ id: 'b' }, { id: 'c' }], 'id'),
+    [{ id: 'a' }, { id: 'b' }, { id: 'c' }],
+  );
+  assert.deepEqual(appendHistoryPage([], [{ id: 'a' }], 'id'), [{ id: 'a' }]);
+});
@@ -1,21 +1,32 @@
-import { useCallback, useEffect, useState } from 'react';
+import { useCallback, useEffect, useRef, useState } from 'react';
 import { ENTRYPOINT_ADMIN_HISTORY, isAdminEntrypoint } from '../entrypoint';
 import { socket } from '../socket';
 import {
   ADMIN_TOKEN_KEY,
   PLAYER_TOKEN_KEY,
+  ROOM_RETRY_DELAY_MS,
   getAdminExpiryMs,
   getExpiredAdminSession,
   getKickedPlayerNotice,
+  getRoomNotFoundNotice,
   getSessionRestorePayload,
   saveAdminToken,
+  withoutAdminPassword,
 } from '../session';
+import {
+  EFFECTS_EVENT,
+  STATE_PROTOCOL_DELTA,
+  dispatchEffects,
+  reconcileStatePatch,
+  replayStatePatches,
+} from '../stateSync';
 import { responseMessage } from '../uiText';
 
 export function useGameSession(entrypoint) {
   const [gameState, setGameState] = useState(null);
   const [gameSettings, setGameSettings] = useState({ volume: 1.0, sound_control: null });
   const [players, setPlayers] = useState([]);
+  const [evictedGroups, setEvictedGroups] = useState(null);
   const [myRole, setMyRole] = useState('player');
   const [myName, setMyName] = useState('');
   const [myGroupId, setMyGroupId] = useState(null);
@@ -29,6 +40,9 @@ export function useGameSession(entrypoint) {
   const [adminExpiresAtMs, setAdminExpiresAtMs] = useState(null);
   const [currentGameMode, setCurrentGameMode] = useState(null);
   const [gameModeLoading, setGameModeLoading] = useState(false);
+  // Raw revisioned server snapshot used as the base for `state_patch`.
+  const serverStateRef = useRef(null);
+  const stateSubscriptionRef = useRef({ pending: false, buffered: [] });
 
   const expireAdminSession = useCallback((data) => {
     const expired = getExpiredAdminSession(data);
@@ -117,9 +131,37 @@ export function useGameSession(entrypoint) {
   }, [addNotification]);
 
   useEffect(() => {
+    let roomNotice = null;
+    let roomRetryTimer = null;
+
+    function subscribeToStateDeltas() {
+      const subscription = stateSubscriptionRef.current;
+      subscription.pending = true;
+      subscription.buffered = [];
+      socket.emit('state_subscribe', { protocol: STATE_PROTOCOL_DELTA, batch: true }, (response) => {
+        const buffered = subscription.buffered;
+        subscription.pending = false;
+        subscription.buffered = [];
+        if (!response?.ok) return;
+        const result = replayStatePatches(response.state, buffered);
+        if (result.status === 'gap') {
+          subscribeToStateDeltas();
+          return;
+        }
+        onStateUpdate(result.state);
+      });
+    }
+
     function onConnect() {
       setIsConnected(true);
+      socket.auth = withoutAdminPassword(socket.auth);
+      if (roomNotice) {
+        const shown = roomNotice;
+        roomNotice = null;
+        setSessionNotice((notice) => (notice === shown ? '' : notice));
+      }
 
+      subscribeToStateDeltas();
       const restorePayload = getSessionRestorePayload(localStorage, entrypoint);
       if (restorePayload) socket.emit('restore_session', restorePayload);
     }
@@ -132,7 +174,31 @@ export function useGameSession(entrypoint) {
       setGameModeLoading(false);
     }
 
+    function onConnectError(error) {
+      const notice = getRoomNotFoundNotice(error);
+      if (!notice) return;
+      // A refused handshake is not retried by socket.io-client itself.
+      roomNotice = notice;
+      setSessionNotice(notice);
+      clearTimeout(roomRetryTimer);
+      roomRetryTimer = setTimeout(() => {
+        if (!socket.connected) socket.connect();
+      }, ROOM_RETRY_DELAY_MS);
+    }
+
+    function onStatePatch(patch) {
+      const subscription = stateSubscriptionRef.current;
+      if (subscription.pending) {
+        subscription.buffered.push(patch);
+        return;
+      }
+      const result = reconcileStatePatch(serverStateRef.current, patch);
+      if (result.status === 'applied') onStateUpdate(result.state);
+      else if (result.status === 'gap') subscribeToStateDeltas();
+    }
+
     function onStateUpdate(newState) {
+      serverStateRef.current = newState;
       if (!newState) {
         setGameState(newState);
         return;
@@ -182,6 +248,7 @@ export function useGameSession(entrypoint) {
 
     function onPlayersUpdate(data) {
       if (data?.players) setPlayers(data.players);
+      setEvictedGroups(data?.evicted || null);
     }
 
     function onAuthSuccess(data) {
@@ -226,6 +293,7 @@ export function useGameSession(entrypoint) {
 
     function onKicked(data) {
       localStorage.removeItem(PLAYER_TOKEN_KEY);
+      serverStateRef.current = null;
       setGameState(null);
       setMyRole('player');
       setMyName('');
@@ -246,9 +314,15 @@ export function useGameSession(entrypoint) {
       setAdminQuestion(data || null);
     }
 
+    function onEffects(envelope) {
+      dispatchEffects(socket, envelope);
+    }
+
     socket.on('connect', onConnect);
     socket.on('disconnect', onDisconnect);
+    socket.on('connect_error', onConnectError);
     socket.on('state_update', onStateUpdate);
+    socket.on('state_patch', onStatePatch);
     socket.on('role_update', onRoleUpdate);
     socket.on('settings_update', onSettingsUpdate);
     socket.on('players_update', onPlayersUpdate);
@@ -263,11 +337,15 @@ export function useGameSession(entrypoint) {
     socket.on('pack_info', onPackInfo);
     socket.on('admin_question', onAdminQuestion);
     socket.on('admin_game_mode_update', onAdminGameModeUpdate);
+    socket.on(EFFECTS_EVENT, onEffects);
 
     return () => {
       socket.off('connect', onConnect);
       socket.off('disconnect', onDisconnect);
+      socket.off('connect_error', onConnectError);
+      clearTimeout(roomRetryTimer);
       socket.off('state_update', onStateUpdate);
+      socket.off('state_patch', onStatePatch);
       socket.off('role_update', onRoleUpdate);
       socket.off('settings_update', onSettingsUpdate);
       socket.off('players_update', onPlayersUpdate);
@@ -282,6 +360,7 @@ export function useGameSession(entrypoint) {
       socket.off('pack_info', onPackInfo);
       socket.off('admin_question', onAdminQuestion);
       socket.off('admin_game_mode_update', onAdminGameModeUpdate);
+      socket.off(EFFECTS_EVENT, onEffects);
     };
   }, [addNotification, entrypoint, expireAdminSession]);
 
@@ -291,12 +370,14 @@ export function useGameSession(entrypoint) {
     localStorage.removeItem(PLAYER_TOKEN_KEY);
     socket.disconnect();
 
+    serverStateRef.current = null;
     setGameState(null);
     setMyRole('player');
     setMyName('');
     setMyGroupId(null);
     setHasJoined(false);
     setPlayers([]);
+    setEvictedGroups(null);
     setIsConnected(false);
     setPackInfo(null);
     setAdminQuestion(null);
@@ -312,6 +393,7 @@ export function useGameSession(entrypoint) {
     gameState,
     gameSettings,
     players,
+    evictedGroups,
     myRole,
     myName,
     myGroupId,
@@ -0,0 +1,29 @@
+import { useEffect } from 'react';
+
+import { createMediaPrefetcher } from '../mediaPrefetch';
+import { mediaUrl, socket } from '../socket';
+
+
+const prefetcher = createMediaPrefetcher({
+  fetchMedia: async (mediaId, signal) => {
+    const response = await fetch(mediaUrl(mediaId), { signal });
+    if (!response.ok) throw new Error(`Prefetch failed: ${response.status}`);
+    return response.blob();
+  },
+  createObjectUrl: (blob) => URL.createObjectURL(blob),
+  revokeObjectUrl: (url) => URL.revokeObjectURL(url),
+});
+
+export function prefetchedMediaSource(prefetchKey) {
+  return prefetcher.sourceFor(prefetchKey);
+}
+
+export function useMediaPrefetch() {
+  useEffect(() => {
+    socket.on('media_prefetch', prefetcher.update);
+    return () => {
+      socket.off('media_prefetch', prefetcher.update);
+      prefetcher.clear();
+    };
+  }, []);
+}
@@ -33,7 +33,8 @@ export function inlineImagePreviews(html, mediaDescriptors = [], resolvedImages
       let content;
       let label;
       if (ready) {
-        content = `<img class="media-inline-preview-image" src="${escapeHtmlAttribute(resolution.preview.url)}" alt="${escapedName}" loading="lazy">`;
+        const source = resolution.preview.thumbnail_url || resolution.preview.url;
+        content = `<img class="media-inline-preview-image" src="${escapeHtmlAttribute(source)}" alt="${escapedName}" loading="lazy">`;
         label = `Выбрать изображение ${name}`;
       } else {
         const failed = resolution?.status === 'error';
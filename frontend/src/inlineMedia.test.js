@@ -29,6 +29,19 @@ test('resolved image placeholder becomes a private inline thumbnail', () => {
 });
 
 
+test('inline thumbnails prefer the downscaled variant', () => {
+  const placeholder = '<span class="media-placeholder" data-media-ref="image-ref"></span>';
+  const rendered = inlineImagePreviews(placeholder, [image], {
+    'image-ref': {
+      status: 'ready',
+      preview: { url: '/media/token?variant=display', thumbnail_url: '/media/token?variant=thumb' },
+    },
+  });
+
+  assert.match(rendered, /src="\/media\/token\?variant=thumb"/);
+});
+
+
 test('pending and failed images render visible fallbacks', () => {
   const placeholder = '<span class="media-placeholder" data-media-ref="image-ref"></span>';
 
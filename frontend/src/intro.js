@@ -85,3 +85,31 @@ export function introHostControlView(intro, localNowMs = Date.now()) {
         : 'Запустить музыку',
   };
 }
+
+// Loads the author photos of the intro's remaining slides once per
+// `asset_token`. `loadPhoto(sector, slot, token)` starts one download and
+// returns a handle that is kept until the token changes, so the browser holds
+// the decoded picture when its slide comes up.
+export function createIntroPhotoPreloader({ loadPhoto }) {
+  let token = null;
+  let handles = [];
+
+  function clear() {
+    token = null;
+    handles = [];
+  }
+
+  function update(intro) {
+    const nextToken = intro?.asset_token || null;
+    if (nextToken === token) return;
+    clear();
+    if (!nextToken) return;
+    token = nextToken;
+    const slideIndex = Number.isInteger(intro.slide_index) ? intro.slide_index : 0;
+    handles = (Array.isArray(intro.asset_photos) ? intro.asset_photos : [])
+      .filter((photo) => photo.sector >= slideIndex)
+      .map((photo) => loadPhoto(photo.sector, photo.slot, nextToken));
+  }
+
+  return { update, clear, loaded: () => handles.length };
+}
@@ -2,6 +2,7 @@ import test from 'node:test';
 import assert from 'node:assert/strict';
 
 import {
+  createIntroPhotoPreloader,
   formatIntroRemaining,
   INTRO_FALLBACK_AUTHOR_SOURCE,
   introAuthorCaption,
@@ -115,3 +116,29 @@ test('host intro controls preserve the disabled music slot after the track ends'
   assert.equal(finished.canSkip, false);
   assert.equal(introHostControlView({ slide_index: -1 }).canSkip, false);
 });
+
+
+test('intro photos are preloaded once per asset token from the current slide on', () => {
+  const loads = [];
+  const preloader = createIntroPhotoPreloader({
+    loadPhoto: (sector, slot, token) => {
+      loads.push(`${token}:${sector}.${slot}`);
+      return {};
+    },
+  });
+  const photos = [
+    { sector: 1, slot: 1 },
+    { sector: 4, slot: 1 },
+    { sector: 4, slot: 3 },
+  ];
+
+  preloader.update({ slide_index: 2, asset_token: 'a', asset_photos: photos });
+  preloader.update({ slide_index: 3, asset_token: 'a', asset_photos: photos });
+  assert.deepEqual(loads, ['a:4.1', 'a:4.3']);
+  assert.equal(preloader.loaded(), 2);
+
+  preloader.update({ slide_index: 0, asset_token: null, asset_photos: [] });
+  assert.equal(preloader.loaded(), 0);
+  preloader.update({ slide_index: 0, asset_token: 'b', asset_photos: photos });
+  assert.deepEqual(loads.slice(2), ['b:1.1', 'b:4.1', 'b:4.3']);
+});
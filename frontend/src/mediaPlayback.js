@@ -45,3 +45,12 @@ export function playbackEndedPayload(media) {
     playback_generation: media.playback_generation,
   };
 }
+
+// `m:ss` for the manifest duration of a pack file, `null` when unknown.
+export function formatMediaDuration(durationMs) {
+  if (!Number.isFinite(durationMs) || durationMs <= 0) return null;
+  const totalSeconds = Math.round(durationMs / 1000);
+  const minutes = Math.floor(totalSeconds / 60);
+  const seconds = String(totalSeconds % 60).padStart(2, '0');
+  return `${minutes}:${seconds}`;
+}
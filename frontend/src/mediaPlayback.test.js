@@ -2,6 +2,7 @@ import test from 'node:test';
 import assert from 'node:assert/strict';
 
 import {
+  formatMediaDuration,
   normalizedVolume,
   playbackEndedPayload,
   playbackPositionSeconds,
@@ -70,3 +71,11 @@ test('ended payload identifies only a valid playing generation', () => {
     null,
   );
 });
+
+
+test('manifest durations format as minutes and seconds', () => {
+  assert.equal(formatMediaDuration(3_030), '0:03');
+  assert.equal(formatMediaDuration(125_600), '2:06');
+  assert.equal(formatMediaDuration(null), null);
+  assert.equal(formatMediaDuration(0), null);
+});
@@ -0,0 +1,65 @@
+// Downloads the question media the server offers in `media_prefetch` while the
+// question is read, so a shared audio or video starts from a local blob.
+// Items are keyed by the opaque `prefetch_key` that the shared media repeats.
+// A download still running at the share is abandoned: the stream the player
+// starts then would only compete with it for the server's uplink.
+
+export function createMediaPrefetcher({ fetchMedia, createObjectUrl, revokeObjectUrl }) {
+  let generation = 0;
+  let concurrency = 1;
+  let queue = [];
+  let running = 0;
+  const sources = new Map();
+  const downloads = new Map();
+
+  function clear() {
+    generation += 1;
+    queue = [];
+    for (const controller of downloads.values()) controller.abort();
+    downloads.clear();
+    for (const source of sources.values()) revokeObjectUrl(source);
+    sources.clear();
+  }
+
+  function pump() {
+    while (running < concurrency && queue.length > 0) {
+      const item = queue.shift();
+      const startedIn = generation;
+      const controller = new AbortController();
+      downloads.set(item.prefetch_key, controller);
+      running += 1;
+      fetchMedia(item.media_id, controller.signal)
+        .then((blob) => {
+          if (startedIn === generation && blob) {
+            sources.set(item.prefetch_key, createObjectUrl(blob));
+          }
+        })
+        // A failed prefetch only means the shared media streams as before.
+        .catch(() => {})
+        .finally(() => {
+          if (downloads.get(item.prefetch_key) === controller) downloads.delete(item.prefetch_key);
+          running -= 1;
+          pump();
+        });
+    }
+  }
+
+  function update(payload) {
+    clear();
+    concurrency = Math.max(1, Number(payload?.concurrency) || 1);
+    queue = (payload?.items || []).filter((item) => item?.media_id && item?.prefetch_key);
+    pump();
+  }
+
+  // The finished blob of `prefetchKey`, or `null` after abandoning its download.
+  function sourceFor(prefetchKey) {
+    if (!prefetchKey) return null;
+    const source = sources.get(prefetchKey);
+    if (source) return source;
+    queue = queue.filter((item) => item.prefetch_key !== prefetchKey);
+    downloads.get(prefetchKey)?.abort();
+    return null;
+  }
+
+  return { update, sourceFor, clear };
+}
@@ -0,0 +1,107 @@
+import assert from 'node:assert/strict';
+import test from 'node:test';
+
+import { createMediaPrefetcher } from './mediaPrefetch.js';
+
+
+function deferred() {
+  let resolve;
+  let reject;
+  const promise = new Promise((onResolve, onReject) => {
+    resolve = onResolve;
+    reject = onReject;
+  });
+  return { promise, resolve, reject };
+}
+
+function harness() {
+  const requests = [];
+  const revoked = [];
+  const prefetcher = createMediaPrefetcher({
+    fetchMedia: (mediaId, signal) => {
+      const request = deferred();
+      signal.addEventListener('abort', () => request.reject(new Error('aborted')));
+      requests.push({ mediaId, signal, ...request });
+      return request.promise;
+    },
+    createObjectUrl: (blob) => `blob:${blob}`,
+    revokeObjectUrl: (url) => revoked.push(url),
+  });
+  return { prefetcher, requests, revoked };
+}
+
+const flush = () => new Promise((resolve) => setTimeout(resolve, 0));
+
+test('downloads offered items one at a time and maps them by prefetch key', async () => {
+  const { prefetcher, requests } = harness();
+  prefetcher.update({
+    concurrency: 1,
+    items: [
+      { media_id: 'token-a', prefetch_key: 'a' },
+      { media_id: 'token-b', prefetch_key: 'b' },
+    ],
+  });
+
+  assert.deepEqual(requests.map((request) => request.mediaId), ['token-a']);
+  requests[0].resolve('first');
+  await flush();
+
+  assert.equal(prefetcher.sourceFor('a'), 'blob:first');
+  assert.equal(prefetcher.sourceFor('b'), null);
+  assert.deepEqual(requests.map((request) => request.mediaId), ['token-a', 'token-b']);
+});
+
+test('failed downloads fall back to streaming and do not stall the queue', async () => {
+  const { prefetcher, requests } = harness();
+  prefetcher.update({
+    concurrency: 1,
+    items: [
+      { media_id: 'token-a', prefetch_key: 'a' },
+      { media_id: 'token-b', prefetch_key: 'b' },
+    ],
+  });
+
+  requests[0].reject(new Error('429'));
+  await flush();
+  requests[1].resolve('second');
+  await flush();
+
+  assert.equal(prefetcher.sourceFor('a'), null);
+  assert.equal(prefetcher.sourceFor('b'), 'blob:second');
+});
+
+test('a new offer revokes old blobs and ignores downloads of the old one', async () => {
+  const { prefetcher, requests, revoked } = harness();
+  prefetcher.update({ items: [{ media_id: 'token-a', prefetch_key: 'a' }] });
+  requests[0].resolve('first');
+  await flush();
+  prefetcher.update({ items: [{ media_id: 'token-b', prefetch_key: 'b' }] });
+  assert.deepEqual(revoked, ['blob:first']);
+
+  prefetcher.update({ items: [] });
+  requests[1].resolve('late');
+  await flush();
+
+  assert.equal(prefetcher.sourceFor('a'), null);
+  assert.equal(prefetcher.sourceFor('b'), null);
+  assert.equal(prefetcher.sourceFor(undefined), null);
+});
+
+test('asking for an unfinished item abandons its download', async () => {
+  const { prefetcher, requests } = harness();
+  prefetcher.update({
+    concurrency: 1,
+    items: [
+      { media_id: 'token-a', prefetch_key: 'a' },
+      { media_id: 'token-b', prefetch_key: 'b' },
+      { media_id: 'token-c', prefetch_key: 'c' },
+    ],
+  });
+
+  assert.equal(prefetcher.sourceFor('b'), null);
+  assert.equal(prefetcher.sourceFor('a'), null);
+  assert.equal(requests[0].signal.aborted, true);
+  await flush();
+
+  assert.deepEqual(requests.map((request) => request.mediaId), ['token-a', 'token-c']);
+});
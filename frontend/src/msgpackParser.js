@@ -0,0 +1,298 @@
+// MessagePack packet parser for socket.io-client, used when the build opts in
+// with VITE_SOCKET_WIRE=msgpack. Packets travel as `{type, data, nsp, id}`
+// maps, the shape python-socketio's MsgPackPacket reads and writes. The
+// handshake asks the backend for this format with `?wire=msgpack`.
+
+export const WIRE_JSON = 'json';
+export const WIRE_MSGPACK = 'msgpack';
+
+// Socket.IO protocol revision implemented by this parser.
+export const protocol = 5;
+
+const textEncoder = new TextEncoder();
+const textDecoder = new TextDecoder();
+
+class Writer {
+  constructor(size = 256) {
+    this.bytes = new Uint8Array(size);
+    this.view = new DataView(this.bytes.buffer);
+    this.length = 0;
+  }
+
+  reserve(count) {
+    if (this.length + count <= this.bytes.length) return;
+    let size = this.bytes.length * 2;
+    while (size < this.length + count) size *= 2;
+    const bytes = new Uint8Array(size);
+    bytes.set(this.bytes.subarray(0, this.length));
+    this.bytes = bytes;
+    this.view = new DataView(bytes.buffer);
+  }
+
+  byte(value) {
+    this.reserve(1);
+    this.bytes[this.length++] = value;
+  }
+
+  head(type, size, count) {
+    this.reserve(1 + size);
+    this.bytes[this.length++] = type;
+    if (size === 1) this.view.setUint8(this.length, count);
+    else if (size === 2) this.view.setUint16(this.length, count);
+    else if (size === 4) this.view.setUint32(this.length, count);
+    this.length += size;
+  }
+
+  raw(bytes) {
+    this.reserve(bytes.length);
+    this.bytes.set(bytes, this.length);
+    this.length += bytes.length;
+  }
+
+  finish() {
+    return this.bytes.slice(0, this.length);
+  }
+}
+
+function writeLength(writer, count, fixType, fixLimit, types) {
+  if (fixType !== null && count < fixLimit) writer.byte(fixType | count);
+  else if (types[0] !== null && count < 0x100) writer.head(types[0], 1, count);
+  else if (count < 0x10000) writer.head(types[1], 2, count);
+  else writer.head(types[2], 4, count);
+}
+
+function writeNumber(writer, value) {
+  if (!Number.isInteger(value) || !Number.isSafeInteger(value)) {
+    writer.head(0xcb, 0, 0);
+    writer.reserve(8);
+    writer.view.setFloat64(writer.length, value);
+    writer.length += 8;
+  } else if (value >= 0) {
+    if (value < 0x80) writer.byte(value);
+    else if (value < 0x100) writer.head(0xcc, 1, value);
+    else if (value < 0x10000) writer.head(0xcd, 2, value);
+    else if (value < 0x100000000) writer.head(0xce, 4, value);
+    else {
+      writer.head(0xcf, 0, 0);
+      writer.reserve(8);
+      writer.view.setBigUint64(writer.length, BigInt(value));
+      writer.length += 8;
+    }
+  } else if (value >= -0x20) {
+    writer.byte(value & 0xff);
+  } else if (value >= -0x80) {
+    writer.byte(0xd0);
+    writer.reserve(1);
+    writer.view.setInt8(writer.length, value);
+    writer.length += 1;
+  } else if (value >= -0x8000) {
+    writer.byte(0xd1);
+    writer.reserve(2);
+    writer.view.setInt16(writer.length, value);
+    writer.length += 2;
+  } else if (value >= -0x80000000) {
+    writer.byte(0xd2);
+    writer.reserve(4);
+    writer.view.setInt32(writer.length, value);
+    writer.length += 4;
+  } else {
+    writer.byte(0xd3);
+    writer.reserve(8);
+    writer.view.setBigInt64(writer.length, BigInt(value));
+    writer.length += 8;
+  }
+}
+
+function writeValue(writer, value) {
+  if (value === null || value === undefined) {
+    writer.byte(0xc0);
+  } else if (value === false || value === true) {
+    writer.byte(value ? 0xc3 : 0xc2);
+  } else if (typeof value === 'number') {
+    writeNumber(writer, value);
+  } else if (typeof value === 'string') {
+    const bytes = textEncoder.encode(value);
+    writeLength(writer, bytes.length, 0xa0, 32, [0xd9, 0xda, 0xdb]);
+    writer.raw(bytes);
+  } else if (value instanceof ArrayBuffer || ArrayBuffer.isView(value)) {
+    const bytes = value instanceof ArrayBuffer
+      ? new Uint8Array(value)
+      : new Uint8Array(value.buffer, value.byteOffset, value.byteLength);
+    writeLength(writer, bytes.length, null, 0, [0xc4, 0xc5, 0xc6]);
+    writer.raw(bytes);
+  } else if (Array.isArray(value)) {
+    writeLength(writer, value.length, 0x90, 16, [null, 0xdc, 0xdd]);
+    for (const item of value) writeValue(writer, item);
+  } else if (typeof value === 'object') {
+    // Like JSON, keys whose value is undefined are left out.
+    const entries = Object.entries(value).filter(([, item]) => item !== undefined);
+    writeLength(writer, entries.length, 0x80, 16, [null, 0xde, 0xdf]);
+    for (const [key, item] of entries) {
+      writeValue(writer, key);
+      writeValue(writer, item);
+    }
+  } else {
+    throw new TypeError(`Cannot encode ${typeof value} as MessagePack`);
+  }
+}
+
+export function encodeMsgpack(value) {
+  const writer = new Writer();
+  writeValue(writer, value);
+  return writer.finish();
+}
+
+class Reader {
+  constructor(bytes) {
+    this.bytes = bytes;
+    this.view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+    this.offset = 0;
+  }
+
+  take(count) {
+    if (this.offset + count > this.bytes.length) throw new Error('Truncated MessagePack data');
+    const start = this.offset;
+    this.offset += count;
+    return start;
+  }
+
+  uint(size) {
+    const at = this.take(size);
+    if (size === 1) return this.view.getUint8(at);
+    if (size === 2) return this.view.getUint16(at);
+    if (size === 4) return this.view.getUint32(at);
+    return Number(this.view.getBigUint64(at));
+  }
+
+  int(size) {
+    const at = this.take(size);
+    if (size === 1) return this.view.getInt8(at);
+    if (size === 2) return this.view.getInt16(at);
+    if (size === 4) return this.view.getInt32(at);
+    return Number(this.view.getBigInt64(at));
+  }
+
+  string(length) {
+    const at = this.take(length);
+    return textDecoder.decode(this.bytes.subarray(at, at + length));
+  }
+
+  binary(length) {
+    const at = this.take(length);
+    return this.bytes.slice(at, at + length);
+  }
+
+  array(length) {
+    const items = new Array(length);
+    for (let index = 0; index < length; index += 1) items[index] = this.value();
+    return items;
+  }
+
+  map(length) {
+    const result = {};
+    for (let index = 0; index < length; index += 1) {
+      const key = this.value();
+      result[key] = this.value();
+    }
+    return result;
+  }
+
+  value() {
+    const type = this.uint(1);
+    if (type < 0x80) return type;
+    if (type < 0x90) return this.map(type & 0x0f);
+    if (type < 0xa0) return this.array(type & 0x0f);
+    if (type < 0xc0) return this.string(type & 0x1f);
+    if (type >= 0xe0) return type - 0x100;
+    switch (type) {
+      case 0xc0: return null;
+      case 0xc2: return false;
+      case 0xc3: return true;
+      case 0xc4: return this.binary(this.uint(1));
+      case 0xc5: return this.binary(this.uint(2));
+      case 0xc6: return this.binary(this.uint(4));
+      case 0xca: return this.view.getFloat32(this.take(4));
+      case 0xcb: return this.view.getFloat64(this.take(8));
+      case 0xcc: return this.uint(1);
+      case 0xcd: return this.uint(2);
+      case 0xce: return this.uint(4);
+      case 0xcf: return this.uint(8);
+      case 0xd0: return this.int(1);
+      case 0xd1: return this.int(2);
+      case 0xd2: return this.int(4);
+      case 0xd3: return this.int(8);
+      case 0xd9: return this.string(this.uint(1));
+      case 0xda: return this.string(this.uint(2));
+      case 0xdb: return this.string(this.uint(4));
+      case 0xdc: return this.array(this.uint(2));
+      case 0xdd: return this.array(this.uint(4));
+      case 0xde: return this.map(this.uint(2));
+      case 0xdf: return this.map(this.uint(4));
+      default: throw new Error(`Unsupported MessagePack type 0x${type.toString(16)}`);
+    }
+  }
+}
+
+function asBytes(data) {
+  if (data instanceof ArrayBuffer) return new Uint8Array(data);
+  if (ArrayBuffer.isView(data)) return new Uint8Array(data.buffer, data.byteOffset, data.byteLength);
+  throw new TypeError('Expected a binary MessagePack packet');
+}
+
+export function decodeMsgpack(data) {
+  const reader = new Reader(asBytes(data));
+  const value = reader.value();
+  if (reader.offset !== reader.bytes.length) throw new Error('Trailing MessagePack data');
+  return value;
+}
+
+function isValidPacket(packet) {
+  return packet !== null
+    && typeof packet === 'object'
+    && Number.isInteger(packet.type)
+    && packet.type >= 0
+    && packet.type <= 4
+    && typeof packet.nsp === 'string'
+    && (packet.id === undefined || packet.id === null || Number.isInteger(packet.id));
+}
+
+export class Encoder {
+  encode(packet) {
+    const message = { type: packet.type, data: packet.data, nsp: packet.nsp };
+    if (packet.id !== undefined) message.id = packet.id;
+    return [encodeMsgpack(message)];
+  }
+}
+
+// socket.io-client subscribes with on/off('decoded') and feeds every
+// Engine.IO message to add().
+export class Decoder {
+  constructor() {
+    this.listeners = new Set();
+  }
+
+  on(event, listener) {
+    if (event === 'decoded') this.listeners.add(listener);
+    return this;
+  }
+
+  off(event, listener) {
+    if (event === 'decoded') this.listeners.delete(listener);
+    return this;
+  }
+
+  add(data) {
+    const packet = decodeMsgpack(data);
+    if (!isValidPacket(packet)) throw new Error('Invalid Socket.IO packet');
+    if (packet.id === null) delete packet.id;
+    for (const listener of [...this.listeners]) listener(packet);
+  }
+
+  destroy() {
+    this.listeners.clear();
+  }
+}
+
+export function socketWireFormat(value) {
+  return value === WIRE_MSGPACK ? WIRE_MSGPACK : WIRE_JSON;
+}
@@ -0,0 +1,83 @@
+import assert from 'node:assert/strict';
+import test from 'node:test';
+
+import {
+  Decoder,
+  Encoder,
+  WIRE_JSON,
+  WIRE_MSGPACK,
+  decodeMsgpack,
+  encodeMsgpack,
+  socketWireFormat,
+} from './msgpackParser.js';
+
+const bytes = (...values) => Uint8Array.from(values);
+
+test('encodes the compact MessagePack forms python msgpack produces', () => {
+  assert.deepEqual(encodeMsgpack({ a: 1 }), bytes(0x81, 0xa1, 0x61, 0x01));
+  assert.deepEqual(encodeMsgpack([null, true, false, -1]), bytes(0x94, 0xc0, 0xc3, 0xc2, 0xff));
+  assert.deepEqual(encodeMsgpack(200), bytes(0xcc, 0xc8));
+  assert.deepEqual(encodeMsgpack(-200), bytes(0xd1, 0xff, 0x38));
+  assert.deepEqual(encodeMsgpack(1.5), bytes(0xcb, 0x3f, 0xf8, 0, 0, 0, 0, 0, 0));
+  assert.deepEqual(encodeMsgpack('Знатоки').slice(0, 1), bytes(0xa0 | 14));
+});
+
+test('round-trips nested state payloads, long strings and large numbers', () => {
+  const state = {
+    revision: 70_000,
+    server_now_ms: 1_760_000_000_123,
+    phase: 'DISCUSSION',
+    score: { znatoki: 5, tv: -3 },
+    logs: Array.from({ length: 40 }, (_, index) => `Ход ${index}`),
+    round: { question: 'в'.repeat(300), deadline: 12.25, media: null },
+    flags: { paused: false, blitz: true },
+  };
+
+  assert.deepEqual(decodeMsgpack(encodeMsgpack(state)), state);
+  assert.deepEqual(decodeMsgpack(encodeMsgpack({ skipped: undefined, kept: 0 })), { kept: 0 });
+  assert.deepEqual(decodeMsgpack(encodeMsgpack(bytes(1, 2, 3))), bytes(1, 2, 3));
+});
+
+test('rejects truncated and trailing data', () => {
+  assert.throws(() => decodeMsgpack(bytes(0x92, 0x01)), /Truncated/);
+  assert.throws(() => decodeMsgpack(bytes(0x01, 0x02)), /Trailing/);
+  assert.throws(() => decodeMsgpack('2["x"]'), /binary/);
+});
+
+test('encoder and decoder speak Socket.IO packets as {type, data, nsp, id} maps', () => {
+  const [encoded] = new Encoder().encode({
+    type: 2,
+    nsp: '/',
+    data: ['state_subscribe', { protocol: 'delta' }],
+    id: 3,
+  });
+  assert.deepEqual(decodeMsgpack(encoded), {
+    type: 2,
+    data: ['state_subscribe', { protocol: 'delta' }],
+    nsp: '/',
+    id: 3,
+  });
+
+  const decoder = new Decoder();
+  const received = [];
+  const listener = (packet) => received.push(packet);
+  decoder.on('decoded', listener);
+  // python-socketio sends id: null for packets without an acknowledgement.
+  decoder.add(encodeMsgpack({ type: 2, data: ['stop_sound'], nsp: '/', id: null }));
+  decoder.add(encodeMsgpack({ type: 3, data: [{ ok: true }], nsp: '/', id: 3 }).buffer);
+  assert.deepEqual(received, [
+    { type: 2, data: ['stop_sound'], nsp: '/' },
+    { type: 3, data: [{ ok: true }], nsp: '/', id: 3 },
+  ]);
+
+  assert.throws(() => decoder.add(encodeMsgpack({ type: 9, nsp: '/' })), /Invalid/);
+  decoder.off('decoded', listener);
+  decoder.add(encodeMsgpack({ type: 2, data: ['stop_sound'], nsp: '/' }));
+  assert.equal(received.length, 2);
+});
+
+test('only an explicit msgpack build setting changes the wire format', () => {
+  assert.equal(socketWireFormat('msgpack'), WIRE_MSGPACK);
+  assert.equal(socketWireFormat(undefined), WIRE_JSON);
+  assert.equal(socketWireFormat('cbor'), WIRE_JSON);
+});
@@ -30,6 +30,13 @@ export function approvedParticipantOptions(players = []) {
   ));
 }
 
+export function evictedGroupsSummary(evicted) {
+  if (!evicted?.count) return null;
+  const names = (evicted.recent || []).map((item) => item.name).filter(Boolean);
+  const recent = names.length > 0 ? ` (последние: ${names.join('; ')})` : '';
+  return `Удалено неактивных подключений: ${evicted.count}${recent}`;
+}
+
 export function groupDisplayName(group) {
   return (group?.participants || []).map((participant) => participant.name).join(', ');
 }
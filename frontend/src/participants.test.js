@@ -3,6 +3,7 @@ import test from 'node:test';
 
 import {
   approvedParticipantOptions,
+  evictedGroupsSummary,
   participantCount,
   participantGroups,
 } from './participants.js';
@@ -51,3 +52,18 @@ test('respondent options include approved offline people and disambiguate duplic
     { value: 'p4', label: 'Иван · подключение 2', online: false },
   ]);
 });
+
+test('evicted groups are summarized in one line instead of roster rows', () => {
+  assert.equal(evictedGroupsSummary(undefined), null);
+  assert.equal(evictedGroupsSummary({ count: 0, recent: [] }), null);
+  assert.equal(
+    evictedGroupsSummary({
+      count: 12,
+      recent: [
+        { name: 'Иван', reason: 'offline' },
+        { name: 'Мария, Пётр', reason: 'over_limit' },
+      ],
+    }),
+    'Удалено неактивных подключений: 12 (последние: Иван; Мария, Пётр)',
+  );
+});
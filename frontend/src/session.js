@@ -58,3 +58,30 @@ export function getKickedPlayerNotice(data) {
     ? data.message
     : DEFAULT_KICKED_PLAYER_MESSAGE;
 }
+
+// The backend refuses connects to a room the host has not opened yet.
+export const ROOM_NOT_FOUND = 'room_not_found';
+export const ROOM_RETRY_DELAY_MS = 5000;
+const ROOM_NOT_FOUND_MESSAGE = 'Ведущий ещё не открыл эту игру.';
+
+export function getRoomNotFoundNotice(error) {
+  return error?.message === ROOM_NOT_FOUND ? ROOM_NOT_FOUND_MESSAGE : null;
+}
+
+// Why the connect that carried the host's password was refused.
+export function getAdminConnectError(error) {
+  if (error?.message === ROOM_NOT_FOUND) return 'Неверный пароль';
+  const message = error?.data?.message;
+  if (typeof message === 'string' && message.trim()) return message;
+  return error?.message || 'Ошибка подключения';
+}
+
+// The host's password opens the room on connect; it is only sent once.
+export function withAdminPassword(auth, password) {
+  return { ...auth, admin_password: password };
+}
+
+export function withoutAdminPassword(auth) {
+  const { admin_password: _password, ...rest } = auth || {};
+  return rest;
+}
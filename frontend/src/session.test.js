@@ -4,11 +4,15 @@ import test from 'node:test';
 import {
   ADMIN_TOKEN_KEY,
   PLAYER_TOKEN_KEY,
+  getAdminConnectError,
   getAdminExpiryMs,
   getExpiredAdminSession,
   getKickedPlayerNotice,
+  getRoomNotFoundNotice,
   getSessionRestorePayload,
   saveAdminToken,
+  withAdminPassword,
+  withoutAdminPassword,
 } from './session.js';
 
 function createStorage(initial = {}) {
@@ -110,3 +114,29 @@ test('kicked player notice preserves a server explanation and has a host-worded
   assert.equal(getKickedPlayerNotice({ message: '   ' }), 'Ведущий отключил вас от игры.');
   assert.equal(getKickedPlayerNotice(), 'Ведущий отключил вас от игры.');
 });
+
+test('only a room_not_found refusal asks the player to wait for the host', () => {
+  assert.equal(
+    getRoomNotFoundNotice(new Error('room_not_found')),
+    'Ведущий ещё не открыл эту игру.',
+  );
+  assert.equal(getRoomNotFoundNotice(new Error('room_limit')), null);
+  assert.equal(getRoomNotFoundNotice(undefined), null);
+});
+
+test('the admin password rides on one connect and is dropped afterwards', () => {
+  const auth = withAdminPassword({ room: 'friday' }, 'secret');
+  assert.deepEqual(auth, { room: 'friday', admin_password: 'secret' });
+  assert.deepEqual(withoutAdminPassword(auth), { room: 'friday' });
+  assert.deepEqual(withoutAdminPassword(undefined), {});
+});
+
+test('a refused host connect names the password only for room_not_found', () => {
+  assert.equal(getAdminConnectError(new Error('room_not_found')), 'Неверный пароль');
+  const tooMany = Object.assign(new Error('too_many_rooms'), {
+    data: { message: 'Сервер не может открыть ещё одну игру' },
+  });
+  assert.equal(getAdminConnectError(tooMany), 'Сервер не может открыть ещё одну игру');
+  assert.equal(getAdminConnectError(new Error('websocket error')), 'websocket error');
+  assert.equal(getAdminConnectError(undefined), 'Ошибка подключения');
+});
@@ -3,23 +3,48 @@ import {
   DEVELOPMENT_BACKEND_ORIGIN,
   backendHttpUrl,
   backendSocketPath,
+  gameRoomFromSearch,
+  withGameRoom,
+  withImageVariant,
+  withIntroBundle,
 } from './backendUrls.js';
+import * as msgpackParser from './msgpackParser.js';
 
 const isDevelopment = import.meta.env.DEV;
 const backendOrigin = isDevelopment ? DEVELOPMENT_BACKEND_ORIGIN : '';
+export const gameRoom = gameRoomFromSearch(window.location.search);
+// Builds with VITE_SOCKET_WIRE=msgpack exchange binary MessagePack frames.
+const msgpackWire = msgpackParser.socketWireFormat(import.meta.env.VITE_SOCKET_WIRE)
+  === msgpackParser.WIRE_MSGPACK;
 
-export const mediaUrl = (mediaId) => backendHttpUrl(
-  `media/${encodeURIComponent(mediaId)}`,
-  { isDevelopment },
+export const mediaUrl = (mediaId, { variant = null } = {}) => withGameRoom(
+  withImageVariant(
+    backendHttpUrl(`media/${encodeURIComponent(mediaId)}`, { isDevelopment }),
+    variant,
+  ),
+  gameRoom,
 );
-export const introAuthorPhotoUrl = (sector, slot) => (
-  backendHttpUrl(
-    `intro/author-photo/${encodeURIComponent(sector)}/${encodeURIComponent(slot)}`,
-    { isDevelopment },
+export const introAuthorPhotoUrl = (sector, slot, { variant = 'display', bundle = null } = {}) => (
+  withGameRoom(
+    withIntroBundle(
+      withImageVariant(
+        backendHttpUrl(
+          `intro/author-photo/${encodeURIComponent(sector)}/${encodeURIComponent(slot)}`,
+          { isDevelopment },
+        ),
+        variant,
+      ),
+      bundle,
+    ),
+    gameRoom,
   )
 );
 
 export const socket = io(backendOrigin || '/', {
   path: backendSocketPath({ isDevelopment }),
   transports: ['websocket'],
+  // The query routes the handshake to the room's backend worker.
+  query: msgpackWire ? { room: gameRoom, wire: msgpackParser.WIRE_MSGPACK } : { room: gameRoom },
+  auth: { room: gameRoom },
+  ...(msgpackWire ? { parser: msgpackParser } : {}),
 });
@@ -0,0 +1,101 @@
+export const STATE_PROTOCOL_DELTA = 'delta';
+export const EFFECTS_EVENT = 'effects';
+
+function unescapeToken(token) {
+  return token.replace(/~1/g, '/').replace(/~0/g, '~');
+}
+
+function clone(value) {
+  return value === undefined ? value : structuredClone(value);
+}
+
+function applyOperation(document, operation) {
+  const { op, path } = operation;
+  if (path === '') {
+    if (op !== 'replace') throw new Error('Only replace may target the root');
+    return clone(operation.value);
+  }
+  const tokens = path.slice(1).split('/').map(unescapeToken);
+  const key = tokens.pop();
+  let parent = document;
+  for (const token of tokens) {
+    const next = Array.isArray(parent) ? parent[Number(token)] : parent?.[token];
+    if (next === undefined) throw new Error(`Invalid patch path: ${path}`);
+    parent = next;
+  }
+
+  if (Array.isArray(parent)) {
+    if (op === 'add' && key === '-') {
+      parent.push(clone(operation.value));
+      return document;
+    }
+    const index = Number(key);
+    if (op === 'add' && index >= 0 && index <= parent.length) {
+      parent.splice(index, 0, clone(operation.value));
+    } else if (op === 'remove' && index >= 0 && index < parent.length) {
+      parent.splice(index, 1);
+    } else if (op === 'replace' && index >= 0 && index < parent.length) {
+      parent[index] = clone(operation.value);
+    } else {
+      throw new Error(`Invalid patch operation at ${path}`);
+    }
+    return document;
+  }
+  if (parent === null || typeof parent !== 'object') {
+    throw new Error(`Invalid patch path: ${path}`);
+  }
+  if (op === 'add' || op === 'replace') {
+    parent[key] = clone(operation.value);
+  } else if (op === 'remove' && key in parent) {
+    delete parent[key];
+  } else {
+    throw new Error(`Invalid patch operation at ${path}`);
+  }
+  return document;
+}
+
+export function applyStatePatch(state, ops) {
+  return ops.reduce(applyOperation, structuredClone(state));
+}
+
+// Returns the next raw server snapshot for a `state_patch`, or a status that
+// tells the caller to ignore an already-applied patch or to resubscribe.
+export function reconcileStatePatch(state, patch) {
+  if (!state || !Number.isInteger(state.revision) || !patch) {
+    return { status: 'gap', state };
+  }
+  // A patch at the current revision only refreshes `server_now_ms`.
+  const refreshesClock = patch.revision === state.revision
+    && patch.base_revision === state.revision;
+  if (patch.revision <= state.revision && !refreshesClock) return { status: 'stale', state };
+  if (patch.base_revision !== state.revision) return { status: 'gap', state };
+  try {
+    const next = applyStatePatch(state, patch.ops || []);
+    return { status: 'applied', state: { ...next, revision: patch.revision } };
+  } catch {
+    return { status: 'gap', state };
+  }
+}
+
+// Replays patches buffered while a subscription snapshot was in flight.
+export function replayStatePatches(snapshot, patches) {
+  let state = snapshot;
+  for (const patch of [...patches].sort((a, b) => a.revision - b.revision)) {
+    const result = reconcileStatePatch(state, patch);
+    if (result.status === 'gap') return result;
+    state = result.state;
+  }
+  return { status: 'applied', state };
+}
+
+// Hands every `[event, data]` pair of a batched `effects` packet to the
+// listeners of that event, in order and within one task, so React renders
+// the whole transition once.
+export function dispatchEffects(emitter, envelope) {
+  const events = Array.isArray(envelope?.events) ? envelope.events : [];
+  for (const entry of events) {
+    if (!Array.isArray(entry) || typeof entry[0] !== 'string' || entry[0] === EFFECTS_EVENT) continue;
+    const [event, data] = entry;
+    for (const listener of [...emitter.listeners(event)]) listener(data);
+  }
+}
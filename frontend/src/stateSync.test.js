@@ -0,0 +1,116 @@
+import assert from 'node:assert/strict';
+import test from 'node:test';
+
+import {
+  applyStatePatch,
+  dispatchEffects,
+  reconcileStatePatch,
+  replayStatePatches,
+} from './stateSync.js';
+
+const snapshot = {
+  revision: 4,
+  phase: 'PRE_ROUND',
+  score: { znatoki: 0, tv: 0 },
+  used_questions: [3],
+  logs: ['b', 'a'],
+  round: null,
+};
+
+test('applies nested replace, list add and removal without mutating input', () => {
+  const next = applyStatePatch(snapshot, [
+    { op: 'replace', path: '/score/znatoki', value: 1 },
+    { op: 'add', path: '/used_questions/-', value: 7 },
+    { op: 'add', path: '/logs/0', value: 'c' },
+    { op: 'remove', path: '/logs/2' },
+    { op: 'replace', path: '/round', value: { kind: 'normal', sector: 7 } },
+  ]);
+
+  assert.deepEqual(next.score, { znatoki: 1, tv: 0 });
+  assert.deepEqual(next.used_questions, [3, 7]);
+  assert.deepEqual(next.logs, ['c', 'b']);
+  assert.equal(next.round.sector, 7);
+  assert.deepEqual(snapshot.logs, ['b', 'a']);
+});
+
+test('reconciles only the patch based on the current revision', () => {
+  const patch = {
+    base_revision: 4,
+    revision: 5,
+    ops: [{ op: 'replace', path: '/phase', value: 'QUESTION_READING' }],
+  };
+
+  const applied = reconcileStatePatch(snapshot, patch);
+  assert.equal(applied.status, 'applied');
+  assert.equal(applied.state.revision, 5);
+  assert.equal(applied.state.phase, 'QUESTION_READING');
+
+  assert.equal(reconcileStatePatch(applied.state, patch).status, 'stale');
+  assert.equal(
+    reconcileStatePatch(snapshot, { ...patch, base_revision: 3, revision: 6 }).status,
+    'gap',
+  );
+  assert.equal(
+    reconcileStatePatch(snapshot, {
+      base_revision: 4,
+      revision: 5,
+      ops: [{ op: 'replace', path: '/missing/key', value: 1 }],
+    }).status,
+    'gap',
+  );
+  assert.equal(reconcileStatePatch(null, patch).status, 'gap');
+});
+
+test('applies a clock refresh at the current revision and ignores older ones', () => {
+  const state = { ...snapshot, timer: { server_now_ms: 1_000 } };
+  const clock = {
+    base_revision: 4,
+    revision: 4,
+    ops: [{ op: 'replace', path: '/timer/server_now_ms', value: 61_000 }],
+  };
+
+  const refreshed = reconcileStatePatch(state, clock);
+  assert.equal(refreshed.status, 'applied');
+  assert.equal(refreshed.state.revision, 4);
+  assert.equal(refreshed.state.timer.server_now_ms, 61_000);
+
+  const later = { ...state, revision: 5 };
+  assert.equal(reconcileStatePatch(later, clock).status, 'stale');
+});
+
+test('replays buffered patches after a subscription snapshot', () => {
+  const patches = [
+    { base_revision: 5, revision: 6, ops: [{ op: 'replace', path: '/score/tv', value: 2 }] },
+    { base_revision: 3, revision: 4, ops: [] },
+    { base_revision: 4, revision: 5, ops: [{ op: 'replace', path: '/score/tv', value: 1 }] },
+  ];
+
+  const result = replayStatePatches(snapshot, patches);
+
+  assert.equal(result.status, 'applied');
+  assert.equal(result.state.revision, 6);
+  assert.equal(result.state.score.tv, 2);
+});
+
+
+test('an effects packet replays its events to their listeners in order', () => {
+  const received = [];
+  const listeners = {
+    play_sound: [(data) => received.push(['play', data.sound])],
+    admin_question: [(data) => received.push(['question', data])],
+    effects: [() => received.push(['nested'])],
+  };
+  const emitter = { listeners: (event) => listeners[event] || [] };
+
+  dispatchEffects(emitter, {
+    events: [
+      ['play_sound', { sound: 'gong' }],
+      ['state_update', { revision: 3 }],
+      ['effects', { events: [] }],
+      ['admin_question', null],
+    ],
+  });
+  dispatchEffects(emitter, null);
+
+  assert.deepEqual(received, [['play', 'gong'], ['question', null]]);
+});